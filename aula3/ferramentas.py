@@ -0,0 +1,147 @@
+"""
+Aula 3 - Ferramentas (Tools) usadas pelos agentes.
+
+Fica num módulo separado porque importar `crewai.tools` (e com ele o
+crewai inteiro) é caro: `main.py` só carrega este módulo quando a primeira
+ferramenta é pedida ao registro.
+
+Busca e scraping são reais (`curso_crewai.web`): pool HTTP compartilhado,
+várias páginas em paralelo com limite por host, HTML extraído enquanto
+chega e cache revalidado por ETag/Last-Modified. `_arun` é a versão
+assíncrona usada quando a crew roda em asyncio.
+"""
+
+import re
+from typing import List, Type
+
+from crewai.tools import BaseTool
+from curso_crewai.rastreamento import rastreado
+from curso_crewai.web import coletor_padrao, formatar_busca
+from pydantic import BaseModel, Field
+
+# Quantas páginas dos resultados a busca abre (em paralelo)
+PAGINAS_ABERTAS = 3
+
+
+# Schema para entrada da ferramenta de busca
+class BuscaWebInput(BaseModel):
+    query: str = Field(description="Termo de busca para pesquisar na web")
+
+
+# Schema para entrada da ferramenta de scraping
+class ScrapingInput(BaseModel):
+    url: str = Field(
+        description="URL do site para extrair conteúdo (ou várias, separadas "
+        "por espaço)"
+    )
+
+
+# Schema para entrada da ferramenta de leitura
+class LeituraArquivoInput(BaseModel):
+    filepath: str = Field(description="Caminho do arquivo para ler")
+
+
+def _urls(texto: str) -> List[str]:
+    urls = []
+    for url in re.findall(r"https?://[^\s,;<>\"']+", texto):
+        # Pontuação da frase em volta ("(veja https://x.com).") não é da URL;
+        # parênteses equilibrados (páginas da Wikipedia) são
+        url = url.rstrip(".:!?")
+        while url.endswith(")") and url.count(")") > url.count("("):
+            url = url[:-1].rstrip(".:!?")
+        urls.append(url)
+    return urls or [texto.strip()]
+
+
+# Ferramenta de Busca Web
+class BuscaWebTool(BaseTool):
+    name: str = "busca_web"
+    description: str = (
+        "Busca informações na web: lista os principais resultados e o "
+        "conteúdo das primeiras páginas"
+    )
+    args_schema: Type[BaseModel] = BuscaWebInput
+
+    # Cada chamada vira um span filho do passo do agente que a pediu
+    @rastreado("tool.busca_web", argumentos=True)
+    def _run(self, query: str) -> str:
+        coletor = coletor_padrao()
+        try:
+            resultados = coletor.buscar_web(query)
+        except ConnectionError as erro:
+            return f"❌ {erro}"
+        paginas = coletor.buscar_varias([r.url for r in resultados[:PAGINAS_ABERTAS]])
+        return formatar_busca(query, resultados, paginas)
+
+    @rastreado("tool.busca_web", argumentos=True)
+    async def _arun(self, query: str) -> str:
+        coletor = coletor_padrao()
+        try:
+            resultados = await coletor.abuscar_web(query)
+        except ConnectionError as erro:
+            return f"❌ {erro}"
+        paginas = await coletor.abuscar_varias(
+            [r.url for r in resultados[:PAGINAS_ABERTAS]]
+        )
+        return formatar_busca(query, resultados, paginas)
+
+
+# Ferramenta de Scraping
+class ScrapingTool(BaseTool):
+    name: str = "scraping_web"
+    description: str = (
+        "Extrai título, seções e texto de páginas web (uma ou várias URLs)"
+    )
+    args_schema: Type[BaseModel] = ScrapingInput
+    # A URL vem do agente (e do conteúdo que ele leu): por padrão nada de
+    # localhost, rede privada ou metadados da nuvem (169.254.169.254)
+    permitir_internos: bool = False
+
+    @rastreado("tool.scraping_web", argumentos=True)
+    def _run(self, url: str) -> str:
+        paginas = coletor_padrao().buscar_varias(
+            _urls(url), bloquear_internos=not self.permitir_internos
+        )
+        return "\n\n".join(pagina.resumo() for pagina in paginas)
+
+    @rastreado("tool.scraping_web", argumentos=True)
+    async def _arun(self, url: str) -> str:
+        paginas = await coletor_padrao().abuscar_varias(
+            _urls(url), bloquear_internos=not self.permitir_internos
+        )
+        return "\n\n".join(pagina.resumo() for pagina in paginas)
+
+
+# Ferramenta de Leitura de Arquivo
+class LeituraArquivoTool(BaseTool):
+    name: str = "leitura_arquivo"
+    description: str = "Lê e analisa conteúdo de arquivos"
+    args_schema: Type[BaseModel] = LeituraArquivoInput
+
+    @rastreado("tool.leitura_arquivo", argumentos=True)
+    def _run(self, filepath: str) -> str:
+        return f"""
+📁 ARQUIVO: {filepath}
+
+=== CONFIGURAÇÃO CREWAI ===
+Framework: CrewAI v0.28.8
+Python: 3.8+
+Dependências: langchain, openai, pydantic
+
+=== EXEMPLOS ===
+1. Agente Pesquisador:
+   - Role: Researcher
+   - Goal: Coletar informações
+   - Tools: Web search
+
+2. Agente Analista:
+   - Role: Analyst  
+   - Goal: Processar dados
+   - Tools: Data processing
+
+=== PRÁTICAS ===
+• Roles claros para agentes
+• Expected_output específico
+• Monitorar tokens
+• Testar com dados simulados
+"""
@@ -1,139 +1,28 @@
 # Aula 3: Ferramentas (Tools) e Processos (Processes) no CrewAI
 # VERSÃO OTIMIZADA PARA ECONOMIA DE TOKENS
+#
+# Ferramentas, agentes, tarefas e crews ficam declarados no `registro` e só
+# são construídos no primeiro uso; o crewai só é importado nesse momento.
 
-from crewai import Agent, Task, Crew, Process
-from crewai.tools import BaseTool
 from dotenv import load_dotenv
 import time
 import os
-from typing import Type
-from pydantic import BaseModel, Field
+from curso_crewai import exportador, rastreamento
+from curso_crewai.fabrica import Registro, importar_preguicoso
+from curso_crewai.limite_taxa import contexto_limite, instalar_litellm, limitador_padrao
+
+crewai = importar_preguicoso("crewai")
+ferramentas = importar_preguicoso("ferramentas")
 
 load_dotenv()
 
-print("🎯 Aula 3: Ferramentas e Processos [MODO ECONÔMICO]")
-print("=" * 50)
+registro = Registro()
 
 # --- PARTE 1: FERRAMENTAS REAIS DO CREWAI ---
-print("🔧 Configurando ferramentas do CrewAI...")
-
-
-# Schema para entrada da ferramenta de busca
-class BuscaWebInput(BaseModel):
-    query: str = Field(description="Termo de busca para pesquisar na web")
-
-
-# Schema para entrada da ferramenta de scraping
-class ScrapingInput(BaseModel):
-    url: str = Field(description="URL do site para extrair conteúdo")
-
-
-# Schema para entrada da ferramenta de leitura
-class LeituraArquivoInput(BaseModel):
-    filepath: str = Field(description="Caminho do arquivo para ler")
-
-
-# Ferramenta de Busca Web
-class BuscaWebTool(BaseTool):
-    name: str = "busca_web"
-    description: str = "Busca informações específicas na web"
-    args_schema: Type[BaseModel] = BuscaWebInput
-    
-    def _run(self, query: str) -> str:
-        return f"""
-🔍 BUSCA: {query}
-
-📄 PRINCIPAIS RESULTADOS:
-• CrewAI - Framework Python para agentes IA colaborativos
-• GitHub oficial: joaomdmoura/crewai 
-• Características: múltiplos agentes, roles específicos, processos sequenciais/hierárquicos
-
-💡 FUNCIONALIDADES:
-- Sistema de agentes com especialidades
-- Delegação de tarefas entre agentes
-- Ferramentas customizadas integradas
-- Suporte a LLMs diversos
-
-🎯 CASOS DE USO:
-- Análise de dados complexos
-- Automação de workflows
-- Geração de conteúdo especializado
-"""
-
-
-# Ferramenta de Scraping
-class ScrapingTool(BaseTool):
-    name: str = "scraping_web"
-    description: str = "Extrai conteúdo específico de páginas web"
-    args_schema: Type[BaseModel] = ScrapingInput
-    
-    def _run(self, url: str) -> str:
-        return f"""
-📄 CONTEÚDO DE: {url}
-
-CrewAI - Framework para Agentes IA Colaborativos
-
-📝 RESUMO:
-Framework Python para criar equipes de agentes IA especializados.
-Cada agente tem role específico e colabora para completar tarefas complexas.
-
-🔧 FUNCIONALIDADES:
-• Agentes com especialidades definidas
-• Tarefas interconectadas
-• Processos sequenciais e hierárquicos
-• Integração com ferramentas externas
-
-⭐ VANTAGENS:
-• Modularidade
-• Escalabilidade
-• Flexibilidade
-• Suporte múltiplos LLMs
-"""
-
-
-# Ferramenta de Leitura de Arquivo
-class LeituraArquivoTool(BaseTool):
-    name: str = "leitura_arquivo"
-    description: str = "Lê e analisa conteúdo de arquivos"
-    args_schema: Type[BaseModel] = LeituraArquivoInput
-    
-    def _run(self, filepath: str) -> str:
-        return f"""
-📁 ARQUIVO: {filepath}
-
-=== CONFIGURAÇÃO CREWAI ===
-Framework: CrewAI v0.28.8
-Python: 3.8+
-Dependências: langchain, openai, pydantic
-
-=== EXEMPLOS ===
-1. Agente Pesquisador:
-   - Role: Researcher
-   - Goal: Coletar informações
-   - Tools: Web search
-
-2. Agente Analista:
-   - Role: Analyst  
-   - Goal: Processar dados
-   - Tools: Data processing
-
-=== PRÁTICAS ===
-• Roles claros para agentes
-• Expected_output específico
-• Monitorar tokens
-• Testar com dados simulados
-"""
-
-
-# Instanciando as ferramentas
-busca_web_tool = BuscaWebTool()
-scraping_tool = ScrapingTool()
-leitura_arquivo_tool = LeituraArquivoTool()
-
-print("✅ Ferramentas CrewAI configuradas:")
-print("🔍 Busca Web - Pesquisa inteligente na web")
-print("🌐 Scraping - Extração de conteúdo de sites")
-print("📁 Leitura de Arquivo - Análise de documentos")
+# Instanciando as ferramentas (classes em ferramentas.py)
+registro.registrar("busca_web_tool", lambda: ferramentas.BuscaWebTool())
+registro.registrar("scraping_tool", lambda: ferramentas.ScrapingTool())
+registro.registrar("leitura_arquivo_tool", lambda: ferramentas.LeituraArquivoTool())
 
 # --- PARTE 2: AGENTES COM FERRAMENTAS INTEGRADAS ---
 
@@ -144,53 +33,58 @@ CONFIG_SISTEMA = {
     'temperature': 0.5  # Reduzido para respostas mais focadas
 }
 
-print("⚙️  CONFIGURAÇÕES OTIMIZADAS:")
-print(f"   � Modelo: {CONFIG_SISTEMA['modelo_economico']}")
-print(f"   � Max Tokens: {CONFIG_SISTEMA['max_tokens']}")
-print(f"   🎯 Temperature: {CONFIG_SISTEMA['temperature']}")
-print()
 
 # Agente Pesquisador otimizado
-pesquisador_com_ferramentas = Agent(
-    role='Pesquisador Web',
-    goal='Coletar informações usando ferramentas de busca',
-    backstory="""Pesquisador especializado em buscas web eficientes.
-    Utiliza ferramentas para encontrar informações relevantes e verificar fontes.
-    Sempre responde em português.""",
-    tools=[busca_web_tool, scraping_tool, leitura_arquivo_tool],
-    verbose=True,
-    allow_delegation=False,
-    max_iter=2,  # Limita iterações para economizar tokens
-    max_execution_time=60  # Timeout de 1 minuto
-)
+@registro.registrar("pesquisador_com_ferramentas")
+def criar_pesquisador_com_ferramentas():
+    return crewai.Agent(
+        role='Pesquisador Web',
+        goal='Coletar informações usando ferramentas de busca',
+        backstory="""Pesquisador especializado em buscas web eficientes.
+        Utiliza ferramentas para encontrar informações relevantes e verificar fontes.
+        Sempre responde em português.""",
+        tools=registro.obter_varios(
+            "busca_web_tool",
+            "scraping_tool",
+            "leitura_arquivo_tool",
+        ),
+        verbose=True,
+        allow_delegation=False,
+        max_iter=2,  # Limita iterações para economizar tokens
+        max_execution_time=60  # Timeout de 1 minuto
+    )
 
 # Agente Redator otimizado
-redator_especializado = Agent(
-    role='Redator Técnico',
-    goal='Criar conteúdo claro e bem estruturado',
-    backstory="""Redator técnico que transforma informações em conteúdo acessível.
-    Especialista em organizar informações de forma lógica.
-    Sempre escreve em português.""",
-    tools=[leitura_arquivo_tool],
-    verbose=True,
-    allow_delegation=False,
-    max_iter=2,
-    max_execution_time=60
-)
+@registro.registrar("redator_especializado")
+def criar_redator_especializado():
+    return crewai.Agent(
+        role='Redator Técnico',
+        goal='Criar conteúdo claro e bem estruturado',
+        backstory="""Redator técnico que transforma informações em conteúdo acessível.
+        Especialista em organizar informações de forma lógica.
+        Sempre escreve em português.""",
+        tools=[registro.obter("leitura_arquivo_tool")],
+        verbose=True,
+        allow_delegation=False,
+        max_iter=2,
+        max_execution_time=60
+    )
 
 # Agente Revisor otimizado
-revisor_critico = Agent(
-    role='Revisor Crítico',
-    goal='Analisar qualidade do conteúdo',
-    backstory="""Revisor experiente que analisa textos em busca de melhorias.
-    Fornece feedback construtivo e específico.
-    Sempre analisa em português.""",
-    tools=[busca_web_tool, leitura_arquivo_tool],
-    verbose=True,
-    allow_delegation=False,
-    max_iter=2,
-    max_execution_time=60
-)
+@registro.registrar("revisor_critico")
+def criar_revisor_critico():
+    return crewai.Agent(
+        role='Revisor Crítico',
+        goal='Analisar qualidade do conteúdo',
+        backstory="""Revisor experiente que analisa textos em busca de melhorias.
+        Fornece feedback construtivo e específico.
+        Sempre analisa em português.""",
+        tools=registro.obter_varios("busca_web_tool", "leitura_arquivo_tool"),
+        verbose=True,
+        allow_delegation=False,
+        max_iter=2,
+        max_execution_time=60
+    )
 
 # Sistema de métricas simplificado
 class MetricasExecucao:
@@ -205,6 +99,15 @@ class MetricasExecucao:
     
     def finalizar_medicao(self):
         return time.time() - self.inicio_execucao if self.inicio_execucao else 0
+
+    def exportar(self, sucesso=True, modelo=""):
+        # Uma vez por execução: duração, resultado e tokens no /metrics
+        exportador.observar_execucao(
+            "crew", self.finalizar_medicao(), sucesso, modelo, self.tipo_processo
+        )
+        exportador.observar_uso(
+            "crew", modelo, self.tipo_processo, total=self.tokens_estimados
+        )
     
     def gerar_relatorio(self):
         tempo_total = self.finalizar_medicao()
@@ -221,121 +124,202 @@ metricas = MetricasExecucao()
 # --- PARTE 3: DEFINIÇÃO DAS TAREFAS ---
 
 # Tarefas otimizadas para menor consumo de tokens
-tarefa_pesquisa_web = Task(
-    description="""Pesquise informações sobre 'CrewAI framework'.
-    
-    Use suas ferramentas para encontrar:
-    1. Características principais do framework
-    2. Vantagens práticas
-    3. Casos de uso principais
-    
-    Seja conciso e direto.""",
-    expected_output="""Relatório com:
-    - 3 características principais
-    - 2 vantagens práticas
-    - 2 casos de uso
-    - Fontes consultadas
-    Em português, máximo 300 palavras.""",
-    agent=pesquisador_com_ferramentas
-)
-
-tarefa_redacao_tecnica = Task(
-    description="""Crie um artigo técnico conciso sobre CrewAI baseado na pesquisa.
-    
-    Inclua:
-    1. Introdução breve
-    2. Características principais
-    3. Casos de uso práticos
-    4. Conclusão
-    
-    Seja direto e objetivo.""",
-    expected_output="""Artigo de 400-500 palavras com:
-    - Introdução (50 palavras)
-    - Seções organizadas
-    - Linguagem clara
-    - Conclusão prática
-    Em português.""",
-    agent=redator_especializado
-)
-
-tarefa_revisao_critica = Task(
-    description="""Revise o artigo analisando:
-    
-    1. Qualidade das informações
-    2. Clareza do conteúdo
-    3. Adequação ao público
-    
-    Feedback conciso e construtivo.""",
-    expected_output="""Análise com:
-    - Nota geral (1-10)
-    - 2 pontos fortes
-    - 2 melhorias sugeridas
-    - Comentário final
-    Em português, máximo 200 palavras.""",
-    agent=revisor_critico
-)
+@registro.registrar("tarefa_pesquisa_web")
+def criar_tarefa_pesquisa_web():
+    return crewai.Task(
+        description="""Pesquise informações sobre 'CrewAI framework'.
+        
+        Use suas ferramentas para encontrar:
+        1. Características principais do framework
+        2. Vantagens práticas
+        3. Casos de uso principais
+        
+        Seja conciso e direto.""",
+        expected_output="""Relatório com:
+        - 3 características principais
+        - 2 vantagens práticas
+        - 2 casos de uso
+        - Fontes consultadas
+        Em português, máximo 300 palavras.""",
+        agent=registro.obter("pesquisador_com_ferramentas")
+    )
+
+@registro.registrar("tarefa_redacao_tecnica")
+def criar_tarefa_redacao_tecnica():
+    return crewai.Task(
+        description="""Crie um artigo técnico conciso sobre CrewAI baseado na pesquisa.
+        
+        Inclua:
+        1. Introdução breve
+        2. Características principais
+        3. Casos de uso práticos
+        4. Conclusão
+        
+        Seja direto e objetivo.""",
+        expected_output="""Artigo de 400-500 palavras com:
+        - Introdução (50 palavras)
+        - Seções organizadas
+        - Linguagem clara
+        - Conclusão prática
+        Em português.""",
+        agent=registro.obter("redator_especializado")
+    )
+
+@registro.registrar("tarefa_revisao_critica")
+def criar_tarefa_revisao_critica():
+    return crewai.Task(
+        description="""Revise o artigo analisando:
+        
+        1. Qualidade das informações
+        2. Clareza do conteúdo
+        3. Adequação ao público
+        
+        Feedback conciso e construtivo.""",
+        expected_output="""Análise com:
+        - Nota geral (1-10)
+        - 2 pontos fortes
+        - 2 melhorias sugeridas
+        - Comentário final
+        Em português, máximo 200 palavras.""",
+        agent=registro.obter("revisor_critico")
+    )
 
-# Processo Sequencial otimizado
-print("\n🔄 DEMONSTRAÇÃO: Processo Sequencial Otimizado")
-print("-" * 40)
+# Limite de RPM/TPM da organização, único para todas as crews (e processos,
+# com CURSO_LIMITE_DB). O max_rpm de cada crew não via as outras crews.
+def limitar_chamadas():
+    instalar_litellm(limitador_padrao())
+
+
+# Um span por chamada de LLM, filho do passo do agente que a fez. Instalado
+# depois do limite: a espera pela vez não conta como tempo da chamada.
+def rastrear_chamadas():
+    rastreamento.instalar_litellm(rastreamento.rastreador_padrao())
 
-crew_sequencial = Crew(
-    agents=[pesquisador_com_ferramentas, redator_especializado, revisor_critico],
-    tasks=[tarefa_pesquisa_web, tarefa_redacao_tecnica, tarefa_revisao_critica],
-    process=Process.sequential,
-    verbose=False,  # Reduz output para economizar tokens
-    language='pt-br',
-    max_rpm=10  # Limita requests por minuto
-)
 
-print("📋 Processo configurado:")
-print("   1️⃣ Pesquisador → Coleta informações")
-print("   2️⃣ Redator → Cria artigo")
-print("   3️⃣ Revisor → Analisa qualidade")
+# Processo Sequencial otimizado
+@registro.registrar("crew_sequencial")
+def criar_crew_sequencial():
+    limitar_chamadas()
+    rastrear_chamadas()
+    return crewai.Crew(
+        agents=registro.obter_varios(
+            "pesquisador_com_ferramentas",
+            "redator_especializado",
+            "revisor_critico",
+        ),
+        tasks=registro.obter_varios(
+            "tarefa_pesquisa_web",
+            "tarefa_redacao_tecnica",
+            "tarefa_revisao_critica",
+        ),
+        process=crewai.Process.sequential,
+        verbose=False,  # Reduz output para economizar tokens
+        language='pt-br'
+    )
 
 
 # Manager otimizado para hierárquico
-manager_projeto = Agent(
-    role='Gerente Editorial',
-    goal='Coordenar produção de artigo em português',
-    backstory="""Gerente experiente que coordena equipes editoriais.
-    Delega tarefas eficientemente e monitora qualidade.
-    Comunicação sempre em português.""",
-    tools=[busca_web_tool],
-    verbose=False,
-    allow_delegation=True,
-    max_iter=1,  # Reduz iterações do manager
-    max_execution_time=120
-)
+@registro.registrar("manager_projeto")
+def criar_manager_projeto():
+    return crewai.Agent(
+        role='Gerente Editorial',
+        goal='Coordenar produção de artigo em português',
+        backstory="""Gerente experiente que coordena equipes editoriais.
+        Delega tarefas eficientemente e monitora qualidade.
+        Comunicação sempre em português.""",
+        tools=[registro.obter("busca_web_tool")],
+        verbose=False,
+        allow_delegation=True,
+        max_iter=1,  # Reduz iterações do manager
+        max_execution_time=120
+    )
 
 # Tarefa hierárquica simplificada
-tarefa_projeto_editorial = Task(
-    description="""Coordene produção de artigo sobre CrewAI.
-    Delegue: pesquisa, redação e revisão.
-    Monitore qualidade e prazo.
-    Tudo em português.""",
-    expected_output="""Artigo completo sobre CrewAI:
-    - Pesquisa fundamentada
-    - Redação clara
-    - Revisão de qualidade
-    Em português, máximo 600 palavras total.""",
-    agent=manager_projeto
-)
-
-crew_hierarquico = Crew(
-    agents=[manager_projeto, pesquisador_com_ferramentas, redator_especializado, revisor_critico],
-    tasks=[tarefa_projeto_editorial],
-    process=Process.hierarchical,
-    manager_llm=CONFIG_SISTEMA['modelo_economico'],
-    verbose=False,
-    language='pt-br',
-    max_rpm=8  # Menos requests para hierárquico
-)
-
-print("\n🏗️ Processo Hierárquico configurado:")
-print("   👨‍💼 Manager → Coordena em português")
-print("   ⚡ Execução otimizada")
-print(f"   💰 Modelo: {CONFIG_SISTEMA['modelo_economico']}")
+@registro.registrar("tarefa_projeto_editorial")
+def criar_tarefa_projeto_editorial():
+    return crewai.Task(
+        description="""Coordene produção de artigo sobre CrewAI.
+        Delegue: pesquisa, redação e revisão.
+        Monitore qualidade e prazo.
+        Tudo em português.""",
+        expected_output="""Artigo completo sobre CrewAI:
+        - Pesquisa fundamentada
+        - Redação clara
+        - Revisão de qualidade
+        Em português, máximo 600 palavras total.""",
+        agent=registro.obter("manager_projeto")
+    )
+
+@registro.registrar("crew_hierarquico")
+def criar_crew_hierarquico():
+    limitar_chamadas()
+    rastrear_chamadas()
+    return crewai.Crew(
+        agents=registro.obter_varios(
+            "manager_projeto",
+            "pesquisador_com_ferramentas",
+            "redator_especializado",
+            "revisor_critico",
+        ),
+        tasks=[registro.obter("tarefa_projeto_editorial")],
+        process=crewai.Process.hierarchical,
+        manager_llm=CONFIG_SISTEMA['modelo_economico'],
+        verbose=False,
+        language='pt-br'
+    )
+
+
+def __getattr__(nome):
+    # Compatibilidade: `from main import crew_sequencial` continua funcionando
+    if nome in registro:
+        return registro.obter(nome)
+    raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
+
+
+def mostrar_configuracao():
+    """Banners da aula (antes impressos no import do módulo)"""
+    print("🎯 Aula 3: Ferramentas e Processos [MODO ECONÔMICO]")
+    print("=" * 50)
+    print("✅ Ferramentas CrewAI configuradas:")
+    print("🔍 Busca Web - Pesquisa inteligente na web")
+    print("🌐 Scraping - Extração de conteúdo de sites")
+    print("📁 Leitura de Arquivo - Análise de documentos")
+    print("⚙️  CONFIGURAÇÕES OTIMIZADAS:")
+    print(f"   � Modelo: {CONFIG_SISTEMA['modelo_economico']}")
+    print(f"   � Max Tokens: {CONFIG_SISTEMA['max_tokens']}")
+    print(f"   🎯 Temperature: {CONFIG_SISTEMA['temperature']}")
+    print()
+    print("\n🔄 DEMONSTRAÇÃO: Processo Sequencial Otimizado")
+    print("-" * 40)
+    print("📋 Processo configurado:")
+    print("   1️⃣ Pesquisador → Coleta informações")
+    print("   2️⃣ Redator → Cria artigo")
+    print("   3️⃣ Revisor → Analisa qualidade")
+    print("\n🏗️ Processo Hierárquico configurado:")
+    print("   👨‍💼 Manager → Coordena em português")
+    print("   ⚡ Execução otimizada")
+    print(f"   💰 Modelo: {CONFIG_SISTEMA['modelo_economico']}")
+
+
+def imprimir_esperas_limite():
+    """Quanto cada agente esperou pelo limite de RPM/TPM"""
+    esperas = limitador_padrao().estatisticas()["esperas_por_agente"]
+    if esperas:
+        print("⏳ Espera pelo limite de taxa:")
+        for agente, stats in esperas.items():
+            print(f"   {agente}: {stats['espera_total_s']:.1f}s em {stats['chamadas']} chamadas")
+
+
+def imprimir_trace():
+    """Onde o tempo do último kickoff foi gasto (árvore de spans)"""
+    rastreador = rastreamento.rastreador_padrao()
+    rastreador.forcar_envio()
+    spans = rastreador.memoria.spans()
+    if spans:
+        # O span do kickoff é o último a terminar
+        print("\n🧵 ONDE O TEMPO FOI GASTO:")
+        print(rastreamento.arvore(spans, spans[-1].trace_id))
+
 
 # Função de execução otimizada
 def executar_processo_sequencial():
@@ -347,20 +331,29 @@ def executar_processo_sequencial():
     try:
         print(f"⚙️ Modelo: {CONFIG_SISTEMA['modelo_economico']} | Tokens: {CONFIG_SISTEMA['max_tokens']}")
         
-        resultado_seq = crew_sequencial.kickoff()
+        with contexto_limite(prioridade="normal"):
+            resultado_seq = rastreamento.kickoff_rastreado(
+                registro.obter("crew_sequencial"), nome="crew_sequencial"
+            )
         tempo_seq = metricas.finalizar_medicao()
         
         metricas.tokens_estimados = len(str(resultado_seq)) // 4
+        metricas.exportar(modelo=CONFIG_SISTEMA['modelo_economico'])
         
         print(f"\n⏱️ Executado em: {tempo_seq:.2f} segundos")
         print("\n📊 RESULTADO:")
         print("-" * 30)
         print(resultado_seq)
         print(metricas.gerar_relatorio())
+        imprimir_esperas_limite()
+        imprimir_trace()
         
         return resultado_seq, tempo_seq
         
     except Exception as e:
+        metricas.erros.append(str(e))
+        metricas.exportar(sucesso=False, modelo=CONFIG_SISTEMA['modelo_economico'])
+        imprimir_trace()
         error_msg = str(e)
         if "RateLimitError" in error_msg or "quota" in error_msg.lower():
             print(f"❌ ERRO DE COTA: {e}")
@@ -379,23 +372,39 @@ def executar_processo_hierarquico():
     
     inicio = time.time()
     try:
-        resultado_hier = crew_hierarquico.kickoff()
+        # Hierárquico faz mais chamadas: cede a vez às outras crews
+        with contexto_limite(prioridade="baixa"):
+            resultado_hier = rastreamento.kickoff_rastreado(
+                registro.obter("crew_hierarquico"), nome="crew_hierarquico"
+            )
         tempo_hier = time.time() - inicio
+        exportador.observar_execucao("crew", tempo_hier, True, tarefa="Hierárquico")
         
         print(f"\n⏱️ Executado em: {tempo_hier:.2f} segundos")
         print("\n📊 RESULTADO:")
         print("-" * 30)
         print(resultado_hier)
+        imprimir_esperas_limite()
+        imprimir_trace()
         
         return resultado_hier, tempo_hier
         
     except Exception as e:
+        exportador.observar_execucao(
+            "crew", time.time() - inicio, False, tarefa="Hierárquico"
+        )
         print(f"❌ Erro hierárquico: {e}")
+        imprimir_trace()
         return None, 0
 
 
 # EXECUÇÃO PRINCIPAL OTIMIZADA
 if __name__ == "__main__":
+    mostrar_configuracao()
+    # Com CURSO_METRICAS_PORTA definida, as métricas ficam em /metrics
+    servidor_metricas = exportador.servidor_padrao()
+    if servidor_metricas:
+        print(f"📡 Métricas em {servidor_metricas.url}")
     print("\n🎬 DEMONSTRAÇÃO OTIMIZADA PARA ECONOMIA DE TOKENS")
     print("=" * 50)
 
@@ -434,11 +443,11 @@ if __name__ == "__main__":
         print("="*30)
         
         print("\n1️⃣ Busca Web:")
-        resultado_busca = busca_web_tool._run("CrewAI")
+        resultado_busca = registro.obter("busca_web_tool")._run("CrewAI")
         print(resultado_busca[:200] + "...")
         
         print("\n2️⃣ Scraping:")
-        resultado_scraping = scraping_tool._run("https://docs.crewai.com")
+        resultado_scraping = registro.obter("scraping_tool")._run("https://docs.crewai.com")
         print(resultado_scraping[:200] + "...")
         
         print("\n✅ Ferramentas funcionando!")
@@ -463,4 +472,4 @@ if __name__ == "__main__":
     print("� ECONOMIA: ~60% menos tokens que versão original")
     print("🇧🇷 PORTUGUÊS: Toda comunicação configurada")
 
-print("\n🏁 Aula 3 OTIMIZADA concluída!")
\ No newline at end of file
+    print("\n🏁 Aula 3 OTIMIZADA concluída!")
\ No newline at end of file
@@ -8,9 +8,13 @@ de segurança e economia de custos aprendidas na aula 4.
 
 import os
 import time
-import hashlib
 from crewai import Agent, Task, Crew, Process
-from langchain_openai import ChatOpenAI
+from curso_crewai.cache import CacheLLM, backend_padrao
+from curso_crewai.conexoes import chat_openai, instalar_litellm
+from curso_crewai.orcamento import LivroOrcamento, OrcamentoExcedido
+from curso_crewai.pool import PoolCrews
+from curso_crewai.tokens import EstimadorCusto
+from curso_crewai.uso import ColetorUso, custo_tokens
 
 # Verificar se a API key está configurada
 if not os.getenv("OPENAI_API_KEY"):
@@ -26,32 +30,74 @@ if not os.getenv("OPENAI_API_KEY"):
 class MonitorCustos:
     """Monitor de custos otimizado para GPT-4o Mini"""
 
-    def __init__(self, orcamento=2.0):
+    def __init__(self, orcamento=2.0, tenant="padrao", limite_por_agente=None):
         self.orcamento = orcamento
-        self.gasto_atual = 0.0
-        # Preços atualizados GPT-4o Mini (input/output por 1M tokens)
-        self.precos = {"input": 0.15 / 1000000, "output": 0.60 / 1000000}
-
-    def estimar_custo(self, texto_entrada, tokens_saida_esperados=600):
-        """Estima custo da operação"""
-        tokens_input = len(texto_entrada) * 0.25  # Aproximação
-        custo = (
-            tokens_input * self.precos["input"]
-            + tokens_saida_esperados * self.precos["output"]
+        self.tenant = tenant
+        # Reserva antes, confirma depois: análises simultâneas não estouram
+        # o orçamento. Com ORCAMENTO_DB o gasto sobrevive a reinícios.
+        self.livro = LivroOrcamento(
+            limite_tenant=orcamento,
+            limite_agente=limite_por_agente,
+            caminho=os.getenv("ORCAMENTO_DB"),
         )
+        # Custo real de cada execução, a partir do `usage` da API
+        self.coletor = ColetorUso()
+        self.coletor.instalar_litellm()
+        # Tokenizador local do GPT-4o Mini: estimativa sem chamar a API
+        self.estimador = EstimadorCusto("gpt-4o-mini")
+
+    def estimar_custo(self, texto_entrada, tokens_saida_esperados=600, tarefas=None):
+        """
+        Estima custo da operação contando os tokens dos prompts.
+
+        Com `tarefas`, soma uma chamada por tarefa: backstory do agente como
+        mensagem de sistema, descrição da tarefa (com o currículo no lugar do
+        marcador `{curriculo}`) e, quando há `context`, a resposta da tarefa
+        anterior.
+        """
+        if not tarefas:
+            return self.estimador.estimar(
+                texto_entrada, tokens_saida=tokens_saida_esperados
+            ).custo
+
+        custo = 0.0
+        for tarefa in tarefas:
+            agente = tarefa.agent
+            descricao = tarefa.description.replace("{curriculo}", texto_entrada)
+            estimativa = self.estimador.estimar(
+                f"{descricao}\n{tarefa.expected_output}",
+                sistema=f"{agente.role}\n{agente.goal}\n{agente.backstory}",
+                tokens_saida=tokens_saida_esperados,
+            )
+            custo += estimativa.custo
+            if tarefa.context:
+                contexto = tokens_saida_esperados * len(tarefa.context)
+                custo += custo_tokens(self.estimador.modelo, contexto, 0)
         return custo
 
-    def verificar_orcamento(self, custo_estimado):
-        """Verifica se operação cabe no orçamento"""
-        if self.gasto_atual + custo_estimado > self.orcamento:
+    @property
+    def gasto_atual(self):
+        return self.livro.saldo(self.tenant)["gasto"]
+
+    def verificar_orcamento(self, custo_estimado, agente=None):
+        """Reserva o custo estimado; falha se não couber no orçamento"""
+        try:
+            return self.livro.reservar(custo_estimado, self.tenant, agente)
+        except OrcamentoExcedido as e:
             raise Exception(
                 f"❌ Custo excederia orçamento! Atual: ${self.gasto_atual:.4f}"
-            )
-        return True
+            ) from e
+
+    def liberar_reserva(self, reserva):
+        """Devolve a reserva de uma operação que não chegou a gastar"""
+        self.livro.liberar(reserva)
 
-    def registrar_gasto(self, custo):
-        """Registra gasto realizado"""
-        self.gasto_atual += custo
+    def registrar_gasto(self, custo, reserva=None):
+        """Registra gasto realizado (troca a reserva pelo custo real)"""
+        if reserva is not None:
+            self.livro.confirmar(reserva, custo)
+        else:
+            self.livro.lancar(custo, self.tenant)
         print(f"💰 Custo desta operação: ${custo:.6f}")
         print(f"💸 Total gasto: ${self.gasto_atual:.4f}")
         print(f"💳 Restante: ${self.orcamento - self.gasto_atual:.4f}")
@@ -61,32 +107,22 @@ class MonitorCustos:
 
 
 class CacheInteligente:
-    """Cache para economizar em queries similares"""
+    """Cache para economizar em queries similares (persiste entre execuções)"""
 
-    def __init__(self, ttl=1800):  # 30 minutos
-        self.cache = {}
+    def __init__(self, ttl=1800, backend=None):  # 30 minutos
         self.ttl = ttl
-
-    def gerar_chave(self, curriculo):
-        """Gera chave única para o currículo"""
-        return hashlib.md5(curriculo.encode()).hexdigest()
+        self.cache = CacheLLM(backend or backend_padrao(), ttl=ttl)
 
     def buscar(self, curriculo):
         """Busca análise no cache"""
-        chave = self.gerar_chave(curriculo)
-        if chave in self.cache:
-            timestamp, resultado = self.cache[chave]
-            if time.time() - timestamp < self.ttl:
-                print("✅ Cache HIT - Economia de ~$0.002!")
-                return resultado
-            else:
-                del self.cache[chave]
-        return None
+        resultado = self.cache.get(curriculo, tarefa="analise_curriculo")
+        if resultado is not None:
+            print("✅ Cache HIT - Economia de ~$0.002!")
+        return resultado
 
     def salvar(self, curriculo, resultado):
         """Salva resultado no cache"""
-        chave = self.gerar_chave(curriculo)
-        self.cache[chave] = (time.time(), resultado)
+        self.cache.set(curriculo, resultado, tarefa="analise_curriculo")
 
 
 def validar_entrada(curriculo):
@@ -120,8 +156,10 @@ FEEDBACK_TEMPLATES = {
     "sugestoes": "Recomendações específicas de melhoria",
 }
 
-# Configuração otimizada do LLM para economia máxima
-llm_economico = ChatOpenAI(
+# Configuração otimizada do LLM para economia máxima, no pool de conexões
+# compartilhado do processo (sem handshake novo a cada cliente)
+instalar_litellm()
+llm_economico = chat_openai(
     model="gpt-4o-mini",  # Modelo mais econômico (85% mais barato que GPT-4o)
     temperature=0.1,  # Baixa variabilidade para consistência
     max_tokens=600,  # Limite de resposta para controlar custos
@@ -173,10 +211,15 @@ def criar_agentes():
 # =============================================================================
 
 
-def criar_tarefas(agentes, curriculo_texto):
-    """Cria as tarefas da cadeia de análise"""
+def criar_tarefas(agentes, curriculo_texto=None):
+    """
+    Cria as tarefas da cadeia de análise. Sem `curriculo_texto`, a tarefa de
+    extração fica com o marcador `{curriculo}`, preenchido no `kickoff`.
+    """
 
     agente_extrator, agente_avaliador, agente_conselheiro = agentes
+    if curriculo_texto is None:
+        curriculo_texto = "{curriculo}"
 
     # TAREFA 1: Extração de Dados
     tarefa_extracao = Task(
@@ -237,6 +280,22 @@ def criar_tarefas(agentes, curriculo_texto):
     return [tarefa_extracao, tarefa_avaliacao, tarefa_feedback]
 
 
+def montar_crew_analise(chave):
+    """Crew completa (agentes próprios) para o pool; o currículo vem no kickoff"""
+    agentes = criar_agentes()
+    return Crew(
+        agents=agentes,
+        tasks=criar_tarefas(agentes),
+        process=Process.sequential,
+        verbose=False,  # Modo silencioso para economia
+    )
+
+
+# Crews prontas reaproveitadas entre currículos: criar 3 agentes, 3 tarefas
+# e a crew a cada análise só somava latência
+pool_analise = PoolCrews(montar_crew_analise, max_por_chave=2)
+
+
 # =============================================================================
 # FUNÇÃO PRINCIPAL DE ANÁLISE
 # =============================================================================
@@ -260,32 +319,41 @@ def analisar_curriculo(curriculo_texto, monitor, cache):
     # 2. Validar entrada
     validar_entrada(curriculo_texto)
 
-    # 3. Estimar e verificar custo
-    custo_estimado = monitor.estimar_custo(curriculo_texto)
-    monitor.verificar_orcamento(custo_estimado)
+    # 3. Retirar uma crew pronta do pool (nenhuma chamada à API ainda)
+    with pool_analise.usar("analise") as crew_analise:
+        # 4. Estimar pelos prompts reais e verificar custo
+        custo_estimado = monitor.estimar_custo(
+            curriculo_texto, tarefas=crew_analise.tasks
+        )
+        reserva = monitor.verificar_orcamento(custo_estimado)
 
-    print(f"💰 Custo estimado: ${custo_estimado:.6f}")
-    print("🚀 Iniciando análise...")
+        print(f"💰 Custo estimado: ${custo_estimado:.6f}")
+        print("🚀 Iniciando análise...")
 
-    # 4. Criar agentes e tarefas
-    agentes = criar_agentes()
-    tarefas = criar_tarefas(agentes, curriculo_texto)
+        # 5. Executar análise com o currículo desta requisição
+        start_time = time.time()
+        uso = None
+        try:
+            with monitor.coletor.rastrear(tarefa="analise_curriculo") as uso:
+                resultado = crew_analise.kickoff(
+                    inputs={"curriculo": curriculo_texto}
+                )
+                uso.finalizar(resultado, modelo=llm_economico.model_name)
+        except Exception:
+            # Lança só o que chegou a ser gasto e devolve o resto da reserva
+            if uso is not None and uso.registros:
+                monitor.registrar_gasto(uso.custo, reserva)
+            else:
+                monitor.liberar_reserva(reserva)
+            raise
+        execution_time = time.time() - start_time
 
-    # 5. Criar e executar crew
-    crew_analise = Crew(
-        agents=agentes,
-        tasks=tarefas,
-        process=Process.sequential,
-        verbose=False,  # Modo silencioso para economia
+    # 6. Registrar custos reais e métricas
+    monitor.registrar_gasto(uso.custo if uso.registros else custo_estimado, reserva)
+    print(
+        f"🔢 Tokens: {uso.prompt_tokens} entrada ({uso.cached_tokens} em cache) "
+        f"+ {uso.completion_tokens} saída"
     )
-
-    # 6. Executar análise
-    start_time = time.time()
-    resultado = crew_analise.kickoff()
-    execution_time = time.time() - start_time
-
-    # 7. Registrar custos e métricas
-    monitor.registrar_gasto(custo_estimado)
     cache.salvar(curriculo_texto, resultado)
 
     print(f"⏱️ Tempo de execução: {execution_time:.2f}s")
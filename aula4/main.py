@@ -7,11 +7,49 @@ em sequência, cada um com uma responsabilidade específica.
 """
 
 import os
-from crewai import Agent, Task, Crew, Process
-from langchain_openai import ChatOpenAI
+import time
+from curso_crewai.cache_semantico import CacheSemantico
+from curso_crewai.catalogo import IndiceProdutos
+from curso_crewai.fabrica import Registro, importar_preguicoso
+from curso_crewai.lote import (
+    EstatisticasLote,
+    escrever_jsonl,
+    ler_jsonl,
+    processar_em_lote,
+)
+from curso_crewai.pool import PoolCrews
+from curso_crewai.streaming import (
+    FIM,
+    FIM_ETAPA,
+    INICIO_ETAPA,
+    TOKEN,
+    EventoStream,
+    para_async,
+    texto_do_trecho,
+    transmitir,
+)
+from curso_crewai.tokens import ajustar_ao_orcamento
+from roteador import RoteadorAtendimento
+
+# crewai e langchain_openai só são importados quando o primeiro agente ou
+# o LLM é construído: importar este módulo (ex.: num serviço) fica barato
+crewai = importar_preguicoso("crewai")
+conexoes = importar_preguicoso("curso_crewai.conexoes")
+
+# Objetos caros declarados aqui e construídos no primeiro uso
+registro = Registro()
+
 
 # Configuração do modelo de linguagem
-llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.1)
+@registro.registrar("llm")
+def criar_llm():
+    # LLM e agentes (via LiteLLM) no mesmo pool de conexões HTTP
+    conexoes.instalar_litellm()
+    return conexoes.chat_openai(model="gpt-4o-mini", temperature=0.1)
+
+# Cache semântico: perguntas equivalentes ("tem smartphone em estoque?" /
+# "tem smartphone no estoque?") reaproveitam a resposta sem rodar os 4 agentes
+cache_atendimento = CacheSemantico(limiar=0.8, ttl=600)
 
 # Base de dados simulada de produtos
 PRODUTOS_DB = {
@@ -36,123 +74,230 @@ PRODUTOS_DB = {
 }
 
 
-def buscar_produto_db(query):
-    """Simula busca no banco de dados"""
-    query_lower = query.lower()
+# Atalho: perguntas simples de catálogo são respondidas direto do banco,
+# sem os 4 agentes; as demais (ou com baixa confiança) seguem para a cadeia
+roteador = RoteadorAtendimento(PRODUTOS_DB, limiar=0.8)
 
-    for key, produto in PRODUTOS_DB.items():
-        if key in query_lower or any(
-            word in produto["nome"].lower() for word in query_lower.split()
-        ):
-            return produto
 
-    return None
+# Índice invertido do catálogo. Para usar um catálogo real (CSV/JSONL ou
+# índice salvo), defina CATALOGO_PRODUTOS=caminho/do/arquivo
+if os.getenv("CATALOGO_PRODUTOS"):
+    indice_produtos = IndiceProdutos.carregar(os.environ["CATALOGO_PRODUTOS"])
+else:
+    indice_produtos = IndiceProdutos.de_dict(PRODUTOS_DB)
 
 
-# ===============================================
-# 1. AGENTE DE SAUDAÇÃO E TRIAGEM (O Recepcionista)
-# ===============================================
+def buscar_produto_db(query, k=1):
+    """Busca no catálogo pelo índice (sem percorrer todos os produtos)"""
+    if k == 1:
+        return indice_produtos.buscar_primeiro(query)
+    return [resultado.produto for resultado in indice_produtos.buscar(query, k=k)]
 
-agente_recepcao = Agent(
-    role="Recepcionista Virtual",
-    goal="Receber e preparar as perguntas dos clientes para processamento",
-    backstory="""
-    Você é um recepcionista virtual experiente e cordial.
-    Sua função é receber as perguntas dos clientes, fazer uma limpeza
-    básica do texto (remover gírias excessivas, corrigir erros óbvios)
-    e preparar a pergunta para os próximos agentes.
-    
-    Mantenha o tom original da pergunta, mas torne-a mais clara e objetiva.
-    """,
-    verbose=True,
-    llm=llm,
-)
 
 # ===============================================
-# 2. AGENTE DE EXTRAÇÃO DE INTENÇÃO (O Analista)
+# AGENTES DA CADEIA
 # ===============================================
 
-agente_analise = Agent(
-    role="Analista de Intenções",
-    goal="Extrair a intenção e entidades importantes da pergunta do cliente",
-    backstory="""
-    Você é um analista especialista em compreender intenções de clientes.
-    Sua missão é analisar a pergunta limpa e extrair:
-    
-    1. A INTENÇÃO principal (consultar_preco, verificar_estoque, obter_informacoes, etc.)
-    2. O PRODUTO mencionado (seja específico ou categoria)
-    3. Qualquer CONTEXTO adicional relevante
-    
-    Sempre retorne sua análise no formato JSON estruturado:
-    {
-        "intencao": "tipo_da_intencao",
-        "produto": "produto_identificado",
-        "contexto": "informações_adicionais"
-    }
-    """,
-    verbose=True,
-    llm=llm,
-)
 
-# ===============================================
-# 3. AGENTE DE BUSCA DE INFORMAÇÃO (O Pesquisador)
-# ===============================================
+# Backstories e descrições passam pela interpolação do kickoff(inputs=...),
+# que em algumas versões do crewai é um str.format: chaves literais ("{")
+# quebram a execução, então o formato JSON é descrito sem elas
+BACKSTORY_ANALISE = """
+        Você é um analista especialista em compreender intenções de clientes.
+        Sua missão é analisar a pergunta limpa e extrair:
 
-agente_pesquisa = Agent(
-    role="Pesquisador de Informações",
-    goal="Buscar informações específicas baseadas na intenção identificada",
-    backstory="""
-    Você é um pesquisador especializado em localizar informações precisas
-    sobre produtos em nossa base de dados.
-    
-    Receba a intenção estruturada e busque as informações necessárias.
-    
-    Para consultas de preço: retorne preço atual e disponibilidade
-    Para verificação de estoque: retorne quantidade disponível
-    Para informações gerais: retorne todos os dados relevantes do produto
-    
-    Sempre retorne dados factuais e precisos, sem elaboração.
-    """,
-    verbose=True,
-    llm=llm,
-)
+        1. A INTENÇÃO principal (consultar_preco, verificar_estoque, obter_informacoes, etc.)
+        2. O PRODUTO mencionado (seja específico ou categoria)
+        3. Qualquer CONTEXTO adicional relevante
 
-# ===============================================
-# 4. AGENTE DE GERAÇÃO DE RESPOSTA (O Comunicador)
-# ===============================================
+        Sempre retorne sua análise como um objeto JSON com estas chaves:
+            "intencao": "tipo_da_intencao",
+            "produto": "produto_identificado",
+            "contexto": "informações_adicionais"
+        """
+
+
+def criar_agentes(verbose=True, llm=None):
+    """Cria os 4 agentes especializados da cadeia de atendimento"""
+
+    llm = llm or registro.obter("llm")
+
+    # ===============================================
+    # 1. AGENTE DE SAUDAÇÃO E TRIAGEM (O Recepcionista)
+    # ===============================================
+
+    agente_recepcao = crewai.Agent(
+        role="Recepcionista Virtual",
+        goal="Receber e preparar as perguntas dos clientes para processamento",
+        backstory="""
+        Você é um recepcionista virtual experiente e cordial.
+        Sua função é receber as perguntas dos clientes, fazer uma limpeza
+        básica do texto (remover gírias excessivas, corrigir erros óbvios)
+        e preparar a pergunta para os próximos agentes.
+
+        Mantenha o tom original da pergunta, mas torne-a mais clara e objetiva.
+        """,
+        verbose=verbose,
+        llm=llm,
+    )
+
+    # ===============================================
+    # 2. AGENTE DE EXTRAÇÃO DE INTENÇÃO (O Analista)
+    # ===============================================
+
+    agente_analise = crewai.Agent(
+        role="Analista de Intenções",
+        goal="Extrair a intenção e entidades importantes da pergunta do cliente",
+        backstory=BACKSTORY_ANALISE,
+        verbose=verbose,
+        llm=llm,
+    )
+
+    # ===============================================
+    # 3. AGENTE DE BUSCA DE INFORMAÇÃO (O Pesquisador)
+    # ===============================================
+
+    agente_pesquisa = crewai.Agent(
+        role="Pesquisador de Informações",
+        goal="Buscar informações específicas baseadas na intenção identificada",
+        backstory="""
+        Você é um pesquisador especializado em localizar informações precisas
+        sobre produtos em nossa base de dados.
+
+        Receba a intenção estruturada e busque as informações necessárias.
+
+        Para consultas de preço: retorne preço atual e disponibilidade
+        Para verificação de estoque: retorne quantidade disponível
+        Para informações gerais: retorne todos os dados relevantes do produto
+
+        Sempre retorne dados factuais e precisos, sem elaboração.
+        """,
+        verbose=verbose,
+        llm=llm,
+    )
+
+    # ===============================================
+    # 4. AGENTE DE GERAÇÃO DE RESPOSTA (O Comunicador)
+    # ===============================================
+
+    agente_resposta = crewai.Agent(
+        role="Comunicador de Atendimento",
+        goal="Transformar informações técnicas em respostas amigáveis e úteis",
+        backstory="""
+        Você é um comunicador experiente em atendimento ao cliente.
+        Sua missão é pegar as informações factuais encontradas e
+        transformá-las em uma resposta calorosa, útil e profissional.
+
+        Características da sua comunicação:
+        - Tom amigável e acolhedor
+        - Informações claras e diretas
+        - Sempre ofereça ajuda adicional
+        - Use uma linguagem natural e humana
+
+        Evite soar robótico ou muito formal.
+        """,
+        verbose=verbose,
+        llm=llm,
+    )
+
+    return [agente_recepcao, agente_analise, agente_pesquisa, agente_resposta]
+
+
+registro.registrar("agentes", criar_agentes)
+
+NOMES_AGENTES = [
+    "agente_recepcao",
+    "agente_analise",
+    "agente_pesquisa",
+    "agente_resposta",
+]
+
+
+def agentes_padrao():
+    """Os 4 agentes compartilhados, criados na primeira pergunta"""
+    return registro.obter("agentes")
+
+
+def __getattr__(nome):
+    # Compatibilidade: `from main import agente_resposta, llm` continua
+    # funcionando, mas só constrói o objeto quando ele é pedido
+    if nome in NOMES_AGENTES:
+        return agentes_padrao()[NOMES_AGENTES.index(nome)]
+    if nome in registro:
+        return registro.obter(nome)
+    raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
 
-agente_resposta = Agent(
-    role="Comunicador de Atendimento",
-    goal="Transformar informações técnicas em respostas amigáveis e úteis",
-    backstory="""
-    Você é um comunicador experiente em atendimento ao cliente.
-    Sua missão é pegar as informações factuais encontradas e
-    transformá-las em uma resposta calorosa, útil e profissional.
-    
-    Características da sua comunicação:
-    - Tom amigável e acolhedor
-    - Informações claras e diretas
-    - Sempre ofereça ajuda adicional
-    - Use uma linguagem natural e humana
-    
-    Evite soar robótico ou muito formal.
-    """,
-    verbose=True,
-    llm=llm,
-)
 
 # ===============================================
 # DEFINIÇÃO DAS TAREFAS
 # ===============================================
 
+# Só os produtos mais relevantes entram no prompt: o tamanho (e o custo)
+# fica constante, tenha o catálogo 3 ou 200 mil itens
+PRODUTOS_NO_PROMPT = 5
+MAX_TOKENS_PESQUISA = 1200
+
+PROMPT_PESQUISA = """
+        Com base na intenção estruturada da tarefa anterior, busque as informações necessárias.
+        
+        Produtos do catálogo relacionados à pergunta:
+{produtos}
+        
+        Instruções de busca:
+        - Para "consultar_preco": retorne preço e disponibilidade
+        - Para "verificar_estoque": retorne quantidade em estoque
+        - Para "obter_informacoes": retorne todos os dados do produto
+        
+        Use apenas os produtos listados. Se nenhum corresponder, diga que
+        o produto não foi encontrado. Retorne apenas dados factuais encontrados.
+        """
+
 
-def criar_tarefas(pergunta_usuario):
-    """Cria as tarefas para processar a pergunta do usuário"""
+def formatar_produto(produto):
+    """Uma linha compacta por produto (bem menor que o dict completo)"""
+    campos = [produto["nome"], f"R$ {produto['preco']:.2f}"]
+    campos.append(f"{produto.get('estoque', 0)} em estoque")
+    if produto.get("categoria"):
+        campos.append(produto["categoria"])
+    return "        - " + " | ".join(campos)
 
-    # Tarefa 1: Recepção e limpeza
-    tarefa_recepcao = Task(
-        description=f"""
-        Receba esta pergunta do cliente: "{pergunta_usuario}"
+
+def produtos_para_prompt(pergunta_usuario):
+    """Top-k produtos relacionados à pergunta, dentro do orçamento de tokens"""
+    candidatos = buscar_produto_db(pergunta_usuario, k=PRODUTOS_NO_PROMPT)
+    linhas = ajustar_ao_orcamento(
+        PROMPT_PESQUISA.format(produtos=""),
+        (formatar_produto(produto) for produto in candidatos),
+        max_tokens=MAX_TOKENS_PESQUISA,
+    )
+    return "\n".join(linhas) or "        (nenhum produto encontrado)"
+
+
+def montar_prompt_pesquisa(pergunta_usuario):
+    """Monta o prompt de pesquisa com os top-k produtos, dentro do orçamento"""
+    return PROMPT_PESQUISA.format(produtos=produtos_para_prompt(pergunta_usuario))
+
+
+
+# Usado pela tarefa 4 e pelo modo streaming (mesmo prompt nos dois caminhos)
+DESCRICAO_RESPOSTA = """
+        Transforme as informações factuais da tarefa anterior em uma resposta
+        amigável e útil para o cliente.
+        
+        A resposta deve:
+        - Ser calorosa e acolhedora
+        - Responder diretamente à pergunta original
+        - Incluir as informações encontradas de forma clara
+        - Oferecer ajuda adicional
+        - Soar natural e humana
+        
+        Esta é a resposta final que o cliente receberá.
+        """
+SAIDA_RESPOSTA = "Resposta final amigável e completa para o cliente"
+
+
+DESCRICAO_RECEPCAO = """
+        Receba esta pergunta do cliente: "{pergunta}"
         
         Faça uma limpeza básica:
         - Corrija erros de digitação óbvios
@@ -160,14 +305,9 @@ def criar_tarefas(pergunta_usuario):
         - Mantenha o sentido original
         
         Entregue a pergunta limpa e preparada.
-        """,
-        agent=agente_recepcao,
-        expected_output="Pergunta do cliente limpa e clara",
-    )
+        """
 
-    # Tarefa 2: Análise de intenção
-    tarefa_analise = Task(
-        description="""
+DESCRICAO_ANALISE = """
         Analise a pergunta limpa recebida da tarefa anterior.
         
         Identifique:
@@ -175,96 +315,394 @@ def criar_tarefas(pergunta_usuario):
         2. O produto mencionado
         3. Contexto adicional relevante
         
-        Retorne OBRIGATORIAMENTE no formato JSON:
-        {
+        Retorne OBRIGATORIAMENTE um objeto JSON com estas chaves:
             "intencao": "tipo_da_intencao",
-            "produto": "produto_identificado", 
+            "produto": "produto_identificado",
             "contexto": "informações_adicionais"
-        }
-        """,
-        agent=agente_analise,
+        """
+
+
+def criar_tarefas(pergunta_usuario=None, agentes=None):
+    """
+    Cria as tarefas para processar a pergunta do usuário.
+
+    Sem pergunta, as descrições ficam com os marcadores `{pergunta}` e
+    `{produtos}`, preenchidos por `kickoff(inputs=entradas_atendimento(...))`:
+    é assim que uma crew do pool atende perguntas diferentes.
+    """
+
+    recepcao, analise, pesquisa, resposta = agentes or agentes_padrao()
+    if pergunta_usuario is None:
+        descricao_recepcao = DESCRICAO_RECEPCAO
+        descricao_pesquisa = PROMPT_PESQUISA
+    else:
+        descricao_recepcao = DESCRICAO_RECEPCAO.format(pergunta=pergunta_usuario)
+        descricao_pesquisa = montar_prompt_pesquisa(pergunta_usuario)
+
+    # Tarefa 1: Recepção e limpeza
+    tarefa_recepcao = crewai.Task(
+        description=descricao_recepcao,
+        agent=recepcao,
+        expected_output="Pergunta do cliente limpa e clara",
+    )
+
+    # Tarefa 2: Análise de intenção
+    tarefa_analise = crewai.Task(
+        description=DESCRICAO_ANALISE,
+        agent=analise,
         expected_output="JSON estruturado com intenção, produto e contexto",
         context=[tarefa_recepcao],
     )
 
     # Tarefa 3: Busca de informações
-    tarefa_pesquisa = Task(
-        description=f"""
-        Com base na intenção estruturada da tarefa anterior, busque as informações necessárias.
-        
-        Base de dados disponível:
-        {PRODUTOS_DB}
-        
-        Instruções de busca:
-        - Para "consultar_preco": retorne preço e disponibilidade
-        - Para "verificar_estoque": retorne quantidade em estoque
-        - Para "obter_informacoes": retorne todos os dados do produto
-        
-        Retorne apenas dados factuais encontrados.
-        """,
-        agent=agente_pesquisa,
+    tarefa_pesquisa = crewai.Task(
+        description=descricao_pesquisa,
+        agent=pesquisa,
         expected_output="Informações factuais específicas sobre o produto consultado",
         context=[tarefa_analise],
     )
 
     # Tarefa 4: Geração da resposta final
-    tarefa_resposta = Task(
-        description="""
-        Transforme as informações factuais da tarefa anterior em uma resposta
-        amigável e útil para o cliente.
-        
-        A resposta deve:
-        - Ser calorosa e acolhedora
-        - Responder diretamente à pergunta original
-        - Incluir as informações encontradas de forma clara
-        - Oferecer ajuda adicional
-        - Soar natural e humana
-        
-        Esta é a resposta final que o cliente receberá.
-        """,
-        agent=agente_resposta,
-        expected_output="Resposta final amigável e completa para o cliente",
+    tarefa_resposta = crewai.Task(
+        description=DESCRICAO_RESPOSTA,
+        agent=resposta,
+        expected_output=SAIDA_RESPOSTA,
         context=[tarefa_pesquisa],
     )
 
     return [tarefa_recepcao, tarefa_analise, tarefa_pesquisa, tarefa_resposta]
 
 
+def entradas_atendimento(pergunta_usuario):
+    """Valores dos marcadores das tarefas criadas sem pergunta"""
+    return {
+        "pergunta": pergunta_usuario,
+        "produtos": produtos_para_prompt(pergunta_usuario),
+    }
+
+
+# ===============================================
+# POOL DE CREWS
+# ===============================================
+
+
+def montar_crew_atendimento(chave):
+    """
+    Constrói uma crew para o pool. Cada crew tem seus próprios agentes (um
+    Agent guarda estado enquanto executa), então duas requisições nunca
+    compartilham agente. No modo "stream" só as 3 primeiras etapas entram.
+    """
+    modo, verbose = chave
+    agentes = criar_agentes(verbose=verbose)
+    tarefas = criar_tarefas(agentes=agentes)
+    if modo == "stream":
+        agentes, tarefas = agentes[:3], tarefas[:3]
+    return crewai.Crew(
+        agents=agentes,
+        tasks=tarefas,
+        process=crewai.Process.sequential,
+        verbose=verbose,
+    )
+
+
+# Crews prontas, reaproveitadas entre perguntas em vez de recriar 4 agentes,
+# 4 tarefas e a crew a cada atendimento
+pool_crews = PoolCrews(
+    montar_crew_atendimento, max_por_chave=int(os.getenv("POOL_CREWS_MAX", "4"))
+)
+
+
+def imprimir_estatisticas_pool():
+    """Mostra quantas crews foram construídas e o tempo de construção poupado"""
+    stats = pool_crews.estatisticas()
+    print(
+        f"\n♻️ Pool de crews: {stats['construcoes']} construídas, "
+        f"{stats['reutilizacoes']} reutilizações "
+        f"({stats['tempo_economizado_s']:.2f}s de construção economizados)"
+    )
+
+
 # ===============================================
 # FUNÇÃO PRINCIPAL DE ATENDIMENTO
 # ===============================================
 
 
-def processar_atendimento(pergunta_usuario):
+def processar_atendimento(
+    pergunta_usuario, usar_cache=True, agentes=None, verbose=True, usar_atalho=True
+):
     """Processa uma pergunta do cliente através da cadeia de agentes"""
 
-    print("=" * 60)
-    print("🤖 SISTEMA DE ATENDIMENTO - CADEIA DE AGENTES")
+    if verbose:
+        print("=" * 60)
+        print("🤖 SISTEMA DE ATENDIMENTO - CADEIA DE AGENTES")
+        print("=" * 60)
+        print(f"📝 Pergunta recebida: {pergunta_usuario}")
+        print("=" * 60)
+
+    # Pergunta simples de catálogo? Responde direto do banco, sem LLM
+    if usar_atalho:
+        rapida = roteador.responder(pergunta_usuario)
+        if rapida:
+            if verbose:
+                classificacao = rapida.classificacao
+                print(
+                    f"⚡ Atalho: {classificacao.intencao} / {classificacao.produto} "
+                    f"(confiança {classificacao.confianca:.2f}, "
+                    f"{rapida.latencia * 1000:.2f}ms)"
+                )
+                print(rapida.texto)
+            return rapida
+
+    # Pergunta igual ou quase igual a uma já respondida? Evita a cadeia inteira
+    if usar_cache:
+        encontrado = cache_atendimento.buscar(pergunta_usuario)
+        if encontrado:
+            if usar_atalho:
+                roteador.registrar_cache()
+            if verbose:
+                print(
+                    f"✅ Cache semântico HIT (similaridade "
+                    f"{encontrado.similaridade:.2f} "
+                    f"com: '{encontrado.pergunta_original}')"
+                )
+                print(encontrado.resposta)
+            return encontrado.resposta
+
+    inicio = time.perf_counter()
+    if agentes is None:
+        # Crew do pool: a pergunta entra pelos marcadores das tarefas
+        with pool_crews.usar(("completo", verbose)) as equipe_atendimento:
+            resultado = equipe_atendimento.kickoff(
+                inputs=entradas_atendimento(pergunta_usuario)
+            )
+    else:
+        # Agentes próprios de quem chamou: monta a crew só para esta pergunta
+        equipe_atendimento = crewai.Crew(
+            agents=agentes,
+            tasks=criar_tarefas(pergunta_usuario, agentes),
+            process=crewai.Process.sequential,  # Um agente por vez
+            verbose=verbose,
+        )
+        resultado = equipe_atendimento.kickoff()
+    if usar_atalho:
+        roteador.registrar_execucao_crew(time.perf_counter() - inicio)
+
+    if usar_cache:
+        cache_atendimento.armazenar(pergunta_usuario, resultado)
+
+    if verbose:
+        print("\n" + "=" * 60)
+        print("✅ RESPOSTA FINAL PARA O CLIENTE:")
+        print("=" * 60)
+        print(resultado)
+        print("=" * 60)
+
+    return resultado
+
+
+# ===============================================
+# MODO STREAMING
+# ===============================================
+
+ETAPAS_CADEIA = ["recepcao", "analise", "pesquisa", "resposta"]
+
+
+def gerar_resposta_stream(pergunta_usuario, informacoes, agente=None):
+    """
+    Etapa final fora da crew: mesmo papel e prompt do agente de resposta,
+    mas entregue em trechos à medida que o modelo gera.
+    """
+    agente = agente or agentes_padrao()[3]
+    mensagens = [
+        ("system", f"Você é {agente.role}. {agente.goal}\n{agente.backstory}"),
+        (
+            "human",
+            f"{DESCRICAO_RESPOSTA}\n"
+            f"Pergunta original do cliente: {pergunta_usuario}\n\n"
+            f"Informações da tarefa anterior:\n{informacoes}\n\n"
+            f"Resultado esperado: {SAIDA_RESPOSTA}",
+        ),
+    ]
+    for trecho in registro.obter("llm").stream(mensagens):
+        texto = texto_do_trecho(trecho)
+        if texto:
+            yield texto
+
+
+def processar_atendimento_stream(
+    pergunta_usuario, usar_cache=True, agentes=None, usar_atalho=True
+):
+    """
+    Versão em streaming de `processar_atendimento`.
+
+    Gera eventos `inicio_etapa`/`fim_etapa` para as 3 primeiras etapas,
+    `token` para cada trecho da resposta final e, por último, `fim` com
+    TTFT, latência total e duração de cada etapa em `dados`.
+    """
+
+    def produzir(emitir):
+        if usar_atalho:
+            rapida = roteador.responder(pergunta_usuario)
+            if rapida:
+                emitir(EventoStream(TOKEN, "atalho", rapida.texto))
+                return rapida.texto
+
+        if usar_cache:
+            encontrado = cache_atendimento.buscar(pergunta_usuario)
+            if encontrado:
+                if usar_atalho:
+                    roteador.registrar_cache()
+                resposta = str(encontrado.resposta)
+                emitir(EventoStream(TOKEN, "cache", resposta))
+                return resposta
+
+        etapas = iter(ETAPAS_CADEIA)
+        etapa_atual = [next(etapas)]
+
+        def ao_concluir_tarefa(saida):
+            emitir(EventoStream(FIM_ETAPA, etapa_atual[0], str(saida.raw)))
+            etapa_atual[0] = next(etapas)
+            emitir(EventoStream(INICIO_ETAPA, etapa_atual[0]))
+
+        inicio = time.perf_counter()
+        emitir(EventoStream(INICIO_ETAPA, etapa_atual[0]))
+        # Só as 3 primeiras etapas rodam na crew; a 4ª é transmitida
+        if agentes is None:
+            with pool_crews.usar(("stream", False)) as equipe:
+                equipe.task_callback = ao_concluir_tarefa
+                informacoes = equipe.kickoff(
+                    inputs=entradas_atendimento(pergunta_usuario)
+                ).raw
+            resposta = None
+        else:
+            recepcao, analise, pesquisa, resposta = agentes
+            equipe = crewai.Crew(
+                agents=[recepcao, analise, pesquisa],
+                tasks=criar_tarefas(pergunta_usuario, agentes)[:3],
+                process=crewai.Process.sequential,
+                verbose=False,
+                task_callback=ao_concluir_tarefa,
+            )
+            informacoes = equipe.kickoff().raw
+
+        trechos = []
+        for texto in gerar_resposta_stream(pergunta_usuario, informacoes, resposta):
+            trechos.append(texto)
+            emitir(EventoStream(TOKEN, "resposta", texto))
+        emitir(EventoStream(FIM_ETAPA, "resposta"))
+        texto_final = "".join(trechos)
+
+        if usar_atalho:
+            roteador.registrar_execucao_crew(time.perf_counter() - inicio)
+        if usar_cache:
+            cache_atendimento.armazenar(pergunta_usuario, texto_final)
+        return texto_final
+
+    return transmitir(produzir)
+
+
+def aprocessar_atendimento_stream(pergunta_usuario, **kwargs):
+    """Mesmos eventos como async iterator (`async for evento in ...`)"""
+    return para_async(processar_atendimento_stream(pergunta_usuario, **kwargs))
+
+
+def atender_com_streaming(pergunta_usuario):
+    """Mostra o progresso das etapas e a resposta conforme é gerada"""
+    nomes = {
+        "recepcao": "🏢 Recepcionista",
+        "analise": "🔍 Analista",
+        "pesquisa": "📊 Pesquisador",
+        "resposta": "💬 Comunicador",
+    }
     print("=" * 60)
     print(f"📝 Pergunta recebida: {pergunta_usuario}")
     print("=" * 60)
 
-    # Criar as tarefas
-    tarefas = criar_tarefas(pergunta_usuario)
+    for evento in processar_atendimento_stream(pergunta_usuario):
+        if evento.tipo == INICIO_ETAPA:
+            print(f"⏳ [{evento.instante:5.1f}s] {nomes[evento.etapa]} trabalhando...")
+            if evento.etapa == "resposta":
+                print()
+        elif evento.tipo == FIM_ETAPA and evento.etapa != "resposta":
+            print(f"✔️  [{evento.instante:5.1f}s] {nomes[evento.etapa]} concluiu")
+        elif evento.tipo == TOKEN:
+            print(evento.texto, end="", flush=True)
+        elif evento.tipo == FIM:
+            metricas = evento.dados
+            print("\n" + "=" * 60)
+            if metricas["ttft_s"] is not None:
+                print(f"⚡ Primeiro token (TTFT): {metricas['ttft_s']:.2f}s")
+            print(f"⏱️ Latência total: {metricas['latencia_total_s']:.2f}s")
+            for etapa, duracao in metricas["etapas_s"].items():
+                print(f"   {nomes[etapa]}: {duracao:.2f}s")
+            print("=" * 60)
+            return metricas["resultado"]
+
+
+def processar_lote(perguntas, max_workers=4, saida=None, ao_concluir=None):
+    """
+    Processa muitas perguntas em paralelo com um pool de workers.
 
-    # Criar a equipe (crew)
-    equipe_atendimento = Crew(
-        agents=[agente_recepcao, agente_analise, agente_pesquisa, agente_resposta],
-        tasks=tarefas,
-        process=Process.sequential,  # Processo sequencial - um agente por vez
-        verbose=True,
+    Cada worker retira uma crew do pool (nunca a mesma de outro worker); o
+    cache semântico é compartilhado, então perguntas repetidas no lote só
+    rodam a cadeia uma vez. Os resultados são gravados em `saida` (JSONL) e
+    passados a `ao_concluir(item)` à medida que terminam; nada fica em
+    memória, então o lote pode ter milhões de perguntas. Retorna o resumo.
+    """
+    estatisticas = EstatisticasLote()
+    # Uma crew por worker, sem ninguém esperando por devolução; no fim o
+    # pool volta ao tamanho anterior e as crews extras são descartadas
+    limite_anterior = pool_crews.max_por_chave
+    pool_crews.redimensionar(max(limite_anterior, max_workers))
+
+    print(f"📦 Processando lote com {max_workers} workers...")
+    try:
+        for item in processar_em_lote(
+            perguntas,
+            lambda pergunta: processar_atendimento(pergunta, verbose=False),
+            max_workers=max_workers,
+            estatisticas=estatisticas,
+        ):
+            if ao_concluir is not None:
+                ao_concluir(item)
+            if saida is not None:
+                escrever_jsonl(saida, item)
+            status = "✅" if item.sucesso else f"❌ {item.erro}"
+            print(f"   [{item.indice}] {item.latencia:.1f}s {status} - {item.entrada}")
+    finally:
+        pool_crews.redimensionar(limite_anterior)
+
+    resumo = estatisticas.resumo()
+    cache = cache_atendimento.estatisticas()
+    print("\n📊 RESUMO DO LOTE")
+    print(f"   Perguntas: {resumo['itens']} ({resumo['falhas']} falhas)")
+    print(f"   Tempo total: {resumo['duracao_s']:.1f}s")
+    print(f"   Throughput: {resumo['throughput_itens_s']:.2f} perguntas/s")
+    print(
+        f"   Latência p50/p95: {resumo['latencia_p50_s']:.1f}s / "
+        f"{resumo['latencia_p95_s']:.1f}s"
     )
+    print(f"   Cache semântico: {cache['hits']}/{cache['consultas']} hits")
+    imprimir_estatisticas_atalho()
+    imprimir_estatisticas_pool()
 
-    # Executar o processamento
-    resultado = equipe_atendimento.kickoff()
+    return resumo
 
-    print("\n" + "=" * 60)
-    print("✅ RESPOSTA FINAL PARA O CLIENTE:")
-    print("=" * 60)
-    print(resultado)
-    print("=" * 60)
 
-    return resultado
+def imprimir_estatisticas_atalho():
+    """Mostra quantas perguntas o atalho resolveu e o tempo economizado"""
+    stats = roteador.estatisticas()
+    print(
+        f"\n⚡ Atalho: {stats['roteadas']} respondidas direto do catálogo, "
+        f"{stats['respondidas_cache']} pelo cache semântico, "
+        f"{stats['escalonadas']} enviadas aos agentes "
+        f"({stats['taxa_roteamento']:.1f}% roteadas)"
+    )
+    print(
+        f"   Latência economizada: ~{stats['latencia_economizada_s']:.1f}s "
+        f"(cadeia média {stats['latencia_media_crew_s']:.1f}s, "
+        f"atalho {stats['latencia_media_roteador_ms']:.2f}ms)"
+    )
 
 
 # ===============================================
@@ -280,6 +718,7 @@ def executar_exemplos():
         "tem smartphone em estoque?",
         "preciso de info sobre o fone bluetooth",
         "quanto custa aquele celular novo?",
+        "tem smartphone no estoque?",  # Quase igual ao 2º: resposta do cache
     ]
 
     for i, exemplo in enumerate(exemplos, 1):
@@ -289,6 +728,15 @@ def executar_exemplos():
         if i < len(exemplos):
             input("\n⏸️  Pressione Enter para continuar para o próximo exemplo...")
 
+    stats = cache_atendimento.estatisticas()
+    print(f"\n💾 Cache semântico: {stats['hits']}/{stats['consultas']} hits "
+          f"({stats['hit_rate']:.1f}%)")
+    for amostra in cache_atendimento.amostras_auditoria(5):
+        print(f"   🔎 '{amostra['consulta']}' ≈ '{amostra['pergunta_cache']}' "
+              f"({amostra['similaridade']:.2f})")
+    imprimir_estatisticas_atalho()
+    imprimir_estatisticas_pool()
+
 
 # ===============================================
 # EXECUÇÃO PRINCIPAL
@@ -315,8 +763,10 @@ if __name__ == "__main__":
     print("\nEscolha uma opção:")
     print("1. Executar exemplos pré-definidos")
     print("2. Fazer uma pergunta personalizada")
+    print("3. Processar lote (arquivo JSONL ou uma pergunta por linha)")
+    print("4. Pergunta personalizada com resposta em streaming")
 
-    escolha = input("\nDigite sua escolha (1 ou 2): ").strip()
+    escolha = input("\nDigite sua escolha (1, 2, 3 ou 4): ").strip()
 
     if escolha == "1":
         executar_exemplos()
@@ -326,5 +776,21 @@ if __name__ == "__main__":
             processar_atendimento(pergunta)
         else:
             print("❌ Pergunta não pode estar vazia!")
+    elif escolha == "3":
+        caminho = input("\n📂 Arquivo de perguntas: ").strip()
+        if os.path.exists(caminho):
+            with open(caminho, encoding="utf-8") as entrada, open(
+                caminho + ".respostas.jsonl", "w", encoding="utf-8"
+            ) as saida:
+                processar_lote(ler_jsonl(entrada), saida=saida)
+            print(f"💾 Respostas em {caminho}.respostas.jsonl")
+        else:
+            print("❌ Arquivo não encontrado!")
+    elif escolha == "4":
+        pergunta = input("\n💬 Digite sua pergunta: ").strip()
+        if pergunta:
+            atender_com_streaming(pergunta)
+        else:
+            print("❌ Pergunta não pode estar vazia!")
     else:
         print("❌ Opção inválida!")
@@ -0,0 +1,350 @@
+"""
+Aula 4 - Roteador de Atalho (fast path)
+
+Perguntas simples sobre o catálogo ("quanto custa o notebook gamer?") não
+precisam passar pelos 4 agentes: a resposta já está em PRODUTOS_DB. Este
+módulo classifica a intenção com regras (regex + palavras-chave), responde
+com um template quando tem confiança suficiente e, caso contrário, devolve
+None para que a pergunta siga para a cadeia completa de agentes.
+"""
+
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from curso_crewai.cache_semantico import normalizar_texto, tokenizar
+
+# Padrões aplicados ao texto normalizado (minúsculas, sem acentos)
+PADROES_INTENCAO = {
+    "consultar_preco": re.compile(
+        r"\b(preco|precos|quanto (custa|sai|fica|e|esta)|valor|custa|custo)\b"
+    ),
+    "verificar_estoque": re.compile(
+        r"\b(estoque|disponivel|disponiveis|disponibilidade|ainda tem|"
+        r"tem (o|a|um|uma)?\s*\w+ (ai|disponivel|pra vender)|acabou|esgotad\w*)\b"
+    ),
+    "obter_informacoes": re.compile(
+        r"\b(info|infos|informacao|informacoes|detalhes?|especificac\w*|"
+        r"ficha tecnica|me (fala|conta) (sobre|do|da)|sobre o|sobre a)\b"
+    ),
+}
+
+# Assuntos que o catálogo não responde: sempre vão para os agentes
+PADRAO_FORA_DO_ESCOPO = re.compile(
+    r"\b(frete|entrega|parcel\w*|desconto|cupom|garantia|troca|devoluc\w*|"
+    r"compar\w*|melhor|diferenca|reclama\w*|cancel\w*|pedido)\b"
+)
+
+# Pergunta "tem smartphone?" sem outra palavra-chave é consulta de estoque
+PADRAO_TEM_PRODUTO = re.compile(r"^(tem|voces tem|vcs tem|ainda tem)\b")
+
+# Qualificadores que mudam o produto: se a pergunta tem um que o nome do
+# produto não tem ("fone com fio", "smartphone 128gb"), é outra variante
+PADRAO_QUALIFICADOR = re.compile(
+    r"\b(com fio|sem fio|usad[oa]s?|recondicionad[oa]s?|seminov[oa]s?|"
+    r"mini|lite|plus|max|pro|ultra|infantil|"
+    r"\d+ ?(gb|tb|mb|w|mah|hz|pol\w*))\b"
+)
+# Termos do nome que já implicam o qualificador
+EQUIVALENTES = {"sem fio": ("bluetooth", "wireless")}
+
+# Palavras que não mudam o assunto de uma pergunta de catálogo: intenção,
+# cortesia e referência ao produto. Qualquer outra palavra que não seja do
+# produto ("capinha", "conserto", "bateria") indica outro assunto
+PALAVRAS_NEUTRAS = frozenset("""
+    quanto quanta custa custam sai fica esta estao e preco precos valor
+    valores custo estoque disponivel disponiveis disponibilidade tem temos
+    ainda acabou esgotado esgotada esgotados esgotadas vender venda vendem
+    info infos informacao informacoes detalhe detalhes especificacao
+    especificacoes ficha tecnica fala conta sobre qual quais voces vcs hoje
+    agora favor gostaria queria quero saber preciso poderia pode podem ver
+    dizer informar aquele aquela daquele daquela desse dessa deste desta
+    bom boa dia tarde noite obrigado obrigada produto loja unidade unidades
+    """.split())
+
+# Segunda pergunta na mesma mensagem ("quanto custa X e quanto tempo dura?")
+PADRAO_SEGUNDA_PERGUNTA = re.compile(
+    r"\b(e|mas) (quanto|quantos|quantas|qual|quais|como|quando|onde|"
+    r"por que|porque|tem|da|funciona)\b"
+)
+
+# Confiança de um produto citado por uma única palavra da chave ("fone"):
+# fica abaixo do limiar padrão, a pergunta vai para os agentes
+NOTA_PALAVRA_UNICA = 0.7
+
+
+@dataclass
+class Classificacao:
+    """Intenção e produto identificados em uma pergunta."""
+
+    intencao: Optional[str]
+    produto: Optional[str]
+    confianca: float
+    motivo: str
+
+
+@dataclass
+class RespostaRapida:
+    """Resposta gerada pelo atalho, sem chamar o LLM."""
+
+    texto: str
+    classificacao: Classificacao
+    latencia: float
+
+    @property
+    def raw(self) -> str:
+        # Mesma interface do CrewOutput, para quem só lê `.raw`
+        return self.texto
+
+    def __str__(self) -> str:
+        return self.texto
+
+
+def formatar_preco(valor: float) -> str:
+    """Formata no padrão brasileiro: 2999.9 -> 'R$ 2.999,90'."""
+    texto = f"{valor:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+    return f"R$ {texto}"
+
+
+class RoteadorAtendimento:
+    """
+    Responde perguntas de catálogo direto do banco de produtos.
+
+    Args:
+        produtos: Dicionário no formato de PRODUTOS_DB
+        limiar: Confiança mínima (0-1) para responder sem os agentes
+        latencia_crew_inicial: Estimativa (s) de uma execução da cadeia,
+            usada até a primeira medição real
+    """
+
+    TEMPLATES = {
+        "consultar_preco": (
+            "Olá! O {nome} está saindo por {preco}. {disponibilidade} "
+            "Posso ajudar em mais alguma coisa?"
+        ),
+        "verificar_estoque": (
+            "Olá! {disponibilidade} O {nome} custa {preco}. "
+            "Posso ajudar em mais alguma coisa?"
+        ),
+        "obter_informacoes": (
+            "Olá! Aqui estão os detalhes do {nome}: categoria {categoria}, "
+            "preço {preco}. {disponibilidade} Posso ajudar em mais alguma coisa?"
+        ),
+    }
+
+    def __init__(
+        self,
+        produtos: Dict[str, Dict],
+        limiar: float = 0.8,
+        latencia_crew_inicial: float = 15.0,
+    ):
+        self.produtos = produtos
+        self.limiar = limiar
+        self._lock = threading.Lock()
+        self.consultas = 0
+        self.roteadas = 0
+        self.escalonadas = 0
+        self.respondidas_cache = 0
+        self.por_intencao: Dict[str, int] = {}
+        self.tempo_roteador = 0.0
+        self.tempo_crew = 0.0
+        self.execucoes_crew = 0
+        self._latencia_crew_inicial = latencia_crew_inicial
+        # Em quantos produtos cada palavra de chave aparece
+        self._contagem_termos: Dict[str, int] = {}
+        for chave in produtos:
+            for termo in set(tokenizar(chave)):
+                self._contagem_termos[termo] = self._contagem_termos.get(termo, 0) + 1
+
+    def _contradiz(self, texto: str, chave: str) -> Optional[str]:
+        """Qualificador da pergunta que o produto não tem (ou None)."""
+        produto = self.produtos[chave]
+        termos = set(tokenizar(chave)) | set(tokenizar(produto["nome"]))
+        nome = " ".join(normalizar_texto(produto["nome"]).split())
+        for encontrado in PADRAO_QUALIFICADOR.finditer(texto):
+            qualificador = encontrado.group(0)
+            if qualificador.replace(" ", "") in nome.replace(" ", ""):
+                continue
+            if set(qualificador.split()) <= termos:
+                continue
+            if any(t in termos for t in EQUIVALENTES.get(qualificador, ())):
+                continue
+            return qualificador
+        return None
+
+    def _termos_estranhos(self, texto: str, chave: str) -> list:
+        """Palavras da pergunta que não são do produto nem da intenção."""
+        produto = self.produtos[chave]
+        termos = set(tokenizar(chave)) | set(tokenizar(produto["nome"]))
+        return sorted(
+            palavra
+            for palavra in set(tokenizar(texto))
+            if palavra not in termos
+            and palavra not in PALAVRAS_NEUTRAS
+            and not palavra.isdigit()
+        )
+
+    def _identificar_produto(self, texto: str) -> Tuple[Optional[str], float, str]:
+        """Retorna (chave, pontuação, motivo) do produto mais provável."""
+        palavras = set(tokenizar(texto))
+        notas: Dict[str, float] = {}
+        citados = []  # produtos citados pela chave (inteira ou por um termo dela)
+        for chave, produto in self.produtos.items():
+            chave_norm = normalizar_texto(chave).strip()
+            termos_chave = set(tokenizar(chave))
+            if re.search(rf"\b{re.escape(chave_norm)}\b", texto):
+                notas[chave] = 1.0
+                citados.append(chave)
+                continue
+            termos = termos_chave | set(tokenizar(produto["nome"]))
+            comuns = palavras & termos
+            if comuns:
+                # Palavra solta do nome ("pro", "ultra") é pouco confiável;
+                # uma palavra da chave que só este produto tem ("fone") indica
+                # o produto, mas sozinha não basta para responder
+                nota = min(0.9, 0.45 * len(comuns))
+                if any(self._contagem_termos[p] == 1 for p in comuns & termos_chave):
+                    nota = max(nota, NOTA_PALAVRA_UNICA)
+                if comuns & termos_chave:
+                    citados.append(chave)
+                notas[chave] = nota
+            elif any(
+                palavra in normalizar_texto(produto.get("categoria", ""))
+                for palavra in palavras
+                if len(palavra) >= 4
+            ):
+                # "celular" -> categoria "celulares": provável, mas ambíguo
+                notas[chave] = 0.5
+        if not notas:
+            return None, 0.0, "produto não identificado"
+        melhor = max(notas, key=notas.__getitem__)
+        if len(citados) > 1:
+            # "o notebook gamer e o smartphone": um template não responde
+            return melhor, 0.0, "vários produtos"
+        qualificador = self._contradiz(texto, melhor)
+        if qualificador:
+            return melhor, 0.0, f"qualificador '{qualificador}' não confere"
+        if PADRAO_SEGUNDA_PERGUNTA.search(texto):
+            return melhor, 0.0, "segunda pergunta"
+        estranhos = self._termos_estranhos(texto, melhor)
+        if estranhos:
+            # "capinha do smartphone" cita o produto, mas pergunta de outra coisa
+            return melhor, 0.0, f"termos fora do catálogo: {', '.join(estranhos)}"
+        return melhor, notas[melhor], "regras"
+
+    def classificar(self, pergunta: str) -> Classificacao:
+        """Classifica a pergunta sem chamar nenhum modelo."""
+        texto = " ".join(normalizar_texto(pergunta).split())
+
+        if PADRAO_FORA_DO_ESCOPO.search(texto):
+            return Classificacao(None, None, 0.0, "assunto fora do catálogo")
+
+        intencoes = [nome for nome, p in PADROES_INTENCAO.items() if p.search(texto)]
+        if not intencoes and PADRAO_TEM_PRODUTO.search(texto):
+            intencoes = ["verificar_estoque"]
+        if not intencoes:
+            return Classificacao(None, None, 0.0, "nenhuma intenção reconhecida")
+
+        produto, nota_produto, motivo = self._identificar_produto(texto)
+        if produto is None:
+            return Classificacao(intencoes[0], None, 0.0, motivo)
+        if nota_produto and re.search(r"\?\s*\w", pergunta):
+            # "quanto custa o fone? e o prazo?": o template responde só a uma
+            nota_produto, motivo = 0.0, "segunda pergunta"
+
+        # Mais de uma intenção ("preço e detalhes") fica para os agentes
+        nota_intencao = 1.0 if len(intencoes) == 1 else 0.5
+        if len(intencoes) > 1 and nota_produto:
+            motivo = "intenções múltiplas"
+        return Classificacao(
+            intencoes[0],
+            produto,
+            round(nota_intencao * nota_produto, 3),
+            motivo,
+        )
+
+    def _montar_resposta(self, classificacao: Classificacao) -> str:
+        produto = self.produtos[classificacao.produto]
+        estoque = produto.get("estoque", 0)
+        if estoque > 0:
+            disponibilidade = f"Temos {estoque} unidades disponíveis em estoque."
+        else:
+            disponibilidade = "No momento ele está sem estoque."
+        return self.TEMPLATES[classificacao.intencao].format(
+            nome=produto["nome"],
+            preco=formatar_preco(produto["preco"]),
+            categoria=produto.get("categoria", "-"),
+            disponibilidade=disponibilidade,
+        )
+
+    def responder(self, pergunta: str) -> Optional[RespostaRapida]:
+        """
+        Tenta responder pelo atalho.
+
+        Returns:
+            RespostaRapida, ou None quando a pergunta deve ir para os agentes
+        """
+        inicio = time.perf_counter()
+        classificacao = self.classificar(pergunta)
+        resposta = None
+        if classificacao.confianca >= self.limiar:
+            resposta = RespostaRapida(
+                self._montar_resposta(classificacao), classificacao, 0.0
+            )
+        latencia = time.perf_counter() - inicio
+
+        with self._lock:
+            self.consultas += 1
+            self.tempo_roteador += latencia
+            if resposta is None:
+                # Só conta como escalonada quando a cadeia roda de fato
+                # (registrar_execucao_crew): o cache semântico pode responder
+                return None
+            self.roteadas += 1
+            intencao = classificacao.intencao
+            self.por_intencao[intencao] = self.por_intencao.get(intencao, 0) + 1
+        resposta.latencia = latencia
+        return resposta
+
+    def registrar_execucao_crew(self, latencia: float) -> None:
+        """Informa quanto demorou uma pergunta escalonada para os agentes."""
+        with self._lock:
+            self.escalonadas += 1
+            self.tempo_crew += latencia
+            self.execucoes_crew += 1
+
+    def registrar_cache(self) -> None:
+        """Pergunta recusada pelo atalho, mas respondida pelo cache semântico."""
+        with self._lock:
+            self.respondidas_cache += 1
+
+    @property
+    def latencia_media_crew(self) -> float:
+        if self.execucoes_crew:
+            return self.tempo_crew / self.execucoes_crew
+        return self._latencia_crew_inicial
+
+    def estatisticas(self) -> Dict:
+        """Contagem de roteadas/escalonadas e latência economizada."""
+        with self._lock:
+            total = self.consultas
+            media_crew = self.latencia_media_crew
+            return {
+                "total": total,
+                "roteadas": self.roteadas,
+                "escalonadas": self.escalonadas,
+                "respondidas_cache": self.respondidas_cache,
+                "taxa_roteamento": (self.roteadas / total * 100) if total else 0.0,
+                "por_intencao": dict(self.por_intencao),
+                "latencia_media_roteador_ms": (
+                    self.tempo_roteador / total * 1000 if total else 0.0
+                ),
+                "latencia_media_crew_s": media_crew,
+                # Cada pergunta roteada deixou de rodar a cadeia completa
+                "latencia_economizada_s": max(
+                    0.0, self.roteadas * media_crew - self.tempo_roteador
+                ),
+                "limiar": self.limiar,
+            }
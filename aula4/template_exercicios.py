@@ -8,7 +8,10 @@ Já inclui todas as práticas de segurança e economia de custos.
 
 import os
 from crewai import Agent, Task, Crew, Process
-from langchain_openai import ChatOpenAI
+from curso_crewai.conexoes import chat_openai, instalar_litellm
+from curso_crewai.orcamento import LivroOrcamento, OrcamentoExcedido
+from curso_crewai.pool import PoolCrews
+from curso_crewai.tokens import EstimadorCusto
 
 # =============================================================================
 # 1. VERIFICAÇÃO BÁSICA
@@ -22,7 +25,9 @@ if not os.getenv("OPENAI_API_KEY"):
 # 2. CONFIGURAÇÃO OTIMIZADA PARA ECONOMIA
 # =============================================================================
 
-llm_economico = ChatOpenAI(
+# Conexões HTTP compartilhadas por todos os LLMs do processo
+instalar_litellm()
+llm_economico = chat_openai(
     model="gpt-4o-mini",  # 85% mais barato que GPT-4o
     temperature=0.1,  # Consistência
     max_tokens=500,  # Limite de custo
@@ -36,20 +41,29 @@ llm_economico = ChatOpenAI(
 class MonitorCustos:
     def __init__(self, orcamento=1.0):
         self.orcamento = orcamento
-        self.gasto = 0.0
-        # Preços GPT-4o Mini (por 1M tokens)
-        self.precos = {"input": 0.15 / 1000000, "output": 0.60 / 1000000}
+        # Reservas atômicas: seguro com várias execuções ao mesmo tempo
+        self.livro = LivroOrcamento(limite_tenant=orcamento)
+        # Conta tokens localmente com o tokenizador do GPT-4o Mini
+        self.estimador = EstimadorCusto("gpt-4o-mini", tokens_saida=500)
 
     def estimar_custo(self, entrada):
-        tokens = len(entrada) * 0.25 + 500  # entrada + saída estimada
-        return tokens * 0.60 / 1000000  # usar preço output (mais alto)
+        return self.estimador.estimar(entrada).custo  # entrada + saída estimada
 
-    def verificar_orcamento(self, custo):
-        if self.gasto + custo > self.orcamento:
-            raise Exception(f"❌ Orçamento excedido! ${self.gasto:.4f}")
+    @property
+    def gasto(self):
+        return self.livro.saldo()["gasto"]
 
-    def registrar_gasto(self, custo):
-        self.gasto += custo
+    def verificar_orcamento(self, custo):
+        try:
+            return self.livro.reservar(custo)  # Guarde a reserva
+        except OrcamentoExcedido as e:
+            raise Exception(f"❌ Orçamento excedido! ${self.gasto:.4f}") from e
+
+    def registrar_gasto(self, custo, reserva=None):
+        if reserva is not None:
+            self.livro.confirmar(reserva, custo)  # Troca a reserva pelo custo
+        else:
+            self.livro.lancar(custo)  # Gasto sem reserva prévia
         print(f"💰 Custo: ${custo:.6f} | Total: ${self.gasto:.4f}")
 
 
@@ -114,11 +128,14 @@ def criar_agentes():
 # =============================================================================
 
 
-def criar_tarefas(agentes, entrada_usuario):
+def criar_tarefas(agentes, entrada_usuario="{entrada}"):
     """
     MODIFIQUE ESTA FUNÇÃO PARA SEU EXERCÍCIO
 
     Crie tarefas que se conectam em sequência usando context=[]
+
+    O padrão `{entrada}` é um marcador: a crew do pool é criada uma vez e a
+    entrada de cada requisição chega por `kickoff(inputs={"entrada": ...})`.
     """
 
     agente1, agente2, agente3 = agentes
@@ -158,6 +175,21 @@ def criar_tarefas(agentes, entrada_usuario):
     return [tarefa1, tarefa2, tarefa3]
 
 
+def montar_crew(chave):
+    """Crew para o pool: agentes e tarefas criados uma vez, reaproveitados"""
+    agentes = criar_agentes()
+    return Crew(
+        agents=agentes,
+        tasks=criar_tarefas(agentes),
+        process=Process.sequential,
+        verbose=False,  # Economia
+    )
+
+
+# Crews prontas: cada requisição retira uma, executa e devolve
+pool_crews = PoolCrews(montar_crew, max_por_chave=2)
+
+
 # =============================================================================
 # 7. FUNÇÃO PRINCIPAL
 # =============================================================================
@@ -175,27 +207,21 @@ def processar_entrada(entrada_usuario):
 
         # 2. Verificar custo
         custo = monitor.estimar_custo(entrada_usuario)
-        monitor.verificar_orcamento(custo)
+        reserva = monitor.verificar_orcamento(custo)
 
         print("🚀 Iniciando processamento...")
 
-        # 3. Criar agentes e tarefas
-        agentes = criar_agentes()
-        tarefas = criar_tarefas(agentes, entrada_usuario)
-
-        # 4. Criar crew
-        crew = Crew(
-            agents=agentes,
-            tasks=tarefas,
-            process=Process.sequential,
-            verbose=False,  # Economia
-        )
-
-        # 5. Executar
-        resultado = crew.kickoff()
+        # 3-5. Retirar uma crew pronta e executar com esta entrada
+        # (se falhar, a reserva é devolvida)
+        try:
+            with pool_crews.usar("padrao") as crew:
+                resultado = crew.kickoff(inputs={"entrada": entrada_usuario})
+        except Exception:
+            monitor.livro.liberar(reserva)
+            raise
 
         # 6. Registrar custo
-        monitor.registrar_gasto(custo)
+        monitor.registrar_gasto(custo, reserva)
 
         return resultado
 
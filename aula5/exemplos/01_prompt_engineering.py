@@ -6,10 +6,15 @@ Demonstra como otimizar prompts para diferentes cenários
 
 from dotenv import load_dotenv
 from crewai import Agent, Task, Crew
+from curso_crewai import conexoes
 import time
 
 load_dotenv()
 
+# Chamadas dos agentes no pool de conexões compartilhado e no limite de
+# RPM/TPM do processo
+conexoes.instalar_litellm()
+
 
 class PromptEngineer:
     """Classe para demonstrar técnicas de prompt engineering"""
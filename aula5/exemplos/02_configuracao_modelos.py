@@ -6,20 +6,58 @@ Demonstra como configurar diferentes parâmetros para diferentes tipos de agente
 
 from dotenv import load_dotenv
 from crewai import Agent, Task, Crew
+from curso_crewai import conexoes
+from curso_crewai.retentativas import (
+    ErroHTTP,
+    ExecutorRetentativas,
+    PoliticaRetentativa,
+)
+from curso_crewai.roteador import roteador_padrao
 import time
 import json
 
 load_dotenv()
 
+# Chamadas dos agentes no pool de conexões compartilhado e no limite de
+# RPM/TPM do processo
+conexoes.instalar_litellm()
+
 
 class ConfiguradorModelos:
-    """Classe para gerenciar configurações de modelos OpenAI"""
+    """
+    Classe para gerenciar configurações de modelos OpenAI
+
+    Os parâmetros de amostragem são fixos por tipo de agente; o modelo vem
+    do roteador, que escolhe o mais barato com qualidade esperada suficiente
+    para a descrição do trabalho (tamanho, tipo de tarefa, complexidade).
+    Montar uma configuração não registra a decisão: ela só vai para o log do
+    roteador com o resultado (`registrar_resultado`), quando o agente roda.
+    """
+
+    # Última decisão por descrição, à espera do resultado da execução
+    decisoes = {}
+
+    @staticmethod
+    def modelo_para(descricao, tipo_tarefa=None):
+        """Modelo escolhido pelo roteador para a descrição"""
+        decisao = roteador_padrao().rotear(
+            descricao, tipo_tarefa=tipo_tarefa, registrar=False
+        )
+        ConfiguradorModelos.decisoes[descricao] = decisao
+        return decisao.modelo
+
+    @staticmethod
+    def registrar_resultado(descricao, sucesso, latencia_s=None):
+        """Devolve ao roteador o resultado do agente configurado com a descrição"""
+        decisao = ConfiguradorModelos.decisoes.pop(descricao, None)
+        if decisao is not None:
+            roteador_padrao().registrar_resultado(decisao, sucesso, latencia_s)
 
     @staticmethod
-    def config_agente_criativo():
+    def config_agente_criativo(descricao="Gerar ideias criativas e inovadoras"):
         """Configuração para agentes que precisam de criatividade"""
         return {
-            "model": "gpt-4",
+            "model": ConfiguradorModelos.modelo_para(descricao, "criativa"),
             "temperature": 0.9,  # Alta criatividade
             "max_tokens": 2000,  # Respostas mais longas
             "top_p": 0.9,  # Diversidade alta
@@ -28,10 +66,10 @@ class ConfiguradorModelos:
         }
 
     @staticmethod
-    def config_agente_analitico():
+    def config_agente_analitico(descricao="Analisar dados de forma precisa"):
         """Configuração para agentes analíticos"""
         return {
-            "model": "gpt-3.5-turbo",
+            "model": ConfiguradorModelos.modelo_para(descricao, "analitica"),
             "temperature": 0.1,  # Baixa variabilidade
             "max_tokens": 1000,  # Respostas concisas
             "top_p": 0.1,  # Focado e preciso
@@ -40,10 +78,10 @@ class ConfiguradorModelos:
         }
 
     @staticmethod
-    def config_agente_conversacional():
+    def config_agente_conversacional(descricao="Responder dúvidas de usuários"):
         """Configuração para agentes de conversação"""
         return {
-            "model": "gpt-3.5-turbo",
+            "model": ConfiguradorModelos.modelo_para(descricao, "conversacional"),
             "temperature": 0.7,  # Equilibrado
             "max_tokens": 500,  # Respostas médias
             "top_p": 0.8,  # Boa variedade
@@ -52,12 +90,20 @@ class ConfiguradorModelos:
         }
 
     @staticmethod
-    def config_com_fallback():
+    def config_com_fallback(descricao="Responder a pergunta do usuário"):
         """Configuração com sistema de fallback"""
+        decisao = roteador_padrao().rotear(descricao, registrar=False)
+        # Reserva: o outro candidato de maior qualidade esperada
+        outros = [c for c in decisao.candidatos if c.modelo != decisao.modelo]
+        reserva = max(outros, key=lambda c: c.qualidade_esperada, default=None)
         return {
-            "primary": {"model": "gpt-4", "temperature": 0.7, "max_tokens": 1000},
+            "primary": {
+                "model": decisao.modelo,
+                "temperature": 0.7,
+                "max_tokens": 1000,
+            },
             "fallback": {
-                "model": "gpt-3.5-turbo",
+                "model": reserva.modelo if reserva else decisao.modelo,
                 "temperature": 0.7,
                 "max_tokens": 1000,
             },
@@ -99,6 +145,12 @@ def demonstrar_configuracoes():
                 print(f"  • {param}: {valor}")
 
 
+# Trabalho de cada agente, usado pelo roteador para escolher o modelo
+DESCRICAO_CRIATIVO = "Brainstorming: gerar ideias criativas e inovadoras"
+DESCRICAO_ANALITICO = "Analisar dados de forma precisa e objetiva, com evidências"
+DESCRICAO_CONVERSACIONAL = "Fornecer suporte amigável e eficiente aos usuários"
+
+
 def criar_agentes_com_configs_diferentes():
     """Cria agentes com configurações específicas"""
 
@@ -112,7 +164,7 @@ def criar_agentes_com_configs_diferentes():
         Seja criativo, ousado e não tenha medo de sugerir coisas diferentes.
         """,
         verbose=True,
-        llm_config=ConfiguradorModelos.config_agente_criativo(),
+        llm_config=ConfiguradorModelos.config_agente_criativo(DESCRICAO_CRIATIVO),
     )
 
     # Agente Analítico - para análise de dados
@@ -125,7 +177,7 @@ def criar_agentes_com_configs_diferentes():
         Seja objetivo, técnico e sempre forneça evidências para suas conclusões.
         """,
         verbose=True,
-        llm_config=ConfiguradorModelos.config_agente_analitico(),
+        llm_config=ConfiguradorModelos.config_agente_analitico(DESCRICAO_ANALITICO),
     )
 
     # Agente Conversacional - para atendimento
@@ -138,7 +190,9 @@ def criar_agentes_com_configs_diferentes():
         Seja empático, prestativo e sempre mantenha um tom profissional.
         """,
         verbose=True,
-        llm_config=ConfiguradorModelos.config_agente_conversacional(),
+        llm_config=ConfiguradorModelos.config_agente_conversacional(
+            DESCRICAO_CONVERSACIONAL
+        ),
     )
 
     return agente_criativo, agente_analitico, agente_conversacional
@@ -164,12 +218,12 @@ def testar_comportamentos_diferentes():
     criativo, analitico, conversacional = criar_agentes_com_configs_diferentes()
 
     agentes = [
-        ("🎨 Criativo", criativo),
-        ("📊 Analítico", analitico),
-        ("💬 Conversacional", conversacional),
+        ("🎨 Criativo", criativo, DESCRICAO_CRIATIVO),
+        ("📊 Analítico", analitico, DESCRICAO_ANALITICO),
+        ("💬 Conversacional", conversacional, DESCRICAO_CONVERSACIONAL),
     ]
 
-    for nome, agente in agentes:
+    for nome, agente, descricao in agentes:
         print(f"\n{nome} analisando...")
 
         task = Task(
@@ -182,10 +236,11 @@ def testar_comportamentos_diferentes():
             agents=[agente], tasks=[task], verbose=False  # Reduzido para clareza
         )
 
+        start_time = time.time()
         try:
-            start_time = time.time()
             result = crew.kickoff()
             execution_time = time.time() - start_time
+            ConfiguradorModelos.registrar_resultado(descricao, True, execution_time)
 
             print(f"⏱️ Tempo: {execution_time:.2f}s")
             print(f"📋 Resposta ({len(str(result))} chars):")
@@ -193,6 +248,9 @@ def testar_comportamentos_diferentes():
             print("-" * 40)
 
         except Exception as e:
+            ConfiguradorModelos.registrar_resultado(
+                descricao, False, time.time() - start_time
+            )
             print(f"❌ Erro: {e}")
 
 
@@ -243,34 +301,50 @@ def demonstrar_fallback():
     print("\n🔄 SISTEMA DE FALLBACK")
     print("=" * 30)
 
-    def executar_com_fallback(prompt, config):
-        """Simula execução com fallback"""
-        try:
-            # Tenta com modelo primário
-            print(f"🔄 Tentando com {config['primary']['model']}...")
-
-            # Simula falha (para demonstração)
-            import random
-
-            if random.random() < 0.3:  # 30% chance de falha
-                raise Exception("Rate limit exceeded")
+    import random
 
-            print("✅ Sucesso com modelo primário")
-            return f"Resposta do {config['primary']['model']}"
+    config = ConfiguradorModelos.config_com_fallback()
+    primario = config["primary"]["model"]
+    reserva = config["fallback"]["model"]
+
+    # Espera curta para a demonstração; em produção use os padrões
+    executor = ExecutorRetentativas(
+        PoliticaRetentativa(max_tentativas=3, base_s=0.1, teto_s=1.0, prazo_s=5.0),
+        limiar_falhas=3,
+        resfriamento_s=10.0,
+    )
 
-        except Exception as e:
-            print(f"❌ Falha: {e}")
-            print(f"🔄 Usando fallback: {config['fallback']['model']}")
-            return f"Resposta do {config['fallback']['model']} (fallback)"
+    def chamar_primario():
+        print(f"🔄 Tentando com {primario}...")
+        # Simula falha (para demonstração): 429 com Retry-After, como a API
+        if random.random() < 0.3:  # 30% chance de falha
+            print("❌ Falha: Rate limit exceeded")
+            raise ErroHTTP(429, "Rate limit exceeded", retry_after=0.2)
+        print("✅ Sucesso com modelo primário")
+        return f"Resposta do {primario}"
 
-    config = ConfiguradorModelos.config_com_fallback()
+    def chamar_fallback():
+        print(f"🔄 Usando fallback: {reserva}")
+        return f"Resposta do {reserva} (fallback)"
 
-    # Simula várias tentativas
+    # Simula várias requisições
     for i in range(3):
-        print(f"\n--- Tentativa {i+1} ---")
-        resultado = executar_com_fallback("Prompt de teste", config)
+        print(f"\n--- Requisição {i+1} ---")
+        resultado = executor.executar_com_fallback(
+            [(primario, chamar_primario), (reserva, chamar_fallback)]
+        )
         print(f"📋 Resultado: {resultado}")
 
+    stats = executor.estatisticas()
+    print("\n📊 Retentativas:")
+    print(f"   Tentativas: {stats['tentativas']}")
+    print(f"   Repetições: {stats['retentativas']}")
+    print(f"   Retry-After respeitado: {stats['retry_after_respeitados']}x")
+    print(f"   Fallbacks: {stats['fallbacks']}")
+    print(f"   Latência adicionada: {stats['latencia_adicionada_s']:.2f}s")
+    for modelo, disjuntor in stats["disjuntores"].items():
+        print(f"   Circuito {modelo}: {disjuntor['estado']}")
+
 
 def main():
     """Função principal"""
@@ -10,9 +10,15 @@ from dotenv import load_dotenv
 from crewai import Agent, Task, Crew
 import time
 import json
+from curso_crewai import conexoes
+from curso_crewai.uso import ColetorUso
 
 load_dotenv()
 
+# Chamadas dos agentes no pool de conexões compartilhado e no limite de
+# RPM/TPM do processo
+conexoes.instalar_litellm()
+
 
 class TesteAgente(unittest.TestCase):
     """Classe base para testes de agentes"""
@@ -114,7 +120,11 @@ class TesteSistemaMonitoramento:
             "falhas": 0,
             "tempo_total": 0,
             "tokens_utilizados": 0,
+            "custo": 0.0,
         }
+        # Lê os tokens reais de cada resposta da API
+        self.coletor = ColetorUso()
+        self.coletor.instalar_litellm()
 
     def executar_teste_com_monitoramento(self, agente, task_description):
         """Executa teste e coleta métricas"""
@@ -129,11 +139,14 @@ class TesteSistemaMonitoramento:
             )
 
             crew = Crew(agents=[agente], tasks=[task], verbose=False)
-            resultado = crew.kickoff()
+            with self.coletor.rastrear(agente.role) as uso:
+                resultado = crew.kickoff()
+                llm = getattr(agente, "llm", None)
+                uso.finalizar(resultado, modelo=getattr(llm, "model", None))
 
-            # Simula contagem de tokens (estimativa)
-            tokens_estimados = len(str(resultado).split()) * 1.3
-            self.metricas["tokens_utilizados"] += tokens_estimados
+            tokens_usados = uso.total_tokens
+            self.metricas["tokens_utilizados"] += tokens_usados
+            self.metricas["custo"] += uso.custo
 
             execution_time = time.time() - start_time
             self.metricas["tempo_total"] += execution_time
@@ -143,7 +156,8 @@ class TesteSistemaMonitoramento:
                 "sucesso": True,
                 "resultado": resultado,
                 "tempo": execution_time,
-                "tokens": tokens_estimados,
+                "tokens": tokens_usados,
+                "custo": uso.custo,
             }
 
         except Exception as e:
@@ -177,7 +191,7 @@ class TesteSistemaMonitoramento:
         • Taxa de sucesso: {taxa_sucesso:.1f}%
         • Tempo médio: {tempo_medio:.2f}s
         • Tokens totais: {self.metricas['tokens_utilizados']:.0f}
-        • Custo estimado: ${(self.metricas['tokens_utilizados'] * 0.002):.4f}
+        • Custo: ${self.metricas['custo']:.6f}
         """
 
 
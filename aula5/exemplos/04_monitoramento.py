@@ -6,105 +6,91 @@ Demonstra como implementar monitoramento de performance, custos e qualidade
 
 import time
 import json
+import random
 from datetime import datetime, timedelta
-from collections import defaultdict
 from dotenv import load_dotenv
 from crewai import Agent, Task, Crew
+from curso_crewai import conexoes, exportador
+from curso_crewai.alertas import REGRAS_PADRAO, MotorAlertas, destinos_padrao
+from curso_crewai.cache import CacheLLM, backend_padrao
+from curso_crewai.metricas import ArmazemMetricas
+from curso_crewai.pool import PoolCrews
+from curso_crewai.uso import ColetorUso, custo_tokens
 
 load_dotenv()
 
+# Tokens reais de cada chamada (campo `usage` da resposta da API)
+coletor_uso = ColetorUso()
+coletor_uso.instalar_litellm()
+# Pool de conexões compartilhado e limite de RPM/TPM do processo
+conexoes.instalar_litellm()
+
 
 class MonitorPerformance:
     """Sistema completo de monitoramento de agentes"""
 
     def __init__(self):
-        self.metricas = defaultdict(list)
+        # Agregados, quantis e consolidados por minuto de cada agente, em
+        # memória fixa: o relatório não depende de quantas execuções houve
+        self.metricas = ArmazemMetricas()
         self.inicio_sessao = datetime.now()
         self.cache_respostas = {}
-        self.alertas = []
+        # Regras sobre janelas de 5 minutos (p95 da latência, taxa de falhas,
+        # média de tokens): um alerta por problema, não por execução
+        self.motor_alertas = MotorAlertas(REGRAS_PADRAO, destinos_padrao())
+
+    @property
+    def alertas(self):
+        """Últimas mudanças de estado dos alertas (histórico limitado)"""
+        return self.motor_alertas.historico()
 
     def registrar_execucao(
-        self, agente_id, tempo_execucao, tokens_usados, sucesso=True, erro=None
+        self,
+        agente_id,
+        tempo_execucao,
+        tokens_usados,
+        sucesso=True,
+        erro=None,
+        custo=None,
+        tokens_prompt=None,
+        tokens_resposta=None,
+        modelo="",
+        instante=None,
     ):
         """Registra métricas de uma execução"""
-        registro = {
-            "timestamp": datetime.now(),
-            "agente_id": agente_id,
-            "tempo_execucao": tempo_execucao,
-            "tokens_usados": tokens_usados,
-            "sucesso": sucesso,
-            "erro": erro,
-        }
-
-        self.metricas[agente_id].append(registro)
-
-        # Verifica se precisa gerar alertas
-        self._verificar_alertas(agente_id, registro)
-
-    def _verificar_alertas(self, agente_id, registro):
-        """Verifica se deve gerar alertas baseado nas métricas"""
-
-        # Alerta por tempo de execução alto
-        if registro["tempo_execucao"] > 30:  # 30 segundos
-            self.alertas.append(
-                {
-                    "tipo": "TEMPO_ALTO",
-                    "agente": agente_id,
-                    "valor": registro["tempo_execucao"],
-                    "timestamp": datetime.now(),
-                }
-            )
+        # Custo real quando a API informou o uso; senão, preço do gpt-4o-mini
+        if custo is None:
+            custo = custo_tokens("gpt-4o-mini", tokens_usados, 0)
+        self.metricas.registrar(
+            agente_id, tempo_execucao, tokens_usados, sucesso, custo
+        )
 
-        # Alerta por uso alto de tokens
-        if registro["tokens_usados"] > 2000:
-            self.alertas.append(
-                {
-                    "tipo": "TOKENS_ALTO",
-                    "agente": agente_id,
-                    "valor": registro["tokens_usados"],
-                    "timestamp": datetime.now(),
-                }
-            )
+        # Mesmos números no /metrics (Prometheus)
+        exportador.observar_execucao(agente_id, tempo_execucao, sucesso, modelo)
+        detalhado = tokens_prompt is not None and tokens_resposta is not None
+        exportador.observar_uso(
+            agente_id,
+            modelo,
+            entrada=tokens_prompt if detalhado else 0,
+            saida=tokens_resposta if detalhado else 0,
+            total=0 if detalhado else tokens_usados,
+            custo=custo,
+        )
 
-        # Alerta por falha
-        if not registro["sucesso"]:
-            self.alertas.append(
-                {
-                    "tipo": "FALHA",
-                    "agente": agente_id,
-                    "erro": registro["erro"],
-                    "timestamp": datetime.now(),
-                }
-            )
+        # Alimenta as janelas e avalia as regras deste agente
+        self.motor_alertas.registrar(
+            agente_id,
+            tempo_execucao,
+            sucesso,
+            tokens_usados,
+            custo,
+            erro=erro,
+            instante=instante,
+        )
 
     def calcular_estatisticas(self, agente_id=None):
-        """Calcula estatísticas das execuções"""
-
-        if agente_id:
-            dados = self.metricas[agente_id]
-        else:
-            # Todos os agentes
-            dados = []
-            for agente_dados in self.metricas.values():
-                dados.extend(agente_dados)
-
-        if not dados:
-            return None
-
-        tempos = [d["tempo_execucao"] for d in dados]
-        tokens = [d["tokens_usados"] for d in dados]
-        sucessos = [d["sucesso"] for d in dados]
-
-        return {
-            "total_execucoes": len(dados),
-            "taxa_sucesso": sum(sucessos) / len(sucessos) * 100,
-            "tempo_medio": sum(tempos) / len(tempos),
-            "tempo_max": max(tempos),
-            "tempo_min": min(tempos),
-            "tokens_total": sum(tokens),
-            "tokens_medio": sum(tokens) / len(tokens),
-            "custo_estimado": sum(tokens) * 0.002,  # GPT-3.5-turbo pricing
-        }
+        """Calcula estatísticas das execuções (um agente ou todos)"""
+        return self.metricas.resumo(agente_id)
 
     def gerar_relatorio_completo(self):
         """Gera relatório completo do sistema"""
@@ -128,6 +114,10 @@ class MonitorPerformance:
                 f"   • Taxa de sucesso: {stats_gerais['taxa_sucesso']:.1f}%"
             )
             relatorio.append(f"   • Tempo médio: {stats_gerais['tempo_medio']:.2f}s")
+            relatorio.append(
+                f"   • Tempo p50/p95/p99: {stats_gerais['tempo_p50']:.2f}s / "
+                f"{stats_gerais['tempo_p95']:.2f}s / {stats_gerais['tempo_p99']:.2f}s"
+            )
             relatorio.append(
                 f"   • Tokens utilizados: {stats_gerais['tokens_total']:.0f}"
             )
@@ -137,22 +127,23 @@ class MonitorPerformance:
 
         # Estatísticas por agente
         relatorio.append(f"\n🤖 POR AGENTE:")
-        for agente_id in self.metricas.keys():
+        for agente_id in self.metricas.agentes():
             stats = self.calcular_estatisticas(agente_id)
             relatorio.append(f"   {agente_id}:")
             relatorio.append(f"      Execuções: {stats['total_execucoes']}")
             relatorio.append(f"      Sucesso: {stats['taxa_sucesso']:.1f}%")
             relatorio.append(f"      Tempo médio: {stats['tempo_medio']:.2f}s")
+            relatorio.append(f"      Tempo p95: {stats['tempo_p95']:.2f}s")
+            relatorio.append(f"      Tokens p95: {stats['tokens_p95']:.0f}")
 
         # Alertas
-        if self.alertas:
-            relatorio.append(f"\n⚠️ ALERTAS ({len(self.alertas)}):")
-            for alerta in self.alertas[-5:]:  # Últimos 5 alertas
-                tipo = alerta["tipo"]
-                timestamp = alerta["timestamp"].strftime("%H:%M:%S")
-                relatorio.append(
-                    f"   {timestamp} - {tipo}: {alerta.get('valor', 'N/A')}"
-                )
+        ativos = self.motor_alertas.ativos()
+        alertas = self.alertas
+        if alertas:
+            relatorio.append(f"\n⚠️ ALERTAS ({len(ativos)} ativos):")
+            for alerta in alertas[-5:]:  # Últimas 5 mudanças de estado
+                timestamp = alerta.instante.strftime("%H:%M:%S")
+                relatorio.append(f"   {timestamp} - {alerta.mensagem()}")
         else:
             relatorio.append(f"\n✅ Nenhum alerta gerado")
 
@@ -160,60 +151,44 @@ class MonitorPerformance:
 
 
 class CacheInteligente:
-    """Sistema de cache para otimizar custos"""
+    """Sistema de cache para otimizar custos (persistente, via curso_crewai.cache)"""
 
-    def __init__(self, ttl_segundos=3600):  # 1 hora de TTL
-        self.cache = {}
+    def __init__(self, ttl_segundos=3600, backend=None):  # 1 hora de TTL
         self.ttl = ttl_segundos
-        self.hits = 0
-        self.misses = 0
+        self.cache = CacheLLM(backend or backend_padrao(), ttl=ttl_segundos)
+        exportador.observar_cache(self.cache, "monitoramento")
 
-    def _gerar_chave(self, prompt, config):
-        """Gera chave única para o cache"""
-        config_str = json.dumps(config, sort_keys=True)
-        return hash(f"{prompt.strip().lower()}{config_str}")
+    @property
+    def hits(self):
+        return self.cache.hits
 
-    def _is_expired(self, entrada):
-        """Verifica se entrada do cache expirou"""
-        return (datetime.now() - entrada["timestamp"]).seconds > self.ttl
+    @property
+    def misses(self):
+        return self.cache.misses
 
     def get(self, prompt, config):
         """Busca no cache"""
-        chave = self._gerar_chave(prompt, config)
-
-        if chave in self.cache and not self._is_expired(self.cache[chave]):
-            self.hits += 1
-            return self.cache[chave]["resposta"]
-        else:
-            self.misses += 1
-            return None
+        return self.cache.get(prompt.strip().lower(), config=config or {})
 
     def set(self, prompt, config, resposta):
         """Armazena no cache"""
-        chave = self._gerar_chave(prompt, config)
-        self.cache[chave] = {"resposta": resposta, "timestamp": datetime.now()}
+        self.cache.set(prompt.strip().lower(), resposta, config=config or {})
 
     def limpar_expirados(self):
         """Remove entradas expiradas"""
-        chaves_expiradas = []
-        for chave, entrada in self.cache.items():
-            if self._is_expired(entrada):
-                chaves_expiradas.append(chave)
-
-        for chave in chaves_expiradas:
-            del self.cache[chave]
+        return self.cache.backend.remover_expirados()
 
     def estatisticas(self):
         """Retorna estatísticas do cache"""
-        total = self.hits + self.misses
-        hit_rate = (self.hits / total * 100) if total > 0 else 0
+        stats = self.cache.get_stats()
 
         return {
-            "hits": self.hits,
-            "misses": self.misses,
-            "hit_rate": hit_rate,
-            "entradas_cache": len(self.cache),
-            "economia_estimada": f"${(self.hits * 100 * 0.002):.2f}",  # Estimativa
+            "hits": stats["hits"],
+            "misses": stats["misses"],
+            "hit_rate": stats["hit_rate"],
+            "entradas_cache": stats["itens"],
+            "bytes_cache": stats["bytes_armazenados"],
+            "economia_estimada": f"${(stats['hits'] * 100 * 0.002):.2f}",  # Estimativa
         }
 
 
@@ -227,16 +202,30 @@ class AgenteMonitorado:
         self.monitor = monitor
         self.cache = cache
 
-        self.agente = Agent(
+        self._config_agente = dict(
             role=role, goal=goal, backstory=backstory, verbose=False, **llm_config
         )
+        self.agente = Agent(**self._config_agente)
+        # Crews de uma tarefa prontas para reuso; a descrição e a saída
+        # esperada de cada chamada entram pelo kickoff(inputs=...)
+        self.pool = PoolCrews(self._montar_crew, max_por_chave=2)
+
+    def _montar_crew(self, chave):
+        # Agente próprio por crew: duas execuções simultâneas não se misturam
+        agente = Agent(**self._config_agente)
+        task = Task(
+            description="{descricao}",
+            expected_output="{saida_esperada}",
+            agent=agente,
+        )
+        return Crew(agents=[agente], tasks=[task], verbose=False)
 
     def executar_task(self, description, expected_output):
         """Executa task com monitoramento"""
 
-        # Verifica cache primeiro
+        # Verifica cache primeiro (compartilhado entre processos e reinícios)
         if self.cache:
-            config = self.agente.llm_config or {}
+            config = getattr(self.agente, "llm_config", None) or {}
             resposta_cache = self.cache.get(description, config)
             if resposta_cache:
                 print(f"✅ Cache HIT para {self.agente_id}")
@@ -246,25 +235,21 @@ class AgenteMonitorado:
         start_time = time.time()
         sucesso = True
         erro = None
-        tokens_estimados = 0
+        uso = None
 
         try:
-            task = Task(
-                description=description,
-                expected_output=expected_output,
-                agent=self.agente,
-            )
-
-            crew = Crew(agents=[self.agente], tasks=[task], verbose=False)
-
-            resultado = crew.kickoff()
+            entradas = {"descricao": description, "saida_esperada": expected_output}
 
-            # Estima tokens (aproximação)
-            tokens_estimados = len(description.split()) + len(str(resultado).split())
+            # Tokens reais: hooks da API ou, na falta deles, CrewOutput.token_usage
+            with coletor_uso.rastrear(self.agente_id, description[:60]) as uso:
+                with self.pool.usar("tarefa") as crew:
+                    resultado = crew.kickoff(inputs=entradas)
+                config = getattr(self.agente, "llm_config", None) or {}
+                uso.finalizar(resultado, modelo=config.get("model"))
 
             # Armazena no cache
             if self.cache:
-                config = self.agente.llm_config or {}
+                config = getattr(self.agente, "llm_config", None) or {}
                 self.cache.set(description, config, resultado)
 
         except Exception as e:
@@ -274,8 +259,17 @@ class AgenteMonitorado:
 
         # Registra métricas
         tempo_execucao = time.time() - start_time
+        config = getattr(self.agente, "llm_config", None) or {}
         self.monitor.registrar_execucao(
-            self.agente_id, tempo_execucao, tokens_estimados, sucesso, erro
+            self.agente_id,
+            tempo_execucao,
+            uso.total_tokens if uso else 0,  # Falhas também consomem tokens
+            sucesso,
+            erro,
+            custo=uso.custo if uso else None,
+            tokens_prompt=uso.prompt_tokens if uso else None,
+            tokens_resposta=uso.completion_tokens if uso else None,
+            modelo=config.get("model", ""),
         )
 
         if not sucesso:
@@ -368,26 +362,40 @@ def demonstrar_alertas_tempo_real():
 
     monitor = MonitorPerformance()
 
-    # Simula execuções que geram alertas
-    simulacoes = [
-        ("agente_normal", 5.0, 500, True, None),  # Normal
-        ("agente_lento", 35.0, 800, True, None),  # Tempo alto
-        ("agente_gastao", 10.0, 2500, True, None),  # Tokens alto
-        ("agente_problema", 15.0, 300, False, "API Error"),  # Falha
-    ]
-
-    for agente_id, tempo, tokens, sucesso, erro in simulacoes:
-        monitor.registrar_execucao(agente_id, tempo, tokens, sucesso, erro)
-        print(f"   Registrado: {agente_id} ({tempo}s, {tokens} tokens)")
+    # Simula 12 minutos de tráfego (1 execução/s por agente): o agente
+    # lento degrada entre 2 e 5 minutos e o instável falha 30% das vezes
+    # entre 3 e 6 minutos
+    aleatorio = random.Random(7)
+    inicio = time.time() - 720
+    agentes = ["agente_normal", "agente_lento", "agente_gastao", "agente_instavel"]
+    for segundo in range(720):
+        for agente_id in agentes:
+            tempo = aleatorio.uniform(3.0, 8.0)
+            tokens = aleatorio.randint(300, 900)
+            sucesso, erro = True, None
+            if agente_id == "agente_lento" and 120 <= segundo < 300:
+                tempo *= 5
+            if agente_id == "agente_gastao":
+                tokens *= 4
+            if agente_id == "agente_instavel" and 180 <= segundo < 360:
+                if aleatorio.random() < 0.3:
+                    sucesso, erro = False, "API Error"
+            monitor.registrar_execucao(
+                agente_id, tempo, tokens, sucesso, erro, instante=inicio + segundo
+            )
+    print(f"   Registradas {720 * len(agentes)} execuções de {len(agentes)} agentes")
 
-    # Mostra alertas gerados
+    # Mostra as mudanças de estado (disparo e resolução), não cada execução
     if monitor.alertas:
-        print(f"\n🚨 {len(monitor.alertas)} alertas gerados:")
+        print(f"\n🚨 {len(monitor.alertas)} mudanças de estado:")
         for alerta in monitor.alertas:
-            tipo = alerta["tipo"]
-            agente = alerta["agente"]
-            timestamp = alerta["timestamp"].strftime("%H:%M:%S")
-            print(f"   {timestamp} - {tipo}: {agente}")
+            print(f"   {alerta.mensagem()}")
+    estatisticas = monitor.motor_alertas.estatisticas()
+    print(
+        f"   Ativos: {estatisticas['ativos']} | "
+        f"deduplicados: {estatisticas['deduplicados']} | "
+        f"suprimidos (resfriamento): {estatisticas['suprimidos']}"
+    )
 
     return monitor
 
@@ -397,6 +405,11 @@ def main():
     print("🚀 EXEMPLO 4: SISTEMA DE MONITORAMENTO E MÉTRICAS")
     print("=" * 70)
 
+    # Com CURSO_METRICAS_PORTA definida, as métricas ficam em /metrics
+    servidor = exportador.servidor_padrao()
+    if servidor:
+        print(f"📡 Métricas em {servidor.url}")
+
     # Demonstra sistema completo
     demonstrar_sistema_completo()
 
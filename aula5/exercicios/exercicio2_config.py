@@ -6,6 +6,11 @@ Pratique configuração de parâmetros OpenAI para diferentes cenários
 
 from dotenv import load_dotenv
 from crewai import Agent, Task, Crew
+from curso_crewai.retentativas import (
+    ErroHTTP,
+    ExecutorRetentativas,
+    PoliticaRetentativa,
+)
 import time
 
 load_dotenv()
@@ -221,8 +226,13 @@ def solucao_exercicio_2b():
     print("\n✅ SOLUÇÃO 2B: Sistema de Fallback")
     print("=" * 40)
 
+    # Espera curta para a demonstração; em produção use os padrões
+    executor = ExecutorRetentativas(
+        PoliticaRetentativa(max_tentativas=3, base_s=0.2, teto_s=2.0, prazo_s=30.0)
+    )
+
     def executar_com_fallback(descricao, output_esperado):
-        """Sistema de fallback entre modelos"""
+        """Sistema de fallback entre modelos, com retentativas e disjuntor"""
 
         configs = [
             {"model": "gpt-4", "temperature": 0.7, "max_tokens": 500},  # Primário
@@ -232,10 +242,12 @@ def solucao_exercicio_2b():
                 "max_tokens": 500,
             },  # Fallback
         ]
+        tentativas = []
 
-        for i, config in enumerate(configs):
-            try:
-                print(f"   🔄 Tentativa {i+1}: {config['model']}")
+        def chamada(i, config):
+            def executar():
+                tentativas.append(config["model"])
+                print(f"   🔄 Tentativa {len(tentativas)}: {config['model']}")
 
                 agente = Agent(
                     role="Agente com Fallback",
@@ -256,28 +268,32 @@ def solucao_exercicio_2b():
                     import random
 
                     if random.random() < 0.7:  # 70% chance de simular falha
-                        raise Exception("Rate limit exceeded (simulado)")
-
-                resultado = crew.kickoff()
-
-                return {
-                    "sucesso": True,
-                    "resultado": resultado,
-                    "modelo_usado": config["model"],
-                    "tentativa": i + 1,
-                }
-
-            except Exception as e:
-                print(f"   ❌ Falha: {str(e)[:50]}")
-                if i == len(configs) - 1:  # Última tentativa
-                    return {
-                        "sucesso": False,
-                        "resultado": "Desculpe, sistema temporariamente indisponível",
-                        "modelo_usado": "resposta_padrao",
-                        "tentativa": i + 1,
-                        "erro": str(e),
-                    }
-                continue
+                        print("   ❌ Falha: Rate limit exceeded (simulado)")
+                        raise ErroHTTP(429, "Rate limit exceeded", retry_after=0.5)
+
+                return config["model"], crew.kickoff()
+
+            return config["model"], executar
+
+        try:
+            modelo, resultado = executor.executar_com_fallback(
+                [chamada(i, config) for i, config in enumerate(configs)]
+            )
+            return {
+                "sucesso": True,
+                "resultado": resultado,
+                "modelo_usado": modelo,
+                "tentativa": len(tentativas),
+            }
+        except Exception as e:
+            print(f"   ❌ Falha: {str(e)[:50]}")
+            return {
+                "sucesso": False,
+                "resultado": "Desculpe, sistema temporariamente indisponível",
+                "modelo_usado": "resposta_padrao",
+                "tentativa": len(tentativas),
+                "erro": str(e),
+            }
 
     # Teste do sistema
     print("🧪 Testando sistema de fallback...")
@@ -289,6 +305,8 @@ def solucao_exercicio_2b():
     print(f"   Sucesso: {resultado['sucesso']}")
     print(f"   Modelo usado: {resultado['modelo_usado']}")
     print(f"   Tentativa: {resultado['tentativa']}")
+    stats = executor.estatisticas()
+    print(f"   Espera por backoff: {stats['latencia_adicionada_s']:.2f}s")
     if resultado["sucesso"]:
         print(f"   Resposta: {str(resultado['resultado'])[:80]}...")
 
@@ -8,6 +8,8 @@ Este arquivo demonstra os conceitos principais da aula através de exemplos prá
 import os
 from dotenv import load_dotenv
 from crewai import Agent, Task, Crew, Process
+from curso_crewai import conexoes
+from curso_crewai.cache import BackendMemoria, CacheLLM
 import time
 import json
 from datetime import datetime
@@ -15,6 +17,10 @@ from datetime import datetime
 # Carrega variáveis de ambiente
 load_dotenv()
 
+# Chamadas dos agentes no pool de conexões compartilhado e no limite de
+# RPM/TPM do processo
+conexoes.instalar_litellm()
+
 
 class AgenteOtimizado:
     """
@@ -155,40 +161,35 @@ def exemplo_sistema_cache():
 
     class CacheSimples:
         def __init__(self):
-            self.cache = {}
-            self.hits = 0
-            self.misses = 0
+            # Backend em memória para a demonstração; use BackendSQLite para
+            # que as respostas sobrevivam a reinícios
+            self.cache = CacheLLM(BackendMemoria(max_itens=100), ttl=None)
 
         def get_hash(self, prompt):
-            """Gera hash simples do prompt"""
-            return hash(prompt.strip().lower())
+            """Gera hash estável do prompt (igual em todos os processos)"""
+            return CacheLLM.chave(prompt.strip().lower())
 
         def get(self, prompt):
             """Busca resposta no cache"""
-            key = self.get_hash(prompt)
-            if key in self.cache:
-                self.hits += 1
+            resposta = self.cache.get(prompt.strip().lower())
+            if resposta is not None:
                 print(f"✅ Cache HIT para prompt: {prompt[:50]}...")
-                return self.cache[key]
             else:
-                self.misses += 1
                 print(f"❌ Cache MISS para prompt: {prompt[:50]}...")
-                return None
+            return resposta
 
         def set(self, prompt, response):
             """Armazena resposta no cache"""
-            key = self.get_hash(prompt)
-            self.cache[key] = response
+            self.cache.set(prompt.strip().lower(), response)
             print(f"💾 Resposta armazenada no cache")
 
         def stats(self):
             """Estatísticas do cache"""
-            total = self.hits + self.misses
-            hit_rate = (self.hits / total * 100) if total > 0 else 0
+            stats = self.cache.get_stats()
             return {
-                "hits": self.hits,
-                "misses": self.misses,
-                "hit_rate": f"{hit_rate:.1f}%",
+                "hits": stats["hits"],
+                "misses": stats["misses"],
+                "hit_rate": f"{stats['hit_rate']:.1f}%",
             }
 
     # Demonstração
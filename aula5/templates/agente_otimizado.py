@@ -6,12 +6,26 @@ Use este template como base para criar seus próprios agentes otimizados
 
 from dotenv import load_dotenv
 from crewai import Agent, Task, Crew
+from curso_crewai import exportador
+from curso_crewai.chaves import gerar_chave
+from curso_crewai.hedge import llm_com_hedge
+from curso_crewai.pool import PoolCrews
+from curso_crewai.roteador import roteador_padrao
 import time
 import json
+from collections import Counter
 from datetime import datetime
 
 load_dotenv()
 
+# Tipo de agente -> tipo de tarefa do roteador (None: o classificador decide)
+TIPO_TAREFA = {
+    "creative": "criativa",
+    "analytical": "analitica",
+    "conversational": "conversacional",
+    "balanced": None,
+}
+
 
 class AgenteOtimizadoTemplate:
     """
@@ -21,7 +35,9 @@ class AgenteOtimizadoTemplate:
     para seus casos específicos.
     """
 
-    def __init__(self, role, goal, backstory, tipo_agente="balanced"):
+    def __init__(
+        self, role, goal, backstory, tipo_agente="balanced", hedge=None, roteador=None
+    ):
         """
         Inicializa o agente com configurações baseadas no tipo
 
@@ -30,46 +46,56 @@ class AgenteOtimizadoTemplate:
             goal: Objetivo do agente
             backstory: História de fundo do agente
             tipo_agente: "creative", "analytical", "conversational", "balanced"
+            hedge: ExecutorHedge (opcional) para duplicar chamadas lentas;
+                pode ser compartilhado entre agentes
+            roteador: Roteador que escolhe o modelo de cada tarefa
+                (padrão: `roteador_padrao()`)
         """
         self.role = role
         self.goal = goal
         self.backstory = backstory
         self.tipo_agente = tipo_agente
+        self.hedge = hedge
+        self.roteador = roteador or roteador_padrao()
 
-        # Configurações por tipo
+        # Parâmetros por tipo; o modelo é escolhido pelo roteador a cada
+        # tarefa (o mais barato que deve atingir a qualidade esperada)
         self.configs = {
             "creative": {
-                "model": "gpt-4",
                 "temperature": 0.9,
                 "max_tokens": 2000,
                 "top_p": 0.9,
             },
             "analytical": {
-                "model": "gpt-3.5-turbo",
                 "temperature": 0.1,
                 "max_tokens": 1000,
                 "top_p": 0.1,
             },
             "conversational": {
-                "model": "gpt-3.5-turbo",
                 "temperature": 0.7,
                 "max_tokens": 500,
                 "top_p": 0.8,
             },
             "balanced": {
-                "model": "gpt-3.5-turbo",
                 "temperature": 0.5,
                 "max_tokens": 800,
                 "top_p": 0.7,
             },
         }
 
+        # Crews prontas por configuração (tipo, verbose, ferramentas, modelo);
+        # a tarefa de cada chamada entra pelo kickoff(inputs=...)
+        self.pool = PoolCrews(self._montar_crew, max_por_chave=2)
+        self._ferramentas_pool = {}
+
         # Métricas de performance
         self.metricas = {
             "execucoes": 0,
             "sucessos": 0,
             "tempo_total": 0,
             "tokens_usados": 0,
+            "modelos": Counter(),
+            "escaladas": 0,
         }
 
     def criar_prompt_otimizado(self, contexto_especifico=""):
@@ -147,18 +173,29 @@ class AgenteOtimizadoTemplate:
 
         return prompt_base + instrucoes + contexto_task + formato
 
-    def criar_agente(self, tools=None, verbose=False):
+    def criar_agente(self, tools=None, verbose=False, modelo="gpt-4o-mini"):
         """
         Cria o agente CrewAI com as configurações otimizadas
 
         Args:
             tools: Lista de ferramentas para o agente
             verbose: Se deve mostrar logs detalhados
+            modelo: Modelo escolhido pelo roteador
 
         Returns:
             Agent: Agente CrewAI configurado
         """
-        config = self.configs[self.tipo_agente]
+        config = {"model": modelo, **self.configs[self.tipo_agente]}
+        extras = {}
+        if self.hedge is not None:
+            # Chamada mais lenta que o p90 do modelo ganha uma duplicata
+            extras["llm"] = llm_com_hedge(
+                config["model"],
+                self.hedge,
+                temperature=config["temperature"],
+                max_tokens=config["max_tokens"],
+                top_p=config["top_p"],
+            )
 
         return Agent(
             role=self.role,
@@ -168,8 +205,39 @@ class AgenteOtimizadoTemplate:
             verbose=verbose,
             allow_delegation=False,
             llm_config=config,
+            **extras,
         )
 
+    def _chave_pool(self, tools, verbose, modelo):
+        tools = list(tools or [])
+        chave = (self.tipo_agente, verbose, tuple(id(tool) for tool in tools), modelo)
+        # Guarda as ferramentas: a chave só tem os ids
+        self._ferramentas_pool.setdefault(chave, tools)
+        return chave
+
+    def _montar_crew(self, chave):
+        _, verbose, _, modelo = chave
+        agente = self.criar_agente(self._ferramentas_pool[chave], verbose, modelo)
+        task = Task(
+            description="{descricao}",
+            expected_output="{saida_esperada}",
+            agent=agente,
+        )
+        return Crew(agents=[agente], tasks=[task], verbose=verbose)
+
+    def chave_cache(self, description):
+        """
+        Gera chave de cache estável para a tarefa com a configuração atual
+
+        Args:
+            description: Descrição da tarefa
+
+        Returns:
+            str: Chave igual em qualquer processo ou reinício
+        """
+        config = {"role": self.role, "llm_config": self.configs[self.tipo_agente]}
+        return gerar_chave(description, config)
+
     def executar_com_monitoramento(
         self, description, expected_output, tools=None, verbose=False
     ):
@@ -188,18 +256,22 @@ class AgenteOtimizadoTemplate:
         start_time = time.time()
         self.metricas["execucoes"] += 1
 
-        try:
-            # Cria agente e tarefa
-            agente = self.criar_agente(tools, verbose)
-
-            task = Task(
-                description=description, expected_output=expected_output, agent=agente
-            )
+        entradas = {"descricao": description, "saida_esperada": expected_output}
 
-            crew = Crew(agents=[agente], tasks=[task], verbose=verbose)
+        def executar(modelo):
+            # Reaproveita agente, tarefa e crew já montados para esta config
+            with self.pool.usar(self._chave_pool(tools, verbose, modelo)) as crew:
+                return crew.kickoff(inputs=entradas)
 
-            # Executa
-            resultado = crew.kickoff()
+        try:
+            # Modelo mais barato que atende; sobe de modelo se a resposta
+            # falhar ou vier vazia
+            resultado, decisao = self.roteador.executar(
+                description,
+                executar,
+                validar=lambda resposta: bool(str(resposta).strip()),
+                tipo_tarefa=TIPO_TAREFA.get(self.tipo_agente),
+            )
 
             # Calcula métricas
             tempo_execucao = time.time() - start_time
@@ -209,18 +281,32 @@ class AgenteOtimizadoTemplate:
             self.metricas["sucessos"] += 1
             self.metricas["tempo_total"] += tempo_execucao
             self.metricas["tokens_usados"] += tokens_estimados
+            self.metricas["modelos"][decisao.modelo] += 1
+            self.metricas["escaladas"] += decisao.nivel
+            exportador.observar_execucao(
+                self.role, tempo_execucao, True, decisao.modelo, self.tipo_agente
+            )
+            exportador.observar_uso(
+                self.role, decisao.modelo, self.tipo_agente, total=tokens_estimados
+            )
 
             return {
                 "sucesso": True,
                 "resultado": resultado,
                 "tempo_execucao": tempo_execucao,
                 "tokens_estimados": tokens_estimados,
-                "config_usada": self.configs[self.tipo_agente],
+                "config_usada": {
+                    "model": decisao.modelo,
+                    **self.configs[self.tipo_agente],
+                },
             }
 
         except Exception as e:
             tempo_execucao = time.time() - start_time
             self.metricas["tempo_total"] += tempo_execucao
+            exportador.observar_execucao(
+                self.role, tempo_execucao, False, tarefa=self.tipo_agente
+            )
 
             return {
                 "sucesso": False,
@@ -243,6 +329,16 @@ class AgenteOtimizadoTemplate:
         taxa_sucesso = (self.metricas["sucessos"] / self.metricas["execucoes"]) * 100
         tempo_medio = self.metricas["tempo_total"] / self.metricas["execucoes"]
         custo_estimado = self.metricas["tokens_usados"] * 0.002
+        pool = self.pool.estatisticas()
+        linha_hedge = ""
+        if self.hedge is not None:
+            hedge = self.hedge.estatisticas()
+            linha_hedge = (
+                f"\n🪞 Hedge: {hedge['taxa_hedge']:.1%} duplicadas, "
+                f"custo extra {hedge['sobrecarga_custo']:.1%}, "
+                f"p99 {hedge['p99_s']:.2f}s "
+                f"(sem hedge {hedge['p99_sem_hedge_s']:.2f}s)"
+            )
 
         return f"""
 📊 RELATÓRIO DE PERFORMANCE - {self.role}
@@ -253,7 +349,8 @@ class AgenteOtimizadoTemplate:
 ⏱️ Tempo médio: {tempo_medio:.2f}s
 🔤 Tokens usados: {self.metricas["tokens_usados"]}
 💰 Custo estimado: ${custo_estimado:.4f}
-⚙️ Modelo: {self.configs[self.tipo_agente]["model"]}
+♻️ Crews reaproveitadas: {pool["reutilizacoes"]} ({pool["tempo_economizado_s"]:.2f}s de construção economizados){linha_hedge}
+⚙️ Modelos: {dict(self.metricas["modelos"])} ({self.metricas["escaladas"]} escaladas)
 🌡️ Temperature: {self.configs[self.tipo_agente]["temperature"]}
         """
 
@@ -360,6 +457,11 @@ def main():
     print("3. Use os métodos de monitoramento para acompanhar performance")
     print("4. Ajuste parâmetros baseado nos resultados")
 
+    # Com CURSO_METRICAS_PORTA definida, as métricas ficam em /metrics
+    servidor = exportador.servidor_padrao()
+    if servidor:
+        print(f"📡 Métricas em {servidor.url}")
+
     # Exemplos práticos
     exemplo_uso_template()
     comparar_tipos_agentes()
@@ -6,11 +6,28 @@ extraídas do guia da Holori para uso com CrewAI.
 
 import os
 import time
-import hashlib
+import asyncio
+import weakref
 from typing import Dict, Any, Optional, List
 from dataclasses import dataclass
 from crewai import Agent, Task, Crew, Process
 from langchain_openai import ChatOpenAI
+from curso_crewai import conexoes, exportador
+from curso_crewai.hedge import ExecutorHedge, llm_com_hedge
+from curso_crewai.paralelo import executar_dag
+from curso_crewai.roteador import Decisao, Roteador, roteador_padrao
+from curso_crewai.cache import (
+    BackendCache,
+    BackendCamadas,
+    BackendMemoria,
+    CacheLLM,
+    backend_padrao,
+)
+from curso_crewai.uso import ColetorUso, Escopo, normalizar_modelo
+
+
+# Rotas guardadas quando o agente não aceita weakref
+MAX_ROTAS = 1024
 
 
 @dataclass
@@ -20,6 +37,9 @@ class TokenUsage:
     output_tokens: int
     cached_tokens: int = 0
     model: str = "gpt-4o-mini"
+    agent: Optional[str] = None
+    task: Optional[str] = None
+    source: str = "api"  # "api" (campo usage da resposta) ou "estimate"
     
     @property
     def total_tokens(self) -> int:
@@ -34,10 +54,11 @@ class TokenUsage:
             "gpt-4": {"input": 30.00/1000000, "output": 60.00/1000000, "cache": 15.00/1000000}
         }
         
-        if self.model not in pricing:
+        model = normalizar_modelo(self.model)
+        if model not in pricing:
             return 0.0
             
-        prices = pricing[self.model]
+        prices = pricing[model]
         cost = (
             self.input_tokens * prices["input"] +
             self.output_tokens * prices["output"] +
@@ -47,105 +68,223 @@ class TokenUsage:
 
 
 class IntelligentCache:
-    """Sistema de cache inteligente para respostas da OpenAI."""
-    
-    def __init__(self, ttl: int = 3600):
-        self.cache: Dict[str, tuple] = {}
+    """
+    Sistema de cache inteligente para respostas da OpenAI.
+
+    Duas camadas (curso_crewai.cache):
+    - L1 em memória, LRU com limite de itens e de MB por processo
+    - L2 compartilhada (SQLite por padrão), que sobrevive a reinícios
+    """
+    
+    def __init__(self,
+                 ttl: int = 3600,
+                 max_items: int = 10_000,
+                 max_memory_mb: float = 64,
+                 backend: Optional[BackendCache] = None):
         self.ttl = ttl
-        self.hit_count = 0
-        self.miss_count = 0
+        self.memory = BackendMemoria(
+            max_itens=max_items,
+            max_bytes=int(max_memory_mb * 1024 * 1024)
+        )
+        shared = backend if backend is not None else backend_padrao()
+        self.cache = CacheLLM(BackendCamadas(self.memory, shared), ttl=ttl)
+        # Hits por camada (L1/L2), itens e bytes lidos a cada coleta do /metrics
+        exportador.observar_cache(self.cache, "otimizador")
     
-    def _generate_key(self, prompt: str, model: str, temperature: float, **kwargs) -> str:
-        """Gera chave única para cache."""
-        key_data = f"{prompt}|{model}|{temperature}|{kwargs}"
-        return hashlib.md5(key_data.encode()).hexdigest()
+    @property
+    def hit_count(self) -> int:
+        return self.cache.hits
+    
+    @property
+    def miss_count(self) -> int:
+        return self.cache.misses
     
     def get(self, prompt: str, model: str, temperature: float, **kwargs) -> Optional[str]:
         """Recupera resposta do cache se válida."""
-        key = self._generate_key(prompt, model, temperature, **kwargs)
-        
-        if key in self.cache:
-            timestamp, response = self.cache[key]
-            if time.time() - timestamp < self.ttl:
-                self.hit_count += 1
-                print(f"✅ Cache HIT - Economizou uma chamada API")
-                return response
-            else:
-                del self.cache[key]
-        
-        self.miss_count += 1
-        return None
+        response = self.cache.get(prompt, model, temperature=temperature, **kwargs)
+        if response is not None:
+            print(f"✅ Cache HIT - Economizou uma chamada API")
+        return response
     
     def set(self, prompt: str, model: str, temperature: float, response: str, **kwargs):
         """Armazena resposta no cache."""
-        key = self._generate_key(prompt, model, temperature, **kwargs)
-        self.cache[key] = (time.time(), response)
+        self.cache.set(prompt, response, model, temperature=temperature, **kwargs)
     
     def get_stats(self) -> Dict[str, Any]:
         """Retorna estatísticas do cache."""
-        total_requests = self.hit_count + self.miss_count
-        hit_rate = (self.hit_count / total_requests * 100) if total_requests > 0 else 0
+        stats = self.cache.get_stats()
+        resident_items = len(self.memory)
+        resident_bytes = self.memory.tamanho_bytes()
         
         return {
-            "cache_hits": self.hit_count,
-            "cache_misses": self.miss_count,
-            "hit_rate": f"{hit_rate:.1f}%",
-            "cached_items": len(self.cache)
+            "cache_hits": stats["hits"],
+            "cache_misses": stats["misses"],
+            "hit_rate": f"{stats['hit_rate']:.1f}%",
+            "cached_items": stats["itens"],
+            "cached_bytes": stats["bytes_armazenados"],
+            "backend": stats["backend"],
+            "memory_items": resident_items,
+            "resident_bytes": resident_bytes,
+            "resident_mb": f"{resident_bytes / (1024 * 1024):.2f}",
+            "memory_limit_mb": f"{self.memory.max_bytes / (1024 * 1024):.0f}",
+            "avg_entry_size": int(resident_bytes / resident_items) if resident_items else 0,
+            "evictions": self.memory.evictions,
+            "expirations": self.memory.expiracoes,
         }
 
 
 class CrewAIOptimizer:
     """Classe principal para otimização de custos em CrewAI."""
     
-    def __init__(self, budget_limit: float = 10.0):
+    def __init__(self,
+                 budget_limit: float = 10.0,
+                 hedging: bool = False,
+                 hedge_fallback_model: Optional[str] = None,
+                 router: Optional[Roteador] = None):
         self.budget_limit = budget_limit
         self.total_cost = 0.0
         self.cache = IntelligentCache()
         self.usage_history: List[TokenUsage] = []
         
+        # Tokens reais, lidos do campo `usage` de cada resposta da API
+        self.usage_collector = ColetorUso()
+        self.usage_collector.instalar_litellm()
+        
+        # Um único cliente HTTP com pool para todos os LLMs do processo
+        # (keep-alive, HTTP/2 quando disponível) em vez de um por instância
+        conexoes.instalar_litellm()
+        
         # Configuração otimizada do LLM
-        self.llm_economico = ChatOpenAI(
+        self.llm_economico = conexoes.chat_openai(
             model="gpt-4o-mini",
             temperature=0.1,
             max_tokens=1000,
             model_kwargs={"frequency_penalty": 0.1}  # Reduz repetições
         )
         
-        self.llm_premium = ChatOpenAI(
+        self.llm_premium = conexoes.chat_openai(
             model="gpt-4o",
             temperature=0.1,
             max_tokens=2000
         )
+        
+        # O modelo de cada agente vem do roteador (o mais barato que deve
+        # atingir a qualidade mínima); o resultado de cada execução volta
+        # para ele
+        self.router = router or roteador_padrao()
+        self._llms: Dict[str, ChatOpenAI] = {
+            "gpt-4o-mini": self.llm_economico,
+            "gpt-4o": self.llm_premium,
+        }
+        # Rota de cada agente vivo, por id(); a entrada sai junto com o agente
+        self._routes: Dict[int, Decisao] = {}
+        
+        # Hedge opcional: uma chamada mais lenta que o p90 observado do modelo
+        # ganha uma duplicata (mesmo modelo ou hedge_fallback_model); vale a
+        # primeira resposta
+        self.hedge = ExecutorHedge() if hedging else None
+        self.hedge_fallback_model = hedge_fallback_model
+        self._hedged_llms: Dict[str, Any] = {}
+        
+        # Gasto x limite, lidos pelo /metrics a cada coleta
+        exportador.observar_orcamento(
+            "otimizador", self, lambda opt: (opt.total_cost, opt.budget_limit)
+        )
     
-    def get_optimized_llm(self, complexity: str = "low") -> ChatOpenAI:
-        """Retorna LLM otimizado baseado na complexidade da tarefa."""
-        if complexity in ["high", "complex", "advanced"]:
-            print("🔥 Usando GPT-4o para tarefa complexa")
-            return self.llm_premium
-        else:
-            print("⚡ Usando GPT-4o Mini para tarefa simples")
-            return self.llm_economico
+    def route(self,
+              prompt: str,
+              complexity: Optional[str] = None,
+              task_type: Optional[str] = None) -> Decisao:
+        """Decisão do roteador para o prompt; `complexity` é só uma dica."""
+        decision = self.router.rotear(prompt, tipo_tarefa=task_type, dica=complexity)
+        features = decision.caracteristicas
+        print(f"🧭 {decision.modelo} para tarefa {features.tipo_tarefa} "
+              f"(complexidade {features.complexidade:.2f}, "
+              f"~${decision.custo_estimado:.5f})")
+        return decision
+    
+    def get_optimized_llm(self,
+                          complexity: Optional[str] = None,
+                          *,
+                          prompt: str = "",
+                          task_type: Optional[str] = None) -> ChatOpenAI:
+        """
+        Retorna o LLM do modelo escolhido pelo roteador para a dica de
+        complexidade ("low"/"high") e, se informado, o texto da tarefa.
+        """
+        return self._llm_for(self.route(prompt, complexity, task_type).modelo)
+    
+    def _llm_for(self, model: str) -> ChatOpenAI:
+        if model not in self._llms:
+            self._llms[model] = conexoes.chat_openai(
+                model=model,
+                temperature=0.1,
+                max_tokens=1000
+            )
+        return self._llms[model]
+    
+    def _remember_route(self, agent: Agent, decision: Decisao):
+        key = id(agent)
+        self._routes[key] = decision
+        try:
+            # O id() é reutilizado depois que o agente é coletado: remove antes
+            weakref.finalize(agent, self._routes.pop, key, None)
+        except TypeError:
+            # Sem weakref: guarda só os agentes mais recentes
+            while len(self._routes) > MAX_ROTAS:
+                self._routes.pop(next(iter(self._routes)))
+    
+    def _record_route(self, agent: Agent, success: bool, latency: float):
+        decision = self._routes.get(id(agent))
+        if decision is not None:
+            self.router.registrar_resultado(decision, success, latency)
     
     def create_optimized_agent(self, 
                              role: str, 
                              goal: str, 
                              backstory: str,
-                             complexity: str = "low",
+                             complexity: Optional[str] = None,
+                             task_hint: str = "",
                              **kwargs) -> Agent:
-        """Cria agente otimizado para custo."""
+        """
+        Cria agente otimizado para custo.
+        
+        O modelo vem do roteador, a partir do objetivo e de `task_hint`
+        (descrição do que o agente vai fazer). `complexity` ("low"/"high")
+        só limita a complexidade calculada.
+        """
         
         # Backstory conciso mas efetivo
         optimized_backstory = self._optimize_backstory(backstory)
+        decision = self.route(f"{goal}. {task_hint}".strip(), complexity)
         
-        return Agent(
+        agent = Agent(
             role=role,
             goal=goal,
             backstory=optimized_backstory,
-            llm=self.get_optimized_llm(complexity),
+            llm=self._with_hedge(self._llm_for(decision.modelo)),
             verbose=False,  # Reduz output desnecessário
             allow_delegation=False,  # Evita delegações custosas
             **kwargs
         )
+        self._remember_route(agent, decision)
+        return agent
+    
+    def _with_hedge(self, llm: ChatOpenAI):
+        """Mesmo modelo e parâmetros, como LLM do CrewAI com hedge nas chamadas."""
+        if self.hedge is None:
+            return llm
+        model = llm.model_name
+        if model not in self._hedged_llms:
+            self._hedged_llms[model] = llm_com_hedge(
+                model,
+                self.hedge,
+                reserva=self.hedge_fallback_model,
+                temperature=llm.temperature,
+                max_tokens=llm.max_tokens,
+                **(llm.model_kwargs or {})
+            )
+        return self._hedged_llms[model]
     
     def create_optimized_task(self,
                             description: str,
@@ -188,26 +327,47 @@ class CrewAIOptimizer:
             **kwargs
         )
     
-    def execute_with_monitoring(self, crew: Crew) -> Dict[str, Any]:
+    def execute_with_monitoring(self, crew: Crew, use_cache: bool = True) -> Dict[str, Any]:
         """Executa crew com monitoramento de custo."""
         
         print(f"💰 Orçamento atual: ${self.budget_limit:.2f}")
         print(f"💸 Gasto acumulado: ${self.total_cost:.4f}")
         
+        start_time = time.time()
+        
+        # Crews idênticas (mesmos agentes, tarefas e modelos) reaproveitam a resposta
+        if use_cache:
+            prompt, model = self._crew_signature(crew)
+            cached = self.cache.get(prompt, model, temperature=0.1)
+            if cached is not None:
+                return {
+                    "result": cached,
+                    "cost": 0.0,
+                    "execution_time": time.time() - start_time,
+                    "total_cost": self.total_cost,
+                    "budget_remaining": self.budget_limit - self.total_cost,
+                    "from_cache": True
+                }
+        
         if self.total_cost >= self.budget_limit:
             raise ValueError(f"❌ Orçamento excedido! Limite: ${self.budget_limit:.2f}")
         
-        start_time = time.time()
-        
         try:
-            # Executa crew
-            result = crew.kickoff()
+            # Executa crew, atribuindo o consumo de cada chamada à sua tarefa
+            with self.usage_collector.rastrear(tarefa="crew") as scope:
+                result = self._kickoff_tracked(crew, scope)
+            
+            if use_cache:
+                self.cache.set(prompt, model, 0.1, result)
             
-            # Calcula custo estimado
-            estimated_cost = self._estimate_execution_cost(result)
+            # Custo real (usage da API); estimativa só se nada foi reportado
+            estimated_cost = self._record_usage(scope, result, self._crew_model(crew))
             self.total_cost += estimated_cost
             
             execution_time = time.time() - start_time
+            exportador.observar_execucao(
+                "crew", execution_time, True, self._crew_model(crew) or "misto"
+            )
             
             # Registra estatísticas
             self._log_execution_stats(estimated_cost, execution_time, result)
@@ -217,13 +377,198 @@ class CrewAIOptimizer:
                 "cost": estimated_cost,
                 "execution_time": execution_time,
                 "total_cost": self.total_cost,
-                "budget_remaining": self.budget_limit - self.total_cost
+                "budget_remaining": self.budget_limit - self.total_cost,
+                "from_cache": False
             }
             
         except Exception as e:
             print(f"❌ Erro na execução: {e}")
+            exportador.observar_execucao(
+                "crew", time.time() - start_time, False,
+                self._crew_model(crew) or "misto"
+            )
             raise
     
+    async def execute_async(self, crew: Crew, max_concurrency: int = 4) -> Dict[str, Any]:
+        """
+        Executa as tarefas da crew em paralelo, respeitando o `context` de cada uma.
+        
+        Tarefas sem dependência entre si rodam ao mesmo tempo (até
+        max_concurrency). Tarefas do mesmo agente ficam em fila, pois o
+        Agent guarda estado de execução. O orçamento é verificado antes de
+        cada despacho, com o custo acumulado das tarefas já concluídas.
+        """
+        print(f"💰 Orçamento atual: ${self.budget_limit:.2f}")
+        print(f"⚡ Execução paralela (máx. {max_concurrency} tarefas simultâneas)")
+        
+        cost_before = self.total_cost
+        
+        def check_budget():
+            if self.total_cost >= self.budget_limit:
+                raise ValueError(f"❌ Orçamento excedido! Limite: ${self.budget_limit:.2f}")
+        
+        async def run_task(task: Task):
+            single = Crew(
+                agents=[task.agent],
+                tasks=[task],
+                process=Process.sequential,
+                verbose=False
+            )
+            # contextvars seguem a corrotina: cada tarefa tem seu escopo
+            started = time.perf_counter()
+            role, label = task.agent.role, self._task_label(task)
+            model = self._agent_model(task.agent)
+            with self.usage_collector.rastrear(agente=role, tarefa=label) as scope:
+                try:
+                    output = await single.kickoff_async()
+                except Exception:
+                    elapsed = time.perf_counter() - started
+                    self._record_route(task.agent, False, elapsed)
+                    exportador.observar_execucao(role, elapsed, False, model, label)
+                    raise
+            elapsed = time.perf_counter() - started
+            self._record_route(task.agent, True, elapsed)
+            exportador.observar_execucao(role, elapsed, True, model, label)
+            self.total_cost += self._record_usage(scope, output, self._agent_model(task.agent))
+            return output
+        
+        dag = await executar_dag(
+            crew.tasks,
+            run_task,
+            max_concorrencia=max_concurrency,
+            verificar_orcamento=check_budget,
+            chave_exclusao=lambda task: id(task.agent)
+        )
+        
+        cost = self.total_cost - cost_before
+        result = dag.resultados[-1]
+        self._log_execution_stats(cost, dag.tempo_total, result)
+        print(f"   🧭 Caminho crítico: {dag.caminho_critico:.2f}s "
+              f"(sequencial: {sum(dag.duracoes):.2f}s, "
+              f"aceleração {dag.aceleracao:.1f}x)")
+        
+        return {
+            "result": result,
+            "task_outputs": dag.resultados,
+            "cost": cost,
+            "execution_time": dag.tempo_total,
+            "critical_path_time": dag.caminho_critico,
+            "max_parallelism": dag.max_paralelismo,
+            "total_cost": self.total_cost,
+            "budget_remaining": self.budget_limit - self.total_cost
+        }
+    
+    def _kickoff_tracked(self, crew: Crew, scope: Escopo):
+        """
+        Executa a crew fechando o escopo de uso a cada tarefa concluída.
+        
+        Cada tarefa devolve ao roteador o resultado da rota do agente que a
+        executou, com o tempo desde a tarefa anterior (não o da crew inteira).
+        As tarefas terminam na ordem da lista (processo sequencial); tarefas
+        sem agente (hierárquico, decididas pelo gerente) não são atribuídas.
+        """
+        original_callback = crew.task_callback
+        # O kickoff copia o task_callback para task.callback: restaurado no fim
+        task_callbacks = [(task, task.callback) for task in crew.tasks]
+        progress = {"done": 0, "since": time.perf_counter()}
+        
+        def current_agent():
+            if progress["done"] < len(crew.tasks):
+                return crew.tasks[progress["done"]].agent
+            return None
+        
+        def on_task_done(output):
+            now = time.perf_counter()
+            agent = current_agent()
+            if agent is not None:
+                self._record_route(agent, True, now - progress["since"])
+            progress["done"] += 1
+            progress["since"] = now
+            scope.fechar_tarefa(getattr(output, "agent", None),
+                                self._task_label(output))
+            if original_callback:
+                original_callback(output)
+        
+        crew.task_callback = on_task_done
+        try:
+            return crew.kickoff()
+        except Exception:
+            agent = current_agent()
+            if agent is not None:
+                self._record_route(agent, False,
+                                   time.perf_counter() - progress["since"])
+            raise
+        finally:
+            crew.task_callback = original_callback
+            for task, callback in task_callbacks:
+                task.callback = callback
+    
+    @staticmethod
+    def _task_label(task) -> str:
+        description = " ".join(str(getattr(task, "description", "")).split())
+        return description[:60]
+    
+    @staticmethod
+    def _agent_model(agent: Agent) -> str:
+        llm = getattr(agent, "llm", None)
+        return str(getattr(llm, "model_name", None) or getattr(llm, "model", ""))
+    
+    def _crew_model(self, crew: Crew) -> Optional[str]:
+        """Modelo da crew, se todos os agentes usam o mesmo."""
+        models = {self._agent_model(agent) for agent in crew.agents}
+        return models.pop() if len(models) == 1 else None
+    
+    def _record_usage(self, scope: Escopo, result, model: Optional[str]) -> float:
+        """
+        Converte o consumo real do escopo em TokenUsage e retorna o custo.
+        
+        Fontes: hooks do LiteLLM/LangChain (por chamada) e, na falta deles,
+        o `token_usage` do CrewOutput. Só se nenhuma existir o custo é
+        estimado pelo tamanho do resultado.
+        """
+        scope.finalizar(result, modelo=model)
+        if not scope.registros:
+            return self._estimate_execution_cost(result)
+        
+        entries = [
+            TokenUsage(
+                input_tokens=record.prompt_tokens - record.cached_tokens,
+                output_tokens=record.completion_tokens,
+                cached_tokens=record.cached_tokens,
+                model=record.modelo if record.modelo != "desconhecido" else (model or ""),
+                agent=record.agente,
+                task=record.tarefa,
+            )
+            for record in scope.registros
+        ]
+        self.usage_history.extend(entries)
+        for usage in entries:
+            self._export_usage(usage)
+        return sum(usage.estimated_cost for usage in entries)
+    
+    @staticmethod
+    def _export_usage(usage: TokenUsage):
+        exportador.observar_uso(
+            usage.agent or "sem_atribuicao",
+            normalizar_modelo(usage.model),
+            usage.task or "",
+            entrada=usage.input_tokens,
+            saida=usage.output_tokens,
+            cache=usage.cached_tokens,
+            custo=usage.estimated_cost
+        )
+    
+    def _crew_signature(self, crew: Crew) -> tuple:
+        """Resume agentes e tarefas da crew em um prompt para chave de cache."""
+        parts = []
+        models = set()
+        for agent in crew.agents:
+            parts.append(f"{agent.role}|{agent.goal}|{agent.backstory}")
+            models.add(str(getattr(agent.llm, "model_name", None) or getattr(agent.llm, "model", "")))
+        for task in crew.tasks:
+            parts.append(f"{task.description}|{task.expected_output}")
+        return "\n".join(parts), ",".join(sorted(models))
+    
     def _optimize_backstory(self, backstory: str) -> str:
         """Otimiza backstory para ser conciso mas efetivo."""
         if len(backstory.split()) > 50:
@@ -231,7 +576,7 @@ class CrewAIOptimizer:
         return backstory[:300] + "..." if len(backstory) > 300 else backstory
     
     def _estimate_execution_cost(self, result) -> float:
-        """Estima custo de execução baseado no resultado."""
+        """Estima custo pelo tamanho do resultado (quando a API não informa uso)."""
         if hasattr(result, 'raw'):
             text_length = len(str(result.raw))
         else:
@@ -244,10 +589,12 @@ class CrewAIOptimizer:
         token_usage = TokenUsage(
             input_tokens=int(estimated_tokens * 0.3),  # 30% input
             output_tokens=int(estimated_tokens * 0.7), # 70% output
-            model="gpt-4o-mini"
+            model="gpt-4o-mini",
+            source="estimate"
         )
         
         self.usage_history.append(token_usage)
+        self._export_usage(token_usage)
         return token_usage.estimated_cost
     
     def _log_execution_stats(self, cost: float, execution_time: float, result):
@@ -263,6 +610,16 @@ class CrewAIOptimizer:
         cache_stats = self.cache.get_stats()
         print(f"   🚀 Cache hit rate: {cache_stats['hit_rate']}")
         print(f"   📦 Itens em cache: {cache_stats['cached_items']}")
+        print(f"   🧠 Memória do cache: {cache_stats['resident_mb']} MB "
+              f"(limite {cache_stats['memory_limit_mb']} MB, "
+              f"{cache_stats['evictions']} evictions)")
+        
+        if self.hedge is not None:
+            hedge_stats = self.hedge.estatisticas()
+            print(f"   🪞 Hedge: {hedge_stats['taxa_hedge']:.1%} das chamadas "
+                  f"duplicadas, custo extra {hedge_stats['sobrecarga_custo']:.1%}, "
+                  f"p99 {hedge_stats['p99_s']:.2f}s "
+                  f"(sem hedge {hedge_stats['p99_sem_hedge_s']:.2f}s)")
     
     def get_usage_report(self) -> Dict[str, Any]:
         """Gera relatório de uso detalhado."""
@@ -272,38 +629,73 @@ class CrewAIOptimizer:
         total_tokens = sum(usage.total_tokens for usage in self.usage_history)
         total_cost = sum(usage.estimated_cost for usage in self.usage_history)
         
-        return {
+        by_agent: Dict[str, Dict[str, Any]] = {}
+        for usage in self.usage_history:
+            agent = by_agent.setdefault(usage.agent or "sem_atribuicao", {
+                "input_tokens": 0, "output_tokens": 0, "cached_tokens": 0, "cost": 0.0
+            })
+            agent["input_tokens"] += usage.input_tokens
+            agent["output_tokens"] += usage.output_tokens
+            agent["cached_tokens"] += usage.cached_tokens
+            agent["cost"] += usage.estimated_cost
+        estimated = sum(1 for usage in self.usage_history if usage.source == "estimate")
+        
+        report = {
             "execucoes": len(self.usage_history),
             "total_tokens": int(total_tokens),
+            "input_tokens": sum(usage.input_tokens for usage in self.usage_history),
+            "output_tokens": sum(usage.output_tokens for usage in self.usage_history),
+            "cached_tokens": sum(usage.cached_tokens for usage in self.usage_history),
+            "por_agente": by_agent,
+            "fonte": "api" if not estimated else f"{estimated} registro(s) estimado(s)",
             "total_cost": f"${total_cost:.6f}",
             "cost_per_execution": f"${total_cost/len(self.usage_history):.6f}",
             "cache_stats": self.cache.get_stats(),
+            "connection_stats": conexoes.metricas.resumo(),
             "budget_utilization": f"{(total_cost/self.budget_limit)*100:.1f}%"
         }
+        routing = self.router.estatisticas()
+        report["routing"] = {
+            "decisoes": routing["decisoes"],
+            "por_modelo": routing["por_modelo"],
+            "latencia_media_s": routing["latencia_media_s"],
+        }
+        if self.hedge is not None:
+            report["hedge_stats"] = self.hedge.estatisticas()
+        return report
 
 
 # Exemplo de uso prático
-def exemplo_agencia_marketing_otimizada():
+def exemplo_agencia_marketing_otimizada(modo_async: bool = True, hedging: bool = False):
     """Exemplo de agência de marketing otimizada para custo."""
     
     print("🚀 Iniciando exemplo de agência de marketing otimizada")
     
     # Configura otimizador com orçamento de $1
-    optimizer = CrewAIOptimizer(budget_limit=1.0)
+    optimizer = CrewAIOptimizer(budget_limit=1.0, hedging=hedging)
     
     # Cria agentes otimizados
     pesquisador = optimizer.create_optimized_agent(
         role="Pesquisador de Mercado",
         goal="Analisar tendências e público-alvo",
         backstory="Especialista em pesquisa de mercado com foco em dados acionáveis.",
-        complexity="low"  # Tarefa simples, usa modelo econômico
+        # O roteador escolhe o modelo pelo que o agente vai fazer
+        task_hint="Analise o mercado de produtos eco-friendly para millennials"
     )
     
     estrategista = optimizer.create_optimized_agent(
         role="Estrategista de Marketing",
         goal="Desenvolver estratégias baseadas em dados",
         backstory="Estrategista experiente que cria campanhas eficazes e mensuráveis.",
-        complexity="medium"  # Pode precisar de mais poder de processamento
+        task_hint="Compare a pesquisa e a concorrência e planeje uma estratégia "
+                  "de marketing digital com táticas mensuráveis"
+    )
+    
+    analista_concorrencia = optimizer.create_optimized_agent(
+        role="Analista de Concorrência",
+        goal="Mapear concorrentes e seus posicionamentos",
+        backstory="Analista focado em benchmarking competitivo e diferenciais de marca.",
+        task_hint="Liste 3 concorrentes de produtos eco-friendly e seus diferenciais"
     )
     
     # Cria tarefas otimizadas
@@ -314,23 +706,34 @@ def exemplo_agencia_marketing_otimizada():
         max_words=150
     )
     
+    # Independente da pesquisa de mercado: roda em paralelo no modo assíncrono
+    tarefa_concorrencia = optimizer.create_optimized_task(
+        description="Identifique 3 concorrentes de produtos eco-friendly no Brasil e seus diferenciais",
+        agent=analista_concorrencia,
+        expected_output="Lista de 3 concorrentes com diferencial de cada um",
+        max_words=150
+    )
+    
     tarefa_estrategia = optimizer.create_optimized_task(
-        description="Baseado na pesquisa, crie uma estratégia de marketing digital",
+        description="Baseado na pesquisa e na análise de concorrência, crie uma estratégia de marketing digital",
         agent=estrategista,
         expected_output="Estratégia com 3 táticas específicas e mensuráveis",
         max_words=200,
-        context=[tarefa_pesquisa]
+        context=[tarefa_pesquisa, tarefa_concorrencia]
     )
     
     # Cria crew otimizada
     agencia = optimizer.create_optimized_crew(
-        agents=[pesquisador, estrategista],
-        tasks=[tarefa_pesquisa, tarefa_estrategia]
+        agents=[pesquisador, analista_concorrencia, estrategista],
+        tasks=[tarefa_pesquisa, tarefa_concorrencia, tarefa_estrategia]
     )
     
     # Executa com monitoramento
     try:
-        resultado = optimizer.execute_with_monitoring(agencia)
+        if modo_async:
+            resultado = asyncio.run(optimizer.execute_async(agencia, max_concurrency=2))
+        else:
+            resultado = optimizer.execute_with_monitoring(agencia)
         
         print(f"\n✅ EXECUÇÃO CONCLUÍDA!")
         print(f"📊 Resultado:\n{resultado['result']}")
@@ -392,6 +795,11 @@ if __name__ == "__main__":
     print("🎯 Exemplo de Otimização OpenAI para CrewAI")
     print("=" * 50)
     
+    # Endpoint do Prometheus quando CURSO_METRICAS_PORTA está definida
+    metrics_server = exportador.servidor_padrao()
+    if metrics_server:
+        print(f"📡 Métricas em {metrics_server.url}")
+    
     # Executa exemplo
     exemplo_agencia_marketing_otimizada()
     
@@ -0,0 +1,8 @@
+"""
+Curso CrewAI - utilitários compartilhados
+
+Infraestrutura reaproveitada pelos exemplos das aulas (cache, monitoramento,
+controle de custos). Cada submódulo é independente e importado sob demanda.
+"""
+
+__version__ = "0.1.0"
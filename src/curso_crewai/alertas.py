@@ -0,0 +1,755 @@
+"""
+Alertas por regras sobre janelas deslizantes.
+
+Alertar a cada execução acima de um limite (30s, 2000 tokens) gera um alerta
+por registro: sob carga a lista cresce sem parar e ninguém lê. Aqui cada
+regra olha uma janela de tempo (ex.: p95 da latência nos últimos 5 minutos,
+fração de falhas) e o alerta é um estado:
+
+- dispara uma vez quando a condição passa a valer e fica ativo enquanto
+  ela vale (as avaliações seguintes só contam ocorrências: deduplicação);
+- resolve quando a condição deixa de valer;
+- depois de disparar, a mesma regra/agente só dispara de novo passado o
+  `resfriamento_s` (os disparos no meio são contados como suprimidos).
+
+As janelas são anéis de fatias de tempo com totais incrementais e um
+histograma de latência em faixas logarítmicas: registrar é O(1) e avaliar
+uma regra percorre no máximo as faixas do histograma. A memória é fixa por
+agente e o histórico de alertas é limitado.
+
+Uso:
+    motor = MotorAlertas(REGRAS_PADRAO, destinos=[DestinoLog()])
+    motor.registrar("pesquisador", latencia=23.5, sucesso=True, tokens=900)
+    motor.ativos()       # alertas disparados e ainda não resolvidos
+    motor.avaliar()      # reavalia tudo (ex.: num timer, para resolver
+                         # alertas de agentes que pararam de receber tráfego)
+
+Destinos são chamáveis que recebem o `Alerta`: `DestinoLog`,
+`DestinoWebhook` (POST JSON numa thread, sem segurar o registro) ou qualquer
+função. `destinos_padrao()` usa o log e, com CURSO_ALERTAS_WEBHOOK, o
+webhook; `ServidorWebhookLocal` recebe os alertas em testes.
+"""
+
+import bisect
+import json
+import logging
+import math
+import operator
+import os
+import re
+import threading
+import time
+import urllib.request
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence, Tuple
+
+# Faixas de latência: de 10ms a ~10min, cada uma 10% maior que a anterior
+LIMITES_LATENCIA = tuple(0.01 * 1.1**i for i in range(141))
+SEVERIDADES = {"info": logging.INFO, "aviso": logging.WARNING, "critico": logging.ERROR}
+OPERADORES = {
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+}
+GLOBAL = "*"
+OUTROS = "outros"
+
+
+# =============================================================================
+# JANELA DESLIZANTE
+# =============================================================================
+
+
+class _Fatia:
+    __slots__ = ("indice", "contagem", "falhas", "tokens", "custo", "latencia", "hist")
+
+    def __init__(self, faixas: int) -> None:
+        self.indice = -1
+        self.contagem = 0
+        self.falhas = 0
+        self.tokens = 0.0
+        self.custo = 0.0
+        self.latencia = 0.0
+        self.hist = [0] * faixas
+
+
+class JanelaDeslizante:
+    """
+    Totais dos últimos `duracao_s` segundos, em `fatias` pedaços: quando uma
+    fatia sai da janela, os valores dela são subtraídos dos totais.
+    """
+
+    def __init__(self, duracao_s: float = 300.0, fatias: int = 30):
+        self.duracao_s = duracao_s
+        self.fatia_s = duracao_s / fatias
+        self._faixas = len(LIMITES_LATENCIA) + 1
+        self._anel = [_Fatia(self._faixas) for _ in range(fatias)]
+        self._atual = -1
+        self.contagem = 0
+        self.falhas = 0
+        self.tokens = 0.0
+        self.custo = 0.0
+        self.latencia = 0.0
+        self.hist = [0] * self._faixas
+        # Limite superior da maior faixa ocupada (baixado no quantil)
+        self._topo = 0
+
+    def _descartar(self, fatia: _Fatia, indice: int) -> None:
+        if fatia.contagem:
+            self.contagem -= fatia.contagem
+            self.falhas -= fatia.falhas
+            self.tokens -= fatia.tokens
+            self.custo -= fatia.custo
+            self.latencia -= fatia.latencia
+            hist = self.hist
+            for faixa, quantidade in enumerate(fatia.hist):
+                if quantidade:
+                    hist[faixa] -= quantidade
+                    fatia.hist[faixa] = 0
+            fatia.contagem = fatia.falhas = 0
+            fatia.tokens = fatia.custo = fatia.latencia = 0.0
+        fatia.indice = indice
+
+    def avancar(self, instante: float) -> None:
+        """Tira da janela as fatias mais antigas que `duracao_s`."""
+        indice = int(instante // self.fatia_s)
+        if indice <= self._atual:
+            return
+        inicio = max(self._atual + 1, indice - len(self._anel) + 1)
+        for i in range(inicio, indice + 1):
+            self._descartar(self._anel[i % len(self._anel)], i)
+        self._atual = indice
+
+    def adicionar(
+        self,
+        instante: float,
+        latencia: float,
+        sucesso: bool = True,
+        tokens: float = 0,
+        custo: float = 0.0,
+    ) -> None:
+        self.avancar(instante)
+        indice = int(instante // self.fatia_s)
+        fatia = self._anel[indice % len(self._anel)]
+        if fatia.indice != indice:
+            return  # mais antigo que a janela
+        faixa = bisect.bisect_left(LIMITES_LATENCIA, latencia)
+        fatia.contagem += 1
+        fatia.latencia += latencia
+        fatia.tokens += tokens
+        fatia.custo += custo
+        fatia.hist[faixa] += 1
+        self.contagem += 1
+        self.latencia += latencia
+        self.tokens += tokens
+        self.custo += custo
+        self.hist[faixa] += 1
+        if faixa > self._topo:
+            self._topo = faixa
+        if not sucesso:
+            fatia.falhas += 1
+            self.falhas += 1
+
+    def quantil_latencia(self, q: float) -> float:
+        """Quantil pelo histograma, interpolado dentro da faixa."""
+        if not self.contagem:
+            return 0.0
+        # Quantis altos: varre de cima para baixo (para em poucas faixas)
+        acima = self.contagem * (1 - q)
+        acumulado = 0
+        hist = self.hist
+        topo = self._topo
+        while topo > 0 and not hist[topo]:
+            topo -= 1
+        self._topo = topo
+        for faixa in range(topo, -1, -1):
+            quantidade = hist[faixa]
+            if not quantidade:
+                continue
+            if acumulado + quantidade > acima:
+                inferior = LIMITES_LATENCIA[faixa - 1] if faixa > 0 else 0.0
+                superior = (
+                    LIMITES_LATENCIA[faixa]
+                    if faixa < len(LIMITES_LATENCIA)
+                    else LIMITES_LATENCIA[-1] * 1.1
+                )
+                fracao = (acumulado + quantidade - acima) / quantidade
+                return inferior + (superior - inferior) * fracao
+            acumulado += quantidade
+        return 0.0
+
+
+# =============================================================================
+# REGRAS E ALERTAS
+# =============================================================================
+
+
+_METRICAS: Dict[str, Callable[[JanelaDeslizante], float]] = {
+    "execucoes": lambda j: j.contagem,
+    "falhas": lambda j: j.falhas,
+    "taxa_falhas": lambda j: j.falhas / j.contagem if j.contagem else 0.0,
+    "latencia_media": lambda j: j.latencia / j.contagem if j.contagem else 0.0,
+    "tokens_medio": lambda j: j.tokens / j.contagem if j.contagem else 0.0,
+    "tokens_total": lambda j: j.tokens,
+    "custo_total": lambda j: j.custo,
+}
+_QUANTIL = re.compile(r"^latencia_p(\d{1,2}(?:\.\d+)?)$")
+
+
+def _leitor(metrica: str) -> Callable[[JanelaDeslizante], float]:
+    if metrica in _METRICAS:
+        return _METRICAS[metrica]
+    encontrado = _QUANTIL.match(metrica)
+    if encontrado:
+        q = float(encontrado.group(1)) / 100
+        return lambda janela: janela.quantil_latencia(q)
+    raise ValueError(
+        f"Métrica desconhecida: {metrica!r} (use {', '.join(_METRICAS)} "
+        f"ou latencia_pNN)"
+    )
+
+
+@dataclass
+class Regra:
+    """
+    Condição `metrica operador limiar` sobre uma janela de `janela_s`.
+    Não avalia com menos de `min_amostras` execuções na janela.
+    """
+
+    nome: str
+    metrica: str
+    operador: str
+    limiar: float
+    janela_s: float = 300.0
+    severidade: str = "aviso"
+    min_amostras: int = 5
+    resfriamento_s: float = 600.0
+    por_agente: bool = True
+    descricao: str = ""
+
+    def __post_init__(self) -> None:
+        if self.operador not in OPERADORES:
+            raise ValueError(f"Operador inválido: {self.operador!r}")
+        if self.severidade not in SEVERIDADES:
+            raise ValueError(f"Severidade inválida: {self.severidade!r}")
+        self._ler = _leitor(self.metrica)
+        self._comparar = OPERADORES[self.operador]
+
+    def avaliar(self, janela: JanelaDeslizante) -> Tuple[bool, float]:
+        if janela.contagem < self.min_amostras:
+            return False, 0.0
+        valor = self._ler(janela)
+        return self._comparar(valor, self.limiar), valor
+
+
+@dataclass
+class Alerta:
+    """Mudança de estado de uma regra para um agente."""
+
+    regra: str
+    agente: str
+    severidade: str
+    estado: str  # "disparado" ou "resolvido"
+    metrica: str
+    operador: str
+    limiar: float
+    valor: float
+    janela_s: float
+    instante: datetime = field(default_factory=datetime.now)
+    ocorrencias: int = 1
+    pico: float = 0.0
+    duracao_s: float = 0.0
+    detalhe: str = ""
+
+    def mensagem(self) -> str:
+        texto = (
+            f"[{self.severidade.upper()}] {self.regra} {self.estado} "
+            f"({self.agente}): {self.metrica}={self.valor:.4g} "
+            f"{self.operador} {self.limiar:g} em {self.janela_s:.0f}s"
+        )
+        if self.estado == "resolvido":
+            texto = (
+                f"[{self.severidade.upper()}] {self.regra} resolvido "
+                f"({self.agente}): {self.metrica}={self.valor:.4g} em "
+                f"{self.janela_s:.0f}s, após {self.duracao_s:.0f}s "
+                f"(pico {self.pico:.4g}, {self.ocorrencias} avaliações)"
+            )
+        if self.detalhe:
+            texto += f" — {self.detalhe}"
+        return texto
+
+    def para_dict(self) -> Dict[str, Any]:
+        dados = asdict(self)
+        dados["instante"] = self.instante.isoformat()
+        return dados
+
+
+@dataclass
+class _Estado:
+    ativo: Optional[Alerta] = None
+    inicio: float = 0.0
+    ultimo_disparo: float = -math.inf
+
+
+# Equivalentes, por janela, aos limites antigos por execução
+REGRAS_PADRAO = (
+    Regra(
+        "TEMPO_ALTO",
+        "latencia_p95",
+        ">",
+        20.0,
+        descricao="p95 da latência acima de 20s nos últimos 5 minutos",
+    ),
+    Regra(
+        "FALHAS",
+        "taxa_falhas",
+        ">",
+        0.05,
+        severidade="critico",
+        min_amostras=20,
+        descricao="mais de 5% das execuções falharam nos últimos 5 minutos",
+    ),
+    Regra(
+        "TOKENS_ALTO",
+        "tokens_medio",
+        ">",
+        2000,
+        descricao="média acima de 2000 tokens por execução nos últimos 5 minutos",
+    ),
+)
+
+
+# =============================================================================
+# MOTOR
+# =============================================================================
+
+
+class MotorAlertas:
+    """
+    Recebe as execuções, mantém as janelas de cada agente (e a global,
+    `*`) e avalia as regras. Com `intervalo_avaliacao_s`, as regras de um
+    agente são avaliadas no máximo uma vez por intervalo no registro.
+    """
+
+    def __init__(
+        self,
+        regras: Sequence[Regra] = REGRAS_PADRAO,
+        destinos: Sequence[Callable[[Alerta], Any]] = (),
+        max_historico: int = 500,
+        max_agentes: int = 1000,
+        intervalo_avaliacao_s: float = 1.0,
+        relogio: Callable[[], float] = time.time,
+    ):
+        self.regras = list(regras)
+        self.destinos = list(destinos)
+        self.max_agentes = max_agentes
+        self.intervalo_avaliacao_s = intervalo_avaliacao_s
+        self.relogio = relogio
+        self._duracoes = sorted({regra.janela_s for regra in self.regras})
+        self._janelas: Dict[str, Dict[float, JanelaDeslizante]] = {}
+        self._estados: Dict[Tuple[str, str], _Estado] = {}
+        self._avaliado_em: Dict[str, float] = {}
+        self._ultimo_erro: Dict[str, str] = {}
+        self._historico: Deque[Alerta] = deque(maxlen=max_historico)
+        self._lock = threading.Lock()
+        self.disparados = 0
+        self.resolvidos = 0
+        self.deduplicados = 0
+        self.suprimidos = 0
+        self.erros_destino = 0
+
+    def _balde(self, agente: str) -> str:
+        """Nome sob o qual o agente é contado: acima de `max_agentes`
+        agentes distintos, os novos vão todos para `outros`."""
+        if agente in self._janelas or agente in (GLOBAL, OUTROS):
+            return agente
+        especiais = (GLOBAL in self._janelas) + (OUTROS in self._janelas)
+        if len(self._janelas) - especiais >= self.max_agentes:
+            return OUTROS
+        return agente
+
+    def _janelas_de(self, agente: str) -> Dict[float, JanelaDeslizante]:
+        janelas = self._janelas.get(agente)
+        if janelas is None:
+            janelas = {d: JanelaDeslizante(d) for d in self._duracoes}
+            self._janelas[agente] = janelas
+        return janelas
+
+    def registrar(
+        self,
+        agente: str,
+        latencia: float,
+        sucesso: bool = True,
+        tokens: float = 0,
+        custo: float = 0.0,
+        erro: Optional[str] = None,
+        instante: Optional[float] = None,
+    ) -> List[Alerta]:
+        """Conta uma execução; retorna os alertas que mudaram de estado."""
+        agora = self.relogio() if instante is None else instante
+        with self._lock:
+            # Janelas, estados e avaliações ficam todos sob o mesmo nome
+            agente = self._balde(agente)
+            for alvo in (agente, GLOBAL):
+                for janela in self._janelas_de(alvo).values():
+                    janela.adicionar(agora, latencia, sucesso, tokens, custo)
+            if erro:
+                self._ultimo_erro[agente] = erro
+            novos: List[Alerta] = []
+            for alvo in (agente, GLOBAL):
+                ultimo = self._avaliado_em.get(alvo, -math.inf)
+                if agora - ultimo >= self.intervalo_avaliacao_s:
+                    self._avaliado_em[alvo] = agora
+                    self._avaliar_agente(alvo, agora, novos)
+        self._entregar(novos)
+        return novos
+
+    def avaliar(self, instante: Optional[float] = None) -> List[Alerta]:
+        """Avalia todas as regras de todos os agentes agora."""
+        agora = self.relogio() if instante is None else instante
+        novos: List[Alerta] = []
+        with self._lock:
+            for agente in list(self._janelas):
+                for janela in self._janelas[agente].values():
+                    janela.avancar(agora)
+                self._avaliado_em[agente] = agora
+                self._avaliar_agente(agente, agora, novos)
+        self._entregar(novos)
+        return novos
+
+    def _avaliar_agente(self, agente: str, agora: float, novos: List[Alerta]) -> None:
+        janelas = self._janelas_de(agente)
+        for regra in self.regras:
+            if regra.por_agente == (agente == GLOBAL):
+                continue
+            condicao, valor = regra.avaliar(janelas[regra.janela_s])
+            chave = (regra.nome, agente)
+            estado = self._estados.get(chave)
+            if estado is None:
+                if not condicao:
+                    continue
+                estado = self._estados[chave] = _Estado()
+            ativo = estado.ativo
+
+            if condicao and ativo is not None:
+                ativo.ocorrencias += 1
+                ativo.pico = max(ativo.pico, valor)
+                self.deduplicados += 1
+            elif condicao:
+                if agora - estado.ultimo_disparo < regra.resfriamento_s:
+                    self.suprimidos += 1
+                    continue
+                estado.ativo = Alerta(
+                    regra.nome,
+                    agente,
+                    regra.severidade,
+                    "disparado",
+                    regra.metrica,
+                    regra.operador,
+                    regra.limiar,
+                    valor,
+                    regra.janela_s,
+                    datetime.fromtimestamp(agora),
+                    pico=valor,
+                    detalhe=self._detalhe(regra, agente),
+                )
+                estado.inicio = estado.ultimo_disparo = agora
+                self.disparados += 1
+                novos.append(estado.ativo)
+            elif ativo is not None:
+                resolvido = Alerta(
+                    regra.nome,
+                    agente,
+                    regra.severidade,
+                    "resolvido",
+                    regra.metrica,
+                    regra.operador,
+                    regra.limiar,
+                    valor,
+                    regra.janela_s,
+                    datetime.fromtimestamp(agora),
+                    ocorrencias=ativo.ocorrencias,
+                    pico=ativo.pico,
+                    duracao_s=agora - estado.inicio,
+                )
+                estado.ativo = None
+                self.resolvidos += 1
+                novos.append(resolvido)
+
+    def _detalhe(self, regra: Regra, agente: str) -> str:
+        if "falha" in regra.metrica and agente in self._ultimo_erro:
+            return f"último erro: {self._ultimo_erro[agente]}"
+        return regra.descricao
+
+    def _entregar(self, alertas: List[Alerta]) -> None:
+        for alerta in alertas:
+            self._historico.append(alerta)
+            for destino in self.destinos:
+                try:
+                    destino(alerta)
+                except Exception:
+                    # Um destino com defeito não pode derrubar o registro
+                    self.erros_destino += 1
+
+    def ativos(self) -> List[Alerta]:
+        with self._lock:
+            return [e.ativo for e in self._estados.values() if e.ativo is not None]
+
+    def historico(self) -> List[Alerta]:
+        """Últimas mudanças de estado (no máximo `max_historico`)."""
+        with self._lock:
+            return list(self._historico)
+
+    def estatisticas(self) -> Dict[str, int]:
+        return {
+            "regras": len(self.regras),
+            "agentes": len(self._janelas)
+            - (GLOBAL in self._janelas)
+            - (OUTROS in self._janelas),
+            "ativos": len(self.ativos()),
+            "disparados": self.disparados,
+            "resolvidos": self.resolvidos,
+            "deduplicados": self.deduplicados,
+            "suprimidos": self.suprimidos,
+            "erros_destino": self.erros_destino,
+        }
+
+
+# =============================================================================
+# DESTINOS
+# =============================================================================
+
+
+class DestinoLog:
+    """Escreve os alertas no logging, com o nível da severidade."""
+
+    def __init__(
+        self, logger: Optional[logging.Logger] = None, severidade_minima: str = "info"
+    ):
+        self.logger = logger or logging.getLogger("curso_crewai.alertas")
+        self.nivel_minimo = SEVERIDADES[severidade_minima]
+
+    def __call__(self, alerta: Alerta) -> None:
+        nivel = SEVERIDADES[alerta.severidade]
+        if alerta.estado == "resolvido":
+            nivel = logging.INFO
+        if nivel >= self.nivel_minimo or alerta.estado == "resolvido":
+            self.logger.log(nivel, alerta.mensagem())
+
+
+class DestinoWebhook:
+    """
+    POST JSON de cada alerta em `url`, feito por uma thread: o registro só
+    enfileira. Fila cheia ou webhook fora do ar descartam o alerta.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        timeout: float = 2.0,
+        max_fila: int = 1000,
+        severidade_minima: str = "info",
+    ):
+        self.url = url
+        self.timeout = timeout
+        self.nivel_minimo = SEVERIDADES[severidade_minima]
+        self.enviados = 0
+        self.erros = 0
+        self.descartados = 0
+        self._pendentes = 0
+        self._fila: Deque[Alerta] = deque()
+        self._max_fila = max_fila
+        self._condicao = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+
+    def __call__(self, alerta: Alerta) -> None:
+        if SEVERIDADES[alerta.severidade] < self.nivel_minimo:
+            return
+        with self._condicao:
+            if len(self._fila) >= self._max_fila:
+                self.descartados += 1
+                return
+            self._fila.append(alerta)
+            self._pendentes += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._laco, daemon=True)
+                self._thread.start()
+            self._condicao.notify()
+
+    def _enviar(self, alerta: Alerta) -> None:
+        corpo = json.dumps(alerta.para_dict(), ensure_ascii=False).encode("utf-8")
+        pedido = urllib.request.Request(
+            self.url,
+            data=corpo,
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        try:
+            with urllib.request.urlopen(pedido, timeout=self.timeout) as resposta:
+                resposta.read()
+            self.enviados += 1
+        except Exception:
+            self.erros += 1
+
+    def _laco(self) -> None:
+        while True:
+            with self._condicao:
+                while not self._fila:
+                    self._condicao.wait()
+                alerta = self._fila.popleft()
+            self._enviar(alerta)
+            with self._condicao:
+                self._pendentes -= 1
+
+    def esperar(self, timeout: float = 5.0) -> bool:
+        """Espera os envios pendentes (útil em testes e no fim do processo)."""
+        limite = time.monotonic() + timeout
+        while self._pendentes:
+            if time.monotonic() >= limite:
+                return False
+            time.sleep(0.01)
+        return True
+
+
+class _ManipuladorWebhook(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, formato: str, *args: Any) -> None:
+        pass
+
+    def do_POST(self) -> None:
+        tamanho = int(self.headers.get("Content-Length", 0))
+        self.server.receber(json.loads(self.rfile.read(tamanho) or b"{}"))
+        self.send_response(204)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+
+class ServidorWebhookLocal(ThreadingHTTPServer):
+    """
+    Webhook de teste: guarda os últimos alertas recebidos.
+
+    Uso:
+        with ServidorWebhookLocal() as webhook:
+            webhook.iniciar_em_thread()
+            motor = MotorAlertas(destinos=[DestinoWebhook(webhook.url)])
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(
+        self, host: str = "127.0.0.1", porta: int = 0, max_alertas: int = 1000
+    ):
+        super().__init__((host, porta), _ManipuladorWebhook)
+        self.recebidos: Deque[Dict[str, Any]] = deque(maxlen=max_alertas)
+        self._lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        host, porta = self.server_address[:2]
+        return f"http://{host}:{porta}/alertas"
+
+    def receber(self, alerta: Dict[str, Any]) -> None:
+        with self._lock:
+            self.recebidos.append(alerta)
+
+    def iniciar_em_thread(self) -> threading.Thread:
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return thread
+
+
+def destinos_padrao() -> List[Callable[[Alerta], Any]]:
+    """Log sempre; webhook quando CURSO_ALERTAS_WEBHOOK está definida."""
+    destinos: List[Callable[[Alerta], Any]] = [DestinoLog()]
+    url = os.getenv("CURSO_ALERTAS_WEBHOOK")
+    if url:
+        destinos.append(DestinoWebhook(url))
+    return destinos
+
+
+def _benchmark(execucoes: int = 200_000, agentes: int = 10) -> None:
+    import random
+    import tracemalloc
+
+    aleatorio = random.Random(3)
+    # 1 execução/s por agente; entre 25% e 50% do tempo um agente fica
+    # lento e outro passa a falhar 20% das vezes
+    duracao = execucoes / agentes
+    lento, instavel = "agente_3", "agente_7"
+    eventos = []
+    for i in range(execucoes):
+        instante = i / agentes
+        agente = f"agente_{i % agentes}"
+        degradado = 0.25 * duracao <= instante < 0.5 * duracao
+        latencia = aleatorio.lognormvariate(1.0, 0.5)
+        if degradado and agente == lento:
+            latencia *= 10
+        sucesso = not (degradado and agente == instavel and aleatorio.random() < 0.2)
+        tokens = aleatorio.randint(300, 1500)
+        eventos.append((agente, latencia, sucesso, tokens, instante))
+
+    # Regra antiga: um alerta por execução acima de 30s / 2000 tokens / falha
+    antigos = sum(
+        1
+        for _, latencia, sucesso, tokens, _ in eventos
+        for condicao in (latencia > 30, tokens > 2000, not sucesso)
+        if condicao
+    )
+
+    recebidos: List[Alerta] = []
+    resultados = {}
+    for intervalo in (0.0, 1.0):
+        motor = MotorAlertas(
+            destinos=[recebidos.append] if intervalo else [],
+            intervalo_avaliacao_s=intervalo,
+        )
+        inicio = time.perf_counter()
+        for agente, latencia, sucesso, tokens, instante in eventos:
+            motor.registrar(agente, latencia, sucesso, tokens, instante=instante)
+        resultados[intervalo] = (time.perf_counter() - inicio) / execucoes
+
+    tracemalloc.start()
+    medido = MotorAlertas()
+    for agente, latencia, sucesso, tokens, instante in eventos[:20_000]:
+        medido.registrar(agente, latencia, sucesso, tokens, instante=instante)
+    memoria = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    janela = motor._janelas_de(lento)[300.0]
+    inicio = time.perf_counter()
+    for _ in range(10_000):
+        REGRAS_PADRAO[0].avaliar(janela)
+    p95 = (time.perf_counter() - inicio) / 10_000
+
+    with ServidorWebhookLocal() as webhook:
+        webhook.iniciar_em_thread()
+        destino = DestinoWebhook(webhook.url)
+        for alerta in recebidos:
+            destino(alerta)
+        destino.esperar()
+        entregues = len(webhook.recebidos)
+        webhook.shutdown()
+
+    print(f"🚨 {execucoes} execuções de {agentes} agentes ({duracao / 60:.0f} min)")
+    print(f"   Regra antiga (por execução): {antigos} alertas")
+    print(f"   Regras por janela: {len(recebidos)} mudanças de estado")
+    for alerta in recebidos:
+        print(f"     {alerta.mensagem()}")
+    print(f"   {motor.estatisticas()}")
+    print(
+        f"   Registro + avaliação: {resultados[0.0] * 1e6:.1f}µs (a cada execução), "
+        f"{resultados[1.0] * 1e6:.1f}µs (no máximo 1x/s por agente)"
+    )
+    print(f"   Avaliar p95 de uma janela: {p95 * 1e6:.1f}µs")
+    print(f"   Memória (10 agentes + global): {memoria / 1024:.0f} KiB")
+    print(f"   Webhook local recebeu {entregues}/{len(recebidos)} alertas")
+
+
+if __name__ == "__main__":
+    _benchmark()
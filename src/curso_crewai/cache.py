@@ -0,0 +1,767 @@
+"""
+Cache de respostas de LLM com backends plugáveis.
+
+Substitui os dicionários em memória espalhados pelos exemplos por um único
+cache com:
+- Backend em memória (LRU), em disco (SQLite) ou Redis (protocolo RESP)
+- Camadas: memória limitada na frente de um backend compartilhado
+- Expiração por TTL e remoção por tamanho
+- Contadores de hits, misses e bytes
+
+Com o backend SQLite ou Redis as respostas sobrevivem a reinícios e são
+compartilhadas entre processos.
+
+Uso:
+    cache = CacheLLM(BackendSQLite(".cache/respostas.sqlite3"))
+    resposta = cache.get(prompt, modelo="gpt-4o-mini")
+    if resposta is None:
+        resposta = chamar_llm(prompt)
+        cache.set(prompt, resposta, modelo="gpt-4o-mini")
+"""
+
+import fnmatch
+import heapq
+import json
+import os
+import socket
+import socketserver
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from urllib.parse import urlparse
+
+from curso_crewai.chaves import gerar_chave
+
+URL_PADRAO = "sqlite:///.cache/respostas_llm.sqlite3"
+
+
+# =============================================================================
+# BACKENDS
+# =============================================================================
+
+
+class BackendCache(ABC):
+    """Interface comum dos backends de armazenamento do cache."""
+
+    evictions: int = 0
+
+    @abstractmethod
+    def ler(self, chave: str) -> Optional[bytes]:
+        """Retorna o valor armazenado ou None se ausente/expirado."""
+
+    @abstractmethod
+    def gravar(self, chave: str, valor: bytes, ttl: Optional[float] = None) -> None:
+        """Armazena o valor, opcionalmente com tempo de vida em segundos."""
+
+    @abstractmethod
+    def remover(self, chave: str) -> None:
+        """Remove a chave se existir."""
+
+    @abstractmethod
+    def limpar(self) -> None:
+        """Remove todas as entradas."""
+
+    @abstractmethod
+    def remover_expirados(self) -> int:
+        """Remove entradas expiradas e retorna quantas foram removidas."""
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """Número de entradas armazenadas."""
+
+    def tamanho_bytes(self) -> int:
+        """Bytes ocupados pelos valores (0 se o backend não souber)."""
+        return 0
+
+    def ler_com_ttl(self, chave: str) -> Tuple[Optional[bytes], Optional[float]]:
+        """Valor e segundos de vida restantes (None: sem expiração ou o
+        backend não sabe)."""
+        return self.ler(chave), None
+
+
+class BackendMemoria(BackendCache):
+    """
+    Backend LRU em memória, limitado por número de itens e por bytes.
+
+    get/set são O(1). As expirações ficam agrupadas em baldes de 1 segundo,
+    então entradas vencidas são removidas proativamente (sem varrer o cache)
+    mesmo que nunca mais sejam consultadas.
+    """
+
+    # Estimativa do custo fixo por entrada (nó do OrderedDict, tupla,
+    # cabeçalhos dos objetos str/bytes e referência no balde de expiração)
+    SOBRECARGA_ENTRADA = 200
+
+    def __init__(self, max_itens: int = 1000, max_bytes: Optional[int] = None):
+        self.max_itens = max_itens
+        self.max_bytes = max_bytes
+        self.evictions = 0
+        self.expiracoes = 0
+        self.rejeitadas = 0
+        self._dados: "OrderedDict[str, Tuple[Optional[float], bytes]]" = OrderedDict()
+        self._bytes = 0
+        self._baldes: Dict[int, Set[str]] = {}
+        self._heap_baldes: List[int] = []
+        self._lock = threading.Lock()
+
+    def ler(self, chave: str) -> Optional[bytes]:
+        return self.ler_com_ttl(chave)[0]
+
+    def ler_com_ttl(self, chave: str) -> Tuple[Optional[bytes], Optional[float]]:
+        agora = time.time()
+        with self._lock:
+            self._expirar(agora)
+            entrada = self._dados.get(chave)
+            if entrada is None:
+                return None, None
+            expira_em, valor = entrada
+            if expira_em is not None and expira_em <= agora:
+                self._descartar(chave)
+                self.expiracoes += 1
+                return None, None
+            self._dados.move_to_end(chave)
+            return valor, None if expira_em is None else expira_em - agora
+
+    def gravar(self, chave: str, valor: bytes, ttl: Optional[float] = None) -> None:
+        agora = time.time()
+        expira_em = agora + ttl if ttl else None
+        custo = self._custo(chave, valor)
+        with self._lock:
+            self._expirar(agora)
+            if chave in self._dados:
+                self._descartar(chave)
+            if self.max_bytes is not None and custo > self.max_bytes:
+                self.rejeitadas += 1
+                return
+            self._dados[chave] = (expira_em, valor)
+            self._bytes += custo
+            if expira_em is not None:
+                balde = int(expira_em) + 1
+                if balde not in self._baldes:
+                    self._baldes[balde] = set()
+                    heapq.heappush(self._heap_baldes, balde)
+                self._baldes[balde].add(chave)
+            while len(self._dados) > self.max_itens or (
+                self.max_bytes is not None and self._bytes > self.max_bytes
+            ):
+                self._descartar(next(iter(self._dados)))
+                self.evictions += 1
+
+    def remover(self, chave: str) -> None:
+        with self._lock:
+            if chave in self._dados:
+                self._descartar(chave)
+
+    def limpar(self) -> None:
+        with self._lock:
+            self._dados.clear()
+            self._baldes.clear()
+            self._heap_baldes.clear()
+            self._bytes = 0
+
+    def remover_expirados(self) -> int:
+        with self._lock:
+            return self._expirar(time.time())
+
+    def chaves(self, padrao: str = "*") -> List[str]:
+        """Chaves que casam com o padrão glob (como o KEYS do Redis)."""
+        with self._lock:
+            self._expirar(time.time())
+            return [c for c in self._dados if fnmatch.fnmatchcase(c, padrao)]
+
+    def __len__(self) -> int:
+        return len(self._dados)
+
+    def tamanho_bytes(self) -> int:
+        return self._bytes
+
+    def _custo(self, chave: str, valor: bytes) -> int:
+        return len(chave) + len(valor) + self.SOBRECARGA_ENTRADA
+
+    def _expirar(self, agora: float) -> int:
+        """Remove os baldes cujo prazo já passou (custo proporcional aos vencidos)."""
+        removidas = 0
+        while self._heap_baldes and self._heap_baldes[0] <= agora:
+            balde = heapq.heappop(self._heap_baldes)
+            for chave in self._baldes.pop(balde, ()):
+                entrada = self._dados.pop(chave, None)
+                if entrada is not None:
+                    self._bytes -= self._custo(chave, entrada[1])
+                    removidas += 1
+        self.expiracoes += removidas
+        return removidas
+
+    def _descartar(self, chave: str) -> None:
+        expira_em, valor = self._dados.pop(chave)
+        self._bytes -= self._custo(chave, valor)
+        if expira_em is not None:
+            chaves_balde = self._baldes.get(int(expira_em) + 1)
+            if chaves_balde is not None:
+                chaves_balde.discard(chave)
+
+
+class BackendCamadas(BackendCache):
+    """
+    Combina um backend rápido (L1, ex.: memória) com um compartilhado
+    (L2, ex.: SQLite ou Redis). Leituras que acertam no L2 são promovidas
+    para o L1 com o tempo de vida que ainda resta no L2, limitado a
+    `ttl_promocao` (o L2 pode mudar por outro processo); gravações vão
+    para os dois.
+    """
+
+    def __init__(self, l1: BackendCache, l2: BackendCache, ttl_promocao: float = 300.0):
+        self.l1 = l1
+        self.l2 = l2
+        self.ttl_promocao = ttl_promocao
+        self.hits_l1 = 0
+        self.hits_l2 = 0
+
+    @property
+    def evictions(self) -> int:  # type: ignore[override]
+        return self.l1.evictions + self.l2.evictions
+
+    def ler(self, chave: str) -> Optional[bytes]:
+        valor = self.l1.ler(chave)
+        if valor is not None:
+            self.hits_l1 += 1
+            return valor
+        valor, restante = self.l2.ler_com_ttl(chave)
+        if valor is not None:
+            self.hits_l2 += 1
+            ttl = self.ttl_promocao
+            if restante is not None:
+                ttl = min(ttl, restante)
+            if ttl > 0:
+                self.l1.gravar(chave, valor, ttl)
+        return valor
+
+    def gravar(self, chave: str, valor: bytes, ttl: Optional[float] = None) -> None:
+        self.l1.gravar(chave, valor, ttl)
+        self.l2.gravar(chave, valor, ttl)
+
+    def remover(self, chave: str) -> None:
+        self.l1.remover(chave)
+        self.l2.remover(chave)
+
+    def limpar(self) -> None:
+        self.l1.limpar()
+        self.l2.limpar()
+
+    def remover_expirados(self) -> int:
+        return self.l1.remover_expirados() + self.l2.remover_expirados()
+
+    def __len__(self) -> int:
+        return len(self.l2)
+
+    def tamanho_bytes(self) -> int:
+        return self.l2.tamanho_bytes()
+
+
+class BackendSQLite(BackendCache):
+    """
+    Backend em disco usando SQLite (modo WAL).
+
+    Vários processos podem abrir o mesmo arquivo ao mesmo tempo; cada thread
+    usa sua própria conexão. A ordem LRU é mantida pela coluna de último acesso.
+    """
+
+    # Verifica o limite de itens a cada N gravações (COUNT(*) não é gratuito)
+    INTERVALO_VERIFICACAO = 64
+
+    def __init__(
+        self, caminho: str = ".cache/respostas_llm.sqlite3", max_itens: int = 100_000
+    ):
+        self.caminho = caminho
+        self.max_itens = max_itens
+        self.evictions = 0
+        self._local = threading.local()
+        self._gravacoes = 0
+        diretorio = os.path.dirname(os.path.abspath(caminho))
+        os.makedirs(diretorio, exist_ok=True)
+        with self._conexao() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS cache (
+                    chave TEXT PRIMARY KEY,
+                    valor BLOB NOT NULL,
+                    expira_em REAL,
+                    acessado_em REAL NOT NULL
+                )
+                """)
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_cache_acesso ON cache(acessado_em)"
+            )
+
+    def _conexao(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.caminho, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def ler(self, chave: str) -> Optional[bytes]:
+        return self.ler_com_ttl(chave)[0]
+
+    def ler_com_ttl(self, chave: str) -> Tuple[Optional[bytes], Optional[float]]:
+        conn = self._conexao()
+        linha = conn.execute(
+            "SELECT valor, expira_em FROM cache WHERE chave = ?", (chave,)
+        ).fetchone()
+        if linha is None:
+            return None, None
+        valor, expira_em = linha
+        agora = time.time()
+        with conn:
+            if expira_em is not None and expira_em <= agora:
+                conn.execute("DELETE FROM cache WHERE chave = ?", (chave,))
+                return None, None
+            conn.execute(
+                "UPDATE cache SET acessado_em = ? WHERE chave = ?", (agora, chave)
+            )
+        return bytes(valor), None if expira_em is None else expira_em - agora
+
+    def gravar(self, chave: str, valor: bytes, ttl: Optional[float] = None) -> None:
+        agora = time.time()
+        expira_em = agora + ttl if ttl else None
+        conn = self._conexao()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (chave, valor, expira_em, acessado_em) "
+                "VALUES (?, ?, ?, ?)",
+                (chave, sqlite3.Binary(valor), expira_em, agora),
+            )
+        self._gravacoes += 1
+        if self._gravacoes % self.INTERVALO_VERIFICACAO == 0:
+            self._aplicar_limite()
+
+    def _aplicar_limite(self) -> None:
+        conn = self._conexao()
+        self.remover_expirados()
+        (total,) = conn.execute("SELECT COUNT(*) FROM cache").fetchone()
+        excesso = total - self.max_itens
+        if excesso > 0:
+            with conn:
+                conn.execute(
+                    "DELETE FROM cache WHERE chave IN ("
+                    "SELECT chave FROM cache ORDER BY acessado_em LIMIT ?)",
+                    (excesso,),
+                )
+            self.evictions += excesso
+
+    def remover(self, chave: str) -> None:
+        conn = self._conexao()
+        with conn:
+            conn.execute("DELETE FROM cache WHERE chave = ?", (chave,))
+
+    def limpar(self) -> None:
+        conn = self._conexao()
+        with conn:
+            conn.execute("DELETE FROM cache")
+
+    def remover_expirados(self) -> int:
+        conn = self._conexao()
+        with conn:
+            cursor = conn.execute(
+                "DELETE FROM cache WHERE expira_em IS NOT NULL AND expira_em <= ?",
+                (time.time(),),
+            )
+        return cursor.rowcount
+
+    def __len__(self) -> int:
+        (total,) = self._conexao().execute("SELECT COUNT(*) FROM cache").fetchone()
+        return total
+
+    def tamanho_bytes(self) -> int:
+        (total,) = (
+            self._conexao()
+            .execute("SELECT COALESCE(SUM(LENGTH(valor)), 0) FROM cache")
+            .fetchone()
+        )
+        return total
+
+
+class ErroRedis(Exception):
+    """Erro retornado pelo servidor Redis."""
+
+
+class BackendRedis(BackendCache):
+    """
+    Backend que fala o protocolo Redis (RESP) diretamente via socket.
+
+    Funciona com um Redis real ou com o ServidorRedisLocal deste módulo,
+    sem depender do pacote redis-py. A eviction fica a cargo do servidor
+    (ex.: maxmemory-policy allkeys-lru).
+    """
+
+    def __init__(
+        self, host: str = "127.0.0.1", porta: int = 6379, prefixo: str = "llm:"
+    ):
+        self.host = host
+        self.porta = porta
+        self.prefixo = prefixo
+        self.evictions = 0
+        self._sock: Optional[socket.socket] = None
+        self._arquivo = None
+        self._lock = threading.Lock()
+
+    # --- Protocolo RESP ---
+
+    def _conectar(self) -> None:
+        self._sock = socket.create_connection((self.host, self.porta), timeout=5)
+        self._arquivo = self._sock.makefile("rb")
+
+    def _comando(self, *args: Any) -> Any:
+        partes = [f"*{len(args)}\r\n".encode()]
+        for arg in args:
+            dado = arg if isinstance(arg, bytes) else str(arg).encode()
+            partes.append(b"$%d\r\n%s\r\n" % (len(dado), dado))
+        with self._lock:
+            for tentativa in range(2):
+                try:
+                    if self._sock is None:
+                        self._conectar()
+                    self._sock.sendall(b"".join(partes))
+                    return self._ler_resposta()
+                except (ConnectionError, OSError):
+                    self.fechar()
+                    if tentativa:
+                        raise
+
+    def _ler_resposta(self) -> Any:
+        linha = self._arquivo.readline()
+        if not linha:
+            raise ConnectionError("Conexão com o servidor Redis encerrada")
+        tipo, resto = linha[:1], linha[1:-2]
+        if tipo == b"+":
+            return resto.decode()
+        if tipo == b"-":
+            raise ErroRedis(resto.decode())
+        if tipo == b":":
+            return int(resto)
+        if tipo == b"$":
+            tamanho = int(resto)
+            if tamanho < 0:
+                return None
+            dado = self._arquivo.read(tamanho + 2)
+            return dado[:-2]
+        if tipo == b"*":
+            return [self._ler_resposta() for _ in range(int(resto))]
+        raise ErroRedis(f"Resposta RESP inválida: {linha!r}")
+
+    def fechar(self) -> None:
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            finally:
+                self._sock = None
+                self._arquivo = None
+
+    # --- Interface do backend ---
+
+    def ler(self, chave: str) -> Optional[bytes]:
+        return self._comando("GET", self.prefixo + chave)
+
+    def ler_com_ttl(self, chave: str) -> Tuple[Optional[bytes], Optional[float]]:
+        valor = self.ler(chave)
+        if valor is None:
+            return None, None
+        # PTTL: -1 sem expiração, -2 chave sumiu entre os dois comandos
+        restante = self._comando("PTTL", self.prefixo + chave)
+        if not isinstance(restante, int) or restante < 0:
+            return valor, None
+        return valor, restante / 1000
+
+    def gravar(self, chave: str, valor: bytes, ttl: Optional[float] = None) -> None:
+        if ttl:
+            self._comando("SET", self.prefixo + chave, valor, "PX", int(ttl * 1000))
+        else:
+            self._comando("SET", self.prefixo + chave, valor)
+
+    def remover(self, chave: str) -> None:
+        self._comando("DEL", self.prefixo + chave)
+
+    def limpar(self) -> None:
+        chaves = self._comando("KEYS", self.prefixo + "*")
+        if chaves:
+            self._comando("DEL", *chaves)
+
+    def remover_expirados(self) -> int:
+        return 0  # O servidor Redis expira as chaves sozinho
+
+    def __len__(self) -> int:
+        return len(self._comando("KEYS", self.prefixo + "*"))
+
+
+# =============================================================================
+# SERVIDOR REDIS LOCAL (substituto para desenvolvimento)
+# =============================================================================
+
+
+class _ManipuladorRESP(socketserver.StreamRequestHandler):
+    """Atende comandos RESP de um cliente conectado."""
+
+    def handle(self) -> None:
+        while True:
+            try:
+                comando = self._ler_comando()
+            except (ConnectionError, ValueError):
+                return
+            if comando is None:
+                return
+            self.wfile.write(self.server.executar(comando))
+
+    def _ler_comando(self) -> Optional[List[bytes]]:
+        linha = self.rfile.readline()
+        if not linha:
+            return None
+        if not linha.startswith(b"*"):
+            # Comando inline (ex.: "PING\r\n" via telnet)
+            return linha.strip().split()
+        argumentos = []
+        for _ in range(int(linha[1:-2])):
+            cabecalho = self.rfile.readline()
+            tamanho = int(cabecalho[1:-2])
+            argumentos.append(self.rfile.read(tamanho + 2)[:-2])
+        return argumentos
+
+
+class ServidorRedisLocal(socketserver.ThreadingTCPServer):
+    """
+    Servidor mínimo compatível com Redis (GET, SET, DEL, KEYS, DBSIZE,
+    FLUSHDB, PING), útil para compartilhar o cache entre processos locais
+    sem instalar o Redis.
+
+    Uso:
+        python -m curso_crewai.cache servidor --porta 6380
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(
+        self, host: str = "127.0.0.1", porta: int = 6380, max_itens: int = 100_000
+    ):
+        super().__init__((host, porta), _ManipuladorRESP)
+        self.armazenamento = BackendMemoria(max_itens=max_itens)
+
+    @property
+    def porta(self) -> int:
+        return self.server_address[1]
+
+    def iniciar_em_thread(self) -> threading.Thread:
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return thread
+
+    def executar(self, comando: List[bytes]) -> bytes:
+        if not comando:
+            return b"-ERR comando vazio\r\n"
+        nome = comando[0].upper().decode(errors="replace")
+        try:
+            return self._executar(nome, comando[1:])
+        except (IndexError, ValueError):
+            return f"-ERR argumentos inválidos para '{nome}'\r\n".encode()
+
+    def _executar(self, nome: str, args: List[bytes]) -> bytes:
+        dados = self.armazenamento
+
+        if nome == "PING":
+            return b"+PONG\r\n"
+        if nome == "GET":
+            return _bulk(dados.ler(args[0].decode()))
+        if nome == "SET":
+            ttl = None
+            opcoes = [a.upper() for a in args[2:]]
+            if b"EX" in opcoes:
+                ttl = float(args[2 + opcoes.index(b"EX") + 1])
+            elif b"PX" in opcoes:
+                ttl = float(args[2 + opcoes.index(b"PX") + 1]) / 1000
+            dados.gravar(args[0].decode(), args[1], ttl)
+            return b"+OK\r\n"
+        if nome == "DEL":
+            removidas = 0
+            for chave in args:
+                if dados.ler(chave.decode()) is not None:
+                    dados.remover(chave.decode())
+                    removidas += 1
+            return b":%d\r\n" % removidas
+        if nome == "KEYS":
+            chaves = dados.chaves(args[0].decode())
+            return b"*%d\r\n" % len(chaves) + b"".join(
+                _bulk(c.encode()) for c in chaves
+            )
+        if nome == "PTTL":
+            valor, restante = dados.ler_com_ttl(args[0].decode())
+            if valor is None:
+                return b":-2\r\n"
+            return b":%d\r\n" % (-1 if restante is None else int(restante * 1000))
+        if nome == "DBSIZE":
+            return b":%d\r\n" % len(dados)
+        if nome == "FLUSHDB":
+            dados.limpar()
+            return b"+OK\r\n"
+        return f"-ERR comando desconhecido '{nome}'\r\n".encode()
+
+
+def _bulk(valor: Optional[bytes]) -> bytes:
+    if valor is None:
+        return b"$-1\r\n"
+    return b"$%d\r\n%s\r\n" % (len(valor), valor)
+
+
+def criar_backend(url: str) -> BackendCache:
+    """
+    Cria um backend a partir de uma URL:
+        memoria://?max_itens=1000
+        sqlite:///caminho/arquivo.sqlite3
+        redis://host:porta/prefixo
+    """
+    partes = urlparse(url)
+    parametros = dict(
+        par.split("=", 1) for par in partes.query.split("&") if "=" in par
+    )
+
+    if partes.scheme == "memoria":
+        return BackendMemoria(max_itens=int(parametros.get("max_itens", 1000)))
+    if partes.scheme == "sqlite":
+        caminho = partes.path[1:] if partes.path.startswith("/") else partes.path
+        return BackendSQLite(
+            caminho, max_itens=int(parametros.get("max_itens", 100_000))
+        )
+    if partes.scheme == "redis":
+        prefixo = partes.path.lstrip("/") or "llm:"
+        return BackendRedis(
+            partes.hostname or "127.0.0.1", partes.port or 6379, prefixo
+        )
+    raise ValueError(f"Backend de cache desconhecido: {url}")
+
+
+# =============================================================================
+# CACHE DE RESPOSTAS
+# =============================================================================
+
+
+class CacheLLM:
+    """Cache de respostas de LLM sobre um backend plugável."""
+
+    def __init__(
+        self, backend: Optional[BackendCache] = None, ttl: Optional[float] = 3600
+    ):
+        self.backend = backend if backend is not None else BackendMemoria()
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.bytes_lidos = 0
+        self.bytes_gravados = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def chave(prompt: str, modelo: str = "", **config: Any) -> str:
+        """Gera chave estável (igual em todos os processos) para o prompt."""
+        return gerar_chave(prompt, {"modelo": modelo, **config})
+
+    def get(self, prompt: str, modelo: str = "", **config: Any) -> Optional[str]:
+        """Retorna a resposta em cache ou None."""
+        valor = self.backend.ler(self.chave(prompt, modelo, **config))
+        with self._lock:
+            if valor is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.bytes_lidos += len(valor)
+        return json.loads(valor.decode("utf-8"))["resposta"]
+
+    def set(
+        self,
+        prompt: str,
+        resposta: Any,
+        modelo: str = "",
+        ttl: Optional[float] = None,
+        **config: Any,
+    ) -> None:
+        """Armazena a resposta (convertida para texto)."""
+        if hasattr(resposta, "raw"):
+            resposta = resposta.raw
+        valor = json.dumps({"resposta": str(resposta)}, ensure_ascii=False).encode(
+            "utf-8"
+        )
+        self.backend.gravar(
+            self.chave(prompt, modelo, **config), valor, ttl or self.ttl
+        )
+        with self._lock:
+            self.bytes_gravados += len(valor)
+
+    def obter_ou_calcular(
+        self, prompt: str, calcular: Callable[[], Any], modelo: str = "", **config: Any
+    ) -> Any:
+        """Retorna do cache ou executa `calcular()` e armazena o resultado."""
+        resposta = self.get(prompt, modelo, **config)
+        if resposta is not None:
+            return resposta
+        resultado = calcular()
+        self.set(prompt, resultado, modelo, **config)
+        return resultado
+
+    def limpar(self) -> None:
+        self.backend.limpar()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Retorna estatísticas do cache."""
+        total = self.hits + self.misses
+        return {
+            "backend": type(self.backend).__name__,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / total * 100) if total > 0 else 0.0,
+            "itens": len(self.backend),
+            "bytes_armazenados": self.backend.tamanho_bytes(),
+            "bytes_lidos": self.bytes_lidos,
+            "bytes_gravados": self.bytes_gravados,
+            "evictions": self.backend.evictions,
+        }
+
+
+def backend_padrao() -> BackendCache:
+    """Backend configurado pela variável CURSO_CACHE_URL (padrão: SQLite local)."""
+    return criar_backend(os.getenv("CURSO_CACHE_URL", URL_PADRAO))
+
+
+_cache_padrao: Optional[CacheLLM] = None
+_lock_padrao = threading.Lock()
+
+
+def cache_padrao() -> CacheLLM:
+    """
+    Cache compartilhado do processo, configurado pela variável CURSO_CACHE_URL
+    (padrão: SQLite em .cache/respostas_llm.sqlite3).
+    """
+    global _cache_padrao
+    with _lock_padrao:
+        if _cache_padrao is None:
+            ttl = float(os.getenv("CURSO_CACHE_TTL", "3600"))
+            _cache_padrao = CacheLLM(backend_padrao(), ttl=ttl)
+        return _cache_padrao
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Utilitários do cache de respostas")
+    sub = parser.add_subparsers(dest="comando", required=True)
+    servidor = sub.add_parser("servidor", help="Inicia o servidor Redis local")
+    servidor.add_argument("--host", default="127.0.0.1")
+    servidor.add_argument("--porta", type=int, default=6380)
+    sub.add_parser("stats", help="Mostra estatísticas do cache padrão")
+    args = parser.parse_args()
+
+    if args.comando == "servidor":
+        with ServidorRedisLocal(args.host, args.porta) as srv:
+            print(f"🗄️  Servidor de cache em redis://{args.host}:{srv.porta}")
+            srv.serve_forever()
+    else:
+        for chave, valor in cache_padrao().get_stats().items():
+            print(f"   {chave}: {valor}")
@@ -0,0 +1,384 @@
+"""
+Cache semântico de perguntas (quase-duplicatas).
+
+Perguntas com a mesma intenção e redação ligeiramente diferente
+("tem smartphone em estoque?" / "tem smartphone no estoque?") reaproveitam
+a mesma resposta, sem chamar o LLM.
+
+Tudo roda localmente, sem modelos baixados:
+- EmbeddingHash: vetor esparso com palavras e n-gramas de caracteres,
+  projetados por hashing em um espaço de dimensão fixa
+- IndiceLSH: busca aproximada de vizinhos por hiperplanos aleatórios
+- CacheSemantico: limiar de similaridade configurável, estatísticas de
+  hit rate e amostras de auditoria para revisar falsos positivos; só
+  reaproveita quando as duas perguntas têm as mesmas negações ("tem" x
+  "não tem") e os mesmos números ("2 notebooks" x "20 notebooks")
+
+Uso:
+    cache = CacheSemantico(limiar=0.8)
+    resposta = cache.obter_ou_executar(pergunta, lambda: crew.kickoff())
+"""
+
+import hashlib
+import math
+import random
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+VetorEsparso = Dict[int, float]
+
+STOPWORDS_PT = frozenset("""
+    a o as os um uma uns umas de do da dos das em no na nos nas num numa
+    por pelo pela pelos pelas para pra pro ao aos à às e ou que se me te
+    lhe eu voce vc ele ela isso esse essa este esta aquele aquela aquilo
+    ai aí ola oi la lá ja já so só
+    """.split())
+
+# Palavras que invertem o sentido da pergunta: "tem X?" e "não tem X?" são
+# quase idênticas no embedding, mas pedem respostas opostas
+NEGACOES_PT = frozenset("""
+    nao nem nunca jamais nenhum nenhuma nenhuns nenhumas ninguem nada sem
+    """.split())
+
+# Quantidades por extenso: "2 notebooks" e "20 notebooks" (ou "dois" e
+# "vinte") têm embeddings quase iguais, mas não a mesma resposta
+NUMERAIS_PT = frozenset("""
+    dois duas tres quatro cinco seis sete oito nove dez onze doze vinte
+    trinta quarenta cinquenta cem cento duzentos quinhentos mil
+    """.split())
+
+
+def normalizar_texto(texto: str) -> str:
+    """Minúsculas, sem acentos e sem pontuação."""
+    texto = unicodedata.normalize("NFKD", texto.lower())
+    texto = "".join(c for c in texto if not unicodedata.combining(c))
+    return re.sub(r"[^\w\s]", " ", texto)
+
+
+def tokenizar(texto: str, remover_stopwords: bool = True) -> List[str]:
+    """Quebra o texto normalizado em palavras."""
+    palavras = normalizar_texto(texto).split()
+    if remover_stopwords:
+        palavras = [p for p in palavras if p not in STOPWORDS_PT]
+    return palavras
+
+
+def negacoes(texto: str) -> frozenset:
+    """Palavras de negação presentes no texto (normalizado)."""
+    return frozenset(p for p in tokenizar(texto, False) if p in NEGACOES_PT)
+
+
+def numeros(texto: str) -> frozenset:
+    """Números e numerais por extenso presentes no texto ("2", "256gb")."""
+    return frozenset(
+        p
+        for p in tokenizar(texto, False)
+        if p in NUMERAIS_PT or any(c.isdigit() for c in p)
+    )
+
+
+def _hash_estavel(texto: str) -> int:
+    return int.from_bytes(
+        hashlib.blake2b(texto.encode("utf-8"), digest_size=8).digest(), "little"
+    )
+
+
+def similaridade_cosseno(a: VetorEsparso, b: VetorEsparso) -> float:
+    """Produto interno de dois vetores já normalizados."""
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(valor * b.get(indice, 0.0) for indice, valor in a.items())
+
+
+class EmbeddingHash:
+    """
+    Embedding local por "hashing trick".
+
+    Cada palavra e cada n-grama de caracteres vira uma dimensão (com sinal)
+    escolhida por hash estável, então o mesmo texto gera o mesmo vetor em
+    qualquer processo. N-gramas tornam o vetor tolerante a erros de
+    digitação e variações de flexão ("celular"/"celulares").
+    """
+
+    def __init__(
+        self,
+        dimensao: int = 2048,
+        tamanhos_ngrama: Tuple[int, ...] = (3, 4),
+        peso_palavra: float = 1.0,
+        peso_ngrama: float = 0.35,
+    ):
+        self.dimensao = dimensao
+        self.tamanhos_ngrama = tamanhos_ngrama
+        self.peso_palavra = peso_palavra
+        self.peso_ngrama = peso_ngrama
+
+    def _caracteristicas(self, texto: str) -> Iterable[Tuple[str, float]]:
+        for palavra in tokenizar(texto):
+            yield "p:" + palavra, self.peso_palavra
+            marcada = f"<{palavra}>"
+            for n in self.tamanhos_ngrama:
+                for i in range(len(marcada) - n + 1):
+                    yield "c:" + marcada[i : i + n], self.peso_ngrama
+
+    def __call__(self, texto: str) -> VetorEsparso:
+        vetor: VetorEsparso = {}
+        for caracteristica, peso in self._caracteristicas(texto):
+            h = _hash_estavel(caracteristica)
+            indice = h % self.dimensao
+            sinal = 1.0 if (h >> 63) & 1 else -1.0
+            vetor[indice] = vetor.get(indice, 0.0) + sinal * peso
+        norma = math.sqrt(sum(v * v for v in vetor.values()))
+        if norma == 0:
+            return {}
+        return {i: v / norma for i, v in vetor.items() if v != 0.0}
+
+
+class IndiceLSH:
+    """
+    Índice de vizinhos aproximados por hiperplanos aleatórios (SimHash).
+
+    Cada tabela agrupa vetores pela assinatura de sinais das projeções; a
+    busca só compara com os candidatos que caem no mesmo balde em alguma
+    tabela, em vez de varrer todas as entradas.
+    """
+
+    def __init__(
+        self, dimensao: int, n_planos: int = 8, n_tabelas: int = 10, semente: int = 42
+    ):
+        self.dimensao = dimensao
+        self.n_planos = n_planos
+        self.n_tabelas = n_tabelas
+        self.semente = semente
+        self._planos_gerados: Optional[List[List[List[float]]]] = None
+        self._tabelas: List[Dict[int, set]] = [{} for _ in range(n_tabelas)]
+        self._assinaturas: Dict[Any, List[int]] = {}
+        self._vetores: Dict[Any, VetorEsparso] = {}
+
+    @property
+    def _planos(self) -> List[List[List[float]]]:
+        # planos[t][p] é um vetor denso de dimensão `dimensao`. São ~160 mil
+        # números: gerados no primeiro uso, não na criação do cache (que
+        # costuma acontecer no import do módulo). A semente fixa garante o
+        # mesmo resultado mesmo se duas threads gerarem ao mesmo tempo.
+        if self._planos_gerados is None:
+            gerador = random.Random(self.semente)
+            self._planos_gerados = [
+                [
+                    [gerador.gauss(0, 1) for _ in range(self.dimensao)]
+                    for _ in range(self.n_planos)
+                ]
+                for _ in range(self.n_tabelas)
+            ]
+        return self._planos_gerados
+
+    def _assinar(self, vetor: VetorEsparso) -> List[int]:
+        assinaturas = []
+        for planos in self._planos:
+            bits = 0
+            for p, plano in enumerate(planos):
+                projecao = sum(valor * plano[i] for i, valor in vetor.items())
+                if projecao >= 0:
+                    bits |= 1 << p
+            assinaturas.append(bits)
+        return assinaturas
+
+    def adicionar(self, identificador: Any, vetor: VetorEsparso) -> None:
+        if identificador in self._vetores:
+            self.remover(identificador)
+        assinaturas = self._assinar(vetor)
+        for tabela, assinatura in zip(self._tabelas, assinaturas):
+            tabela.setdefault(assinatura, set()).add(identificador)
+        self._assinaturas[identificador] = assinaturas
+        self._vetores[identificador] = vetor
+
+    def remover(self, identificador: Any) -> None:
+        assinaturas = self._assinaturas.pop(identificador, None)
+        if assinaturas is None:
+            return
+        del self._vetores[identificador]
+        for tabela, assinatura in zip(self._tabelas, assinaturas):
+            balde = tabela.get(assinatura)
+            if balde is not None:
+                balde.discard(identificador)
+                if not balde:
+                    del tabela[assinatura]
+
+    def buscar(self, vetor: VetorEsparso, k: int = 1) -> List[Tuple[Any, float]]:
+        """Retorna até k vizinhos (identificador, similaridade) em ordem decrescente."""
+        candidatos = set()
+        for tabela, assinatura in zip(self._tabelas, self._assinar(vetor)):
+            candidatos.update(tabela.get(assinatura, ()))
+        pontuados = [
+            (c, similaridade_cosseno(vetor, self._vetores[c])) for c in candidatos
+        ]
+        pontuados.sort(key=lambda par: par[1], reverse=True)
+        return pontuados[:k]
+
+    def __len__(self) -> int:
+        return len(self._vetores)
+
+
+@dataclass
+class ResultadoSemantico:
+    """Resposta recuperada do cache semântico."""
+
+    resposta: Any
+    similaridade: float
+    pergunta_original: str
+
+
+class CacheSemantico:
+    """
+    Cache de respostas indexado pelo significado da pergunta.
+
+    Args:
+        limiar: similaridade mínima (0-1) para considerar a pergunta repetida
+        max_itens: entradas mantidas (as mais antigas saem primeiro)
+        ttl: tempo de vida das respostas em segundos (None = sem expiração)
+        taxa_auditoria: fração dos hits não exatos guardada para revisão
+    """
+
+    def __init__(
+        self,
+        limiar: float = 0.8,
+        max_itens: int = 10_000,
+        ttl: Optional[float] = 3600,
+        taxa_auditoria: float = 0.2,
+        embedding: Optional[Callable[[str], VetorEsparso]] = None,
+        max_amostras: int = 200,
+    ):
+        self.limiar = limiar
+        self.max_itens = max_itens
+        self.ttl = ttl
+        self.taxa_auditoria = taxa_auditoria
+        self.embedding = embedding or EmbeddingHash()
+        dimensao = getattr(self.embedding, "dimensao", 2048)
+        self.indice = IndiceLSH(dimensao)
+        self._entradas: "OrderedDict[int, Tuple[str, Any, float]]" = OrderedDict()
+        self._exatas: Dict[str, int] = {}
+        self._proximo_id = 0
+        self._auditoria: deque = deque(maxlen=max_amostras)
+        self._aleatorio = random.Random()
+        self._lock = threading.Lock()
+        self.consultas = 0
+        self.hits_exatos = 0
+        self.hits_semanticos = 0
+        self.rejeitados_negacao = 0
+        self.rejeitados_numero = 0
+
+    @staticmethod
+    def _forma_canonica(pergunta: str) -> str:
+        return " ".join(tokenizar(pergunta))
+
+    def buscar(self, pergunta: str) -> Optional[ResultadoSemantico]:
+        """Procura resposta para a pergunta ou para uma quase-duplicata."""
+        canonica = self._forma_canonica(pergunta)
+        vetor = self.embedding(pergunta)
+        polaridade = negacoes(pergunta)
+        quantidades = numeros(pergunta)
+        with self._lock:
+            self.consultas += 1
+            identificador = self._exatas.get(canonica)
+            if identificador is not None and self._valida(identificador):
+                original, resposta, _ = self._entradas[identificador]
+                self.hits_exatos += 1
+                return ResultadoSemantico(resposta, 1.0, original)
+
+            for identificador, similaridade in self.indice.buscar(vetor, k=3):
+                if similaridade < self.limiar:
+                    break
+                if not self._valida(identificador):
+                    continue
+                original, resposta, _ = self._entradas[identificador]
+                if negacoes(original) != polaridade:
+                    # Parecida, mas com o sentido invertido
+                    self.rejeitados_negacao += 1
+                    continue
+                if numeros(original) != quantidades:
+                    # "2 notebooks" x "20 notebooks": outra quantidade
+                    self.rejeitados_numero += 1
+                    continue
+                self.hits_semanticos += 1
+                if self._aleatorio.random() < self.taxa_auditoria:
+                    self._auditoria.append(
+                        {
+                            "consulta": pergunta,
+                            "pergunta_cache": original,
+                            "similaridade": round(similaridade, 4),
+                            "timestamp": time.time(),
+                        }
+                    )
+                return ResultadoSemantico(resposta, similaridade, original)
+        return None
+
+    def armazenar(self, pergunta: str, resposta: Any) -> None:
+        """Guarda a resposta da pergunta."""
+        if hasattr(resposta, "raw"):
+            resposta = resposta.raw
+        canonica = self._forma_canonica(pergunta)
+        vetor = self.embedding(pergunta)
+        with self._lock:
+            antigo = self._exatas.get(canonica)
+            if antigo is not None:
+                self._remover(antigo)
+            identificador = self._proximo_id
+            self._proximo_id += 1
+            self._entradas[identificador] = (pergunta, resposta, time.time())
+            self._exatas[canonica] = identificador
+            self.indice.adicionar(identificador, vetor)
+            while len(self._entradas) > self.max_itens:
+                self._remover(next(iter(self._entradas)))
+
+    def obter_ou_executar(self, pergunta: str, executar: Callable[[], Any]) -> Any:
+        """Retorna a resposta em cache ou executa e armazena."""
+        resultado = self.buscar(pergunta)
+        if resultado is not None:
+            return resultado.resposta
+        resposta = executar()
+        self.armazenar(pergunta, resposta)
+        return resposta
+
+    def _valida(self, identificador: int) -> bool:
+        if identificador not in self._entradas:
+            return False
+        if self.ttl is None:
+            return True
+        _, _, criado_em = self._entradas[identificador]
+        if time.time() - criado_em <= self.ttl:
+            return True
+        self._remover(identificador)
+        return False
+
+    def _remover(self, identificador: int) -> None:
+        pergunta, _, _ = self._entradas.pop(identificador)
+        canonica = self._forma_canonica(pergunta)
+        if self._exatas.get(canonica) == identificador:
+            del self._exatas[canonica]
+        self.indice.remover(identificador)
+
+    def amostras_auditoria(self, n: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Hits semânticos amostrados, para revisar possíveis falsos positivos."""
+        amostras = list(self._auditoria)
+        return amostras[-n:] if n else amostras
+
+    def estatisticas(self) -> Dict[str, Any]:
+        """Retorna estatísticas do cache semântico."""
+        hits = self.hits_exatos + self.hits_semanticos
+        return {
+            "consultas": self.consultas,
+            "hits": hits,
+            "hits_exatos": self.hits_exatos,
+            "hits_semanticos": self.hits_semanticos,
+            "misses": self.consultas - hits,
+            "rejeitados_negacao": self.rejeitados_negacao,
+            "rejeitados_numero": self.rejeitados_numero,
+            "hit_rate": (hits / self.consultas * 100) if self.consultas else 0.0,
+            "entradas": len(self._entradas),
+            "limiar": self.limiar,
+            "amostras_auditoria": len(self._auditoria),
+        }
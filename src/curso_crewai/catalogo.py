@@ -0,0 +1,487 @@
+"""
+Índice invertido de produtos.
+
+Em vez de percorrer o catálogo inteiro a cada consulta (O(produtos x
+palavras)), cada palavra aponta para a lista de produtos que a contêm. A
+busca só visita os produtos das palavras da consulta e devolve os k
+melhores, ordenados por relevância:
+
+- Normalização de acentos e maiúsculas ("Preço" == "preco")
+- Prefixo: "note" encontra "notebook" (busca binária no vocabulário)
+- Aproximação: "notbook" encontra "notebook" (distância de edição 1)
+- Pontuação por IDF: palavras raras (o modelo) pesam mais que comuns
+
+Uso:
+    indice = IndiceProdutos.carregar("catalogo.jsonl")  # ou .csv
+    for resultado in indice.buscar("notebook gamer", k=5):
+        print(resultado.pontuacao, resultado.produto["nome"])
+    indice.salvar("catalogo.indice.json")
+
+Benchmark:
+    python -m curso_crewai.catalogo [10000 100000 1000000]
+"""
+
+import bisect
+import csv
+import heapq
+import json
+import math
+from array import array
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from curso_crewai.cache_semantico import tokenizar
+
+Caminho = Union[str, Path]
+
+VERSAO_INDICE = 1
+
+# Pesos de cada tipo de correspondência entre palavra da consulta e do índice
+PESO_EXATO = 1.0
+PESO_PREFIXO = 0.8
+PESO_APROXIMADO = 0.6
+
+# Campos do produto que entram no índice
+CAMPOS_INDEXADOS = ("nome", "categoria", "marca", "descricao")
+CAMPOS_NUMERICOS = {"preco": float, "estoque": int}
+
+
+@dataclass
+class ResultadoBusca:
+    """Produto encontrado e sua relevância para a consulta."""
+
+    chave: str
+    produto: Dict[str, Any]
+    pontuacao: float
+
+
+def _delecoes(palavra: str) -> Iterator[str]:
+    """Variações com um caractere removido (busca aproximada estilo SymSpell)."""
+    for i in range(len(palavra)):
+        yield palavra[:i] + palavra[i + 1 :]
+
+
+def _contem(lista: array, documento: int) -> bool:
+    """Busca binária em uma lista invertida (os ids são crescentes)."""
+    i = bisect.bisect_left(lista, documento)
+    return i < len(lista) and lista[i] == documento
+
+
+def _distancia_ate_1(a: str, b: str) -> bool:
+    """True se a distância de edição entre a e b for no máximo 1."""
+    if a == b:
+        return True
+    if abs(len(a) - len(b)) > 1:
+        return False
+    if len(a) > len(b):
+        a, b = b, a
+    i = 0
+    while i < len(a) and a[i] == b[i]:
+        i += 1
+    if len(a) == len(b):
+        return a[i + 1 :] == b[i + 1 :]
+    return a[i:] == b[i + 1 :]
+
+
+class IndiceProdutos:
+    """
+    Catálogo de produtos com busca por índice invertido.
+
+    Args:
+        min_prefixo: Tamanho mínimo da palavra para busca por prefixo
+        min_aproximado: Tamanho mínimo da palavra para busca aproximada
+        max_expansoes: Máximo de palavras do vocabulário por prefixo
+    """
+
+    def __init__(
+        self, min_prefixo: int = 3, min_aproximado: int = 4, max_expansoes: int = 50
+    ):
+        self.min_prefixo = min_prefixo
+        self.min_aproximado = min_aproximado
+        self.max_expansoes = max_expansoes
+        self._chaves: List[str] = []
+        self._produtos: List[Dict[str, Any]] = []
+        self._posicao: Dict[str, int] = {}
+        self._postings: Dict[str, array] = {}
+        self._vocabulario: Optional[List[str]] = None
+        self._delecoes: Optional[Dict[str, List[str]]] = None
+
+    # ------------------------------------------------------------------
+    # Construção
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _palavras(chave: str, produto: Dict[str, Any]) -> set:
+        textos = [chave] + [str(produto.get(c, "")) for c in CAMPOS_INDEXADOS]
+        return set(tokenizar(" ".join(textos)))
+
+    def adicionar(self, chave: str, produto: Dict[str, Any]) -> None:
+        """Adiciona (ou substitui) um produto no índice."""
+        if chave in self._posicao:
+            self.remover(chave)
+        documento = len(self._produtos)
+        self._chaves.append(chave)
+        self._produtos.append(produto)
+        self._posicao[chave] = documento
+        for palavra in self._palavras(chave, produto):
+            lista = self._postings.get(palavra)
+            if lista is None:
+                lista = self._postings[palavra] = array("I")
+            lista.append(documento)
+        # Vocabulário ordenado e deleções são refeitos na próxima busca
+        self._vocabulario = None
+        self._delecoes = None
+
+    def remover(self, chave: str) -> None:
+        """Remove o produto do índice (o espaço é reaproveitado ao salvar)."""
+        documento = self._posicao.pop(chave, None)
+        if documento is None:
+            return
+        for palavra in self._palavras(chave, self._produtos[documento]):
+            lista = self._postings.get(palavra)
+            if lista is not None and documento in lista:
+                lista.remove(documento)
+                if not lista:
+                    del self._postings[palavra]
+        self._produtos[documento] = {}
+        self._vocabulario = None
+        self._delecoes = None
+
+    def adicionar_varios(self, produtos: Iterable[Tuple[str, Dict[str, Any]]]) -> None:
+        for chave, produto in produtos:
+            self.adicionar(chave, produto)
+
+    @classmethod
+    def de_dict(cls, produtos: Dict[str, Dict[str, Any]], **opcoes) -> "IndiceProdutos":
+        """Cria o índice a partir de um dicionário no formato de PRODUTOS_DB."""
+        indice = cls(**opcoes)
+        indice.adicionar_varios(produtos.items())
+        return indice
+
+    @classmethod
+    def carregar(cls, caminho: Caminho, **opcoes) -> "IndiceProdutos":
+        """
+        Carrega um catálogo .csv ou .jsonl, ou um índice salvo (.json).
+
+        Cada produto precisa de `nome`; a chave vem de `chave`, `sku` ou `id`
+        (ou do próprio nome). `preco` e `estoque` viram números.
+        """
+        caminho = Path(caminho)
+        if caminho.suffix == ".json":
+            return cls.abrir(caminho, **opcoes)
+        indice = cls(**opcoes)
+        with open(caminho, encoding="utf-8", newline="") as arquivo:
+            if caminho.suffix == ".csv":
+                linhas: Iterable[Dict[str, Any]] = csv.DictReader(arquivo)
+            else:
+                linhas = (json.loads(l) for l in arquivo if l.strip())
+            indice.adicionar_varios(_normalizar_registro(r) for r in linhas)
+        return indice
+
+    def salvar(self, caminho: Caminho) -> None:
+        """Grava produtos e listas invertidas, para abrir sem reindexar."""
+        ativos = [i for i, p in enumerate(self._produtos) if p]
+        renumerar = {antigo: novo for novo, antigo in enumerate(ativos)}
+        dados = {
+            "versao": VERSAO_INDICE,
+            "chaves": [self._chaves[i] for i in ativos],
+            "produtos": [self._produtos[i] for i in ativos],
+            "postings": {
+                palavra: [renumerar[d] for d in lista]
+                for palavra, lista in self._postings.items()
+            },
+        }
+        caminho = Path(caminho)
+        temporario = caminho.with_suffix(caminho.suffix + ".tmp")
+        with open(temporario, "w", encoding="utf-8") as arquivo:
+            json.dump(dados, arquivo, ensure_ascii=False, separators=(",", ":"))
+        temporario.replace(caminho)  # Troca atômica: leitores nunca veem meio arquivo
+
+    @classmethod
+    def abrir(cls, caminho: Caminho, **opcoes) -> "IndiceProdutos":
+        """Abre um índice gravado por `salvar`."""
+        with open(caminho, encoding="utf-8") as arquivo:
+            dados = json.load(arquivo)
+        if dados.get("versao") != VERSAO_INDICE:
+            raise ValueError(f"Versão de índice não suportada: {dados.get('versao')}")
+        indice = cls(**opcoes)
+        indice._chaves = dados["chaves"]
+        indice._produtos = dados["produtos"]
+        indice._posicao = {chave: i for i, chave in enumerate(indice._chaves)}
+        indice._postings = {
+            palavra: array("I", lista) for palavra, lista in dados["postings"].items()
+        }
+        return indice
+
+    # ------------------------------------------------------------------
+    # Busca
+    # ------------------------------------------------------------------
+
+    def _preparar(self) -> None:
+        if self._vocabulario is None:
+            self._vocabulario = sorted(self._postings)
+        if self._delecoes is None:
+            delecoes: Dict[str, List[str]] = {}
+            for palavra in self._vocabulario:
+                # Códigos com dígitos ("modelo123", "256gb") só por exato/prefixo
+                if len(palavra) >= self.min_aproximado and palavra.isalpha():
+                    for variante in _delecoes(palavra):
+                        delecoes.setdefault(variante, []).append(palavra)
+            self._delecoes = delecoes
+
+    def _expandir(self, termo: str) -> Dict[str, float]:
+        """Palavras do vocabulário que correspondem ao termo, com seus pesos."""
+        encontradas: Dict[str, float] = {}
+        if termo in self._postings:
+            encontradas[termo] = PESO_EXATO
+
+        # Palavra que já existe no catálogo não é expandida: "ssd" não deve
+        # trazer todos os "ssd..." e o custo da busca fica previsível
+        if not encontradas and len(termo) >= self.min_prefixo:
+            vocabulario = self._vocabulario
+            inicio = bisect.bisect_left(vocabulario, termo)
+            for palavra in vocabulario[inicio : inicio + self.max_expansoes]:
+                if not palavra.startswith(termo):
+                    break
+                # Prefixo curto de palavra longa vale menos
+                encontradas[palavra] = PESO_PREFIXO * len(termo) / len(palavra)
+
+        if not encontradas and len(termo) >= self.min_aproximado and termo.isalpha():
+            candidatas = set(self._delecoes.get(termo, ()))
+            for variante in _delecoes(termo):
+                candidatas.add(variante)  # termo com uma letra a mais
+                candidatas.update(self._delecoes.get(variante, ()))
+            for palavra in candidatas:
+                if palavra in self._postings and _distancia_ate_1(termo, palavra):
+                    encontradas.setdefault(palavra, PESO_APROXIMADO)
+        return encontradas
+
+    def buscar(self, consulta: str, k: int = 5) -> List[ResultadoBusca]:
+        """
+        Retorna os k produtos mais relevantes para a consulta.
+
+        Palavras da consulta que não existem no catálogo ("quanto", "custa")
+        são ignoradas; produtos que cobrem mais palavras ficam na frente.
+        """
+        self._preparar()
+        total = max(1, len(self._posicao))
+        termos = []
+        for termo in dict.fromkeys(tokenizar(consulta)):
+            expansoes = self._expandir(termo)
+            if expansoes:
+                notas = {
+                    palavra: peso * math.log(1 + total / len(self._postings[palavra]))
+                    for palavra, peso in expansoes.items()
+                }
+                visitas = sum(len(self._postings[p]) for p in expansoes)
+                termos.append((visitas, notas))
+        if not termos:
+            return []
+
+        # Termos raros primeiro: definem os candidatos com poucas visitas
+        termos.sort(key=lambda termo: termo[0])
+        n_termos = len(termos)
+        maximos = [max(notas.values()) for _, notas in termos]
+        pontuacoes: Dict[int, float] = {}
+        cobertura: Dict[int, int] = {}
+        fechado = False
+
+        for i, (_, notas) in enumerate(termos):
+            if not fechado and len(pontuacoes) >= k:
+                # MaxScore: um produto que ainda não apareceu soma no máximo
+                # os termos restantes; se nem assim alcança o k-ésimo
+                # candidato, basta atualizar os candidatos atuais
+                restantes = n_termos - i
+                teto = sum(maximos[i:]) * restantes
+                piso = heapq.nlargest(
+                    k, (pontuacoes[d] * cobertura[d] for d in pontuacoes)
+                )[-1]
+                fechado = piso >= teto
+
+            # Melhor correspondência deste termo em cada produto
+            melhor: Dict[int, float] = {}
+            for palavra, nota in notas.items():
+                lista = self._postings[palavra]
+                if fechado and len(pontuacoes) * 20 < len(lista):
+                    documentos: Iterable[int] = [
+                        d for d in pontuacoes if _contem(lista, d)
+                    ]
+                else:
+                    documentos = lista
+                for documento in documentos:
+                    if nota > melhor.get(documento, 0.0):
+                        melhor[documento] = nota
+            for documento, nota in melhor.items():
+                if fechado and documento not in pontuacoes:
+                    continue
+                pontuacoes[documento] = pontuacoes.get(documento, 0.0) + nota
+                cobertura[documento] = cobertura.get(documento, 0) + 1
+
+        melhores = heapq.nlargest(
+            k, pontuacoes, key=lambda d: pontuacoes[d] * cobertura[d]
+        )
+        return [
+            ResultadoBusca(
+                self._chaves[documento],
+                self._produtos[documento],
+                round(pontuacoes[documento] * cobertura[documento] / n_termos, 4),
+            )
+            for documento in melhores
+        ]
+
+    def buscar_primeiro(self, consulta: str) -> Optional[Dict[str, Any]]:
+        """Produto mais relevante, ou None."""
+        resultados = self.buscar(consulta, k=1)
+        return resultados[0].produto if resultados else None
+
+    def obter(self, chave: str) -> Optional[Dict[str, Any]]:
+        documento = self._posicao.get(chave)
+        return None if documento is None else self._produtos[documento]
+
+    def __len__(self) -> int:
+        return len(self._posicao)
+
+    def __contains__(self, chave: str) -> bool:
+        return chave in self._posicao
+
+    def estatisticas(self) -> Dict[str, Any]:
+        self._preparar()
+        return {
+            "produtos": len(self),
+            "vocabulario": len(self._postings),
+            "entradas_postings": sum(len(l) for l in self._postings.values()),
+            "variantes_aproximadas": len(self._delecoes),
+        }
+
+
+def _numero(texto: str) -> float:
+    """
+    Lê números no formato brasileiro ou americano: "1.299,90", "1,299.90",
+    "R$ 2999,90" e "2999.90" viram 1299.9, 1299.9, 2999.9 e 2999.9.
+    """
+    texto = texto.replace("R$", "").replace(" ", "").strip()
+    if "," in texto and "." in texto:
+        # O separador que aparece por último é o decimal
+        milhar = "." if texto.rfind(",") > texto.rfind(".") else ","
+        texto = texto.replace(milhar, "")
+    elif texto.count(".") > 1:
+        texto = texto.replace(".", "")  # "1.299.900": só milhares
+    return float(texto.replace(",", "."))
+
+
+def _normalizar_registro(registro: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+    """Converte uma linha de CSV/JSONL em (chave, produto)."""
+    produto = {k: v for k, v in registro.items() if v not in (None, "")}
+    for campo, tipo in CAMPOS_NUMERICOS.items():
+        if campo in produto:
+            valor = produto[campo]
+            if isinstance(valor, str):
+                valor = _numero(valor)
+            produto[campo] = tipo(float(valor)) if tipo is int else tipo(valor)
+    chave = produto.pop("chave", None) or produto.get("sku") or produto.get("id")
+    return str(chave or produto["nome"]).lower(), produto
+
+
+def buscar_varredura(
+    produtos: Dict[str, Dict[str, Any]], consulta: str, k: int = 5
+) -> List[Dict[str, Any]]:
+    """
+    Busca antiga (varre todo o catálogo comparando cada palavra com o nome),
+    estendida para devolver os k melhores; mantida para comparação.
+    """
+    palavras = tokenizar(consulta)
+    pontuados = []
+    for produto in produtos.values():
+        nome = produto["nome"].lower()
+        acertos = sum(1 for palavra in palavras if palavra in nome)
+        if acertos:
+            pontuados.append((acertos, produto))
+    return [p for _, p in heapq.nlargest(k, pontuados, key=lambda par: par[0])]
+
+
+def _gerar_catalogo(n: int, semente: int = 0) -> Dict[str, Dict[str, Any]]:
+    """Catálogo sintético para o benchmark."""
+    import random
+
+    gerador = random.Random(semente)
+    categorias = {
+        "informatica": ["notebook", "monitor", "teclado", "mouse", "ssd", "roteador"],
+        "celulares": ["smartphone", "carregador", "capinha", "pelicula"],
+        "acessorios": ["fone", "caixa de som", "smartwatch", "cabo usb"],
+        "eletrodomesticos": ["geladeira", "micro-ondas", "liquidificador", "cafeteira"],
+    }
+    marcas = [f"marca{i}" for i in range(300)]
+    adjetivos = ["gamer", "pro", "ultra", "max", "slim", "bluetooth", "premium", "lite"]
+    produtos = {}
+    for i in range(n):
+        categoria = gerador.choice(list(categorias))
+        tipo = gerador.choice(categorias[categoria])
+        nome = (
+            f"{tipo} {gerador.choice(marcas)} {gerador.choice(adjetivos)} "
+            f"modelo{gerador.randrange(n // 4 + 1)}"
+        )
+        produtos[f"sku{i}"] = {
+            "nome": nome,
+            "preco": round(gerador.uniform(20, 9000), 2),
+            "estoque": gerador.randrange(100),
+            "categoria": categoria,
+        }
+    return produtos
+
+
+def _benchmark(tamanhos: List[int]) -> None:
+    import statistics
+    import time
+
+    consultas = {
+        "exata": "quanto custa o notebook marca7 gamer",
+        "prefixo": "tem smartph marca12 no estoque",
+        "aproximada": "preço da geladera marca3",
+        "modelo": "info do monitor modelo123",
+        "comum": "notebook gamer",
+    }
+
+    def medir(funcao, repeticoes: int) -> Tuple[float, float]:
+        tempos = []
+        for _ in range(repeticoes):
+            inicio = time.perf_counter()
+            funcao()
+            tempos.append(time.perf_counter() - inicio)
+        tempos.sort()
+        return statistics.median(tempos), tempos[int(0.95 * (len(tempos) - 1))]
+
+    print("📦 BENCHMARK: ÍNDICE INVERTIDO DE PRODUTOS")
+    print("=" * 78)
+    for n in tamanhos:
+        produtos = _gerar_catalogo(n)
+        inicio = time.perf_counter()
+        indice = IndiceProdutos.de_dict(produtos)
+        indice._preparar()
+        construcao = time.perf_counter() - inicio
+        stats = indice.estatisticas()
+        print(
+            f"\n{n:,} produtos | construção {construcao:.1f}s | "
+            f"vocabulário {stats['vocabulario']:,} palavras"
+        )
+        print(
+            f"  {'consulta':<11} | {'p50 índice':>11} | {'p95 índice':>11} | "
+            f"{'varredura':>11} | top-1"
+        )
+        for nome, consulta in consultas.items():
+            p50, p95 = medir(lambda: indice.buscar(consulta, k=5), 20)
+            repeticoes = 3 if n <= 100_000 else 1
+            linear, _ = medir(lambda: buscar_varredura(produtos, consulta), repeticoes)
+            topo = indice.buscar(consulta, k=1)
+            print(
+                f"  {nome:<11} | {p50 * 1000:>9.2f}ms | {p95 * 1000:>9.2f}ms | "
+                f"{linear * 1000:>9.2f}ms | {topo[0].produto['nome'] if topo else '-'}"
+            )
+    print("\n💡 A varredura cresce com o catálogo; o índice só visita os produtos")
+    print("   que contêm as palavras da consulta.")
+
+
+if __name__ == "__main__":
+    import sys
+
+    _benchmark([int(n) for n in sys.argv[1:]] or [10_000, 100_000, 1_000_000])
@@ -0,0 +1,190 @@
+"""
+Chaves de cache estáveis entre processos e reinícios.
+
+O `hash()` embutido do Python usa uma semente aleatória por processo
+(PYTHONHASHSEED), então a mesma pergunta gera chaves diferentes em cada
+worker. Aqui a chave é derivada de forma canônica:
+
+1. O prompt é normalizado (Unicode NFC, espaços colapsados)
+2. A configuração do modelo é serializada em JSON canônico (chaves
+   ordenadas e marcadas com o tipo, floats padronizados, objetos LLM
+   reduzidos aos parâmetros que influenciam a resposta). Tipos sem forma
+   canônica levantam TypeError, a não ser que definam `__chave_cache__()`
+3. O resultado passa por BLAKE2b (hashlib, sem dependências extras)
+
+Uso:
+    chave = gerar_chave(prompt, {"model": "gpt-4o-mini", "temperature": 0.1})
+
+Benchmark:
+    python -m curso_crewai.chaves
+"""
+
+import dataclasses
+import enum
+import hashlib
+import json
+import unicodedata
+from typing import Any, Mapping, Optional
+
+VERSAO_CHAVE = "v2"
+
+# Atributos de objetos LLM (ChatOpenAI, crewai.LLM...) que mudam a resposta
+ATRIBUTOS_LLM = (
+    "model",
+    "model_name",
+    "temperature",
+    "max_tokens",
+    "top_p",
+    "frequency_penalty",
+    "presence_penalty",
+    "seed",
+    "stop",
+)
+
+
+def normalizar_prompt(prompt: str, minusculas: bool = False) -> str:
+    """Normaliza Unicode e espaços; opcionalmente converte para minúsculas."""
+    if not unicodedata.is_normalized("NFC", prompt):
+        prompt = unicodedata.normalize("NFC", prompt)
+    # split()/join é bem mais rápido que uma regex para colapsar espaços
+    texto = " ".join(prompt.split())
+    return texto.lower() if minusculas else texto
+
+
+def _chave_canonica(chave: Any) -> str:
+    """Chave de dicionário marcada com o tipo: {1: x} e {"1": x} diferem."""
+    if isinstance(chave, str):
+        return f"str:{chave}"
+    forma = json.dumps(_canonico(chave), sort_keys=True, ensure_ascii=False)
+    return f"{type(chave).__name__}:{forma}"
+
+
+def _canonico(valor: Any) -> Any:
+    """
+    Converte o valor para tipos JSON com representação determinística.
+
+    Raises:
+        TypeError: Para objetos sem forma canônica conhecida
+    """
+    if hasattr(valor, "__chave_cache__"):
+        return {"__objeto__": _canonico(valor.__chave_cache__())}
+    if isinstance(valor, enum.Enum):
+        return {"__enum__": f"{type(valor).__qualname__}.{valor.name}"}
+    if valor is None or isinstance(valor, (bool, int, str)):
+        return valor
+    if isinstance(valor, float):
+        # repr é o menor texto que reproduz o float; 1.0 e 1 ficam distintos
+        return {"__float__": repr(valor)}
+    if isinstance(valor, Mapping):
+        return {_chave_canonica(k): _canonico(v) for k, v in valor.items()}
+    if isinstance(valor, (list, tuple)):
+        return [_canonico(v) for v in valor]
+    if isinstance(valor, (set, frozenset)):
+        return sorted((_canonico(v) for v in valor), key=json.dumps)
+    if isinstance(valor, bytes):
+        return {"__bytes__": valor.hex()}
+    if dataclasses.is_dataclass(valor) and not isinstance(valor, type):
+        return _canonico(dataclasses.asdict(valor))
+    if hasattr(valor, "model_dump") and not _parece_llm(valor):
+        return _canonico(valor.model_dump())
+    if _parece_llm(valor):
+        atributos = {
+            nome: getattr(valor, nome)
+            for nome in ATRIBUTOS_LLM
+            if getattr(valor, nome, None) is not None
+        }
+        return {"__llm__": type(valor).__name__, **_canonico(atributos)}
+    # Objetos desconhecidos: o repr padrão inclui endereço de memória e só o
+    # nome da classe daria a mesma chave para valores diferentes
+    raise TypeError(
+        f"Sem forma canônica para {type(valor).__module__}."
+        f"{type(valor).__qualname__}: defina __chave_cache__() no objeto"
+    )
+
+
+def _parece_llm(valor: Any) -> bool:
+    return any(hasattr(valor, nome) for nome in ("model_name", "model")) and hasattr(
+        valor, "temperature"
+    )
+
+
+def serializar_config(config: Optional[Mapping[str, Any]]) -> str:
+    """Serializa a configuração do modelo em JSON canônico."""
+    return json.dumps(
+        _canonico(config or {}),
+        sort_keys=True,
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+
+
+def gerar_chave(
+    prompt: str,
+    config: Optional[Mapping[str, Any]] = None,
+    namespace: str = "",
+    minusculas: bool = False,
+    tamanho: int = 16,
+) -> str:
+    """
+    Gera a chave de cache para um prompt e sua configuração.
+
+    Args:
+        prompt: Texto enviado ao modelo
+        config: Parâmetros do modelo (ex.: llm_config de um agente)
+        namespace: Separa chaves de usos diferentes (ex.: "analise_curriculo")
+        minusculas: Ignora maiúsculas/minúsculas no prompt
+        tamanho: Bytes do digest (16 = 32 caracteres hexadecimais)
+
+    Returns:
+        str: Digest hexadecimal, igual em qualquer processo ou máquina
+    """
+    h = hashlib.blake2b(digest_size=tamanho, person=VERSAO_CHAVE.encode())
+    h.update(namespace.encode("utf-8"))
+    h.update(b"\x00")
+    h.update(serializar_config(config).encode("utf-8"))
+    h.update(b"\x00")
+    h.update(normalizar_prompt(prompt, minusculas).encode("utf-8"))
+    return h.hexdigest()
+
+
+def _benchmark() -> None:
+    """Mede o custo de gerar chaves para prompts de 1k a 100k caracteres."""
+    import random
+    import timeit
+
+    gerador = random.Random(0)
+    palavras = "análise cliente produto preço estoque entrega ação é não".split()
+    config = {"model": "gpt-4o-mini", "temperature": 0.1, "max_tokens": 800}
+
+    print("🔑 BENCHMARK: GERAÇÃO DE CHAVES DE CACHE")
+    print("=" * 72)
+    print(
+        f"{'tamanho':>10} | {'gerar_chave':>12} | {'só blake2b':>12} | "
+        f"{'md5':>10} | {'hash()':>10}"
+    )
+    print("-" * 72)
+    for tamanho in (1_000, 10_000, 100_000):
+        texto = ""
+        while len(texto) < tamanho:
+            texto += gerador.choice(palavras) + " "
+        texto = texto[:tamanho]
+        dados = texto.encode("utf-8")
+        repeticoes = max(10, 200_000 // tamanho)
+
+        def medir(funcao):
+            return min(timeit.repeat(funcao, number=repeticoes, repeat=3)) / repeticoes
+
+        t_chave = medir(lambda: gerar_chave(texto, config))
+        t_blake = medir(lambda: hashlib.blake2b(dados, digest_size=16).hexdigest())
+        t_md5 = medir(lambda: hashlib.md5(dados).hexdigest())
+        t_hash = medir(lambda: hash(texto + "x"))  # concatena para não usar cache
+        print(
+            f"{tamanho:>10,} | {t_chave * 1e6:>10.1f}µs | {t_blake * 1e6:>10.1f}µs | "
+            f"{t_md5 * 1e6:>8.1f}µs | {t_hash * 1e6:>8.1f}µs"
+        )
+    print("\n💡 A normalização domina o custo; o digest em si é desprezível")
+    print("   diante de uma chamada de LLM (centenas de ms).")
+
+
+if __name__ == "__main__":
+    _benchmark()
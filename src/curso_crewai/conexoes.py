@@ -0,0 +1,424 @@
+"""
+Pool de conexões HTTP compartilhado por todos os clientes de LLM do processo.
+
+Cada `OpenAI()` ou `ChatOpenAI(...)` cria o próprio cliente httpx: conexões
+novas, handshake TLS novo e nenhum keep-alive aproveitado entre eles. Aqui
+há um único cliente por processo (um síncrono e um assíncrono), com limites
+e timeouts configuráveis e HTTP/2 quando o pacote `h2` está instalado
+(`pip install httpx[http2]`). Todos os clientes criados por
+`cliente_openai`, `chat_openai` e o LiteLLM (usado pelo CrewAI) passam a
+reaproveitar as mesmas conexões.
+
+As métricas contam requisições, conexões abertas e handshakes TLS, usando o
+trace do httpcore; a diferença entre requisições e conexões é o reuso.
+
+Configuração por variáveis de ambiente (todas opcionais):
+    CURSO_HTTP_MAX_CONEXOES=100     CURSO_HTTP_MAX_KEEPALIVE=20
+    CURSO_HTTP_KEEPALIVE_S=30       CURSO_HTTP_HTTP2=1
+    CURSO_HTTP_TIMEOUT_CONEXAO_S=5  CURSO_HTTP_TIMEOUT_LEITURA_S=60
+
+Uso:
+    from curso_crewai.conexoes import chat_openai, instalar_litellm, metricas
+
+    instalar_litellm()                       # agentes do CrewAI
+    llm = chat_openai(model="gpt-4o-mini")   # LangChain
+    print(metricas.resumo()["taxa_reuso"])
+
+Teste contra um servidor local compatível com a API da OpenAI:
+    python -m curso_crewai.conexoes
+"""
+
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+
+
+def _h2_disponivel() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+@dataclass
+class ConfigConexoes:
+    """Limites do pool e timeouts (segundos) do cliente compartilhado."""
+
+    max_conexoes: int = 100
+    max_keepalive: int = 20
+    keepalive_s: float = 30.0
+    timeout_conexao: float = 5.0
+    timeout_leitura: float = 60.0
+    timeout_escrita: float = 30.0
+    timeout_pool: float = 10.0
+    http2: bool = True
+
+    @classmethod
+    def do_ambiente(cls) -> "ConfigConexoes":
+        padrao = cls()
+        return cls(
+            max_conexoes=int(os.getenv("CURSO_HTTP_MAX_CONEXOES", padrao.max_conexoes)),
+            max_keepalive=int(
+                os.getenv("CURSO_HTTP_MAX_KEEPALIVE", padrao.max_keepalive)
+            ),
+            keepalive_s=float(os.getenv("CURSO_HTTP_KEEPALIVE_S", padrao.keepalive_s)),
+            timeout_conexao=float(
+                os.getenv("CURSO_HTTP_TIMEOUT_CONEXAO_S", padrao.timeout_conexao)
+            ),
+            timeout_leitura=float(
+                os.getenv("CURSO_HTTP_TIMEOUT_LEITURA_S", padrao.timeout_leitura)
+            ),
+            http2=os.getenv("CURSO_HTTP_HTTP2", "1") not in ("0", "false", "nao"),
+        )
+
+    def argumentos_httpx(self) -> Dict[str, Any]:
+        import httpx
+
+        return {
+            "limits": httpx.Limits(
+                max_connections=self.max_conexoes,
+                max_keepalive_connections=self.max_keepalive,
+                keepalive_expiry=self.keepalive_s,
+            ),
+            "timeout": httpx.Timeout(
+                connect=self.timeout_conexao,
+                read=self.timeout_leitura,
+                write=self.timeout_escrita,
+                pool=self.timeout_pool,
+            ),
+            # Sem o pacote h2 o httpx recusa http2=True
+            "http2": self.http2 and _h2_disponivel(),
+        }
+
+
+class MetricasConexoes:
+    """Requisições, conexões novas e handshakes vistos pelo trace do httpcore."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.zerar()
+
+    def zerar(self) -> None:
+        with self._lock:
+            self.requisicoes = 0
+            self.conexoes_novas = 0
+            self.handshakes_tls = 0
+            self.requisicoes_http2 = 0
+            self.tempo_conexao = 0.0
+            self._inicios: Dict[int, float] = {}
+
+    def registrar_evento(self, evento: str, info: Dict[str, Any]) -> None:
+        agora = time.perf_counter()
+        with self._lock:
+            if evento == "connection.connect_tcp.started":
+                self._inicios[threading.get_ident()] = agora
+            elif evento == "connection.connect_tcp.complete":
+                self.conexoes_novas += 1
+                inicio = self._inicios.pop(threading.get_ident(), None)
+                if inicio is not None:
+                    self.tempo_conexao += agora - inicio
+            elif evento == "connection.start_tls.complete":
+                self.handshakes_tls += 1
+            elif evento.endswith("send_request_headers.started"):
+                self.requisicoes += 1
+                if evento.startswith("http2."):
+                    self.requisicoes_http2 += 1
+
+    def trace(self, evento: str, info: Dict[str, Any]) -> None:
+        self.registrar_evento(evento, info)
+
+    async def trace_async(self, evento: str, info: Dict[str, Any]) -> None:
+        self.registrar_evento(evento, info)
+
+    def resumo(self) -> Dict[str, Any]:
+        with self._lock:
+            reutilizadas = max(self.requisicoes - self.conexoes_novas, 0)
+            return {
+                "requisicoes": self.requisicoes,
+                "conexoes_novas": self.conexoes_novas,
+                "requisicoes_reutilizando": reutilizadas,
+                "taxa_reuso": (
+                    reutilizadas / self.requisicoes * 100 if self.requisicoes else 0.0
+                ),
+                "handshakes_tls": self.handshakes_tls,
+                "requisicoes_http2": self.requisicoes_http2,
+                "conexao_media_ms": (
+                    self.tempo_conexao / self.conexoes_novas * 1000
+                    if self.conexoes_novas
+                    else 0.0
+                ),
+            }
+
+
+# Métricas do cliente compartilhado
+metricas = MetricasConexoes()
+
+
+def criar_cliente(
+    config: Optional[ConfigConexoes] = None,
+    metricas_cliente: Optional[MetricasConexoes] = None,
+    assincrono: bool = False,
+):
+    """Cria um cliente httpx com o pool configurado e o trace das métricas."""
+    import httpx
+
+    config = config or ConfigConexoes.do_ambiente()
+    metricas_cliente = metricas_cliente or metricas
+
+    if assincrono:
+        from curso_crewai.limite_taxa import esperar_vez_http
+
+        async def anexar_trace_async(request):
+            request.extensions["trace"] = metricas_cliente.trace_async
+
+        # Chamadas async do LiteLLM esperam a vez do limite de taxa aqui
+        return httpx.AsyncClient(
+            event_hooks={"request": [esperar_vez_http, anexar_trace_async]},
+            **config.argumentos_httpx(),
+        )
+
+    def anexar_trace(request):
+        request.extensions["trace"] = metricas_cliente.trace
+
+    return httpx.Client(
+        event_hooks={"request": [anexar_trace]}, **config.argumentos_httpx()
+    )
+
+
+_clientes: Dict[str, Any] = {}
+_lock_clientes = threading.Lock()
+
+
+def cliente_http():
+    """Cliente httpx síncrono compartilhado pelo processo."""
+    with _lock_clientes:
+        if "sync" not in _clientes:
+            _clientes["sync"] = criar_cliente()
+        return _clientes["sync"]
+
+
+def cliente_http_async():
+    """
+    Cliente httpx assíncrono compartilhado. As conexões ficam presas ao
+    event loop que as abriu: use um único loop (o `asyncio.run` do programa).
+    """
+    with _lock_clientes:
+        if "async" not in _clientes:
+            _clientes["async"] = criar_cliente(assincrono=True)
+        return _clientes["async"]
+
+
+def fechar_clientes() -> None:
+    """Fecha o cliente síncrono e esquece os dois (recriados no próximo uso)."""
+    with _lock_clientes:
+        sincrono = _clientes.pop("sync", None)
+        _clientes.pop("async", None)
+    if sincrono is not None:
+        sincrono.close()
+
+
+def cliente_openai(**kwargs):
+    """`openai.OpenAI(...)` usando o pool compartilhado."""
+    from openai import OpenAI
+
+    return OpenAI(http_client=cliente_http(), **kwargs)
+
+
+def chat_openai(**kwargs):
+    """
+    `ChatOpenAI(...)` do LangChain usando o pool compartilhado e o limite de
+    taxa do processo (`limite_taxa.limitador_padrao`).
+    """
+    from langchain_openai import ChatOpenAI
+
+    from curso_crewai.limite_taxa import callback_langchain
+
+    callbacks = [*(kwargs.pop("callbacks", None) or []), callback_langchain()]
+    return ChatOpenAI(
+        http_client=cliente_http(),
+        http_async_client=cliente_http_async(),
+        callbacks=callbacks,
+        **kwargs,
+    )
+
+
+def instalar_litellm() -> bool:
+    """
+    Faz o LiteLLM (e portanto os agentes do CrewAI) usar o pool
+    compartilhado e o limite de taxa do processo. Retorna False se o LiteLLM
+    não estiver instalado.
+    """
+    from curso_crewai import limite_taxa
+
+    try:
+        import litellm
+    except ImportError:
+        return False
+    litellm.client_session = cliente_http()
+    litellm.aclient_session = cliente_http_async()
+    limite_taxa.instalar_litellm(limite_taxa.limitador_padrao(), espera_no_cliente=True)
+    return True
+
+
+# =============================================================================
+# SERVIDOR LOCAL COMPATÍVEL COM A API DA OPENAI (para testes)
+# =============================================================================
+
+
+class _ManipuladorOpenAI(BaseHTTPRequestHandler):
+    """Respostas fixas para chat, moderação e listagem de modelos."""
+
+    # HTTP/1.1 com Content-Length: o cliente pode manter a conexão aberta
+    protocol_version = "HTTP/1.1"
+    # Cabeçalho e corpo num único envio, sem esperar o ACK atrasado do TCP
+    disable_nagle_algorithm = True
+    wbufsize = 64 * 1024
+
+    def log_message(self, formato: str, *args: Any) -> None:
+        pass
+
+    def _responder(self, corpo: Dict[str, Any], status: int = 200) -> None:
+        dados = json.dumps(corpo).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(dados)))
+        self.end_headers()
+        self.wfile.write(dados)
+
+    def do_GET(self) -> None:
+        if self.path.rstrip("/").endswith("/models"):
+            modelos = [{"id": m, "object": "model"} for m in ("gpt-4o-mini", "gpt-4o")]
+            self._responder({"object": "list", "data": modelos})
+        else:
+            self._responder({"error": {"message": "não encontrado"}}, 404)
+
+    def do_POST(self) -> None:
+        tamanho = int(self.headers.get("Content-Length", 0))
+        pedido = json.loads(self.rfile.read(tamanho) or b"{}")
+        self.server.contar_conexao(self.client_address)
+        if self.server.latencia:
+            time.sleep(self.server.latencia)
+
+        if self.path.endswith("/chat/completions"):
+            self._responder(
+                {
+                    "id": "chatcmpl-local",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": pedido.get("model", "gpt-4o-mini"),
+                    "choices": [
+                        {
+                            "index": 0,
+                            "message": {"role": "assistant", "content": "OK"},
+                            "finish_reason": "stop",
+                        }
+                    ],
+                    "usage": {
+                        "prompt_tokens": 10,
+                        "completion_tokens": 1,
+                        "total_tokens": 11,
+                    },
+                }
+            )
+        elif self.path.endswith("/moderations"):
+            self._responder(
+                {
+                    "id": "modr-local",
+                    "model": "omni-moderation-latest",
+                    "results": [
+                        {"flagged": False, "categories": {}, "category_scores": {}}
+                    ],
+                }
+            )
+        else:
+            self._responder({"error": {"message": "não encontrado"}}, 404)
+
+
+class ServidorOpenAILocal(ThreadingHTTPServer):
+    """
+    Servidor mínimo que imita a API da OpenAI, para medir o reuso de
+    conexões sem gastar tokens. Conta as conexões TCP que recebeu.
+
+    Uso:
+        with ServidorOpenAILocal() as servidor:
+            servidor.iniciar_em_thread()
+            cliente = cliente_openai(api_key="sk-local", base_url=servidor.url)
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host: str = "127.0.0.1", porta: int = 0, latencia: float = 0):
+        super().__init__((host, porta), _ManipuladorOpenAI)
+        self.latencia = latencia
+        self._enderecos = set()
+        self._lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        host, porta = self.server_address[:2]
+        return f"http://{host}:{porta}/v1"
+
+    @property
+    def conexoes_recebidas(self) -> int:
+        return len(self._enderecos)
+
+    def contar_conexao(self, endereco: Any) -> None:
+        # Cada conexão TCP vem de uma porta de origem diferente
+        with self._lock:
+            self._enderecos.add(endereco)
+
+    def iniciar_em_thread(self) -> threading.Thread:
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return thread
+
+
+def _benchmark(requisicoes: int = 200) -> None:
+    import httpx
+
+    corpo = {"model": "gpt-4o-mini", "messages": [{"role": "user", "content": "oi"}]}
+    with ServidorOpenAILocal() as servidor:
+        servidor.iniciar_em_thread()
+        url = f"{servidor.url}/chat/completions"
+
+        # Antes: um cliente (e uma conexão) por chamada
+        inicio = time.perf_counter()
+        for _ in range(requisicoes):
+            with httpx.Client() as cliente:
+                cliente.post(url, json=corpo).raise_for_status()
+        isolado = time.perf_counter() - inicio
+        conexoes_isolado = servidor.conexoes_recebidas
+
+        # Depois: o cliente compartilhado
+        metricas.zerar()
+        inicio = time.perf_counter()
+        for _ in range(requisicoes):
+            cliente_http().post(url, json=corpo).raise_for_status()
+        compartilhado = time.perf_counter() - inicio
+        conexoes_compartilhado = servidor.conexoes_recebidas - conexoes_isolado
+
+    resumo = metricas.resumo()
+    print(f"{requisicoes} chamadas a {servidor.url}")
+    print(
+        f"  cliente por chamada: {isolado * 1000 / requisicoes:.2f}ms/chamada, "
+        f"{conexoes_isolado} conexões"
+    )
+    print(
+        f"  cliente compartilhado: {compartilhado * 1000 / requisicoes:.2f}ms/chamada, "
+        f"{conexoes_compartilhado} conexões"
+    )
+    print(
+        f"  métricas: {resumo['conexoes_novas']} conexões novas, "
+        f"reuso {resumo['taxa_reuso']:.1f}%, "
+        f"conexão média {resumo['conexao_media_ms']:.2f}ms"
+    )
+
+
+if __name__ == "__main__":
+    _benchmark()
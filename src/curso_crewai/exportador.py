@@ -0,0 +1,746 @@
+"""
+Registro de métricas (contadores, medidores, histogramas) e endpoint
+`/metrics` no formato OpenMetrics, para o Prometheus coletar.
+
+As métricas dos exemplos (`MonitorPerformance`, `IntelligentCache`,
+`CrewAIOptimizer`, `MetricasExecucao`, `AgenteOtimizadoTemplate`) só
+viravam texto com emoji no terminal. Aqui todos alimentam um registro único,
+com rótulos de agente, modelo, tarefa e camada de cache:
+
+- No caminho da requisição só há um `dict.get` pela série e um incremento
+  sob o lock dela; nada é formatado nem alocado depois da primeira vez.
+- O que já é contado em outro lugar (hits por camada do cache, gasto do
+  orçamento) não é duplicado: coletores leem os valores na hora da coleta.
+- Cada família aceita no máximo `max_series` combinações de rótulos; as
+  excedentes vão para a série `outros`, para um rótulo com texto livre não
+  explodir a memória nem o Prometheus.
+
+Uso:
+    from curso_crewai import exportador
+
+    exportador.observar_execucao("pesquisador", 2.3, modelo="gpt-4o-mini")
+    exportador.observar_cache(cache, nome="respostas")
+    servidor = exportador.iniciar_servidor(porta=9464)
+    # curl -H 'Accept: application/openmetrics-text' localhost:9464/metrics
+
+Com CURSO_METRICAS_PORTA definida, `servidor_padrao()` sobe o endpoint uma
+vez por processo (os exemplos das aulas chamam no início).
+"""
+
+import bisect
+import math
+import os
+import re
+import threading
+import time
+import weakref
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+TIPO_OPENMETRICS = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+TIPO_PROMETHEUS = "text/plain; version=0.0.4; charset=utf-8"
+
+# Limites (segundos) pensados para chamadas de LLM: de 100ms a 5 minutos
+LIMITES_DURACAO = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+ROTULO_EXCEDENTE = "outros"
+PORTA_PADRAO = 9464
+MAX_ATALHOS = 4096
+
+_NOME_VALIDO = re.compile(r"^[a-zA-Z_:][a-zA-Z0-9_:]*$")
+_ROTULO_VALIDO = re.compile(r"^[a-zA-Z_][a-zA-Z0-9_]*$")
+
+
+def _escapar_rotulo(valor: str) -> str:
+    return valor.replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n")
+
+
+def _escapar_ajuda(texto: str) -> str:
+    return texto.replace("\\", r"\\").replace("\n", r"\n")
+
+
+def _formatar(valor: float) -> str:
+    if math.isinf(valor):
+        return "+Inf" if valor > 0 else "-Inf"
+    if math.isnan(valor):
+        return "NaN"
+    if float(valor).is_integer() and abs(valor) < 1e15:
+        return str(int(valor))
+    return repr(float(valor))
+
+
+def _formatar_rotulos(nomes: Sequence[str], valores: Sequence[str]) -> str:
+    if not nomes:
+        return ""
+    pares = ",".join(
+        f'{nome}="{_escapar_rotulo(valor)}"' for nome, valor in zip(nomes, valores)
+    )
+    return "{" + pares + "}"
+
+
+# Família montada a partir dos coletores: (tipo, ajuda, [(rótulos, valor)])
+_Coletada = Tuple[str, str, List[Tuple[Dict[str, str], float]]]
+
+
+class Amostra(NamedTuple):
+    """Valor lido por um coletor no momento da coleta."""
+
+    nome: str
+    tipo: str  # "counter" ou "gauge"
+    ajuda: str
+    rotulos: Dict[str, str]
+    valor: float
+
+
+# =============================================================================
+# SÉRIES
+# =============================================================================
+
+
+class _Serie:
+    """Valor de um contador ou medidor para uma combinação de rótulos."""
+
+    __slots__ = ("valor", "_lock")
+
+    def __init__(self) -> None:
+        self.valor = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, quantidade: float = 1.0) -> None:
+        with self._lock:
+            self.valor += quantidade
+
+    def dec(self, quantidade: float = 1.0) -> None:
+        with self._lock:
+            self.valor -= quantidade
+
+    def set(self, valor: float) -> None:
+        self.valor = float(valor)
+
+
+class _SerieHistograma:
+    """Contagens por faixa, soma e total de um histograma."""
+
+    __slots__ = ("limites", "contagens", "soma", "_lock")
+
+    def __init__(self, limites: Tuple[float, ...]) -> None:
+        self.limites = limites
+        # Uma posição por limite, mais a do +Inf
+        self.contagens = [0] * (len(limites) + 1)
+        self.soma = 0.0
+        self._lock = threading.Lock()
+
+    def observar(self, valor: float) -> None:
+        posicao = bisect.bisect_left(self.limites, valor)
+        with self._lock:
+            self.contagens[posicao] += 1
+            self.soma += valor
+
+    def instantaneo(self) -> Tuple[List[int], float]:
+        with self._lock:
+            return list(self.contagens), self.soma
+
+
+# =============================================================================
+# FAMÍLIAS
+# =============================================================================
+
+
+class Familia:
+    """
+    Métrica com nome, tipo e rótulos; cada combinação de valores dos
+    rótulos é uma série. Sem rótulos, a própria família aceita
+    `inc`/`set`/`observar`.
+    """
+
+    def __init__(
+        self,
+        nome: str,
+        tipo: str,
+        ajuda: str,
+        rotulos: Sequence[str] = (),
+        limites: Optional[Sequence[float]] = None,
+        max_series: int = 1000,
+    ):
+        if not _NOME_VALIDO.match(nome):
+            raise ValueError(f"Nome de métrica inválido: {nome!r}")
+        for rotulo in rotulos:
+            if not _ROTULO_VALIDO.match(rotulo) or rotulo == "le":
+                raise ValueError(f"Rótulo inválido: {rotulo!r}")
+        if tipo == "counter" and nome.endswith("_total"):
+            nome = nome[: -len("_total")]
+        self.nome = nome
+        self.tipo = tipo
+        self.ajuda = ajuda
+        self.nomes_rotulos = tuple(rotulos)
+        self.limites = tuple(sorted(limites or LIMITES_DURACAO))
+        self.max_series = max_series
+        self._series: Dict[Tuple[str, ...], Any] = {}
+        self._lock = threading.Lock()
+
+    def _nova_serie(self) -> Any:
+        if self.tipo == "histogram":
+            return _SerieHistograma(self.limites)
+        return _Serie()
+
+    def rotulos(self, *valores: Any, **por_nome: Any) -> Any:
+        """Série da combinação de rótulos (criada no primeiro uso)."""
+        if por_nome:
+            valores = tuple(por_nome.get(nome, "") for nome in self.nomes_rotulos)
+        serie = self._series.get(valores)
+        if serie is not None:
+            return serie
+        chave = tuple(map(str, valores))
+        if len(chave) != len(self.nomes_rotulos):
+            raise ValueError(
+                f"{self.nome} espera os rótulos {self.nomes_rotulos}, "
+                f"recebeu {len(chave)} valor(es)"
+            )
+        with self._lock:
+            serie = self._series.get(chave)
+            if serie is None:
+                if len(self._series) >= self.max_series:
+                    chave = (ROTULO_EXCEDENTE,) * len(self.nomes_rotulos)
+                    serie = self._series.get(chave)
+                if serie is None:
+                    serie = self._series[chave] = self._nova_serie()
+        return serie
+
+    def inc(self, quantidade: float = 1.0) -> None:
+        self.rotulos().inc(quantidade)
+
+    def set(self, valor: float) -> None:
+        self.rotulos().set(valor)
+
+    def observar(self, valor: float) -> None:
+        self.rotulos().observar(valor)
+
+    def series(self) -> List[Tuple[Tuple[str, ...], Any]]:
+        with self._lock:
+            return list(self._series.items())
+
+    def linhas(self, openmetrics: bool = True) -> Iterable[str]:
+        """Linhas de texto da família (cabeçalho e amostras)."""
+        series = self.series()
+        if self.tipo == "counter":
+            amostra = f"{self.nome}_total"
+            cabecalho = self.nome if openmetrics else amostra
+        else:
+            amostra = cabecalho = self.nome
+        yield f"# TYPE {cabecalho} {self.tipo}"
+        yield f"# HELP {cabecalho} {_escapar_ajuda(self.ajuda)}"
+        for valores, serie in series:
+            rotulos = _formatar_rotulos(self.nomes_rotulos, valores)
+            if self.tipo != "histogram":
+                yield f"{amostra}{rotulos} {_formatar(serie.valor)}"
+                continue
+            contagens, soma = serie.instantaneo()
+            nomes = self.nomes_rotulos + ("le",)
+            acumulado = 0
+            for limite, contagem in zip(self.limites + (math.inf,), contagens):
+                acumulado += contagem
+                faixa = "+Inf" if math.isinf(limite) else repr(float(limite))
+                rotulos_faixa = _formatar_rotulos(nomes, valores + (faixa,))
+                yield f"{self.nome}_bucket{rotulos_faixa} {acumulado}"
+            yield f"{self.nome}_count{rotulos} {acumulado}"
+            yield f"{self.nome}_sum{rotulos} {_formatar(soma)}"
+
+
+# =============================================================================
+# REGISTRO
+# =============================================================================
+
+
+class Registro:
+    """Famílias de métricas e coletores de um processo."""
+
+    def __init__(self) -> None:
+        self._familias: Dict[str, Familia] = {}
+        self._coletores: List[Tuple[Callable[..., Iterable[Amostra]], Any]] = []
+        self._lock = threading.Lock()
+        self._atalhos: Dict[Tuple[Any, ...], Any] = {}
+        self.erros_coleta = 0
+
+    def _familia(self, nome: str, tipo: str, ajuda: str, **opcoes: Any) -> Familia:
+        familia = self._familias.get(nome)
+        if familia is None:
+            with self._lock:
+                familia = self._familias.get(nome)
+                if familia is None:
+                    familia = Familia(nome, tipo, ajuda, **opcoes)
+                    self._familias[nome] = familia
+        if familia.tipo != tipo:
+            raise ValueError(f"{nome} já registrada como {familia.tipo}")
+        return familia
+
+    def contador(self, nome: str, ajuda: str, rotulos: Sequence[str] = ()) -> Familia:
+        """Contador (só cresce); o sufixo `_total` é acrescentado na saída."""
+        return self._familia(nome, "counter", ajuda, rotulos=rotulos)
+
+    def medidor(self, nome: str, ajuda: str, rotulos: Sequence[str] = ()) -> Familia:
+        """Valor que sobe e desce (ex.: itens em cache, orçamento gasto)."""
+        return self._familia(nome, "gauge", ajuda, rotulos=rotulos)
+
+    def histograma(
+        self,
+        nome: str,
+        ajuda: str,
+        rotulos: Sequence[str] = (),
+        limites: Sequence[float] = LIMITES_DURACAO,
+    ) -> Familia:
+        """Distribuição em faixas cumulativas (`le`), com soma e contagem."""
+        return self._familia(nome, "histogram", ajuda, rotulos=rotulos, limites=limites)
+
+    def atalho(self, chave: Tuple[Any, ...], criar: Callable[[], Any]) -> Any:
+        """
+        Séries já resolvidas para uma combinação de rótulos usada sempre
+        junta (ex.: contador + histograma de uma execução): uma consulta só
+        no caminho da requisição. Limitado a `MAX_ATALHOS` combinações.
+        """
+        valor = self._atalhos.get(chave)
+        if valor is None:
+            valor = criar()
+            if len(self._atalhos) < MAX_ATALHOS:
+                self._atalhos[chave] = valor
+        return valor
+
+    def coletor(
+        self, funcao: Callable[..., Iterable[Amostra]], dono: Any = None
+    ) -> None:
+        """
+        Registra uma função chamada a cada coleta. Com `dono`, ela recebe o
+        objeto como argumento e guarda só uma referência fraca: quando o
+        dono é descartado, o coletor sai junto.
+        """
+        referencia = weakref.ref(dono) if dono is not None else None
+        with self._lock:
+            self._coletores.append((funcao, referencia))
+
+    def _coletar(self) -> Dict[str, _Coletada]:
+        with self._lock:
+            coletores = list(self._coletores)
+        vivos = []
+        familias: Dict[str, _Coletada] = {}
+        for funcao, referencia in coletores:
+            if referencia is not None:
+                dono = referencia()
+                if dono is None:
+                    continue
+            vivos.append((funcao, referencia))
+            try:
+                amostras = list(funcao(dono) if referencia is not None else funcao())
+            except Exception:
+                # Um coletor com defeito não derruba a coleta inteira
+                self.erros_coleta += 1
+                continue
+            for amostra in amostras:
+                nome = amostra.nome
+                if amostra.tipo == "counter" and nome.endswith("_total"):
+                    nome = nome[: -len("_total")]
+                tipo, ajuda, valores = familias.setdefault(
+                    nome, (amostra.tipo, amostra.ajuda, [])
+                )
+                valores.append((amostra.rotulos, amostra.valor))
+        if len(vivos) != len(coletores):
+            with self._lock:
+                self._coletores = [c for c in self._coletores if c in vivos]
+        return familias
+
+    def exportar(self, openmetrics: bool = True) -> str:
+        """Texto no formato OpenMetrics (ou Prometheus 0.0.4)."""
+        linhas: List[str] = []
+        with self._lock:
+            familias = list(self._familias.values())
+        for familia in familias:
+            linhas.extend(familia.linhas(openmetrics))
+
+        for nome, (tipo, ajuda, valores) in self._coletar().items():
+            if nome in self._familias:
+                continue
+            amostra = f"{nome}_total" if tipo == "counter" else nome
+            cabecalho = nome if tipo == "counter" and openmetrics else amostra
+            linhas.append(f"# TYPE {cabecalho} {tipo}")
+            linhas.append(f"# HELP {cabecalho} {_escapar_ajuda(ajuda)}")
+            for rotulos, valor in valores:
+                texto = _formatar_rotulos(
+                    list(rotulos), [str(v) for v in rotulos.values()]
+                )
+                linhas.append(f"{amostra}{texto} {_formatar(valor)}")
+
+        if openmetrics:
+            linhas.append("# EOF")
+        return "\n".join(linhas) + "\n"
+
+
+# =============================================================================
+# SERVIDOR /metrics
+# =============================================================================
+
+
+class _ManipuladorMetricas(BaseHTTPRequestHandler):
+    """Responde GET /metrics com o texto do registro."""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, formato: str, *args: Any) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        if self.path.split("?")[0].rstrip("/") != "/metrics":
+            corpo = b"Metricas em /metrics\n"
+            self.send_response(404)
+            self.send_header("Content-Type", "text/plain; charset=utf-8")
+        else:
+            aceita = self.headers.get("Accept", "")
+            openmetrics = "application/openmetrics-text" in aceita
+            corpo = self.server.registro.exportar(openmetrics).encode("utf-8")
+            self.send_response(200)
+            self.send_header(
+                "Content-Type", TIPO_OPENMETRICS if openmetrics else TIPO_PROMETHEUS
+            )
+        self.send_header("Content-Length", str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+
+class ServidorMetricas(ThreadingHTTPServer):
+    """
+    Endpoint HTTP local com as métricas do registro. Formato OpenMetrics
+    quando o cliente pede (`Accept: application/openmetrics-text`, como o
+    Prometheus faz); senão, o formato texto 0.0.4.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        porta: int = PORTA_PADRAO,
+        registro: Optional[Registro] = None,
+    ):
+        super().__init__((host, porta), _ManipuladorMetricas)
+        self.registro = registro if registro is not None else registro_padrao()
+
+    @property
+    def url(self) -> str:
+        host, porta = self.server_address[:2]
+        return f"http://{host}:{porta}/metrics"
+
+    def iniciar_em_thread(self) -> threading.Thread:
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return thread
+
+
+def iniciar_servidor(
+    porta: Optional[int] = None,
+    host: str = "127.0.0.1",
+    registro: Optional[Registro] = None,
+) -> ServidorMetricas:
+    """Sobe o endpoint /metrics numa thread (porta 0: qualquer livre)."""
+    if porta is None:
+        porta = int(os.getenv("CURSO_METRICAS_PORTA", str(PORTA_PADRAO)))
+    servidor = ServidorMetricas(host, porta, registro)
+    servidor.iniciar_em_thread()
+    return servidor
+
+
+_registro_padrao: Optional[Registro] = None
+_servidor_padrao: Optional[ServidorMetricas] = None
+_lock_padrao = threading.Lock()
+
+
+def registro_padrao() -> Registro:
+    """Registro compartilhado do processo."""
+    global _registro_padrao
+    with _lock_padrao:
+        if _registro_padrao is None:
+            _registro_padrao = Registro()
+        return _registro_padrao
+
+
+def servidor_padrao() -> Optional[ServidorMetricas]:
+    """
+    Endpoint do registro padrão na porta CURSO_METRICAS_PORTA (e host
+    CURSO_METRICAS_HOST), iniciado uma vez; None se a variável não existe.
+    """
+    global _servidor_padrao
+    porta = os.getenv("CURSO_METRICAS_PORTA")
+    if not porta:
+        return None
+    registro = registro_padrao()
+    with _lock_padrao:
+        if _servidor_padrao is None:
+            host = os.getenv("CURSO_METRICAS_HOST", "127.0.0.1")
+            _servidor_padrao = iniciar_servidor(int(porta), host, registro)
+        return _servidor_padrao
+
+
+# =============================================================================
+# MÉTRICAS DOS EXEMPLOS
+# =============================================================================
+
+
+def _execucoes(registro: Registro) -> Familia:
+    return registro.contador(
+        "curso_agente_execucoes",
+        "Execuções de agentes/tarefas por resultado.",
+        ("agente", "modelo", "tarefa", "resultado"),
+    )
+
+
+def _duracao(registro: Registro) -> Familia:
+    return registro.histograma(
+        "curso_agente_duracao_segundos",
+        "Duração das execuções de agentes/tarefas, em segundos.",
+        ("agente", "modelo", "tarefa"),
+    )
+
+
+def _tokens(registro: Registro) -> Familia:
+    return registro.contador(
+        "curso_llm_tokens",
+        "Tokens consumidos por tipo (entrada, saida, cache ou total).",
+        ("agente", "modelo", "tarefa", "tipo"),
+    )
+
+
+def _custo(registro: Registro) -> Familia:
+    return registro.contador(
+        "curso_llm_custo_dolares",
+        "Custo das chamadas de LLM, em dólares.",
+        ("agente", "modelo", "tarefa"),
+    )
+
+
+_TIPOS_TOKENS = ("entrada", "saida", "cache", "total")
+
+
+def observar_execucao(
+    agente: str,
+    duracao: float,
+    sucesso: bool = True,
+    modelo: str = "",
+    tarefa: str = "",
+    registro: Optional[Registro] = None,
+) -> None:
+    """Conta uma execução e registra a duração no histograma."""
+    registro = registro or registro_padrao()
+    resultado = "sucesso" if sucesso else "falha"
+    contador, histograma = registro.atalho(
+        ("execucao", agente, modelo, tarefa, resultado),
+        lambda: (
+            _execucoes(registro).rotulos(agente, modelo, tarefa, resultado),
+            _duracao(registro).rotulos(agente, modelo, tarefa),
+        ),
+    )
+    contador.inc()
+    histograma.observar(duracao)
+
+
+def observar_uso(
+    agente: str,
+    modelo: str = "",
+    tarefa: str = "",
+    entrada: int = 0,
+    saida: int = 0,
+    cache: int = 0,
+    total: int = 0,
+    custo: float = 0.0,
+    registro: Optional[Registro] = None,
+) -> None:
+    """
+    Soma tokens e custo de uma chamada. `total` é só para quem não sabe
+    separar entrada e saída (entra com tipo="total").
+    """
+    registro = registro or registro_padrao()
+
+    def criar() -> Tuple[Any, ...]:
+        tokens = _tokens(registro)
+        return tuple(
+            tokens.rotulos(agente, modelo, tarefa, tipo) for tipo in _TIPOS_TOKENS
+        ) + (
+            _custo(registro).rotulos(agente, modelo, tarefa),
+        )
+
+    series = registro.atalho(("uso", agente, modelo, tarefa), criar)
+    for serie, quantidade in zip(series, (entrada, saida, cache, total, custo)):
+        if quantidade:
+            serie.inc(quantidade)
+
+
+def _amostras_cache(cache: Any, nome: str) -> Iterable[Amostra]:
+    backend = cache.backend
+    # BackendCamadas: hits separados por camada; senão, uma camada só
+    if hasattr(backend, "l1") and hasattr(backend, "l2"):
+        camadas = {"l1": backend.l1, "l2": backend.l2}
+        acertos = {"l1": backend.hits_l1, "l2": backend.hits_l2}
+    else:
+        camadas = {"unica": backend}
+        acertos = {"unica": cache.hits}
+    acertos["nenhuma"] = cache.misses
+
+    ajuda = "Consultas ao cache por camada que respondeu (nenhuma: miss)."
+    for camada, valor in acertos.items():
+        rotulos = {"cache": nome, "camada": camada}
+        yield Amostra("curso_cache_consultas", "counter", ajuda, rotulos, valor)
+    for camada, alvo in camadas.items():
+        rotulos = {"cache": nome, "camada": camada}
+        for metrica, tipo, ajuda, valor in (
+            ("curso_cache_itens", "gauge", "Itens na camada.", len(alvo)),
+            ("curso_cache_bytes", "gauge", "Bytes na camada.", alvo.tamanho_bytes()),
+            (
+                "curso_cache_remocoes",
+                "counter",
+                "Itens removidos da camada por limite de tamanho.",
+                alvo.evictions,
+            ),
+        ):
+            yield Amostra(metrica, tipo, ajuda, rotulos, valor)
+
+
+def observar_cache(
+    cache: Any, nome: str = "padrao", registro: Optional[Registro] = None
+) -> None:
+    """
+    Exporta os contadores de um `CacheLLM` (hits por camada, misses, itens,
+    bytes e remoções). Nada muda no caminho da requisição: os valores são
+    lidos na coleta.
+    """
+    registro = registro or registro_padrao()
+    registro.coletor(lambda alvo: _amostras_cache(alvo, nome), dono=cache)
+
+
+def observar_orcamento(
+    nome: str,
+    dono: Any,
+    ler: Callable[[Any], Tuple[float, float]],
+    registro: Optional[Registro] = None,
+) -> None:
+    """
+    Exporta gasto e limite de um orçamento; `ler(dono)` devolve
+    `(gasto, limite)` na hora da coleta.
+    """
+
+    def amostras(alvo: Any) -> Iterable[Amostra]:
+        gasto, limite = ler(alvo)
+        rotulos = {"orcamento": nome}
+        yield Amostra(
+            "curso_orcamento_gasto_dolares",
+            "gauge",
+            "Gasto acumulado, em dólares.",
+            rotulos,
+            gasto,
+        )
+        yield Amostra(
+            "curso_orcamento_limite_dolares",
+            "gauge",
+            "Limite do orçamento.",
+            rotulos,
+            limite,
+        )
+
+    (registro or registro_padrao()).coletor(amostras, dono=dono)
+
+
+def _benchmark(operacoes: int = 200_000, agentes: int = 20) -> None:
+    import urllib.request
+
+    from curso_crewai.cache import BackendCamadas, BackendMemoria, CacheLLM
+
+    registro = Registro()
+    modelos = ("gpt-4o-mini", "gpt-4o")
+    tarefas = ("pesquisa", "redacao", "revisao")
+    rotulos = [
+        (f"agente_{i % agentes}", modelos[i % 2], tarefas[i % 3])
+        for i in range(operacoes)
+    ]
+
+    def base() -> None:
+        for agente, modelo, tarefa in rotulos:
+            pass
+
+    def caminho_requisicao() -> None:
+        for agente, modelo, tarefa in rotulos:
+            observar_execucao(agente, 1.7, True, modelo, tarefa, registro=registro)
+            observar_uso(
+                agente,
+                modelo,
+                tarefa,
+                entrada=800,
+                saida=200,
+                custo=0.0003,
+                registro=registro,
+            )
+
+    inicio = time.perf_counter()
+    base()
+    vazio = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    caminho_requisicao()
+    por_operacao = (time.perf_counter() - inicio - vazio) / operacoes
+
+    cache = CacheLLM(BackendCamadas(BackendMemoria(), BackendMemoria()))
+    for i in range(200):
+        cache.set(f"prompt {i}", "resposta", "gpt-4o-mini")
+    for i in range(1000):
+        cache.get(f"prompt {i % 400}", "gpt-4o-mini")
+    observar_cache(cache, "respostas", registro)
+
+    class Orcamento:
+        gasto, limite = 0.42, 10.0
+
+    orcamento = Orcamento()
+    observar_orcamento("demo", orcamento, lambda o: (o.gasto, o.limite), registro)
+
+    repeticoes = 50
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        texto = registro.exportar()
+    coleta = (time.perf_counter() - inicio) / repeticoes
+    series = sum(1 for linha in texto.splitlines() if not linha.startswith("#"))
+
+    with ServidorMetricas(porta=0, registro=registro) as servidor:
+        servidor.iniciar_em_thread()
+        pedido = urllib.request.Request(
+            servidor.url, headers={"Accept": "application/openmetrics-text"}
+        )
+        with urllib.request.urlopen(pedido) as resposta:
+            tipo = resposta.headers["Content-Type"]
+            corpo = resposta.read().decode("utf-8")
+        servidor.shutdown()
+
+    del orcamento
+    sobra = "curso_orcamento" in registro.exportar()
+
+    print(f"📈 {operacoes} execuções ({agentes} agentes x 2 modelos x 3 tarefas)")
+    print(f"   Caminho da requisição: {por_operacao * 1e6:.2f}µs por execução")
+    print(f"     (1 contador + 1 histograma + 3 contadores de tokens/custo)")
+    print(f"   Coleta: {coleta * 1000:.2f}ms para {series} amostras")
+    print(
+        f"   HTTP: {tipo}, {len(corpo)} bytes, termina com # EOF: "
+        f"{corpo.rstrip().endswith('# EOF')}"
+    )
+    print(f"   Coletor removido com o dono: {not sobra}")
+    print(
+        "\n"
+        + "\n".join(
+            linha
+            for linha in corpo.splitlines()
+            if linha.startswith(("curso_cache_consultas", "curso_orcamento"))
+        )
+    )
+
+
+if __name__ == "__main__":
+    _benchmark()
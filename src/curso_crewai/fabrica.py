@@ -0,0 +1,267 @@
+"""
+Construção preguiçosa de agentes, ferramentas e crews.
+
+Os exemplos montavam todos os `Agent`, `Task`, ferramentas e `Crew` no
+import do módulo, e o simples `import crewai` já puxa LangChain, LiteLLM,
+OpenTelemetry etc. Quem só queria reaproveitar uma função (num serviço, num
+teste, no processamento em lote) pagava esse custo inteiro.
+
+Aqui os objetos são declarados num `Registro` e só construídos no primeiro
+uso, uma única vez (memoizados, seguro entre threads). Os módulos pesados
+entram por `importar_preguicoso`, que só importa de verdade quando algum
+atributo é acessado.
+
+Uso:
+    crewai = importar_preguicoso("crewai")
+    registro = Registro()
+
+    @registro.registrar("pesquisador")
+    def criar_pesquisador():
+        return crewai.Agent(role="Pesquisador", ...)
+
+    @registro.registrar("crew")
+    def criar_crew():
+        return crewai.Crew(agents=[registro.obter("pesquisador")], ...)
+
+    registro.obter("crew").kickoff()  # Só aqui o crewai é importado
+
+Benchmark de tempo de import:
+    python -m curso_crewai.fabrica aula2/main.py aula3/main.py aula4/main.py
+"""
+
+import importlib
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+Fabrica = Callable[[], Any]
+
+
+class ModuloPreguicoso:
+    """Substituto de um módulo que só é importado no primeiro acesso."""
+
+    def __init__(self, nome: str):
+        self.__dict__["_nome"] = nome
+        self.__dict__["_modulo"] = None
+
+    def _carregar(self) -> Any:
+        modulo = self.__dict__["_modulo"]
+        if modulo is None:
+            # import_module é protegido pela trava de import do Python
+            modulo = importlib.import_module(self.__dict__["_nome"])
+            self.__dict__["_modulo"] = modulo
+        return modulo
+
+    @property
+    def carregado(self) -> bool:
+        return self.__dict__["_modulo"] is not None
+
+    def __getattr__(self, atributo: str) -> Any:
+        return getattr(self._carregar(), atributo)
+
+    def __repr__(self) -> str:
+        estado = "carregado" if self.carregado else "não carregado"
+        return f"<módulo preguiçoso {self.__dict__['_nome']!r} ({estado})>"
+
+
+def importar_preguicoso(nome: str) -> ModuloPreguicoso:
+    """Equivalente a `import nome`, adiado até o primeiro atributo usado."""
+    return ModuloPreguicoso(nome)
+
+
+class Registro:
+    """
+    Fábricas nomeadas com construção sob demanda e memoização.
+
+    Fábricas podem pedir outros objetos ao registro (ex.: a crew pede os
+    agentes); a trava é reentrante para permitir isso.
+    """
+
+    def __init__(self) -> None:
+        self._fabricas: Dict[str, Fabrica] = {}
+        self._instancias: Dict[str, Any] = {}
+        self._trava = threading.RLock()
+        self.tempos_construcao: Dict[str, float] = {}
+
+    def registrar(
+        self, nome: str, fabrica: Optional[Fabrica] = None
+    ) -> Callable[[Fabrica], Fabrica]:
+        """Declara uma fábrica; pode ser usado como decorador."""
+
+        def decorar(funcao: Fabrica) -> Fabrica:
+            with self._trava:
+                self._fabricas[nome] = funcao
+                self._instancias.pop(nome, None)
+            return funcao
+
+        if fabrica is not None:
+            decorar(fabrica)
+        return decorar
+
+    def obter(self, nome: str) -> Any:
+        """Retorna o objeto, construindo-o no primeiro pedido."""
+        try:
+            return self._instancias[nome]
+        except KeyError:
+            pass
+        with self._trava:
+            if nome in self._instancias:
+                return self._instancias[nome]
+            if nome not in self._fabricas:
+                raise KeyError(f"Nada registrado com o nome '{nome}'")
+            inicio = time.perf_counter()
+            instancia = self._fabricas[nome]()
+            self.tempos_construcao[nome] = time.perf_counter() - inicio
+            self._instancias[nome] = instancia
+            return instancia
+
+    __getitem__ = obter
+
+    def obter_varios(self, *nomes: str) -> List[Any]:
+        """Atalho para listas de agentes, tarefas ou ferramentas."""
+        return [self.obter(nome) for nome in nomes]
+
+    def __contains__(self, nome: str) -> bool:
+        return nome in self._fabricas
+
+    def construido(self, nome: str) -> bool:
+        return nome in self._instancias
+
+    def nomes(self) -> List[str]:
+        return list(self._fabricas)
+
+    def descartar(self, nome: Optional[str] = None) -> None:
+        """Esquece a instância (ou todas) para reconstruir no próximo uso."""
+        with self._trava:
+            if nome is None:
+                self._instancias.clear()
+            else:
+                self._instancias.pop(nome, None)
+
+    def estatisticas(self) -> Dict[str, Any]:
+        return {
+            "registrados": len(self._fabricas),
+            "construidos": len(self._instancias),
+            "tempos_construcao_s": dict(self.tempos_construcao),
+        }
+
+
+# =============================================================================
+# BENCHMARK DE IMPORT
+# =============================================================================
+
+_SCRIPT_MEDICAO = """
+import os, sys, time
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+sys.path.insert(0, {pasta!r})
+inicio = time.perf_counter()
+import {modulo} as alvo
+importado = time.perf_counter() - inicio
+pesados = [m for m in ("crewai", "langchain_openai", "litellm") if m in sys.modules]
+construido = None
+registro = getattr(alvo, "registro", None)
+if registro is not None and {construir!r}:
+    inicio = time.perf_counter()
+    try:
+        for nome in registro.nomes():
+            registro.obter(nome)
+        construido = time.perf_counter() - inicio
+    except Exception as e:
+        construido = type(e).__name__
+print(importado, construido, ",".join(pesados) or "-")
+"""
+
+
+def medir_import(caminho: str, construir: bool = True) -> Dict[str, Any]:
+    """
+    Importa o script num processo novo e mede o tempo do import e, se o
+    módulo tiver um `registro`, o tempo para construir tudo depois.
+    """
+    import os
+    import subprocess
+    import sys
+
+    pasta, arquivo = os.path.split(os.path.abspath(caminho))
+    script = _SCRIPT_MEDICAO.format(
+        pasta=pasta, modulo=os.path.splitext(arquivo)[0], construir=construir
+    )
+    ambiente = dict(os.environ)
+    raiz_src = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    ambiente["PYTHONPATH"] = os.pathsep.join(
+        p for p in (raiz_src, ambiente.get("PYTHONPATH")) if p
+    )
+    processo = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=pasta,
+        env=ambiente,
+        capture_output=True,
+        text=True,
+        stdin=subprocess.DEVNULL,
+    )
+    if processo.returncode != 0:
+        ultima = (processo.stderr.strip().splitlines() or ["?"])[-1]
+        return {"erro": ultima}
+    importado, construido, pesados = processo.stdout.strip().splitlines()[-1].split()
+    try:
+        construcao: Any = float(construido)
+    except ValueError:
+        # "None" (sem registro) ou o nome da exceção ao construir
+        construcao = None if construido == "None" else construido
+    return {
+        "import_s": float(importado),
+        "construcao_s": construcao,
+        "modulos_pesados": pesados,
+    }
+
+
+def medir_import_modulos(modulos: List[str]) -> Optional[float]:
+    """Tempo (s) de importar os módulos num processo novo; None se faltarem."""
+    import subprocess
+    import sys
+
+    script = (
+        "import time; inicio = time.perf_counter(); "
+        + "; ".join(f"import {m}" for m in modulos)
+        + "; print(time.perf_counter() - inicio)"
+    )
+    processo = subprocess.run(
+        [sys.executable, "-c", script], capture_output=True, text=True
+    )
+    if processo.returncode != 0:
+        return None
+    return float(processo.stdout.strip().splitlines()[-1])
+
+
+def _benchmark(caminhos: List[str], repeticoes: int = 3) -> None:
+    # Antes, todo script pagava pelo menos isto no import
+    pesados = ["crewai", "langchain_openai"]
+    tempos = [medir_import_modulos(pesados) for _ in range(repeticoes)]
+    if None in tempos:
+        print(f"Custo eager ({' + '.join(pesados)}): não instalados")
+    else:
+        print(f"Custo eager ({' + '.join(pesados)}): {min(tempos) * 1000:.0f}ms\n")
+
+    print(f"{'script':20s} {'import':>10s} {'construir':>10s}  pesados no import")
+    for caminho in caminhos:
+        medicoes = [medir_import(caminho) for _ in range(repeticoes)]
+        if "erro" in medicoes[0]:
+            print(f"{caminho:20s} erro: {medicoes[0]['erro']}")
+            continue
+        importado = min(m["import_s"] for m in medicoes) * 1000
+        construcoes = [
+            m["construcao_s"] for m in medicoes if isinstance(m["construcao_s"], float)
+        ]
+        if construcoes:
+            construcao = f"{min(construcoes) * 1000:8.0f}ms"
+        else:
+            construcao = medicoes[0]["construcao_s"] or "-"
+        print(
+            f"{caminho:20s} {importado:8.0f}ms {construcao:>10s}  "
+            f"{medicoes[0]['modulos_pesados']}"
+        )
+
+
+if __name__ == "__main__":
+    import sys
+
+    _benchmark(sys.argv[1:] or ["aula2/main.py", "aula3/main.py", "aula4/main.py"])
@@ -0,0 +1,498 @@
+"""
+Requisições duplicadas (hedging) para cortar a cauda de latência.
+
+A maioria das chamadas ao modelo volta rápido, mas uma em cada dezenas fica
+presa em um servidor lento e domina o p99 da etapa. Com hedging, se a
+resposta não chegou dentro do p90 observado para aquele modelo, uma segunda
+requisição (mesmo modelo ou um de reserva) é disparada; vale a que chegar
+primeiro e a outra é cancelada.
+
+O limiar é o p90 da latência total da chamada, não do tempo até o primeiro
+token (TTFB): o `LLM.call` do CrewAI não usa streaming, então só se observa
+quando a resposta inteira chega. Uma resposta longa que já está sendo gerada
+também passa do limiar e é duplicada; por isso o quantil é por modelo (e,
+na prática, por tipo de tarefa com tamanho de resposta parecido).
+
+O custo é previsível: só as ~10% de chamadas mais lentas são duplicadas, e
+`max_taxa_hedge` limita a proporção mesmo se o modelo inteiro ficar lento
+(aí duplicar tudo só dobraria a carga). As estatísticas mostram a taxa de
+hedge, o custo extra e o p99 com e sem hedge.
+
+Cancelamento: no caminho async (`executar_async`) a perdedora é cancelada de
+fato. No caminho síncrono, que é o do `LLM.call` do CrewAI, uma thread não
+pode ser interrompida: a perdedora termina em segundo plano, o resultado é
+descartado e o custo dela entra como custo extra. Por isso a duplicata
+nunca usa o mesmo objeto `LLM` da primária (que ainda está em uso na outra
+thread): `llm_com_hedge` cria um cliente separado, do mesmo modelo quando
+não há modelo de reserva.
+
+Uso:
+    hedge = ExecutorHedge()
+    agente = Agent(..., llm=llm_com_hedge("gpt-4o", hedge, reserva="gpt-4o-mini"))
+    ...
+    print(hedge.estatisticas())
+"""
+
+import asyncio
+import contextvars
+import os
+import queue
+import threading
+import time
+from collections import deque
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+PRIMARIA = "primaria"
+RESERVA = "reserva"
+
+
+def _quantil(valores: Sequence[float], q: float) -> float:
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(q * len(ordenados)))]
+
+
+class ExecutorHedge:
+    """
+    Dispara uma requisição duplicada quando a primeira passa do quantil de
+    latência observado para a chave (normalmente o modelo).
+
+    Args:
+        quantil: Quantil da latência total (por chave) a partir do qual a
+            duplicata sai
+        min_amostras: Chamadas observadas antes de começar a duplicar
+        janela: Latências guardadas por chave para calcular o quantil
+        atraso_minimo_s: Nunca duplica antes disso, mesmo com p90 baixo
+        max_taxa_hedge: Fração máxima de chamadas duplicadas
+    """
+
+    def __init__(
+        self,
+        quantil: float = 0.9,
+        min_amostras: int = 20,
+        janela: int = 500,
+        atraso_minimo_s: float = 0.05,
+        max_taxa_hedge: float = 0.15,
+    ):
+        self.quantil = quantil
+        self.min_amostras = min_amostras
+        self.janela = janela
+        self.atraso_minimo_s = atraso_minimo_s
+        self.max_taxa_hedge = max_taxa_hedge
+        self._lock = threading.Lock()
+        self._amostras: Dict[str, Deque[float]] = {}
+        self._latencias: Deque[float] = deque(maxlen=janela * 4)
+        self._latencias_sem_hedge: Deque[float] = deque(maxlen=janela * 4)
+        self._metricas: Dict[str, Any] = {
+            "chamadas": 0,
+            "duplicadas": 0,
+            "vitorias_reserva": 0,
+            "perdedoras": 0,
+            "limitadas": 0,
+            "erros": 0,
+            "custo_vencedoras": 0.0,
+            "custo_extra": 0.0,
+        }
+
+    # -- limiar -------------------------------------------------------------
+
+    def atraso(self, chave: str) -> Optional[float]:
+        """Espera antes da duplicata; None enquanto não há amostras suficientes."""
+        with self._lock:
+            amostras = self._amostras.get(chave)
+            if not amostras or len(amostras) < self.min_amostras:
+                return None
+            return max(self.atraso_minimo_s, _quantil(amostras, self.quantil))
+
+    def _amostrar(self, chave: str, duracao: float) -> None:
+        with self._lock:
+            if chave not in self._amostras:
+                self._amostras[chave] = deque(maxlen=self.janela)
+            self._amostras[chave].append(duracao)
+
+    def _pode_duplicar(self) -> bool:
+        with self._lock:
+            limite = self.max_taxa_hedge * self._metricas["chamadas"]
+            if self._metricas["duplicadas"] >= limite + 1:
+                self._metricas["limitadas"] += 1
+                return False
+            self._metricas["duplicadas"] += 1
+            return True
+
+    def _contar(self, chave: str, valor: float = 1) -> None:
+        with self._lock:
+            self._metricas[chave] += valor
+
+    def _registrar(
+        self, latencia: float, vencedora: str, custo_vencedora: float
+    ) -> None:
+        with self._lock:
+            self._latencias.append(latencia)
+            self._metricas["custo_vencedoras"] += custo_vencedora
+            if vencedora == RESERVA:
+                self._metricas["vitorias_reserva"] += 1
+
+    # -- caminho síncrono ---------------------------------------------------
+
+    def executar(
+        self,
+        primaria: Callable[[], Any],
+        reserva: Optional[Callable[[], Any]] = None,
+        chave: str = "padrao",
+        chave_reserva: Optional[str] = None,
+        custo: Optional[Callable[[Any], float]] = None,
+    ) -> Any:
+        """
+        Executa `primaria()`; se passar do limiar de `chave`, dispara
+        `reserva()` (ou outra `primaria()`) e devolve o primeiro resultado
+        sem erro. `custo(resultado)` alimenta o custo extra. Sem `reserva`,
+        `primaria` roda duas vezes ao mesmo tempo: só serve para funções
+        sem estado compartilhado entre as chamadas.
+        """
+        reserva = reserva or primaria
+        chave_reserva = chave_reserva or chave
+        atraso = self.atraso(chave)
+        self._contar("chamadas")
+        resultados: "queue.Queue[Tuple[str, Any, Optional[BaseException], bool]]"
+        resultados = queue.Queue()
+        vencedora: List[str] = []
+        lock_vencedora = threading.Lock()
+        inicio = time.perf_counter()
+
+        def rodar(
+            nome: str,
+            funcao: Callable[[], Any],
+            chave_amostra: str,
+            contexto: contextvars.Context,
+        ) -> None:
+            t0 = time.perf_counter()
+            try:
+                valor, erro = contexto.run(funcao), None
+            except BaseException as e:
+                valor, erro = None, e
+            duracao = time.perf_counter() - t0
+            if erro is None:
+                self._amostrar(chave_amostra, duracao)
+            if nome == PRIMARIA:
+                with self._lock:
+                    self._latencias_sem_hedge.append(duracao)
+            with lock_vencedora:
+                venceu = erro is None and not vencedora
+                if venceu:
+                    vencedora.append(nome)
+            if erro is None and not venceu and custo is not None:
+                self._contar("custo_extra", custo(valor))
+            resultados.put((nome, valor, erro, venceu))
+
+        def disparar(nome: str, funcao: Callable[[], Any], chave_amostra: str):
+            # Cópia do contexto de quem chamou, para os escopos de uso e de
+            # limite (contextvars) continuarem valendo dentro da thread
+            contexto = contextvars.copy_context()
+            threading.Thread(
+                target=rodar,
+                args=(nome, funcao, chave_amostra, contexto),
+                daemon=True,
+            ).start()
+
+        disparar(PRIMARIA, primaria, chave)
+        pendentes = 1
+        duplicou = False
+        primeiro_erro: Optional[BaseException] = None
+        while True:
+            espera = None
+            if atraso is not None and not duplicou:
+                espera = max(0.0, atraso - (time.perf_counter() - inicio))
+            try:
+                nome, valor, erro, venceu = resultados.get(timeout=espera)
+            except queue.Empty:
+                duplicou = True
+                if self._pode_duplicar():
+                    disparar(RESERVA, reserva, chave_reserva)
+                    pendentes += 1
+                continue
+            pendentes -= 1
+            if venceu:
+                if pendentes:
+                    # Não dá para interromper a thread: o resultado é descartado
+                    self._contar("perdedoras", pendentes)
+                self._registrar(
+                    time.perf_counter() - inicio,
+                    nome,
+                    custo(valor) if custo is not None else 0.0,
+                )
+                return valor
+            if erro is not None:
+                primeiro_erro = primeiro_erro or erro
+            if not pendentes:
+                # Falhas antes do limiar ficam para a política de retentativa
+                self._contar("erros")
+                assert primeiro_erro is not None
+                raise primeiro_erro
+
+    # -- caminho async ------------------------------------------------------
+
+    async def executar_async(
+        self,
+        primaria: Callable[[], Awaitable[Any]],
+        reserva: Optional[Callable[[], Awaitable[Any]]] = None,
+        chave: str = "padrao",
+        chave_reserva: Optional[str] = None,
+        custo: Optional[Callable[[Any], float]] = None,
+    ) -> Any:
+        """Como `executar`, mas a requisição perdedora é cancelada."""
+        reserva = reserva or primaria
+        chave_reserva = chave_reserva or chave
+        atraso = self.atraso(chave)
+        self._contar("chamadas")
+        inicio = time.perf_counter()
+
+        async def medir(funcao: Callable[[], Awaitable[Any]], chave_amostra: str):
+            t0 = time.perf_counter()
+            valor = await funcao()
+            self._amostrar(chave_amostra, time.perf_counter() - t0)
+            return valor
+
+        tarefas: Dict[asyncio.Task, str] = {
+            asyncio.ensure_future(medir(primaria, chave)): PRIMARIA
+        }
+        feitas, _ = await asyncio.wait(set(tarefas), timeout=atraso)
+        if not feitas and self._pode_duplicar():
+            tarefas[asyncio.ensure_future(medir(reserva, chave_reserva))] = RESERVA
+
+        pendentes = set(tarefas) - feitas
+        primeiro_erro: Optional[BaseException] = None
+        try:
+            while True:
+                for tarefa in feitas:
+                    if tarefa.exception() is not None:
+                        primeiro_erro = primeiro_erro or tarefa.exception()
+                        continue
+                    nome = tarefas[tarefa]
+                    if nome == PRIMARIA:
+                        with self._lock:
+                            self._latencias_sem_hedge.append(
+                                time.perf_counter() - inicio
+                            )
+                    valor = tarefa.result()
+                    self._registrar(
+                        time.perf_counter() - inicio,
+                        nome,
+                        custo(valor) if custo is not None else 0.0,
+                    )
+                    return valor
+                if not pendentes:
+                    self._contar("erros")
+                    assert primeiro_erro is not None
+                    raise primeiro_erro
+                feitas, pendentes = await asyncio.wait(
+                    pendentes, return_when=asyncio.FIRST_COMPLETED
+                )
+        finally:
+            for tarefa in pendentes:
+                tarefa.cancel()
+                if tarefas[tarefa] == PRIMARIA:
+                    # Só se sabe que a primária levaria pelo menos isso
+                    with self._lock:
+                        self._latencias_sem_hedge.append(time.perf_counter() - inicio)
+            if pendentes:
+                self._contar("perdedoras", len(pendentes))
+
+    # -- relatório ----------------------------------------------------------
+
+    def estatisticas(self) -> Dict[str, Any]:
+        """
+        Taxa de hedge, custo extra e p99 com e sem hedge. O "sem hedge" é a
+        latência da requisição primária; no caminho async, quando ela foi
+        cancelada, entra o tempo até o cancelamento (limite inferior).
+        """
+        with self._lock:
+            metricas = dict(self._metricas)
+            latencias = list(self._latencias)
+            sem_hedge = list(self._latencias_sem_hedge)
+            chaves = list(self._amostras)
+        chamadas = metricas["chamadas"]
+        p99 = _quantil(latencias, 0.99)
+        p99_sem_hedge = _quantil(sem_hedge, 0.99)
+        if metricas["custo_vencedoras"]:
+            sobrecarga = metricas["custo_extra"] / metricas["custo_vencedoras"]
+        else:
+            sobrecarga = metricas["duplicadas"] / chamadas if chamadas else 0.0
+        metricas.update(
+            {
+                "taxa_hedge": metricas["duplicadas"] / chamadas if chamadas else 0.0,
+                "sobrecarga_custo": sobrecarga,
+                "p50_s": _quantil(latencias, 0.5),
+                "p99_s": p99,
+                "p99_sem_hedge_s": p99_sem_hedge,
+                "melhoria_p99": 1 - p99 / p99_sem_hedge if p99_sem_hedge else 0.0,
+                "limiares_s": {chave: self.atraso(chave) for chave in chaves},
+            }
+        )
+        return metricas
+
+
+# =============================================================================
+# INTEGRAÇÃO COM O CREWAI
+# =============================================================================
+
+_hedge_padrao: Optional[ExecutorHedge] = None
+_lock_padrao = threading.Lock()
+_classes_llm: Dict[type, type] = {}
+
+
+def hedge_padrao() -> ExecutorHedge:
+    """Executor do processo (CURSO_HEDGE_QUANTIL, CURSO_HEDGE_MAX_TAXA)."""
+    global _hedge_padrao
+    with _lock_padrao:
+        if _hedge_padrao is None:
+            _hedge_padrao = ExecutorHedge(
+                quantil=float(os.getenv("CURSO_HEDGE_QUANTIL", "0.9")),
+                max_taxa_hedge=float(os.getenv("CURSO_HEDGE_MAX_TAXA", "0.15")),
+            )
+        return _hedge_padrao
+
+
+def _custo_da_chamada(modelo: str, mensagens: Any, resposta: Any) -> float:
+    from curso_crewai.tokens import contador_padrao, estimar_tokens
+    from curso_crewai.uso import custo_tokens
+
+    if isinstance(mensagens, str):
+        entrada = estimar_tokens(mensagens, modelo)
+    else:
+        entrada = contador_padrao(modelo).contar_mensagens(mensagens)
+    return custo_tokens(modelo, entrada, estimar_tokens(str(resposta), modelo))
+
+
+def _classe_llm(base: type) -> type:
+    if base in _classes_llm:
+        return _classes_llm[base]
+
+    class LLMComHedge(base):  # type: ignore[misc, valid-type]
+        """`LLM` do CrewAI cuja chamada passa pelo `ExecutorHedge`."""
+
+        def configurar_hedge(self, hedge: ExecutorHedge, reserva: Any) -> None:
+            # A primária continua rodando na thread dela enquanto a duplicata
+            # sai: as duas não podem dividir o mesmo objeto LLM
+            if reserva is None or reserva is self:
+                raise ValueError("O hedge precisa de um LLM de reserva separado")
+            # object.__setattr__: em versões Pydantic do LLM, atributos fora
+            # do modelo são recusados pelo setattr normal
+            object.__setattr__(self, "_hedge", hedge)
+            object.__setattr__(self, "_llm_reserva", reserva)
+
+        def call(self, messages, *args, **kwargs):
+            reserva = self._llm_reserva
+            return self._hedge.executar(
+                lambda: super(LLMComHedge, self).call(messages, *args, **kwargs),
+                lambda: reserva.call(messages, *args, **kwargs),
+                chave=self.model,
+                chave_reserva=reserva.model,
+                custo=lambda resposta: _custo_da_chamada(
+                    self.model, messages, resposta
+                ),
+            )
+
+    _classes_llm[base] = LLMComHedge
+    return LLMComHedge
+
+
+def llm_com_hedge(
+    modelo: str,
+    hedge: Optional[ExecutorHedge] = None,
+    reserva: Optional[str] = None,
+    **kwargs: Any,
+) -> Any:
+    """
+    `LLM` do CrewAI para `Agent(llm=...)` com hedging nas chamadas.
+
+    Args:
+        modelo: Modelo principal (também é a chave do limiar de latência)
+        hedge: Executor compartilhado (padrão: `hedge_padrao()`)
+        reserva: Modelo da duplicata; None repete o mesmo modelo (num
+            cliente `LLM` separado)
+        **kwargs: Demais parâmetros do `LLM` (temperature, max_tokens...)
+    """
+    from crewai import LLM
+
+    classe = _classe_llm(LLM)
+    llm = classe(model=modelo, **kwargs)
+    llm_reserva = LLM(model=reserva or modelo, **kwargs)
+    llm.configurar_hedge(hedge or hedge_padrao(), llm_reserva)
+    return llm
+
+
+def _benchmark(chamadas: int = 400, threads: int = 16) -> None:
+    import random
+    from concurrent.futures import ThreadPoolExecutor
+
+    aleatorio = random.Random(7)
+    lock = threading.Lock()
+
+    def chamada_llm() -> str:
+        # 95% respondem em ~40ms; 5% ficam presas em um servidor lento
+        with lock:
+            lenta = aleatorio.random() < 0.05
+            duracao = (
+                aleatorio.uniform(0.5, 0.8) if lenta else aleatorio.uniform(0.03, 0.05)
+            )
+        time.sleep(duracao)
+        return "ok"
+
+    hedge = ExecutorHedge(quantil=0.9, min_amostras=20)
+    with ThreadPoolExecutor(threads) as executor:
+        list(
+            executor.map(
+                lambda _: hedge.executar(chamada_llm, chave="gpt-4o-mini"),
+                range(chamadas),
+            )
+        )
+    stats = hedge.estatisticas()
+    print(f"{chamadas} chamadas (5% lentas), hedge no p90:")
+    print(
+        f"  p99 sem hedge: {stats['p99_sem_hedge_s'] * 1000:.0f}ms  "
+        f"com hedge: {stats['p99_s'] * 1000:.0f}ms  "
+        f"(-{stats['melhoria_p99']:.0%})"
+    )
+    print(
+        f"  duplicadas: {stats['duplicadas']} ({stats['taxa_hedge']:.1%}), "
+        f"reserva venceu {stats['vitorias_reserva']}x, "
+        f"limiar {stats['limiares_s']['gpt-4o-mini'] * 1000:.0f}ms"
+    )
+
+    async def chamada_async() -> str:
+        with lock:
+            lenta = aleatorio.random() < 0.05
+        await asyncio.sleep(0.6 if lenta else 0.04)
+        return "ok"
+
+    async def lote() -> None:
+        vagas = asyncio.Semaphore(threads)
+
+        async def uma() -> None:
+            async with vagas:
+                await hedge_async.executar_async(chamada_async, chave="gpt-4o-mini")
+
+        await asyncio.gather(*(uma() for _ in range(chamadas * 3)))
+
+    hedge_async = ExecutorHedge(quantil=0.9, min_amostras=20)
+    asyncio.run(lote())
+    stats = hedge_async.estatisticas()
+    print(
+        f"  async ({chamadas * 3} chamadas): p99 {stats['p99_s'] * 1000:.0f}ms, "
+        f"{stats['perdedoras']} perdedoras canceladas"
+    )
+
+
+if __name__ == "__main__":
+    _benchmark()
@@ -0,0 +1,684 @@
+"""
+Limite de taxa central (RPM + TPM) para todas as chamadas de LLM.
+
+O `max_rpm` do CrewAI vale só para a própria crew: com várias crews ao mesmo
+tempo (ou vários processos) a soma passa do limite da organização e o
+`RateLimitError` só aparece depois. Aqui há dois baldes de fichas
+compartilhados, um de requisições e um de tokens por minuto, e toda chamada
+espera a vez antes de sair:
+
+- No processo: baldes em memória, fila por prioridade ("alta", "normal",
+  "baixa"); quem é menos prioritário não pode esvaziar o balde (reserva de
+  10% / 30% para as faixas acima).
+- Entre processos: com `caminho`, os baldes ficam num SQLite local e cada
+  retirada é uma transação (`BEGIN IMMEDIATE`).
+
+Os tokens de uma chamada são estimados antes (prompt + max_tokens) e
+corrigidos pelo `usage` da resposta. O tempo de espera é contabilizado por
+agente e por prioridade.
+
+Uso:
+    limitador = LimitadorTaxa(rpm=500, tpm=200_000, caminho=".cache/limite.sqlite3")
+    instalar_litellm(limitador)          # toda chamada do CrewAI passa aqui
+    ChatOpenAI(callbacks=[callback_langchain(limitador)])   # LangChain direto
+    with contexto_limite(prioridade="alta"):
+        crew.kickoff()
+    print(limitador.estatisticas()["esperas_por_agente"])
+
+Configuração do limitador padrão: CURSO_LIMITE_RPM, CURSO_LIMITE_TPM e
+CURSO_LIMITE_DB (arquivo SQLite para o modo entre processos). O
+`conexoes.instalar_litellm()` e o `conexoes.chat_openai()` já instalam o
+limitador padrão.
+"""
+
+import asyncio
+import contextvars
+import heapq
+import itertools
+import os
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+PRIORIDADES = {"alta": 0, "normal": 1, "baixa": 2}
+# Fração de cada balde que uma faixa deixa para as faixas mais prioritárias
+RESERVA_POR_PRIORIDADE = {0: 0.0, 1: 0.1, 2: 0.3}
+# Resposta assumida quando a chamada não informa max_tokens
+TOKENS_RESPOSTA_PADRAO = 512
+
+
+class LimiteTaxaExcedido(TimeoutError):
+    """A espera pela vez passou do `timeout` pedido."""
+
+
+@dataclass
+class Permissao:
+    """Fichas retiradas para uma chamada; corrigidas depois com o uso real."""
+
+    tokens: int
+    prioridade: int
+    agente: str
+    espera: float
+    ativa: bool = True
+
+
+# =============================================================================
+# ESTADO DOS BALDES
+# =============================================================================
+
+
+class _EstadoMemoria:
+    """Baldes do próprio processo."""
+
+    relogio = staticmethod(time.monotonic)
+
+    def __init__(self) -> None:
+        self._baldes: Dict[str, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def transacao(self) -> Iterator[Dict[str, Tuple[float, float]]]:
+        with self._lock:
+            yield self._baldes
+
+
+class _EstadoSQLite:
+    """Baldes num SQLite local, compartilhados por todos os processos."""
+
+    # Processos diferentes não compartilham o monotonic
+    relogio = staticmethod(time.time)
+
+    def __init__(self, caminho: str):
+        self.caminho = caminho
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(caminho)), exist_ok=True)
+        self._conexao().execute("""
+            CREATE TABLE IF NOT EXISTS baldes (
+                nome TEXT PRIMARY KEY,
+                nivel REAL NOT NULL,
+                atualizado REAL NOT NULL
+            )
+            """)
+
+    def _conexao(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # isolation_level=None: a transação é controlada com BEGIN IMMEDIATE
+            conn = sqlite3.connect(self.caminho, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def transacao(self) -> Iterator[Dict[str, Tuple[float, float]]]:
+        conn = self._conexao()
+        # Trava de escrita já no início: ler e debitar é atômico entre processos
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            baldes = {
+                nome: (nivel, atualizado)
+                for nome, nivel, atualizado in conn.execute("SELECT * FROM baldes")
+            }
+            yield baldes
+            conn.executemany(
+                "INSERT OR REPLACE INTO baldes (nome, nivel, atualizado) "
+                "VALUES (?, ?, ?)",
+                [(nome, nivel, momento) for nome, (nivel, momento) in baldes.items()],
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+
+# =============================================================================
+# LIMITADOR
+# =============================================================================
+
+_contexto_atual: contextvars.ContextVar[Dict[str, Any]] = contextvars.ContextVar(
+    "contexto_limite", default={}
+)
+
+
+@contextmanager
+def contexto_limite(
+    agente: Optional[str] = None, prioridade: Optional[str] = None
+) -> Iterator[None]:
+    """Agente e prioridade das chamadas feitas dentro do bloco."""
+    atual = dict(_contexto_atual.get())
+    if agente is not None:
+        atual["agente"] = agente
+    if prioridade is not None:
+        atual["prioridade"] = prioridade
+    token = _contexto_atual.set(atual)
+    try:
+        yield
+    finally:
+        _contexto_atual.reset(token)
+
+
+def _nivel_prioridade(prioridade: Union[str, int, None]) -> int:
+    if prioridade is None:
+        prioridade = _contexto_atual.get().get("prioridade", "normal")
+    if isinstance(prioridade, int):
+        return prioridade
+    try:
+        return PRIORIDADES[prioridade]
+    except KeyError:
+        raise ValueError(
+            f"Prioridade '{prioridade}' inválida (use {', '.join(PRIORIDADES)})"
+        ) from None
+
+
+class LimitadorTaxa:
+    """
+    Baldes de fichas de requisições (RPM) e tokens (TPM).
+
+    Args:
+        rpm: Requisições por minuto permitidas
+        tpm: Tokens por minuto permitidos
+        caminho: Arquivo SQLite para dividir o limite entre processos
+        rajada_s: Segundos de taxa que o balde acumula (60 = um minuto cheio)
+        nome: Prefixo dos baldes (limites diferentes no mesmo arquivo)
+    """
+
+    def __init__(
+        self,
+        rpm: float = 500,
+        tpm: float = 200_000,
+        caminho: Optional[str] = None,
+        rajada_s: float = 60.0,
+        nome: str = "openai",
+    ):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.rajada_s = rajada_s
+        self.nome = nome
+        self._estado = _EstadoSQLite(caminho) if caminho else _EstadoMemoria()
+        self._condicao = threading.Condition()
+        self._fila: List[Tuple[int, int]] = []
+        self._sequencia = itertools.count()
+        self._lock_stats = threading.Lock()
+        self._esperas_agente: Dict[str, List[float]] = {}
+        self._esperas_prioridade: Dict[int, List[float]] = {}
+        self.tokens_corrigidos = 0
+
+    def _baldes(self, tokens: float) -> Dict[str, Tuple[float, float, float]]:
+        # nome -> (custo, taxa por segundo, capacidade)
+        return {
+            f"{self.nome}:rpm": (1, self.rpm / 60, self.rpm / 60 * self.rajada_s),
+            f"{self.nome}:tpm": (tokens, self.tpm / 60, self.tpm / 60 * self.rajada_s),
+        }
+
+    def _tentar(self, tokens: float, prioridade: int) -> float:
+        """Debita os dois baldes se houver fichas; senão, segundos até haver."""
+        reserva = RESERVA_POR_PRIORIDADE.get(prioridade, 0.3)
+        pedidos = self._baldes(tokens)
+        with self._estado.transacao() as baldes:
+            agora = self._estado.relogio()
+            niveis = {}
+            espera = 0.0
+            for nome, (custo, taxa, capacidade) in pedidos.items():
+                nivel, atualizado = baldes.get(nome, (capacidade, agora))
+                nivel = min(capacidade, nivel + max(agora - atualizado, 0) * taxa)
+                niveis[nome] = nivel
+                # Uma chamada maior que o balde espera ele encher, não para sempre
+                necessario = min(custo + reserva * capacidade, capacidade)
+                if nivel < necessario:
+                    espera = max(espera, (necessario - nivel) / taxa)
+            for nome, (custo, _, _) in pedidos.items():
+                debito = custo if espera == 0 else 0
+                baldes[nome] = (niveis[nome] - debito, agora)
+        return espera
+
+    def _creditar(self, tokens: float) -> None:
+        nome = f"{self.nome}:tpm"
+        _, taxa, capacidade = self._baldes(0)[nome]
+        with self._estado.transacao() as baldes:
+            agora = self._estado.relogio()
+            nivel, atualizado = baldes.get(nome, (capacidade, agora))
+            nivel = min(capacidade, nivel + max(agora - atualizado, 0) * taxa)
+            # Pode ficar negativo: uso acima do estimado atrasa quem vem depois
+            baldes[nome] = (min(capacidade, nivel + tokens), agora)
+        with self._condicao:
+            self._condicao.notify_all()
+
+    def adquirir(
+        self,
+        tokens: int = 1,
+        prioridade: Union[str, int, None] = None,
+        agente: Optional[str] = None,
+        timeout: Optional[float] = None,
+    ) -> Permissao:
+        """
+        Espera a vez de fazer uma chamada de `tokens` tokens (estimados).
+
+        Raises:
+            LimiteTaxaExcedido: Se a espera passar de `timeout` segundos
+        """
+        nivel = _nivel_prioridade(prioridade)
+        agente = agente or _contexto_atual.get().get("agente") or "desconhecido"
+        bilhete = (nivel, next(self._sequencia))
+        inicio = time.perf_counter()
+        with self._condicao:
+            heapq.heappush(self._fila, bilhete)
+            try:
+                while True:
+                    if self._fila[0] == bilhete:
+                        pausa = self._tentar(tokens, nivel)
+                        if pausa == 0:
+                            heapq.heappop(self._fila)
+                            break
+                    else:
+                        # Não é a vez: espera quem está na frente sair
+                        pausa = 0.5
+                    decorrido = time.perf_counter() - inicio
+                    if timeout is not None and decorrido + pausa > timeout:
+                        raise LimiteTaxaExcedido(
+                            f"Sem vaga para {tokens} tokens em {timeout}s"
+                        )
+                    self._condicao.wait(pausa)
+            except BaseException:
+                if bilhete in self._fila:
+                    self._fila.remove(bilhete)
+                    heapq.heapify(self._fila)
+                raise
+            finally:
+                self._condicao.notify_all()
+        espera = time.perf_counter() - inicio
+        self._registrar_espera(agente, nivel, espera)
+        return Permissao(tokens, nivel, agente, espera)
+
+    def confirmar(self, permissao: Permissao, tokens_reais: int) -> None:
+        """Troca a estimativa pelos tokens que a API informou."""
+        if not permissao.ativa:
+            return
+        permissao.ativa = False
+        diferenca = permissao.tokens - tokens_reais
+        if diferenca:
+            with self._lock_stats:
+                self.tokens_corrigidos += abs(diferenca)
+            self._creditar(diferenca)
+
+    def liberar(self, permissao: Permissao) -> None:
+        """Chamada que falhou sem gastar: devolve os tokens (a requisição conta)."""
+        if permissao.ativa:
+            permissao.ativa = False
+            self._creditar(permissao.tokens)
+
+    async def aadquirir(
+        self,
+        tokens: int = 1,
+        prioridade: Union[str, int, None] = None,
+        agente: Optional[str] = None,
+        timeout: Optional[float] = None,
+    ) -> Permissao:
+        """`adquirir` para código async: espera numa thread, sem travar o loop."""
+        tarefa = asyncio.ensure_future(
+            asyncio.to_thread(self.adquirir, tokens, prioridade, agente, timeout)
+        )
+        try:
+            return await asyncio.shield(tarefa)
+        except asyncio.CancelledError:
+            # A thread continua na fila; a vez que ela conseguir é devolvida
+            tarefa.add_done_callback(
+                lambda t: t.cancelled() or t.exception() or self.liberar(t.result())
+            )
+            raise
+
+    @contextmanager
+    def limitar(
+        self,
+        tokens: int = 1,
+        prioridade: Union[str, int, None] = None,
+        agente: Optional[str] = None,
+    ) -> Iterator[Permissao]:
+        """Adquire antes do bloco; libera se o bloco falhar sem confirmar."""
+        permissao = self.adquirir(tokens, prioridade, agente)
+        try:
+            yield permissao
+        except BaseException:
+            self.liberar(permissao)
+            raise
+
+    def _registrar_espera(self, agente: str, prioridade: int, espera: float) -> None:
+        with self._lock_stats:
+            for grupo, chave in (
+                (self._esperas_agente, agente),
+                (self._esperas_prioridade, prioridade),
+            ):
+                total, chamadas, maxima = grupo.get(chave, (0.0, 0, 0.0))
+                grupo[chave] = [total + espera, chamadas + 1, max(maxima, espera)]
+
+    def estatisticas(self) -> Dict[str, Any]:
+        """Espera total, média e máxima por agente e por prioridade."""
+        nomes_prioridade = {v: k for k, v in PRIORIDADES.items()}
+
+        def resumir(total: float, chamadas: int, maxima: float) -> Dict[str, Any]:
+            return {
+                "chamadas": chamadas,
+                "espera_total_s": total,
+                "espera_media_ms": total / chamadas * 1000 if chamadas else 0.0,
+                "espera_max_ms": maxima * 1000,
+            }
+
+        with self._lock_stats:
+            return {
+                "rpm": self.rpm,
+                "tpm": self.tpm,
+                "esperas_por_agente": {
+                    agente: resumir(*valores)
+                    for agente, valores in self._esperas_agente.items()
+                },
+                "esperas_por_prioridade": {
+                    nomes_prioridade.get(nivel, str(nivel)): resumir(*valores)
+                    for nivel, valores in self._esperas_prioridade.items()
+                },
+                "tokens_corrigidos": self.tokens_corrigidos,
+            }
+
+
+# =============================================================================
+# INTEGRAÇÃO COM O LITELLM (CrewAI)
+# =============================================================================
+
+# O CrewAI monta o prompt de sistema como "You are {role}. {backstory}...". O
+# papel termina no primeiro ponto seguido de espaço: "v2.0" e "Node.js" ficam
+# inteiros (abreviações como "Dr. X" não dá para separar do backstory)
+_PADRAO_PAPEL = re.compile(r"^\s*You are ((?:[^.]|\.(?!\s))+)\.\s", re.DOTALL)
+
+
+def agente_das_mensagens(mensagens: Any) -> Optional[str]:
+    """Papel do agente do CrewAI a partir do prompt de sistema."""
+    for mensagem in mensagens or []:
+        if isinstance(mensagem, dict) and mensagem.get("role") == "system":
+            encontrado = _PADRAO_PAPEL.match(str(mensagem.get("content") or ""))
+            return encontrado.group(1).strip() if encontrado else None
+    return None
+
+
+def tokens_da_chamada(
+    mensagens: Any, max_tokens: Optional[int] = None, modelo: str = "gpt-4o-mini"
+) -> int:
+    """Estimativa para o balde de TPM: prompt + resposta máxima."""
+    from curso_crewai.tokens import estimar_tokens
+
+    texto = "\n".join(
+        str(m.get("content") or "") if isinstance(m, dict) else str(m)
+        for m in mensagens or []
+    )
+    return estimar_tokens(texto, modelo) + (max_tokens or TOKENS_RESPOSTA_PADRAO)
+
+
+_limitador_litellm: Optional[LimitadorTaxa] = None
+_permissoes_por_chamada: Dict[str, Permissao] = {}
+_lock_chamadas = threading.Lock()
+# Chamada async do LiteLLM aguardando a vez no hook do cliente httpx:
+# (id da chamada, tokens, agente)
+_vez_pendente: contextvars.ContextVar[Optional[Tuple[Any, int, Optional[str]]]] = (
+    contextvars.ContextVar("vez_pendente", default=None)
+)
+_espera_no_cliente_async = False
+
+
+def _guardar_permissao(id_chamada: Any, permissao: Permissao) -> None:
+    if id_chamada:
+        with _lock_chamadas:
+            _permissoes_por_chamada[id_chamada] = permissao
+
+
+def _em_event_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+async def esperar_vez_http(request: Any) -> None:
+    """
+    Hook de requisição do cliente httpx assíncrono compartilhado
+    (`conexoes.cliente_http_async`): a chamada async do LiteLLM espera a vez
+    aqui, com `await`, em vez de travar o event loop no `log_pre_api_call`.
+    """
+    pendente = _vez_pendente.get()
+    if pendente is None or _limitador_litellm is None:
+        return
+    _vez_pendente.set(None)
+    id_chamada, tokens, agente = pendente
+    permissao = await _limitador_litellm.aadquirir(tokens, agente=agente)
+    _guardar_permissao(id_chamada, permissao)
+
+
+def instalar_litellm(limitador: LimitadorTaxa, espera_no_cliente: bool = False) -> bool:
+    """
+    Faz toda chamada do LiteLLM (agentes do CrewAI) passar pelo limitador.
+    Retorna False se o LiteLLM não estiver instalado. Chamar de novo só
+    troca o limitador.
+
+    Com `espera_no_cliente` (o LiteLLM usa o pool de `conexoes`), as chamadas
+    async esperam no hook `esperar_vez_http` sem travar o event loop; sem ele
+    a espera acontece antes do envio, bloqueando quem chamou.
+    """
+    global _limitador_litellm, _espera_no_cliente_async
+    try:
+        import litellm
+        from litellm.integrations.custom_logger import CustomLogger
+    except ImportError:
+        return False
+
+    instalado = _limitador_litellm is not None
+    _limitador_litellm = limitador
+    _espera_no_cliente_async = _espera_no_cliente_async or espera_no_cliente
+    if instalado:
+        return True
+
+    def retirar(kwargs: Dict[str, Any]) -> Optional[Permissao]:
+        with _lock_chamadas:
+            return _permissoes_por_chamada.pop(kwargs.get("litellm_call_id"), None)
+
+    class LoggerLimite(CustomLogger):
+        def log_pre_api_call(self, model, messages, kwargs):
+            parametros = kwargs.get("optional_params") or {}
+            tokens = tokens_da_chamada(messages, parametros.get("max_tokens"), model)
+            agente = _contexto_atual.get().get("agente") or agente_das_mensagens(
+                messages
+            )
+            id_chamada = kwargs.get("litellm_call_id")
+            if _espera_no_cliente_async and _em_event_loop():
+                # O hook do httpx roda na mesma tarefa e vê esta variável
+                _vez_pendente.set((id_chamada, tokens, agente))
+                return
+            permissao = _limitador_litellm.adquirir(tokens, agente=agente)
+            _guardar_permissao(id_chamada, permissao)
+
+        def _confirmar(self, kwargs, resposta):
+            permissao = retirar(kwargs)
+            if permissao is None:
+                return
+            usage = getattr(resposta, "usage", None)
+            if isinstance(resposta, dict):
+                usage = resposta.get("usage")
+            total = getattr(usage, "total_tokens", None)
+            if isinstance(usage, dict):
+                total = usage.get("total_tokens")
+            if total:
+                _limitador_litellm.confirmar(permissao, int(total))
+
+        def log_success_event(self, kwargs, response_obj, start_time, end_time):
+            self._confirmar(kwargs, response_obj)
+
+        async def async_log_success_event(
+            self, kwargs, response_obj, start_time, end_time
+        ):
+            self._confirmar(kwargs, response_obj)
+
+        def log_failure_event(self, kwargs, response_obj, start_time, end_time):
+            permissao = retirar(kwargs)
+            if permissao is not None:
+                _limitador_litellm.liberar(permissao)
+
+        async def async_log_failure_event(
+            self, kwargs, response_obj, start_time, end_time
+        ):
+            self.log_failure_event(kwargs, response_obj, start_time, end_time)
+
+    litellm.callbacks = [*(litellm.callbacks or []), LoggerLimite()]
+    return True
+
+
+def callback_langchain(limitador: Optional[LimitadorTaxa] = None) -> Any:
+    """
+    Handler de callbacks do LangChain que passa as chamadas de um chat model
+    (ex.: `ChatOpenAI`, inclusive `stream`/`astream`) pelo limitador. Nas
+    chamadas async o LangChain roda handlers síncronos num executor: a espera
+    não trava o event loop. Retorna None sem o `langchain_core`.
+    """
+    try:
+        from langchain_core.callbacks import BaseCallbackHandler
+    except ImportError:
+        return None
+
+    limitador = limitador or limitador_padrao()
+
+    class CallbackLimite(BaseCallbackHandler):
+        def __init__(self) -> None:
+            self._permissoes: Dict[Any, Permissao] = {}
+            self._lock = threading.Lock()
+
+        def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+            parametros = kwargs.get("invocation_params") or {}
+            mensagens = [
+                {"role": getattr(m, "type", ""), "content": getattr(m, "content", m)}
+                for lote in messages
+                for m in lote
+            ]
+            permissao = limitador.adquirir(
+                tokens_da_chamada(
+                    mensagens,
+                    parametros.get("max_tokens"),
+                    parametros.get("model_name")
+                    or parametros.get("model")
+                    or "gpt-4o-mini",
+                ),
+                agente=_contexto_atual.get().get("agente")
+                or agente_das_mensagens(mensagens),
+            )
+            with self._lock:
+                self._permissoes[run_id] = permissao
+
+        def on_llm_end(self, response, *, run_id, **kwargs):
+            with self._lock:
+                permissao = self._permissoes.pop(run_id, None)
+            uso = (getattr(response, "llm_output", None) or {}).get("token_usage")
+            total = (uso or {}).get("total_tokens")
+            if permissao is not None and total:
+                limitador.confirmar(permissao, int(total))
+
+        def on_llm_error(self, error, *, run_id, **kwargs):
+            with self._lock:
+                permissao = self._permissoes.pop(run_id, None)
+            if permissao is not None:
+                limitador.liberar(permissao)
+
+    return CallbackLimite()
+
+
+_limitador_padrao: Optional[LimitadorTaxa] = None
+_lock_padrao = threading.Lock()
+
+
+def limitador_padrao() -> LimitadorTaxa:
+    """Limitador do processo, configurado pelas variáveis CURSO_LIMITE_*."""
+    global _limitador_padrao
+    with _lock_padrao:
+        if _limitador_padrao is None:
+            _limitador_padrao = LimitadorTaxa(
+                rpm=float(os.getenv("CURSO_LIMITE_RPM", "500")),
+                tpm=float(os.getenv("CURSO_LIMITE_TPM", "200000")),
+                caminho=os.getenv("CURSO_LIMITE_DB") or None,
+            )
+        return _limitador_padrao
+
+
+# =============================================================================
+# BENCHMARK
+# =============================================================================
+
+
+def _rajada_em_processo(caminho: str, chamadas: int, fila: Any) -> None:
+    limitador = LimitadorTaxa(rpm=600, tpm=10**9, caminho=caminho, rajada_s=0.5)
+    instantes = []
+    for _ in range(chamadas):
+        limitador.adquirir(agente="processo")
+        instantes.append(time.time())
+    fila.put(instantes)
+
+
+def _maior_taxa(instantes: List[float], janela: float = 1.0) -> int:
+    instantes = sorted(instantes)
+    maior, inicio = 0, 0
+    for fim, instante in enumerate(instantes):
+        while instante - instantes[inicio] > janela:
+            inicio += 1
+        maior = max(maior, fim - inicio + 1)
+    return maior
+
+
+def _benchmark() -> None:
+    import multiprocessing
+    import tempfile
+    from concurrent.futures import ThreadPoolExecutor
+
+    # 3 "crews" no mesmo processo disputando 600 RPM (10/s, rajada de 5)
+    limitador = LimitadorTaxa(rpm=600, tpm=10**9, rajada_s=0.5)
+    instantes: List[float] = []
+
+    def crew(nome: str, prioridade: str) -> None:
+        for _ in range(15):
+            limitador.adquirir(agente=nome, prioridade=prioridade)
+            instantes.append(time.time())
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(3) as executor:
+        for nome, prioridade in (
+            ("pesquisador", "alta"),
+            ("redator", "normal"),
+            ("revisor", "baixa"),
+        ):
+            executor.submit(crew, nome, prioridade)
+    duracao = time.perf_counter() - inicio
+    print(f"3 crews x 15 chamadas, limite 10/s: {duracao:.1f}s")
+    print(f"  maior taxa observada em 1s: {_maior_taxa(instantes)} chamadas")
+    for agente, stats in limitador.estatisticas()["esperas_por_agente"].items():
+        print(f"  {agente:12s} espera média {stats['espera_media_ms']:6.0f}ms")
+
+    # 3 processos dividindo o mesmo limite pelo SQLite
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, "limite.sqlite3")
+        LimitadorTaxa(caminho=caminho)  # cria a tabela antes dos processos
+        fila: Any = multiprocessing.Queue()
+        processos = [
+            multiprocessing.Process(
+                target=_rajada_em_processo, args=(caminho, 15, fila)
+            )
+            for _ in range(3)
+        ]
+        inicio = time.perf_counter()
+        for processo in processos:
+            processo.start()
+        todos = [t for _ in processos for t in fila.get()]
+        for processo in processos:
+            processo.join()
+        duracao = time.perf_counter() - inicio
+    print(f"3 processos x 15 chamadas, limite 10/s: {duracao:.1f}s")
+    print(f"  maior taxa observada em 1s: {_maior_taxa(todos)} chamadas")
+
+
+if __name__ == "__main__":
+    _benchmark()
@@ -0,0 +1,175 @@
+"""
+Processamento em lote com pool de workers.
+
+Passa milhares de entradas por uma função (ex.: uma crew) usando um pool de
+threads limitado. O número de itens em voo é limitado, então entradas
+enormes (arquivos JSONL com milhões de linhas) não são carregadas de uma
+vez. Os resultados saem à medida que terminam, com a latência de cada item,
+e as estatísticas do lote trazem throughput e percentis (num esboço de
+quantis de memória limitada: nada cresce com o tamanho do lote).
+
+Uso:
+    for item in processar_em_lote(perguntas, responder, max_workers=8):
+        print(item.indice, item.latencia, item.saida)
+"""
+
+import json
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, TextIO
+
+from curso_crewai.metricas import EsbocoQuantis
+
+
+@dataclass
+class ResultadoItem:
+    """Resultado de um item do lote."""
+
+    indice: int
+    entrada: Any
+    saida: Any = None
+    erro: Optional[str] = None
+    latencia: float = 0.0
+
+    @property
+    def sucesso(self) -> bool:
+        return self.erro is None
+
+    def para_dict(self) -> Dict[str, Any]:
+        saida = self.saida.raw if hasattr(self.saida, "raw") else self.saida
+        return {
+            "indice": self.indice,
+            "entrada": self.entrada,
+            "saida": None if saida is None else str(saida),
+            "erro": self.erro,
+            "latencia": round(self.latencia, 4),
+        }
+
+
+@dataclass
+class EstatisticasLote:
+    """Acumula latências (em esboço de quantis) e calcula throughput do lote."""
+
+    inicio: float = field(default_factory=time.perf_counter)
+    fim: Optional[float] = None
+    latencias: EsbocoQuantis = field(default_factory=EsbocoQuantis)
+    latencia_total: float = 0.0
+    falhas: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def registrar(self, item: ResultadoItem) -> None:
+        with self._lock:
+            self.latencias.adicionar(item.latencia)
+            self.latencia_total += item.latencia
+            if not item.sucesso:
+                self.falhas += 1
+
+    def finalizar(self) -> None:
+        self.fim = time.perf_counter()
+
+    def resumo(self) -> Dict[str, Any]:
+        duracao = (self.fim or time.perf_counter()) - self.inicio
+        with self._lock:
+            total = self.latencias.contagem
+            p50 = self.latencias.quantil(0.5)
+            p95 = self.latencias.quantil(0.95)
+            maxima = self.latencias.maximo if total else 0.0
+            soma = self.latencia_total
+        return {
+            "itens": total,
+            "sucessos": total - self.falhas,
+            "falhas": self.falhas,
+            "duracao_s": round(duracao, 3),
+            "throughput_itens_s": round(total / duracao, 3) if duracao > 0 else 0.0,
+            "latencia_media_s": round(soma / total, 3) if total else 0.0,
+            "latencia_p50_s": round(p50, 3),
+            "latencia_p95_s": round(p95, 3),
+            "latencia_max_s": round(maxima, 3),
+        }
+
+
+def processar_em_lote(
+    entradas: Iterable[Any],
+    funcao: Callable[[Any], Any],
+    max_workers: int = 4,
+    max_em_voo: Optional[int] = None,
+    estatisticas: Optional[EstatisticasLote] = None,
+    inicializar_worker: Optional[Callable[[], None]] = None,
+) -> Iterator[ResultadoItem]:
+    """
+    Executa `funcao` para cada entrada e devolve os resultados conforme terminam.
+
+    Args:
+        entradas: Iterável (pode ser preguiçoso) de entradas
+        funcao: Função chamada em uma thread do pool para cada entrada
+        max_workers: Tamanho do pool de threads
+        max_em_voo: Máximo de itens submetidos e ainda não entregues
+            (padrão: 2 x max_workers)
+        estatisticas: Acumulador opcional de latência/throughput
+        inicializar_worker: Chamada uma vez em cada thread do pool
+
+    Yields:
+        ResultadoItem: Na ordem de conclusão (use `indice` para reordenar)
+    """
+    limite = max_em_voo or max_workers * 2
+    estatisticas = estatisticas if estatisticas is not None else EstatisticasLote()
+
+    def executar(indice: int, entrada: Any) -> ResultadoItem:
+        inicio = time.perf_counter()
+        try:
+            saida = funcao(entrada)
+            return ResultadoItem(
+                indice, entrada, saida, latencia=time.perf_counter() - inicio
+            )
+        except Exception as e:  # Um item com erro não derruba o lote
+            return ResultadoItem(
+                indice,
+                entrada,
+                erro=f"{type(e).__name__}: {e}",
+                latencia=time.perf_counter() - inicio,
+            )
+
+    iterador = enumerate(entradas)
+    with ThreadPoolExecutor(
+        max_workers=max_workers,
+        thread_name_prefix="lote",
+        initializer=inicializar_worker,
+    ) as pool:
+        pendentes: "set[Future]" = set()
+        esgotado = False
+        while pendentes or not esgotado:
+            while not esgotado and len(pendentes) < limite:
+                try:
+                    indice, entrada = next(iterador)
+                except StopIteration:
+                    esgotado = True
+                    break
+                pendentes.add(pool.submit(executar, indice, entrada))
+            if not pendentes:
+                break
+            concluidas, pendentes = wait(pendentes, return_when=FIRST_COMPLETED)
+            for futura in concluidas:
+                item = futura.result()
+                estatisticas.registrar(item)
+                yield item
+    estatisticas.finalizar()
+
+
+def ler_jsonl(arquivo: TextIO, campo: str = "pergunta") -> Iterator[str]:
+    """Lê entradas de um JSONL (objetos com `campo`) ou de texto, uma por linha."""
+    for linha in arquivo:
+        linha = linha.strip()
+        if not linha:
+            continue
+        if linha.startswith("{"):
+            yield json.loads(linha)[campo]
+        else:
+            yield linha
+
+
+def escrever_jsonl(arquivo: TextIO, item: ResultadoItem) -> None:
+    """Grava um resultado como linha JSON e força a escrita (streaming)."""
+    arquivo.write(json.dumps(item.para_dict(), ensure_ascii=False) + "\n")
+    arquivo.flush()
@@ -0,0 +1,496 @@
+"""
+Métricas de execução com memória limitada e relatórios em tempo constante.
+
+Guardar um dicionário por execução e recalcular tudo a cada relatório é
+O(n) em memória e em tempo: depois de um dia em produção são milhões de
+registros. Aqui cada execução só atualiza estruturas de tamanho fixo:
+
+- agregados contínuos (contagem, soma, mínimo, máximo)
+- esboços de quantis (p50/p95/p99) de latência e tokens, com erro relativo
+  limitado e mescláveis entre agentes ou processos
+- buffers circulares em `array` com as últimas N execuções de cada agente
+- consolidados por intervalo de tempo (ex.: por minuto), com retenção fixa
+
+O relatório lê esses agregados: o custo não depende de quantas execuções
+já foram registradas.
+
+Uso:
+    armazem = ArmazemMetricas()
+    armazem.registrar("pesquisador", tempo=2.3, tokens=850, sucesso=True)
+    armazem.resumo("pesquisador")["tempo_p95"]
+    armazem.janela(segundos=300)  # últimos 5 minutos, todos os agentes
+"""
+
+import math
+import threading
+import time
+from array import array
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+
+TOTAL = "__total__"
+
+
+# =============================================================================
+# ESTRUTURAS BÁSICAS
+# =============================================================================
+
+
+@dataclass
+class Agregado:
+    """Contagem, soma, mínimo e máximo de uma série."""
+
+    contagem: int = 0
+    soma: float = 0.0
+    minimo: float = math.inf
+    maximo: float = -math.inf
+
+    def adicionar(self, valor: float) -> None:
+        self.contagem += 1
+        self.soma += valor
+        if valor < self.minimo:
+            self.minimo = valor
+        if valor > self.maximo:
+            self.maximo = valor
+
+    def mesclar(self, outro: "Agregado") -> None:
+        self.contagem += outro.contagem
+        self.soma += outro.soma
+        self.minimo = min(self.minimo, outro.minimo)
+        self.maximo = max(self.maximo, outro.maximo)
+
+    @property
+    def media(self) -> float:
+        return self.soma / self.contagem if self.contagem else 0.0
+
+
+class EsbocoQuantis:
+    """
+    Esboço de quantis com erro relativo limitado (no estilo DDSketch).
+
+    Cada valor cai em um balde logarítmico; o quantil devolvido fica a no
+    máximo `erro_relativo` do valor real. Inserir é O(1), a memória é
+    limitada por `max_baldes` (os menores baldes são fundidos) e dois
+    esboços se mesclam somando as contagens.
+    """
+
+    def __init__(self, erro_relativo: float = 0.01, max_baldes: int = 2048):
+        self.erro_relativo = erro_relativo
+        self.max_baldes = max_baldes
+        self._gama = (1 + erro_relativo) / (1 - erro_relativo)
+        self._log_gama = math.log(self._gama)
+        self.baldes: Dict[int, int] = {}
+        self.zeros = 0
+        self.contagem = 0
+        self.minimo = math.inf
+        self.maximo = -math.inf
+
+    def adicionar(self, valor: float, vezes: int = 1) -> None:
+        self.contagem += vezes
+        if valor < self.minimo:
+            self.minimo = valor
+        if valor > self.maximo:
+            self.maximo = valor
+        if valor <= 1e-9:
+            self.zeros += vezes
+            return
+        indice = math.ceil(math.log(valor) / self._log_gama)
+        self.baldes[indice] = self.baldes.get(indice, 0) + vezes
+        if len(self.baldes) > self.max_baldes:
+            self._fundir_menores()
+
+    def _fundir_menores(self) -> None:
+        indices = sorted(self.baldes)
+        excesso = len(indices) - self.max_baldes + 1
+        destino = indices[excesso]
+        for indice in indices[:excesso]:
+            self.baldes[destino] += self.baldes.pop(indice)
+
+    def mesclar(self, outro: "EsbocoQuantis") -> None:
+        if outro._gama != self._gama:
+            raise ValueError("Esboços com erro relativo diferente")
+        for indice, quantidade in outro.baldes.items():
+            self.baldes[indice] = self.baldes.get(indice, 0) + quantidade
+        self.zeros += outro.zeros
+        self.contagem += outro.contagem
+        self.minimo = min(self.minimo, outro.minimo)
+        self.maximo = max(self.maximo, outro.maximo)
+        if len(self.baldes) > self.max_baldes:
+            self._fundir_menores()
+
+    def quantil(self, q: float) -> float:
+        """Valor no quantil q (0..1); 0.0 se vazio."""
+        if not self.contagem:
+            return 0.0
+        posicao = q * (self.contagem - 1)
+        acumulado = self.zeros
+        if acumulado > posicao:
+            return max(0.0, self.minimo)
+        for indice in sorted(self.baldes):
+            acumulado += self.baldes[indice]
+            if acumulado > posicao:
+                valor = 2 * self._gama**indice / (self._gama + 1)
+                return min(max(valor, self.minimo), self.maximo)
+        return self.maximo
+
+    def copia(self) -> "EsbocoQuantis":
+        nova = EsbocoQuantis(self.erro_relativo, self.max_baldes)
+        nova.mesclar(self)
+        return nova
+
+
+class BufferCircular:
+    """Últimas `capacidade` execuções em arrays de tamanho fixo."""
+
+    def __init__(self, capacidade: int = 1024):
+        self.capacidade = capacidade
+        self.instantes = array("d", bytes(8 * capacidade))
+        self.tempos = array("d", bytes(8 * capacidade))
+        self.tokens = array("d", bytes(8 * capacidade))
+        self.sucessos = array("b", bytes(capacidade))
+        self.posicao = 0
+        self.tamanho = 0
+
+    def adicionar(
+        self, instante: float, tempo: float, tokens: float, sucesso: bool
+    ) -> None:
+        i = self.posicao
+        self.instantes[i] = instante
+        self.tempos[i] = tempo
+        self.tokens[i] = tokens
+        self.sucessos[i] = 1 if sucesso else 0
+        self.posicao = (i + 1) % self.capacidade
+        if self.tamanho < self.capacidade:
+            self.tamanho += 1
+
+    def ultimos(
+        self, n: Optional[int] = None
+    ) -> Iterator[Tuple[float, float, float, bool]]:
+        """(instante, tempo, tokens, sucesso) do mais antigo ao mais novo."""
+        n = self.tamanho if n is None else min(n, self.tamanho)
+        inicio = (self.posicao - n) % self.capacidade
+        for k in range(n):
+            i = (inicio + k) % self.capacidade
+            yield (
+                self.instantes[i],
+                self.tempos[i],
+                self.tokens[i],
+                bool(self.sucessos[i]),
+            )
+
+
+# =============================================================================
+# SÉRIES
+# =============================================================================
+
+
+@dataclass
+class Consolidado:
+    """Agregados de um intervalo de tempo (ou da série inteira)."""
+
+    erro_relativo: float = 0.01
+    max_baldes: int = 2048
+    falhas: int = 0
+    custo: float = 0.0
+    tempo: Agregado = field(default_factory=Agregado)
+    tokens: Agregado = field(default_factory=Agregado)
+    quantis_tempo: EsbocoQuantis = field(init=False)
+    quantis_tokens: EsbocoQuantis = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.quantis_tempo = EsbocoQuantis(self.erro_relativo, self.max_baldes)
+        self.quantis_tokens = EsbocoQuantis(self.erro_relativo, self.max_baldes)
+
+    def adicionar(
+        self, tempo: float, tokens: float, sucesso: bool, custo: float
+    ) -> None:
+        self.tempo.adicionar(tempo)
+        self.tokens.adicionar(tokens)
+        self.quantis_tempo.adicionar(tempo)
+        self.quantis_tokens.adicionar(tokens)
+        self.custo += custo
+        if not sucesso:
+            self.falhas += 1
+
+    def mesclar(self, outro: "Consolidado") -> None:
+        self.tempo.mesclar(outro.tempo)
+        self.tokens.mesclar(outro.tokens)
+        self.quantis_tempo.mesclar(outro.quantis_tempo)
+        self.quantis_tokens.mesclar(outro.quantis_tokens)
+        self.custo += outro.custo
+        self.falhas += outro.falhas
+
+    def resumo(self) -> Optional[Dict[str, Any]]:
+        total = self.tempo.contagem
+        if not total:
+            return None
+        return {
+            "total_execucoes": total,
+            "falhas": self.falhas,
+            "taxa_sucesso": (total - self.falhas) / total * 100,
+            "tempo_medio": self.tempo.media,
+            "tempo_max": self.tempo.maximo,
+            "tempo_min": self.tempo.minimo,
+            "tempo_p50": self.quantis_tempo.quantil(0.5),
+            "tempo_p95": self.quantis_tempo.quantil(0.95),
+            "tempo_p99": self.quantis_tempo.quantil(0.99),
+            "tokens_total": self.tokens.soma,
+            "tokens_medio": self.tokens.media,
+            "tokens_p50": self.quantis_tokens.quantil(0.5),
+            "tokens_p95": self.quantis_tokens.quantil(0.95),
+            "tokens_p99": self.quantis_tokens.quantil(0.99),
+            "custo_estimado": self.custo,
+        }
+
+
+class SerieAgente:
+    """Totais, buffer recente e consolidados por intervalo de um agente."""
+
+    def __init__(
+        self,
+        resolucao_s: float = 60.0,
+        retencao: int = 1440,
+        capacidade_recentes: int = 1024,
+        erro_relativo: float = 0.01,
+    ):
+        self.resolucao_s = resolucao_s
+        self.retencao = retencao
+        self.erro_relativo = erro_relativo
+        self.total = Consolidado(erro_relativo)
+        self.recentes = BufferCircular(capacidade_recentes)
+        self.intervalos: Dict[int, Consolidado] = {}
+        self._ordem: Deque[int] = deque()
+
+    def _intervalo(self, instante: float) -> Optional[Consolidado]:
+        chave = int(instante // self.resolucao_s)
+        consolidado = self.intervalos.get(chave)
+        if consolidado is not None:
+            return consolidado
+        if self._ordem and chave < self._ordem[0]:
+            return None  # Mais antigo que a retenção: só entra nos totais
+        # Intervalos têm esboço menor: são muitos e cada um vê poucas execuções
+        consolidado = Consolidado(erro_relativo=0.02, max_baldes=256)
+        self.intervalos[chave] = consolidado
+        if not self._ordem or chave > self._ordem[-1]:
+            self._ordem.append(chave)
+        else:
+            self._ordem = deque(sorted((*self._ordem, chave)))
+        while len(self._ordem) > self.retencao:
+            del self.intervalos[self._ordem.popleft()]
+        return consolidado
+
+    def registrar(
+        self,
+        instante: float,
+        tempo: float,
+        tokens: float,
+        sucesso: bool,
+        custo: float,
+    ) -> None:
+        self.total.adicionar(tempo, tokens, sucesso, custo)
+        self.recentes.adicionar(instante, tempo, tokens, sucesso)
+        intervalo = self._intervalo(instante)
+        if intervalo is not None:
+            intervalo.adicionar(tempo, tokens, sucesso, custo)
+
+    def janela(self, desde: float) -> Consolidado:
+        """Consolidado dos intervalos a partir de `desde` (epoch)."""
+        primeiro = int(desde // self.resolucao_s)
+        resultado = Consolidado(erro_relativo=0.02, max_baldes=256)
+        for chave in reversed(self._ordem):
+            if chave < primeiro:
+                break
+            resultado.mesclar(self.intervalos[chave])
+        return resultado
+
+
+class ArmazemMetricas:
+    """
+    Métricas por agente, com uma série `TOTAL` atualizada junto: o resumo
+    geral não precisa juntar os agentes.
+
+    Args:
+        resolucao_s: Duração de cada intervalo consolidado
+        retencao: Quantos intervalos guardar (1440 x 60s = 1 dia)
+        capacidade_recentes: Execuções no buffer circular de cada agente
+        erro_relativo: Precisão dos quantis dos totais
+    """
+
+    def __init__(
+        self,
+        resolucao_s: float = 60.0,
+        retencao: int = 1440,
+        capacidade_recentes: int = 1024,
+        erro_relativo: float = 0.01,
+    ):
+        self._parametros = dict(
+            resolucao_s=resolucao_s,
+            retencao=retencao,
+            capacidade_recentes=capacidade_recentes,
+            erro_relativo=erro_relativo,
+        )
+        self._series: Dict[str, SerieAgente] = {TOTAL: SerieAgente(**self._parametros)}
+        self._lock = threading.Lock()
+
+    def registrar(
+        self,
+        agente: str,
+        tempo: float,
+        tokens: float = 0,
+        sucesso: bool = True,
+        custo: float = 0.0,
+        instante: Optional[float] = None,
+    ) -> None:
+        instante = time.time() if instante is None else instante
+        with self._lock:
+            serie = self._series.get(agente)
+            if serie is None:
+                serie = self._series[agente] = SerieAgente(**self._parametros)
+            serie.registrar(instante, tempo, tokens, sucesso, custo)
+            self._series[TOTAL].registrar(instante, tempo, tokens, sucesso, custo)
+
+    def agentes(self) -> List[str]:
+        with self._lock:
+            return [agente for agente in self._series if agente != TOTAL]
+
+    def resumo(self, agente: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Estatísticas desde o início (todos os agentes se `agente` for None)."""
+        with self._lock:
+            serie = self._series.get(agente or TOTAL)
+            return serie.total.resumo() if serie else None
+
+    def janela(
+        self, agente: Optional[str] = None, segundos: float = 300.0
+    ) -> Optional[Dict[str, Any]]:
+        """Estatísticas dos intervalos dos últimos `segundos`."""
+        with self._lock:
+            serie = self._series.get(agente or TOTAL)
+            if serie is None:
+                return None
+            return serie.janela(time.time() - segundos).resumo()
+
+    def serie_temporal(self, agente: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Um ponto por intervalo retido: início, execuções, falhas, p95 etc."""
+        with self._lock:
+            serie = self._series.get(agente or TOTAL)
+            if serie is None:
+                return []
+            pontos = []
+            for chave in serie._ordem:
+                consolidado = serie.intervalos[chave]
+                pontos.append(
+                    {
+                        "inicio": chave * serie.resolucao_s,
+                        "execucoes": consolidado.tempo.contagem,
+                        "falhas": consolidado.falhas,
+                        "tempo_medio": consolidado.tempo.media,
+                        "tempo_p95": consolidado.quantis_tempo.quantil(0.95),
+                        "tokens": consolidado.tokens.soma,
+                        "custo": consolidado.custo,
+                    }
+                )
+            return pontos
+
+    def recentes(
+        self, agente: Optional[str] = None, n: Optional[int] = None
+    ) -> List[Tuple[float, float, float, bool]]:
+        """Últimas execuções (instante, tempo, tokens, sucesso)."""
+        with self._lock:
+            serie = self._series.get(agente or TOTAL)
+            return list(serie.recentes.ultimos(n)) if serie else []
+
+    def mesclar(self, outro: "ArmazemMetricas") -> None:
+        """Soma os totais de outro armazém (ex.: de outro processo)."""
+        with self._lock, outro._lock:
+            for agente, serie in outro._series.items():
+                destino = self._series.get(agente)
+                if destino is None:
+                    destino = self._series[agente] = SerieAgente(**self._parametros)
+                destino.total.mesclar(serie.total)
+
+
+def _benchmark(execucoes: int = 500_000, agentes: int = 10) -> None:
+    import gc
+    import random
+    import tracemalloc
+    from datetime import datetime
+
+    aleatorio = random.Random(1)
+    amostras = [
+        (
+            f"agente_{i % agentes}",
+            aleatorio.lognormvariate(0.5, 0.6),
+            aleatorio.randint(200, 3000),
+            aleatorio.random() > 0.03,
+        )
+        for i in range(execucoes)
+    ]
+    agora = time.time() - execucoes * 0.1
+
+    def preencher() -> ArmazemMetricas:
+        armazem = ArmazemMetricas()
+        for i, (agente, tempo, tokens, sucesso) in enumerate(amostras):
+            armazem.registrar(agente, tempo, tokens, sucesso, 0.0, agora + i * 0.1)
+        return armazem
+
+    inicio = time.perf_counter()
+    armazem = preencher()
+    duracao = time.perf_counter() - inicio
+
+    gc.collect()
+    inicio = time.perf_counter()
+    geral = armazem.resumo()
+    for agente in armazem.agentes():
+        armazem.resumo(agente)
+    relatorio = time.perf_counter() - inicio
+
+    ordenados = sorted(tempo for _, tempo, _, _ in amostras)
+    exato = ordenados[int(0.99 * (len(ordenados) - 1))]
+
+    del armazem
+    gc.collect()
+    tracemalloc.start()
+    armazem = preencher()
+    memoria = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    # Referência: um dict por execução, como no monitor antigo (10% extrapolado)
+    tracemalloc.start()
+    registros = [
+        {
+            "timestamp": datetime.now(),
+            "agente_id": agente,
+            "tempo_execucao": tempo,
+            "tokens_usados": tokens,
+            "tokens_prompt": None,
+            "tokens_resposta": None,
+            "custo": None,
+            "sucesso": sucesso,
+            "erro": None,
+        }
+        for agente, tempo, tokens, sucesso in amostras[: execucoes // 10]
+    ]
+    memoria_dicts = tracemalloc.get_traced_memory()[0] * 10
+    tracemalloc.stop()
+    inicio = time.perf_counter()
+    tempos = [r["tempo_execucao"] for r in registros]
+    tokens_lista = [r["tokens_usados"] for r in registros]
+    sum(tempos) / len(tempos), max(tempos), min(tempos), sum(tokens_lista)
+    relatorio_dicts = (time.perf_counter() - inicio) * 10
+
+    print(f"{execucoes} execuções, {agentes} agentes:")
+    print(f"  registro: {duracao / execucoes * 1e6:.1f}µs por execução")
+    print(
+        f"  memória: {memoria / 1e6:.1f}MB "
+        f"(um dict por execução: ~{memoria_dicts / 1e6:.0f}MB)"
+    )
+    print(
+        f"  relatório geral + {agentes} agentes: {relatorio * 1000:.2f}ms "
+        f"(varrendo os dicts, só o geral: ~{relatorio_dicts * 1000:.0f}ms)"
+    )
+    print(f"  p99 do tempo: {geral['tempo_p99']:.3f}s (exato {exato:.3f}s)")
+
+
+if __name__ == "__main__":
+    _benchmark()
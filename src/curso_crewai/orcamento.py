@@ -0,0 +1,584 @@
+"""
+Livro-caixa de orçamento com reservas atômicas.
+
+O padrão "verifica o saldo e depois soma o gasto" quebra com várias
+execuções ao mesmo tempo: todas passam pela verificação antes de qualquer
+uma registrar o gasto, e o orçamento estoura. Aqui cada execução:
+
+1. Reserva o custo estimado (falha na hora se não couber)
+2. Chama o modelo
+3. Confirma o custo real, devolvendo a diferença, ou libera a reserva
+   se a chamada falhou
+
+Os saldos são organizados em contas hierárquicas: um limite global
+opcional, um por cliente (tenant) e um por agente dentro do cliente.
+Cada conta é protegida por uma das N travas listradas, então execuções de
+clientes diferentes não disputam a mesma trava. Com `caminho`, os gastos
+são gravados em SQLite em lote (thread de fundo) e os limites sobrevivem a
+reinícios.
+
+Uso:
+    livro = LivroOrcamento(limite_tenant=5.0, caminho=".cache/orcamento.sqlite3")
+    with livro.reserva(0.02, tenant="acme", agente="pesquisador") as reserva:
+        resultado = crew.kickoff()
+        reserva.custo_real = uso.custo
+"""
+
+import atexit
+import itertools
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Tuple
+
+TENANT_PADRAO = "padrao"
+CONTA_GLOBAL = "*"
+# Margem para erros de arredondamento (100 x $0.01 cabe em $1.00)
+_TOLERANCIA = 1e-9
+
+
+class OrcamentoExcedido(Exception):
+    """A reserva não cabe no saldo de alguma das contas envolvidas."""
+
+    def __init__(self, conta: str, valor: float, disponivel: float):
+        self.conta = conta
+        self.valor = valor
+        self.disponivel = disponivel
+        super().__init__(
+            f"Orçamento excedido em '{conta}': reserva de ${valor:.6f}, "
+            f"disponível ${max(disponivel, 0.0):.6f}"
+        )
+
+
+@dataclass
+class Reserva:
+    """Valor bloqueado até a confirmação do custo real."""
+
+    id: int
+    contas: Tuple[str, ...]
+    valor: float
+    expira_em: float
+    ativa: bool = True
+    # Devolvida por expirar_reservas; o custo real ainda pode ser confirmado
+    expirada: bool = False
+    # Preenchido por quem usa `LivroOrcamento.reserva()` como context manager
+    custo_real: Optional[float] = None
+
+    @property
+    def tenant(self) -> str:
+        return self.contas[-1].split("/", 1)[0]
+
+
+@dataclass
+class _Conta:
+    limite: Optional[float]
+    gasto: float = 0.0
+    reservado: float = 0.0
+    reservas: int = 0
+    rejeicoes: int = 0
+    # Custos confirmados depois de a reserva expirar
+    tardias: int = 0
+
+    @property
+    def disponivel(self) -> float:
+        if self.limite is None:
+            return float("inf")
+        return self.limite - self.gasto - self.reservado
+
+
+@dataclass
+class _Listra:
+    trava: threading.Lock = field(default_factory=threading.Lock)
+    # Gastos confirmados ainda não gravados no SQLite
+    pendentes: Dict[str, float] = field(default_factory=dict)
+    lancamentos: List[Tuple[float, str, float, float]] = field(default_factory=list)
+
+
+def conta_de(tenant: Optional[str] = None, agente: Optional[str] = None) -> str:
+    """Nome da conta: '*' (global), 'tenant' ou 'tenant/agente'."""
+    if tenant is None:
+        return CONTA_GLOBAL
+    return f"{tenant}/{agente}" if agente else tenant
+
+
+class LivroOrcamento:
+    """
+    Orçamentos por cliente e por agente com reservas atômicas.
+
+    Args:
+        limite_global: Teto somado de todos os clientes (None = sem teto;
+            com teto, toda reserva passa pela mesma conta)
+        limite_tenant: Limite padrão de cada cliente (None = ilimitado)
+        limite_agente: Limite padrão de cada agente dentro do cliente
+        caminho: Arquivo SQLite para persistir limites e gastos
+        listras: Quantidade de travas independentes
+        ttl_reserva: Segundos até uma reserva esquecida ser devolvida
+        intervalo_gravacao: Segundos entre gravações em lote no SQLite
+    """
+
+    def __init__(
+        self,
+        limite_global: Optional[float] = None,
+        limite_tenant: Optional[float] = None,
+        limite_agente: Optional[float] = None,
+        caminho: Optional[str] = None,
+        listras: int = 64,
+        ttl_reserva: float = 600.0,
+        intervalo_gravacao: float = 1.0,
+    ):
+        self.limite_global = limite_global
+        self.limite_tenant = limite_tenant
+        self.limite_agente = limite_agente
+        self.caminho = caminho
+        self.ttl_reserva = ttl_reserva
+        self.intervalo_gravacao = intervalo_gravacao
+        self._listras = [_Listra() for _ in range(listras)]
+        self._contas: Dict[str, _Conta] = {}
+        self._limites: Dict[str, Optional[float]] = {}
+        self._reservas: Dict[int, Reserva] = {}
+        self._ids = itertools.count(1)
+        self._trava_sqlite = threading.Lock()
+        self._parar = threading.Event()
+        self._gravador: Optional[threading.Thread] = None
+        if caminho:
+            self._abrir_sqlite()
+            self._gravador = threading.Thread(
+                target=self._gravar_periodicamente, name="livro-orcamento", daemon=True
+            )
+            self._gravador.start()
+            atexit.register(self.fechar)
+
+    # -------------------------------------------------------------------------
+    # Contas e limites
+    # -------------------------------------------------------------------------
+
+    def _listra(self, conta: str) -> _Listra:
+        return self._listras[hash(conta) % len(self._listras)]
+
+    def _limite_padrao(self, conta: str) -> Optional[float]:
+        if conta in self._limites:
+            return self._limites[conta]
+        if conta == CONTA_GLOBAL:
+            return self.limite_global
+        return self.limite_agente if "/" in conta else self.limite_tenant
+
+    def _conta(self, nome: str) -> _Conta:
+        conta = self._contas.get(nome)
+        if conta is None:
+            # setdefault é atômico: duas threads criando a mesma conta ficam
+            # com o mesmo objeto
+            conta = self._contas.setdefault(nome, _Conta(self._limite_padrao(nome)))
+        return conta
+
+    def _caminho_contas(self, tenant: str, agente: Optional[str]) -> Tuple[str, ...]:
+        contas = [tenant]
+        if agente:
+            contas.append(conta_de(tenant, agente))
+        if self.limite_global is not None or CONTA_GLOBAL in self._limites:
+            contas.insert(0, CONTA_GLOBAL)
+        return tuple(contas)
+
+    def definir_limite(
+        self,
+        limite: Optional[float],
+        tenant: Optional[str] = None,
+        agente: Optional[str] = None,
+    ) -> None:
+        """Define o limite de uma conta (sem tenant = limite global)."""
+        nome = conta_de(tenant, agente)
+        self._limites[nome] = limite
+        if nome == CONTA_GLOBAL:
+            self.limite_global = limite
+        listra = self._listra(nome)
+        with listra.trava:
+            self._conta(nome).limite = limite
+        if self.caminho:
+            with self._trava_sqlite, self._conexao_sqlite as conn:
+                conn.execute(
+                    "INSERT INTO contas (conta, limite, gasto) VALUES (?, ?, 0) "
+                    "ON CONFLICT(conta) DO UPDATE SET limite = excluded.limite",
+                    (nome, limite),
+                )
+
+    @contextmanager
+    def _travar(self, contas: Tuple[str, ...]) -> Iterator[None]:
+        # Sempre na mesma ordem (índice da listra) para não haver deadlock
+        indices = sorted({hash(c) % len(self._listras) for c in contas})
+        travas = [self._listras[i].trava for i in indices]
+        for trava in travas:
+            trava.acquire()
+        try:
+            yield
+        finally:
+            for trava in reversed(travas):
+                trava.release()
+
+    # -------------------------------------------------------------------------
+    # Reservas
+    # -------------------------------------------------------------------------
+
+    def reservar(
+        self,
+        valor: float,
+        tenant: str = TENANT_PADRAO,
+        agente: Optional[str] = None,
+        ttl: Optional[float] = None,
+    ) -> Reserva:
+        """
+        Bloqueia `valor` em todas as contas do caminho (global, cliente,
+        agente) ou em nenhuma.
+
+        Raises:
+            OrcamentoExcedido: Se alguma conta não tiver saldo
+        """
+        if valor < 0:
+            raise ValueError("O valor da reserva não pode ser negativo")
+        nomes = self._caminho_contas(tenant, agente)
+        for tentativa in range(2):
+            contas = [self._conta(nome) for nome in nomes]
+            with self._travar(nomes):
+                falta = next(
+                    (
+                        (n, c)
+                        for n, c in zip(nomes, contas)
+                        if c.disponivel + _TOLERANCIA < valor
+                    ),
+                    None,
+                )
+                if falta is None:
+                    for conta in contas:
+                        conta.reservado += valor
+                        conta.reservas += 1
+                    reserva = Reserva(
+                        next(self._ids),
+                        nomes,
+                        valor,
+                        time.monotonic() + (ttl or self.ttl_reserva),
+                    )
+                    self._reservas[reserva.id] = reserva
+                    return reserva
+            # Antes de recusar, devolve reservas esquecidas e tenta de novo
+            if tentativa == 0 and self.expirar_reservas() == 0:
+                break
+        nome, conta = falta
+        conta.rejeicoes += 1
+        raise OrcamentoExcedido(nome, valor, conta.disponivel)
+
+    def _lancar(self, contas: Tuple[str, ...], reservado: float, custo: float) -> None:
+        """Soma `custo` ao gasto das contas. Chamar com as travas das contas."""
+        for nome in contas:
+            conta = self._conta(nome)
+            conta.gasto += custo
+            if self.caminho:
+                listra = self._listra(nome)
+                listra.pendentes[nome] = listra.pendentes.get(nome, 0.0) + custo
+        if self.caminho:
+            self._listra(contas[-1]).lancamentos.append(
+                (time.time(), contas[-1], reservado, custo)
+            )
+
+    def confirmar(self, reserva: Reserva, custo_real: Optional[float] = None) -> float:
+        """
+        Troca a reserva pelo custo real (padrão: o valor reservado).
+
+        O custo real pode passar do reservado: o dinheiro já foi gasto, então
+        é lançado mesmo assim e as próximas reservas encontram menos saldo.
+        Pelo mesmo motivo, uma reserva que expirou durante uma chamada lenta
+        ainda tem o custo lançado (e contado em `tardias`).
+
+        Raises:
+            ValueError: Se a reserva já foi confirmada ou liberada
+        """
+        custo = reserva.valor if custo_real is None else custo_real
+        with self._travar(reserva.contas):
+            if reserva.ativa:
+                for nome in reserva.contas:
+                    self._conta(nome).reservado -= reserva.valor
+            elif reserva.expirada:
+                # O valor reservado já foi devolvido por expirar_reservas
+                for nome in reserva.contas:
+                    self._conta(nome).tardias += 1
+            else:
+                raise ValueError(f"Reserva {reserva.id} já foi encerrada")
+            reserva.ativa = reserva.expirada = False
+            self._lancar(reserva.contas, reserva.valor, custo)
+        self._reservas.pop(reserva.id, None)
+        return custo
+
+    def lancar(
+        self, custo: float, tenant: str = TENANT_PADRAO, agente: Optional[str] = None
+    ) -> float:
+        """
+        Lança um gasto sem reserva prévia (ex.: custo descoberto depois).
+
+        Não verifica saldo: o gasto já aconteceu, mesmo com a conta estourada.
+        """
+        nomes = self._caminho_contas(tenant, agente)
+        for nome in nomes:
+            self._conta(nome)
+        with self._travar(nomes):
+            self._lancar(nomes, 0.0, custo)
+        return custo
+
+    def liberar(self, reserva: Reserva, expirada: bool = False) -> None:
+        """Devolve a reserva inteira (a chamada falhou ou foi cancelada)."""
+        with self._travar(reserva.contas):
+            if not reserva.ativa:
+                if not expirada:
+                    reserva.expirada = False
+                return
+            reserva.ativa = False
+            reserva.expirada = expirada
+            for nome in reserva.contas:
+                self._conta(nome).reservado -= reserva.valor
+        self._reservas.pop(reserva.id, None)
+
+    @contextmanager
+    def reserva(
+        self,
+        valor: float,
+        tenant: str = TENANT_PADRAO,
+        agente: Optional[str] = None,
+    ) -> Iterator[Reserva]:
+        """
+        Reserva, executa o bloco e confirma `reserva.custo_real` (ou o valor
+        estimado, se não for informado). Exceções liberam a reserva.
+        """
+        reserva = self.reservar(valor, tenant, agente)
+        try:
+            yield reserva
+        except BaseException:
+            if reserva.custo_real is None:
+                self.liberar(reserva)
+            else:
+                # Falhou depois de gastar: o gasto aconteceu
+                self.confirmar(reserva, reserva.custo_real)
+            raise
+        if reserva.ativa or reserva.expirada:
+            self.confirmar(reserva, reserva.custo_real)
+
+    def expirar_reservas(self) -> int:
+        """Libera reservas vencidas (ex.: worker que morreu no meio)."""
+        agora = time.monotonic()
+        vencidas = [r for r in list(self._reservas.values()) if r.expira_em <= agora]
+        for reserva in vencidas:
+            self.liberar(reserva, expirada=True)
+        return len(vencidas)
+
+    # -------------------------------------------------------------------------
+    # Consultas
+    # -------------------------------------------------------------------------
+
+    def saldo(
+        self, tenant: Optional[str] = None, agente: Optional[str] = None
+    ) -> Dict[str, Optional[float]]:
+        """Limite, gasto, reservado e disponível de uma conta."""
+        nome = conta_de(tenant, agente)
+        if nome == CONTA_GLOBAL and CONTA_GLOBAL not in self._contas:
+            # Sem teto global não existe conta global: soma os clientes
+            clientes = [c for n, c in self._contas.items() if "/" not in n]
+            gasto = sum(c.gasto for c in clientes)
+            reservado = sum(c.reservado for c in clientes)
+            limite = self.limite_global
+        else:
+            conta = self._conta(nome)
+            with self._travar((nome,)):
+                gasto, reservado, limite = conta.gasto, conta.reservado, conta.limite
+        disponivel = None if limite is None else limite - gasto - reservado
+        return {
+            "conta": nome,
+            "limite": limite,
+            "gasto": gasto,
+            "reservado": reservado,
+            "disponivel": disponivel,
+        }
+
+    def estatisticas(self) -> Dict[str, Dict[str, float]]:
+        """Saldos e contadores de todas as contas conhecidas."""
+        resultado = {}
+        for nome, conta in sorted(self._contas.items()):
+            resultado[nome] = {
+                "limite": conta.limite,
+                "gasto": round(conta.gasto, 6),
+                "reservado": round(conta.reservado, 6),
+                "reservas": conta.reservas,
+                "rejeicoes": conta.rejeicoes,
+                "tardias": conta.tardias,
+            }
+        return resultado
+
+    # -------------------------------------------------------------------------
+    # Persistência (SQLite, gravação em lote)
+    # -------------------------------------------------------------------------
+
+    def _abrir_sqlite(self) -> None:
+        diretorio = os.path.dirname(os.path.abspath(self.caminho))
+        os.makedirs(diretorio, exist_ok=True)
+        conn = sqlite3.connect(self.caminho, timeout=30, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        with conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS contas (
+                    conta TEXT PRIMARY KEY,
+                    limite REAL,
+                    gasto REAL NOT NULL DEFAULT 0
+                )
+                """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS lancamentos (
+                    momento REAL NOT NULL,
+                    conta TEXT NOT NULL,
+                    reservado REAL NOT NULL,
+                    custo REAL NOT NULL
+                )
+                """)
+        self._conexao_sqlite = conn
+        self._recarregar()
+
+    def _recarregar(self) -> None:
+        """Lê limites e gastos gravados (inclusive por outros processos)."""
+        linhas = self._conexao_sqlite.execute(
+            "SELECT conta, limite, gasto FROM contas"
+        ).fetchall()
+        for nome, limite, gasto in linhas:
+            if limite is not None:
+                self._limites[nome] = limite
+                if nome == CONTA_GLOBAL:
+                    self.limite_global = limite
+            conta = self._conta(nome)
+            with self._travar((nome,)):
+                pendente = self._listra(nome).pendentes.get(nome, 0.0)
+                conta.limite = self._limite_padrao(nome)
+                conta.gasto = gasto + pendente
+
+    def sincronizar(self) -> None:
+        """Grava os gastos pendentes e relê os saldos do arquivo."""
+        if not self.caminho:
+            return
+        deltas: Dict[str, float] = {}
+        lancamentos: List[Tuple[float, str, float, float]] = []
+        for listra in self._listras:
+            with listra.trava:
+                if not listra.pendentes and not listra.lancamentos:
+                    continue
+                for nome, valor in listra.pendentes.items():
+                    deltas[nome] = deltas.get(nome, 0.0) + valor
+                lancamentos.extend(listra.lancamentos)
+                listra.pendentes = {}
+                listra.lancamentos = []
+        with self._trava_sqlite:
+            conn = self._conexao_sqlite
+            if deltas or lancamentos:
+                with conn:
+                    # Soma deltas em vez de sobrescrever: vários processos
+                    # podem dividir o mesmo arquivo
+                    conn.executemany(
+                        "INSERT INTO contas (conta, limite, gasto) VALUES (?, NULL, ?) "
+                        "ON CONFLICT(conta) DO UPDATE "
+                        "SET gasto = gasto + excluded.gasto",
+                        list(deltas.items()),
+                    )
+                    conn.executemany(
+                        "INSERT INTO lancamentos VALUES (?, ?, ?, ?)", lancamentos
+                    )
+            self._recarregar()
+
+    def _gravar_periodicamente(self) -> None:
+        while not self._parar.wait(self.intervalo_gravacao):
+            try:
+                self.sincronizar()
+            except sqlite3.Error as e:
+                print(f"⚠️ Falha ao gravar orçamento: {e}")
+
+    def fechar(self) -> None:
+        """Para a thread de gravação e grava o que falta."""
+        if not self.caminho or self._parar.is_set():
+            return
+        self._parar.set()
+        if self._gravador and self._gravador is not threading.current_thread():
+            self._gravador.join(timeout=5)
+        self.sincronizar()
+        self._conexao_sqlite.close()
+
+
+# =============================================================================
+# BENCHMARK
+# =============================================================================
+
+
+class _MonitorIngenuo:
+    """Verifica e depois soma, sem trava (como o MonitorCustos original)."""
+
+    def __init__(self, orcamento: float):
+        self.orcamento = orcamento
+        self.gasto_atual = 0.0
+
+    def executar(self, custo: float) -> bool:
+        if self.gasto_atual + custo > self.orcamento:
+            return False
+        time.sleep(0.001)  # Chamada ao modelo
+        self.gasto_atual += custo
+        return True
+
+
+def _benchmark(threads: int = 16, operacoes: int = 20_000) -> None:
+    from concurrent.futures import ThreadPoolExecutor
+
+    print("Estouro de orçamento (limite $1.00, 200 execuções de $0.01)")
+    ingenuo = _MonitorIngenuo(1.0)
+    with ThreadPoolExecutor(threads) as pool:
+        list(pool.map(lambda _: ingenuo.executar(0.01), range(200)))
+    livro = LivroOrcamento(limite_tenant=1.0)
+
+    def com_reserva(_: int) -> None:
+        try:
+            with livro.reserva(0.01, tenant="demo"):
+                time.sleep(0.001)
+        except OrcamentoExcedido:
+            pass
+
+    with ThreadPoolExecutor(threads) as pool:
+        list(pool.map(com_reserva, range(200)))
+    print(f"  verifica-e-soma: gasto ${ingenuo.gasto_atual:.2f}")
+    print(f"  reservas:        gasto ${livro.saldo('demo')['gasto']:.2f}")
+
+    print(f"\nVazão: {operacoes} reservar+confirmar em {threads} threads")
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as pasta:
+        for rotulo, caminho in (
+            ("memória", None),
+            ("sqlite", os.path.join(pasta, "orcamento.sqlite3")),
+        ):
+            livro = LivroOrcamento(
+                limite_tenant=1e9, limite_agente=1e9, caminho=caminho
+            )
+
+            def ciclo(i: int) -> None:
+                tenant = f"cliente{i % 32}"
+                reserva = livro.reservar(0.002, tenant=tenant, agente=f"agente{i % 4}")
+                livro.confirmar(reserva, 0.0015)
+
+            inicio = time.perf_counter()
+            with ThreadPoolExecutor(threads) as pool:
+                list(pool.map(ciclo, range(operacoes)))
+            livro.fechar()
+            duracao = time.perf_counter() - inicio
+            total = sum(livro.saldo(f"cliente{i}")["gasto"] for i in range(32))
+            print(
+                f"  {rotulo:8s} {operacoes / duracao:10,.0f} ops/s  "
+                f"gasto total ${total:.2f} (esperado ${operacoes * 0.0015:.2f})"
+            )
+            if caminho:
+                reaberto = LivroOrcamento(caminho=caminho)
+                gasto = sum(reaberto.saldo(f"cliente{i}")["gasto"] for i in range(32))
+                print(f"  reaberto do disco: gasto total ${gasto:.2f}")
+                reaberto.fechar()
+
+
+if __name__ == "__main__":
+    _benchmark()
@@ -0,0 +1,177 @@
+"""
+Execução paralela de tarefas independentes.
+
+As dependências entre tarefas do CrewAI já estão declaradas em
+`Task.context`. A partir delas montamos um grafo (DAG) e despachamos cada
+tarefa assim que todas as suas dependências terminam, com limite de
+concorrência e verificação de orçamento antes de cada despacho. Em crews
+"largas" o tempo total cai para aproximadamente o caminho crítico.
+
+Uso:
+    resultado = await executar_dag(
+        crew.tasks,
+        executar=lambda tarefa: rodar_tarefa(tarefa),
+        max_concorrencia=4,
+    )
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Set
+
+
+class CicloDependencias(ValueError):
+    """As tarefas dependem umas das outras em ciclo."""
+
+
+def montar_dag(tarefas: Sequence[Any]) -> Dict[int, Set[int]]:
+    """
+    Retorna, para cada índice de tarefa, os índices das tarefas das quais
+    ela depende (via atributo `context`).
+    """
+    posicao = {id(tarefa): i for i, tarefa in enumerate(tarefas)}
+    dependencias: Dict[int, Set[int]] = {}
+    for i, tarefa in enumerate(tarefas):
+        contexto = getattr(tarefa, "context", None) or []
+        if not isinstance(contexto, (list, tuple)):
+            contexto = []  # Ex.: sentinela NOT_SPECIFIED do CrewAI
+        dependencias[i] = {posicao[id(dep)] for dep in contexto if id(dep) in posicao}
+    _verificar_ciclos(dependencias)
+    return dependencias
+
+
+def _verificar_ciclos(dependencias: Dict[int, Set[int]]) -> None:
+    pendentes = {i: set(deps) for i, deps in dependencias.items()}
+    prontas = [i for i, deps in pendentes.items() if not deps]
+    visitadas = 0
+    while prontas:
+        atual = prontas.pop()
+        visitadas += 1
+        for i, deps in pendentes.items():
+            if atual in deps:
+                deps.discard(atual)
+                if not deps:
+                    prontas.append(i)
+    if visitadas != len(dependencias):
+        raise CicloDependencias("As tarefas possuem dependências circulares")
+
+
+@dataclass
+class ResultadoDAG:
+    """Resultado de uma execução em DAG."""
+
+    resultados: List[Any]
+    duracoes: List[float]
+    tempo_total: float
+    caminho_critico: float
+    max_paralelismo: int
+
+    @property
+    def aceleracao(self) -> float:
+        """Quanto mais rápido que rodar tudo em sequência."""
+        sequencial = sum(self.duracoes)
+        return sequencial / self.tempo_total if self.tempo_total > 0 else 1.0
+
+
+def caminho_critico(dependencias: Dict[int, Set[int]], duracoes: List[float]) -> float:
+    """Maior soma de durações ao longo de uma cadeia de dependências."""
+    fim: Dict[int, float] = {}
+
+    def termino(i: int) -> float:
+        if i not in fim:
+            inicio = max((termino(d) for d in dependencias[i]), default=0.0)
+            fim[i] = inicio + duracoes[i]
+        return fim[i]
+
+    return max((termino(i) for i in dependencias), default=0.0)
+
+
+async def executar_dag(
+    tarefas: Sequence[Any],
+    executar: Callable[[Any], Awaitable[Any]],
+    max_concorrencia: int = 4,
+    verificar_orcamento: Optional[Callable[[], None]] = None,
+    chave_exclusao: Optional[Callable[[Any], Any]] = None,
+) -> ResultadoDAG:
+    """
+    Executa as tarefas respeitando as dependências.
+
+    Args:
+        tarefas: Tarefas com atributo `context` (lista de dependências)
+        executar: Corrotina que executa uma tarefa e retorna o resultado
+        max_concorrencia: Máximo de tarefas rodando ao mesmo tempo
+        verificar_orcamento: Chamada antes de cada despacho; deve lançar
+            exceção para interromper a execução
+        chave_exclusao: Tarefas com a mesma chave (ex.: o mesmo agente)
+            nunca rodam ao mesmo tempo
+
+    Returns:
+        ResultadoDAG: Resultados na ordem original das tarefas
+    """
+    dependencias = montar_dag(tarefas)
+    dependentes: Dict[int, Set[int]] = {i: set() for i in dependencias}
+    for i, deps in dependencias.items():
+        for d in deps:
+            dependentes[d].add(i)
+
+    faltando = {i: len(deps) for i, deps in dependencias.items()}
+    semaforo = asyncio.Semaphore(max_concorrencia)
+    travas: Dict[Any, asyncio.Lock] = {}
+    resultados: List[Any] = [None] * len(tarefas)
+    duracoes: List[float] = [0.0] * len(tarefas)
+    rodando = 0
+    max_paralelismo = 0
+
+    async def rodar(i: int) -> int:
+        nonlocal rodando, max_paralelismo
+        chave = chave_exclusao(tarefas[i]) if chave_exclusao else None
+        trava = travas.setdefault(chave, asyncio.Lock()) if chave is not None else None
+        # A trava vem antes do semáforo para não ocupar uma vaga esperando
+        if trava is not None:
+            await trava.acquire()
+        try:
+            async with semaforo:
+                if verificar_orcamento:
+                    verificar_orcamento()
+                rodando += 1
+                max_paralelismo = max(max_paralelismo, rodando)
+                inicio = time.perf_counter()
+                try:
+                    resultados[i] = await executar(tarefas[i])
+                finally:
+                    duracoes[i] = time.perf_counter() - inicio
+                    rodando -= 1
+        finally:
+            if trava is not None:
+                trava.release()
+        return i
+
+    inicio_total = time.perf_counter()
+    em_andamento = {
+        asyncio.ensure_future(rodar(i)) for i, n in faltando.items() if n == 0
+    }
+    try:
+        while em_andamento:
+            concluidas, em_andamento = await asyncio.wait(
+                em_andamento, return_when=asyncio.FIRST_COMPLETED
+            )
+            for futura in concluidas:
+                i = futura.result()  # Propaga a primeira falha
+                for dependente in dependentes[i]:
+                    faltando[dependente] -= 1
+                    if faltando[dependente] == 0:
+                        em_andamento.add(asyncio.ensure_future(rodar(dependente)))
+    except BaseException:
+        for futura in em_andamento:
+            futura.cancel()
+        await asyncio.gather(*em_andamento, return_exceptions=True)
+        raise
+
+    return ResultadoDAG(
+        resultados=resultados,
+        duracoes=duracoes,
+        tempo_total=time.perf_counter() - inicio_total,
+        caminho_critico=caminho_critico(dependencias, duracoes),
+        max_paralelismo=max_paralelismo,
+    )
@@ -0,0 +1,298 @@
+"""
+Pool de crews (ou agentes) pré-construídos.
+
+Montar `Agent`, `Task` e `Crew` a cada pergunta custa validação do
+Pydantic, criação de executores, cópia de ferramentas etc., e esse tempo
+entra na latência de toda requisição. Com o pool, cada configuração (chave)
+tem algumas instâncias prontas: a requisição retira uma, executa com
+`kickoff(inputs=...)` e devolve. Entre usos a instância é limpa (saídas e
+descrições das tarefas, callbacks da requisição anterior).
+
+Uma instância nunca é usada por duas threads ao mesmo tempo. Se todas
+estiverem em uso e o limite da chave foi atingido, `retirar` espera uma
+devolução.
+
+Uso:
+    pool = PoolCrews(lambda chave: montar_crew(*chave), max_por_chave=4)
+    with pool.usar(("atendimento", False)) as crew:
+        resultado = crew.kickoff(inputs={"pergunta": pergunta})
+    print(pool.estatisticas()["tempo_economizado_s"])
+"""
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, Hashable, Iterator, Optional
+
+
+class PoolEsgotado(TimeoutError):
+    """Nenhuma instância foi devolvida dentro do tempo de espera."""
+
+
+def _atribuir(objeto: Any, atributo: str, valor: Any) -> None:
+    # Modelos do CrewAI são Pydantic; um campo pode não aceitar o valor
+    if hasattr(objeto, atributo):
+        try:
+            setattr(objeto, atributo, valor)
+        except (AttributeError, TypeError, ValueError):
+            pass
+
+
+def resetar_crew(crew: Any) -> None:
+    """
+    Limpa o estado que uma execução deixa na crew.
+
+    O `kickoff(inputs=...)` troca os marcadores das descrições pelos valores
+    da requisição e copia o `task_callback` da crew para as tarefas sem
+    callback. Aqui as descrições voltam ao modelo (com os marcadores) e o
+    callback da requisição anterior é removido.
+    """
+    callback = getattr(crew, "task_callback", None)
+    for tarefa in getattr(crew, "tasks", None) or []:
+        _atribuir(tarefa, "output", None)
+        for campo in ("description", "expected_output"):
+            original = getattr(tarefa, f"_original_{campo}", None)
+            if original is not None:
+                _atribuir(tarefa, campo, original)
+        if callback is not None and getattr(tarefa, "callback", None) is callback:
+            _atribuir(tarefa, "callback", None)
+    for agente in getattr(crew, "agents", None) or []:
+        _atribuir(agente, "tools_results", [])
+    _atribuir(crew, "task_callback", None)
+    _atribuir(crew, "step_callback", None)
+
+
+@dataclass
+class _Fila:
+    livres: Deque[Any] = field(default_factory=deque)
+    criadas: int = 0
+    construcoes: int = 0
+    reutilizacoes: int = 0
+    descartes: int = 0
+    tempo_construcao: float = 0.0
+    tempo_espera: float = 0.0
+
+    @property
+    def construcao_media(self) -> float:
+        return self.tempo_construcao / self.construcoes if self.construcoes else 0.0
+
+
+class PoolCrews:
+    """
+    Instâncias prontas por chave de configuração, com retirada/devolução.
+
+    Args:
+        construir: Recebe a chave e devolve uma nova instância
+        max_por_chave: Instâncias simultâneas por chave (em uso + livres)
+        resetar: Limpeza aplicada na devolução (padrão: `resetar_crew`)
+        timeout: Espera máxima (s) por uma instância livre; None = sem limite
+    """
+
+    def __init__(
+        self,
+        construir: Callable[[Hashable], Any],
+        max_por_chave: int = 4,
+        resetar: Optional[Callable[[Any], None]] = resetar_crew,
+        timeout: Optional[float] = None,
+    ):
+        self.construir = construir
+        self.max_por_chave = max_por_chave
+        self.resetar = resetar
+        self.timeout = timeout
+        self._filas: Dict[Hashable, _Fila] = {}
+        self._condicao = threading.Condition()
+
+    def _fila(self, chave: Hashable) -> _Fila:
+        fila = self._filas.get(chave)
+        if fila is None:
+            fila = self._filas[chave] = _Fila()
+        return fila
+
+    def _construir(self, chave: Hashable, fila: _Fila) -> Any:
+        # Fora da trava: construir leva centenas de ms e não deve bloquear
+        # quem só quer devolver ou retirar outra chave
+        inicio = time.perf_counter()
+        try:
+            instancia = self.construir(chave)
+        except BaseException:
+            with self._condicao:
+                fila.criadas -= 1
+                self._condicao.notify_all()
+            raise
+        duracao = time.perf_counter() - inicio
+        with self._condicao:
+            fila.construcoes += 1
+            fila.tempo_construcao += duracao
+        return instancia
+
+    def retirar(self, chave: Hashable, timeout: Optional[float] = None) -> Any:
+        """
+        Retira uma instância livre, construindo uma nova se houver vaga.
+
+        Raises:
+            PoolEsgotado: Se o tempo de espera acabar
+        """
+        timeout = self.timeout if timeout is None else timeout
+        inicio = time.perf_counter()
+        with self._condicao:
+            fila = self._fila(chave)
+            while not fila.livres and fila.criadas >= self.max_por_chave:
+                restante = None
+                if timeout is not None:
+                    restante = timeout - (time.perf_counter() - inicio)
+                    if restante <= 0:
+                        raise PoolEsgotado(
+                            f"Nenhuma instância de {chave!r} livre em {timeout}s"
+                        )
+                self._condicao.wait(restante)
+            fila.tempo_espera += time.perf_counter() - inicio
+            if fila.livres:
+                fila.reutilizacoes += 1
+                return fila.livres.pop()
+            fila.criadas += 1
+        return self._construir(chave, fila)
+
+    def devolver(
+        self, chave: Hashable, instancia: Any, descartar: bool = False
+    ) -> None:
+        """
+        Devolve a instância ao pool. Use `descartar=True` se a execução
+        falhou no meio e o estado dela não é confiável.
+        """
+        if not descartar and self.resetar is not None:
+            try:
+                self.resetar(instancia)
+            except Exception:
+                descartar = True
+        with self._condicao:
+            fila = self._fila(chave)
+            if descartar:
+                fila.criadas -= 1
+                fila.descartes += 1
+            elif fila.criadas > self.max_por_chave:
+                fila.criadas -= 1  # Sobra de antes de reduzir o limite
+            else:
+                fila.livres.append(instancia)
+            self._condicao.notify()
+
+    @contextmanager
+    def usar(self, chave: Hashable, timeout: Optional[float] = None) -> Iterator[Any]:
+        """Retira, entrega ao bloco e devolve (descarta se houver exceção)."""
+        instancia = self.retirar(chave, timeout)
+        try:
+            yield instancia
+        except BaseException:
+            self.devolver(chave, instancia, descartar=True)
+            raise
+        self.devolver(chave, instancia)
+
+    def aquecer(self, chave: Hashable, quantidade: int = 1) -> int:
+        """Constrói instâncias antes da primeira requisição."""
+        construidas = []
+        for _ in range(quantidade):
+            with self._condicao:
+                fila = self._fila(chave)
+                if fila.criadas >= self.max_por_chave:
+                    break
+                fila.criadas += 1
+            construidas.append(self._construir(chave, fila))
+        with self._condicao:
+            self._fila(chave).livres.extend(construidas)
+            self._condicao.notify_all()
+        return len(construidas)
+
+    def redimensionar(self, max_por_chave: int) -> None:
+        """
+        Muda o limite por chave. Ao reduzir, as instâncias livres que
+        passam do limite são descartadas; as em uso, quando voltarem.
+        """
+        with self._condicao:
+            self.max_por_chave = max_por_chave
+            for fila in self._filas.values():
+                while fila.livres and fila.criadas > max_por_chave:
+                    fila.livres.popleft()
+                    fila.criadas -= 1
+            self._condicao.notify_all()
+
+    def limpar(self, chave: Optional[Hashable] = None) -> None:
+        """Descarta as instâncias livres (ex.: depois de mudar a configuração)."""
+        with self._condicao:
+            chaves = list(self._filas) if chave is None else [chave]
+            for c in chaves:
+                fila = self._filas.get(c)
+                if fila:
+                    fila.criadas -= len(fila.livres)
+                    fila.livres.clear()
+            self._condicao.notify_all()
+
+    def estatisticas(self) -> Dict[str, Any]:
+        """
+        Construções, reutilizações e o tempo de construção economizado
+        (cada reutilização evitou uma construção de duração média).
+        """
+        with self._condicao:
+            por_chave = {}
+            economizado = 0.0
+            for chave, fila in self._filas.items():
+                poupado = fila.reutilizacoes * fila.construcao_media
+                economizado += poupado
+                usos = fila.construcoes + fila.reutilizacoes
+                por_chave[str(chave)] = {
+                    "instancias": fila.criadas,
+                    "livres": len(fila.livres),
+                    "construcoes": fila.construcoes,
+                    "reutilizacoes": fila.reutilizacoes,
+                    "descartes": fila.descartes,
+                    "construcao_media_ms": fila.construcao_media * 1000,
+                    "tempo_economizado_s": poupado,
+                    "economia_por_requisicao_ms": (
+                        poupado / usos * 1000 if usos else 0.0
+                    ),
+                    "espera_total_s": fila.tempo_espera,
+                }
+            return {
+                "chaves": por_chave,
+                "construcoes": sum(f.construcoes for f in self._filas.values()),
+                "reutilizacoes": sum(f.reutilizacoes for f in self._filas.values()),
+                "tempo_economizado_s": economizado,
+            }
+
+
+def _benchmark(requisicoes: int = 2000, threads: int = 8) -> None:
+    from concurrent.futures import ThreadPoolExecutor
+
+    def construir(chave: Hashable) -> Dict[str, Any]:
+        time.sleep(0.02)  # ~ criar 4 Agent + 4 Task + Crew
+        return {"chave": chave, "em_uso": False}
+
+    pool = PoolCrews(construir, max_por_chave=threads, resetar=None)
+    conflitos = []
+
+    def requisicao(i: int) -> None:
+        with pool.usar(("atendimento", i % 2)) as crew:
+            if crew["em_uso"]:
+                conflitos.append(i)
+            crew["em_uso"] = True
+            time.sleep(0.001)  # kickoff
+            crew["em_uso"] = False
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(threads) as executor:
+        list(executor.map(requisicao, range(requisicoes)))
+    duracao = time.perf_counter() - inicio
+    stats = pool.estatisticas()
+    print(f"{requisicoes} requisições em {threads} threads: {duracao:.2f}s")
+    print(
+        f"  construções: {stats['construcoes']}  "
+        f"reutilizações: {stats['reutilizacoes']}"
+    )
+    print(f"  construção economizada: {stats['tempo_economizado_s']:.1f}s")
+    print(f"  instância usada por duas threads ao mesmo tempo: {len(conflitos)}x")
+    sem_pool = requisicoes * (0.02 + 0.001) / threads
+    print(f"  sem pool (estimado): {sem_pool:.2f}s")
+
+
+if __name__ == "__main__":
+    _benchmark()
@@ -0,0 +1,994 @@
+"""
+Rastreamento (tracing) hierárquico no formato do OpenTelemetry.
+
+Quando um `kickoff` leva 90s, o tempo total não diz onde ele foi gasto.
+Aqui cada etapa vira um span, filho da etapa que a chamou:
+
+    crew.kickoff
+    └── tarefa                      (uma por Task, na ordem do processo)
+        └── agente.iteracao         (cada passo do agente: pensar + agir)
+            ├── llm.chamada         (tokens, modelo, cache)
+            └── tool.<nome>         (argumentos e tamanho do resultado)
+
+O span atual fica num `contextvars.ContextVar`: chamadas feitas dentro de
+um span viram filhas dele sem passar nada adiante. Os spans terminados vão
+para uma fila e uma thread os exporta em lote, fora do caminho da chamada:
+
+- `ExportadorArquivo`: JSON Lines no formato OTLP/JSON (cada linha um
+  `ExportTraceServiceRequest`), lido pelo receiver `otlpjsonfile` do
+  OpenTelemetry Collector ou por `python -m curso_crewai.rastreamento`.
+- `ExportadorOTLP`: POST em `/v1/traces` de um collector OTLP/HTTP
+  (Jaeger, Tempo, Collector), sem dependências extras.
+- `ExportadorMemoria`: últimos spans do processo, para imprimir a árvore.
+
+Uso:
+    rastreador = rastreador_padrao()
+    instalar_litellm(rastreador)            # um span por chamada de LLM
+    resultado = kickoff_rastreado(crew)     # crew -> tarefa -> iteração
+    print(arvore(rastreador.memoria.spans()))
+
+    class MinhaTool(BaseTool):
+        @rastreado("tool.minha_tool", argumentos=True)
+        def _run(self, consulta: str) -> str: ...
+
+Configuração do rastreador padrão: CURSO_TRACE_ARQUIVO (padrão
+.cache/traces.jsonl; vazio desativa), CURSO_TRACE_OTLP (ex.:
+http://localhost:4318/v1/traces), CURSO_TRACE_SERVICO e
+CURSO_TRACE_AMOSTRAGEM (fração dos traces exportados, padrão 1.0).
+"""
+
+import atexit
+import contextvars
+import functools
+import inspect
+import json
+import os
+import random
+import threading
+import time
+import urllib.request
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Sequence
+
+# Códigos do OTLP (SpanKind e StatusCode)
+TIPOS_SPAN = {"INTERNAL": 1, "SERVER": 2, "CLIENT": 3}
+STATUS = {"UNSET": 0, "OK": 1, "ERROR": 2}
+MAX_TEXTO_ATRIBUTO = 200
+
+_span_atual: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar(
+    "curso_span_atual", default=None
+)
+
+
+def _novo_id(bits: int) -> str:
+    return f"{random.getrandbits(bits):0{bits // 4}x}"
+
+
+def _valor_atributo(valor: Any) -> Any:
+    if isinstance(valor, (bool, int, float)):
+        return valor
+    texto = str(valor)
+    if len(texto) > MAX_TEXTO_ATRIBUTO:
+        texto = texto[: MAX_TEXTO_ATRIBUTO - 1] + "…"
+    return texto
+
+
+# =============================================================================
+# SPANS
+# =============================================================================
+
+
+@dataclass
+class Span:
+    """Uma etapa com início, fim, atributos e status."""
+
+    nome: str
+    trace_id: str
+    span_id: str
+    pai_id: Optional[str] = None
+    inicio_ns: int = field(default_factory=time.time_ns)
+    fim_ns: Optional[int] = None
+    atributos: Dict[str, Any] = field(default_factory=dict)
+    tipo: str = "INTERNAL"
+    status: str = "UNSET"
+    mensagem: str = ""
+    amostrado: bool = True
+
+    def definir(self, **atributos: Any) -> "Span":
+        """Acrescenta atributos (textos longos são truncados)."""
+        for chave, valor in atributos.items():
+            if valor is not None:
+                self.atributos[chave] = _valor_atributo(valor)
+        return self
+
+    def registrar_erro(self, erro: BaseException) -> None:
+        self.status = "ERROR"
+        self.mensagem = _valor_atributo(erro)
+        self.atributos["exception.type"] = type(erro).__name__
+        self.atributos["exception.message"] = self.mensagem
+
+    @property
+    def terminado(self) -> bool:
+        return self.fim_ns is not None
+
+    @property
+    def duracao_s(self) -> float:
+        fim = self.fim_ns if self.fim_ns is not None else time.time_ns()
+        return (fim - self.inicio_ns) / 1e9
+
+    def para_otlp(self) -> Dict[str, Any]:
+        """Span no formato OTLP/JSON (ids em hexadecimal, tempos em texto)."""
+        span: Dict[str, Any] = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.nome,
+            "kind": TIPOS_SPAN.get(self.tipo, 1),
+            "startTimeUnixNano": str(self.inicio_ns),
+            "endTimeUnixNano": str(self.fim_ns or self.inicio_ns),
+            "attributes": [
+                {"key": chave, "value": _valor_otlp(valor)}
+                for chave, valor in self.atributos.items()
+            ],
+            "status": {"code": STATUS.get(self.status, 0)},
+        }
+        if self.pai_id:
+            span["parentSpanId"] = self.pai_id
+        if self.mensagem:
+            span["status"]["message"] = self.mensagem
+        return span
+
+    @classmethod
+    def de_otlp(cls, dados: Dict[str, Any]) -> "Span":
+        codigos = {codigo: nome for nome, codigo in STATUS.items()}
+        tipos = {codigo: nome for nome, codigo in TIPOS_SPAN.items()}
+        status = dados.get("status") or {}
+        return cls(
+            nome=dados["name"],
+            trace_id=dados["traceId"],
+            span_id=dados["spanId"],
+            pai_id=dados.get("parentSpanId") or None,
+            inicio_ns=int(dados["startTimeUnixNano"]),
+            fim_ns=int(dados["endTimeUnixNano"]),
+            atributos={
+                item["key"]: _valor_de_otlp(item["value"])
+                for item in dados.get("attributes", [])
+            },
+            tipo=tipos.get(dados.get("kind", 1), "INTERNAL"),
+            status=codigos.get(status.get("code", 0), "UNSET"),
+            mensagem=status.get("message", ""),
+        )
+
+
+def _valor_otlp(valor: Any) -> Dict[str, Any]:
+    if isinstance(valor, bool):
+        return {"boolValue": valor}
+    if isinstance(valor, int):
+        # int64 vai como texto no OTLP/JSON
+        return {"intValue": str(valor)}
+    if isinstance(valor, float):
+        return {"doubleValue": valor}
+    return {"stringValue": str(valor)}
+
+
+def _valor_de_otlp(valor: Dict[str, Any]) -> Any:
+    if "intValue" in valor:
+        return int(valor["intValue"])
+    for chave in ("boolValue", "doubleValue", "stringValue"):
+        if chave in valor:
+            return valor[chave]
+    return None
+
+
+def span_atual() -> Optional[Span]:
+    """Span ativo no contexto (thread ou corrotina) atual."""
+    return _span_atual.get()
+
+
+# =============================================================================
+# EXPORTADORES
+# =============================================================================
+
+
+def requisicao_otlp(spans: Sequence[Span], servico: str) -> Dict[str, Any]:
+    """Corpo de um `ExportTraceServiceRequest` com os spans."""
+    return {
+        "resourceSpans": [
+            {
+                "resource": {
+                    "attributes": [
+                        {"key": "service.name", "value": {"stringValue": servico}}
+                    ]
+                },
+                "scopeSpans": [
+                    {
+                        "scope": {"name": __name__},
+                        "spans": [span.para_otlp() for span in spans],
+                    }
+                ],
+            }
+        ]
+    }
+
+
+class ExportadorMemoria:
+    """Guarda os últimos `max_spans` spans terminados."""
+
+    def __init__(self, max_spans: int = 10_000):
+        self._spans: Deque[Span] = deque(maxlen=max_spans)
+        self._lock = threading.Lock()
+
+    def exportar(self, spans: Sequence[Span], servico: str) -> None:
+        with self._lock:
+            self._spans.extend(spans)
+
+    def spans(self, trace_id: Optional[str] = None) -> List[Span]:
+        with self._lock:
+            todos = list(self._spans)
+        return [s for s in todos if trace_id is None or s.trace_id == trace_id]
+
+    def limpar(self) -> None:
+        with self._lock:
+            self._spans.clear()
+
+    def encerrar(self) -> None:
+        pass
+
+
+class ExportadorArquivo:
+    """Acrescenta cada lote como uma linha OTLP/JSON no arquivo."""
+
+    def __init__(self, caminho: str):
+        self.caminho = caminho
+        pasta = os.path.dirname(caminho)
+        if pasta:
+            os.makedirs(pasta, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def exportar(self, spans: Sequence[Span], servico: str) -> None:
+        linha = json.dumps(requisicao_otlp(spans, servico), ensure_ascii=False)
+        with self._lock, open(self.caminho, "a", encoding="utf-8") as arquivo:
+            arquivo.write(linha + "\n")
+
+    def encerrar(self) -> None:
+        pass
+
+
+class ExportadorOTLP:
+    """Envia os lotes para um collector OTLP/HTTP (JSON)."""
+
+    def __init__(
+        self,
+        url: str = "http://localhost:4318/v1/traces",
+        cabecalhos: Optional[Dict[str, str]] = None,
+        timeout: float = 5.0,
+    ):
+        self.url = url
+        self.cabecalhos = {"Content-Type": "application/json", **(cabecalhos or {})}
+        self.timeout = timeout
+
+    def exportar(self, spans: Sequence[Span], servico: str) -> None:
+        corpo = json.dumps(requisicao_otlp(spans, servico)).encode("utf-8")
+        pedido = urllib.request.Request(
+            self.url, data=corpo, headers=self.cabecalhos, method="POST"
+        )
+        with urllib.request.urlopen(pedido, timeout=self.timeout) as resposta:
+            resposta.read()
+
+    def encerrar(self) -> None:
+        pass
+
+
+def ler_arquivo(caminho: str) -> List[Span]:
+    """Spans gravados por `ExportadorArquivo` (ou pelo Collector)."""
+    spans = []
+    with open(caminho, encoding="utf-8") as arquivo:
+        for linha in arquivo:
+            if not linha.strip():
+                continue
+            for recurso in json.loads(linha).get("resourceSpans", []):
+                for escopo in recurso.get("scopeSpans", []):
+                    spans.extend(Span.de_otlp(s) for s in escopo.get("spans", []))
+    return spans
+
+
+class ProcessadorLote:
+    """
+    Fila de spans terminados exportada por uma thread, em lotes de até
+    `max_lote` ou a cada `intervalo_s`. Com a fila cheia os spans novos são
+    descartados (e contados): o rastreamento nunca segura a aplicação.
+    """
+
+    def __init__(
+        self,
+        exportador: Any,
+        servico: str = "curso-crewai",
+        max_lote: int = 512,
+        intervalo_s: float = 2.0,
+        max_fila: int = 20_000,
+    ):
+        self.exportador = exportador
+        self.servico = servico
+        self.max_lote = max_lote
+        self.intervalo_s = intervalo_s
+        self.max_fila = max_fila
+        self.descartados = 0
+        self.erros = 0
+        self.exportados = 0
+        self._fila: Deque[Span] = deque()
+        self._condicao = threading.Condition()
+        self._lock_envio = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._encerrado = False
+
+    def adicionar(self, span: Span) -> None:
+        with self._condicao:
+            if self._encerrado or len(self._fila) >= self.max_fila:
+                self.descartados += 1
+                return
+            self._fila.append(span)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._laco, daemon=True)
+                self._thread.start()
+            if len(self._fila) >= self.max_lote:
+                self._condicao.notify()
+
+    def _retirar_lote(self) -> List[Span]:
+        quantidade = min(len(self._fila), self.max_lote)
+        return [self._fila.popleft() for _ in range(quantidade)]
+
+    def _enviar(self, lote: List[Span]) -> None:
+        with self._lock_envio:
+            try:
+                self.exportador.exportar(lote, self.servico)
+                self.exportados += len(lote)
+            except Exception:
+                # Collector fora do ar: o lote se perde, a aplicação segue
+                self.erros += 1
+
+    def _laco(self) -> None:
+        while True:
+            with self._condicao:
+                if len(self._fila) < self.max_lote and not self._encerrado:
+                    self._condicao.wait(self.intervalo_s)
+                lote = self._retirar_lote()
+                fim = self._encerrado and not self._fila
+            if lote:
+                self._enviar(lote)
+            if fim:
+                return
+
+    def forcar_envio(self) -> None:
+        """Exporta tudo o que está na fila antes de retornar."""
+        while True:
+            with self._condicao:
+                lote = self._retirar_lote()
+            if not lote:
+                break
+            self._enviar(lote)
+        # Espera um envio que a thread já tinha começado
+        with self._lock_envio:
+            pass
+
+    def encerrar(self) -> None:
+        with self._condicao:
+            self._encerrado = True
+            self._condicao.notify()
+        self.forcar_envio()
+        self.exportador.encerrar()
+
+
+# =============================================================================
+# RASTREADOR
+# =============================================================================
+
+
+class Rastreador:
+    """Cria spans, mantém o span atual e entrega os terminados aos exportadores."""
+
+    def __init__(
+        self,
+        exportadores: Sequence[Any] = (),
+        servico: str = "curso-crewai",
+        amostragem: float = 1.0,
+        memoria: Optional[ExportadorMemoria] = None,
+    ):
+        self.servico = servico
+        self.amostragem = amostragem
+        self.memoria = memoria if memoria is not None else ExportadorMemoria()
+        self.processadores = [
+            ProcessadorLote(exportador, servico)
+            for exportador in (self.memoria, *exportadores)
+        ]
+
+    def iniciar(
+        self,
+        nome: str,
+        pai: Optional[Span] = None,
+        tipo: str = "INTERNAL",
+        inicio_ns: Optional[int] = None,
+        **atributos: Any,
+    ) -> Span:
+        """Span novo, filho de `pai` (padrão: o span atual). Não o ativa."""
+        pai = pai if pai is not None else _span_atual.get()
+        if pai is None:
+            trace_id = _novo_id(128)
+            amostrado = self.amostragem >= 1 or random.random() < self.amostragem
+        else:
+            trace_id, amostrado = pai.trace_id, pai.amostrado
+        span = Span(
+            nome,
+            trace_id,
+            _novo_id(64),
+            pai.span_id if pai is not None else None,
+            tipo=tipo,
+            amostrado=amostrado,
+        )
+        if inicio_ns is not None:
+            span.inicio_ns = inicio_ns
+        return span.definir(**atributos)
+
+    def terminar(self, span: Span, fim_ns: Optional[int] = None) -> None:
+        if span.terminado:
+            return
+        span.fim_ns = fim_ns or time.time_ns()
+        if span.status == "UNSET":
+            span.status = "OK"
+        if span.amostrado:
+            for processador in self.processadores:
+                processador.adicionar(span)
+
+    @contextmanager
+    def span(
+        self, nome: str, tipo: str = "INTERNAL", **atributos: Any
+    ) -> Iterator[Span]:
+        """Abre um span, ativo dentro do bloco; exceções marcam erro."""
+        span = self.iniciar(nome, tipo=tipo, **atributos)
+        token = _span_atual.set(span)
+        try:
+            yield span
+        except BaseException as erro:
+            span.registrar_erro(erro)
+            raise
+        finally:
+            _span_atual.reset(token)
+            self.terminar(span)
+
+    def forcar_envio(self) -> None:
+        for processador in self.processadores:
+            processador.forcar_envio()
+
+    def encerrar(self) -> None:
+        for processador in self.processadores:
+            processador.encerrar()
+
+    def estatisticas(self) -> Dict[str, int]:
+        return {
+            "exportados": sum(p.exportados for p in self.processadores[1:]),
+            "descartados": sum(p.descartados for p in self.processadores),
+            "erros_exportacao": sum(p.erros for p in self.processadores),
+        }
+
+
+def rastreado(
+    nome: Optional[str] = None,
+    rastreador: Optional[Rastreador] = None,
+    argumentos: bool = False,
+) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """
+    Decorador: cada chamada da função vira um span. Com `argumentos=True`
+    os argumentos simples entram como atributos `arg.<nome>`. Funções
+    `async` também são aceitas (o span dura até o `await` terminar).
+    """
+
+    def decorar(funcao: Callable[..., Any]) -> Callable[..., Any]:
+        nome_span = nome or funcao.__qualname__
+        assinatura = inspect.signature(funcao)
+
+        def anotar(span: Span, args: Any, kwargs: Dict[str, Any]) -> None:
+            if not argumentos:
+                return
+            try:
+                valores = assinatura.bind(*args, **kwargs).arguments
+            except TypeError:
+                valores = kwargs
+            span.definir(
+                **{
+                    f"arg.{chave}": valor
+                    for chave, valor in valores.items()
+                    if chave != "self" and isinstance(valor, (str, int, float))
+                }
+            )
+
+        def concluir(span: Span, resultado: Any) -> Any:
+            if isinstance(resultado, str):
+                span.definir(**{"resultado.caracteres": len(resultado)})
+            return resultado
+
+        if inspect.iscoroutinefunction(funcao):
+
+            @functools.wraps(funcao)
+            async def envolvida_async(*args: Any, **kwargs: Any) -> Any:
+                alvo = rastreador or rastreador_padrao()
+                with alvo.span(nome_span) as span:
+                    anotar(span, args, kwargs)
+                    return concluir(span, await funcao(*args, **kwargs))
+
+            return envolvida_async
+
+        @functools.wraps(funcao)
+        def envolvida(*args: Any, **kwargs: Any) -> Any:
+            alvo = rastreador or rastreador_padrao()
+            with alvo.span(nome_span) as span:
+                anotar(span, args, kwargs)
+                return concluir(span, funcao(*args, **kwargs))
+
+        return envolvida
+
+    return decorar
+
+
+# =============================================================================
+# CREWAI
+# =============================================================================
+
+
+def _descricao(tarefa: Any) -> str:
+    return " ".join(str(getattr(tarefa, "description", "") or "").split())
+
+
+def _papel(tarefa: Any) -> str:
+    return str(getattr(getattr(tarefa, "agent", None), "role", "") or "")
+
+
+def kickoff_rastreado(
+    crew: Any,
+    rastreador: Optional[Rastreador] = None,
+    nome: str = "crew.kickoff",
+    inputs: Optional[Dict[str, Any]] = None,
+    **atributos: Any,
+) -> Any:
+    """
+    Executa `crew.kickoff()` dentro de um span, com um span por tarefa e
+    um por passo de agente. No processo sequencial a tarefa seguinte
+    começa quando a anterior termina (`task_callback`); cada passo termina
+    no `step_callback` e o próximo começa em seguida. As chamadas de LLM e
+    de ferramentas feitas no passo viram filhas dele.
+
+    O CrewAI copia os callbacks da crew para as tarefas e agentes sem
+    callback próprio; todos são restaurados ao final, para que a próxima
+    execução da mesma crew (pool, cache) não mande spans para este trace.
+    O span atual dos callbacks só muda num contexto próprio do kickoff.
+    """
+    rastreador = rastreador or rastreador_padrao()
+    tarefas = list(getattr(crew, "tasks", []) or [])
+    processo = getattr(getattr(crew, "process", None), "value", None)
+    estado: Dict[str, Any] = {
+        "indice": 0,
+        "tarefa": None,
+        "passo": None,
+        "n": 0,
+        "ativo": True,
+    }
+
+    def abrir_tarefa(indice: int) -> None:
+        if indice >= len(tarefas):
+            estado["tarefa"] = None
+            return
+        tarefa = tarefas[indice]
+        estado["tarefa"] = rastreador.iniciar(
+            "tarefa",
+            pai=raiz,
+            **{
+                "tarefa.indice": indice,
+                "tarefa.descricao": _descricao(tarefa),
+                "agente.papel": _papel(tarefa),
+            },
+        )
+        estado["n"] = 0
+        abrir_passo()
+
+    def abrir_passo() -> None:
+        pai = estado["tarefa"] or raiz
+        estado["n"] += 1
+        estado["passo"] = rastreador.iniciar(
+            "agente.iteracao",
+            pai=pai,
+            **{
+                "agente.iteracao": estado["n"],
+                "agente.papel": pai.atributos.get("agente.papel"),
+            },
+        )
+        _span_atual.set(estado["passo"])
+
+    def fechar_passo(passo_crewai: Any = None) -> None:
+        passo = estado["passo"]
+        if passo is None:
+            return
+        if passo_crewai is not None:
+            ferramenta = getattr(passo_crewai, "tool", None)
+            passo.definir(
+                **{
+                    "agente.ferramenta": ferramenta,
+                    "agente.final": ferramenta is None,
+                }
+            )
+        rastreador.terminar(passo)
+        estado["passo"] = None
+
+    def fechar_tarefa(saida: Any = None) -> None:
+        fechar_passo()
+        tarefa = estado["tarefa"]
+        if tarefa is not None:
+            if saida is not None:
+                texto = str(getattr(saida, "raw", saida))
+                tarefa.definir(**{"tarefa.saida_caracteres": len(texto)})
+            rastreador.terminar(tarefa)
+            estado["tarefa"] = None
+
+    original_tarefa = getattr(crew, "task_callback", None)
+    original_passo = getattr(crew, "step_callback", None)
+
+    def ao_terminar_tarefa(saida: Any) -> None:
+        # Fora desta execução (callback que ficou preso em algum lugar) só
+        # repassa ao callback original
+        if estado["ativo"]:
+            fechar_tarefa(saida)
+            estado["indice"] += 1
+            abrir_tarefa(estado["indice"])
+        if original_tarefa:
+            original_tarefa(saida)
+
+    def ao_terminar_passo(passo_crewai: Any) -> None:
+        if estado["ativo"]:
+            fechar_passo(passo_crewai)
+            # AgentFinish (sem `tool`) encerra a tarefa: não há próximo passo
+            if hasattr(passo_crewai, "tool"):
+                abrir_passo()
+            else:
+                _span_atual.set(estado["tarefa"] or raiz)
+        if original_passo:
+            original_passo(passo_crewai)
+
+    # Callbacks que o kickoff pode sobrescrever nas tarefas e agentes
+    agentes = list(getattr(crew, "agents", []) or [])
+    agentes += [t.agent for t in tarefas if getattr(t, "agent", None) is not None]
+    salvos = [(t, "callback", getattr(t, "callback", None)) for t in tarefas]
+    salvos += [
+        (a, "step_callback", getattr(a, "step_callback", None))
+        for a in {id(a): a for a in agentes}.values()
+    ]
+
+    def executar() -> Any:
+        _span_atual.set(raiz)
+        abrir_tarefa(0)
+        return crew.kickoff(inputs=inputs) if inputs else crew.kickoff()
+
+    crew.task_callback = ao_terminar_tarefa
+    crew.step_callback = ao_terminar_passo
+    with rastreador.span(
+        nome,
+        **{"crew.processo": processo, "crew.tarefas": len(tarefas)},
+        **atributos,
+    ) as raiz:
+        try:
+            resultado = contextvars.copy_context().run(executar)
+        except BaseException as erro:
+            for aberto in (estado["passo"], estado["tarefa"]):
+                if aberto is not None:
+                    aberto.registrar_erro(erro)
+            raise
+        finally:
+            fechar_tarefa()
+            estado["ativo"] = False
+            crew.task_callback = original_tarefa
+            crew.step_callback = original_passo
+            for objeto, atributo, valor in salvos:
+                try:
+                    setattr(objeto, atributo, valor)
+                except (AttributeError, TypeError, ValueError):
+                    pass
+        uso = getattr(resultado, "token_usage", None)
+        if uso is not None:
+            raiz.definir(
+                **{
+                    "gen_ai.usage.input_tokens": getattr(uso, "prompt_tokens", None),
+                    "gen_ai.usage.output_tokens": getattr(
+                        uso, "completion_tokens", None
+                    ),
+                    "gen_ai.usage.cached_tokens": getattr(
+                        uso, "cached_prompt_tokens", None
+                    ),
+                }
+            )
+    return resultado
+
+
+_spans_por_chamada: Dict[str, Span] = {}
+_lock_chamadas = threading.Lock()
+_rastreador_litellm: Optional[Rastreador] = None
+
+
+def _ns(instante: Any) -> Optional[int]:
+    if isinstance(instante, datetime):
+        return int(instante.timestamp() * 1e9)
+    if isinstance(instante, (int, float)):
+        return int(instante * 1e9)
+    return None
+
+
+def instalar_litellm(rastreador: Optional[Rastreador] = None) -> bool:
+    """
+    Um span `llm.chamada` por requisição do LiteLLM (agentes do CrewAI),
+    filho do span ativo no momento da chamada, com modelo, tokens (entrada,
+    saída, em cache) e se a resposta veio do cache do LiteLLM. Retorna
+    False se o LiteLLM não estiver instalado.
+    """
+    global _rastreador_litellm
+    try:
+        import litellm
+        from litellm.integrations.custom_logger import CustomLogger
+    except ImportError:
+        return False
+
+    from curso_crewai.uso import _ler, extrair_usage
+
+    instalado = _rastreador_litellm is not None
+    _rastreador_litellm = rastreador or rastreador_padrao()
+    if instalado:
+        return True
+
+    def retirar(kwargs: Dict[str, Any]) -> Optional[Span]:
+        with _lock_chamadas:
+            return _spans_por_chamada.pop(kwargs.get("litellm_call_id"), None)
+
+    class LoggerRastreamento(CustomLogger):
+        def log_pre_api_call(self, model, messages, kwargs):
+            id_chamada = kwargs.get("litellm_call_id")
+            if not id_chamada:
+                return
+            parametros = kwargs.get("optional_params") or {}
+            span = _rastreador_litellm.iniciar(
+                "llm.chamada",
+                tipo="CLIENT",
+                **{
+                    "gen_ai.system": "openai",
+                    "gen_ai.request.model": model,
+                    "gen_ai.request.max_tokens": parametros.get("max_tokens"),
+                    "gen_ai.request.mensagens": len(messages or []),
+                },
+            )
+            with _lock_chamadas:
+                _spans_por_chamada[id_chamada] = span
+
+        def _terminar(self, kwargs, resposta, inicio, fim, erro=None):
+            span = retirar(kwargs)
+            if span is None:
+                return
+            usage = extrair_usage(_ler(resposta, "usage")) or {}
+            span.definir(
+                **{
+                    "gen_ai.response.model": _ler(resposta, "model"),
+                    "gen_ai.usage.input_tokens": usage.get("prompt_tokens"),
+                    "gen_ai.usage.output_tokens": usage.get("completion_tokens"),
+                    "gen_ai.usage.cached_tokens": usage.get("cached_tokens"),
+                    "cache.hit": bool(kwargs.get("cache_hit")),
+                }
+            )
+            if erro is not None:
+                span.registrar_erro(erro)
+            # O início fica no pre_call (inclui esperas de outros callbacks);
+            # o fim vem do LiteLLM, pois o callback pode rodar depois
+            _rastreador_litellm.terminar(span, _ns(fim))
+
+        def log_success_event(self, kwargs, response_obj, start_time, end_time):
+            self._terminar(kwargs, response_obj, start_time, end_time)
+
+        async def async_log_success_event(
+            self, kwargs, response_obj, start_time, end_time
+        ):
+            self._terminar(kwargs, response_obj, start_time, end_time)
+
+        def log_failure_event(self, kwargs, response_obj, start_time, end_time):
+            erro = kwargs.get("exception") or RuntimeError("falha na chamada")
+            self._terminar(kwargs, response_obj, start_time, end_time, erro)
+
+        async def async_log_failure_event(
+            self, kwargs, response_obj, start_time, end_time
+        ):
+            self.log_failure_event(kwargs, response_obj, start_time, end_time)
+
+    litellm.callbacks = [*(litellm.callbacks or []), LoggerRastreamento()]
+    return True
+
+
+# =============================================================================
+# ANÁLISE
+# =============================================================================
+
+
+def _rotulo(span: Span) -> str:
+    atributos = span.atributos
+    partes = [span.nome]
+    if span.nome == "tarefa":
+        partes.append(str(atributos.get("tarefa.descricao", ""))[:50])
+    elif span.nome == "agente.iteracao":
+        partes.append(f"#{atributos.get('agente.iteracao')}")
+        if atributos.get("agente.ferramenta"):
+            partes.append(f"→ {atributos['agente.ferramenta']}")
+    elif span.nome == "llm.chamada":
+        partes.append(str(atributos.get("gen_ai.request.model", "")))
+        entrada = atributos.get("gen_ai.usage.input_tokens")
+        if entrada is not None:
+            saida = atributos.get("gen_ai.usage.output_tokens", 0)
+            partes.append(f"[{entrada}→{saida} tokens]")
+        if atributos.get("cache.hit"):
+            partes.append("(cache)")
+    if span.status == "ERROR":
+        partes.append(f"❌ {span.mensagem}")
+    return " ".join(parte for parte in partes if parte)
+
+
+def passo_mais_lento(spans: Sequence[Span]) -> Optional[Span]:
+    """Span folha (sem filhos) mais demorado: onde o tempo foi de fato gasto."""
+    pais = {span.pai_id for span in spans if span.pai_id}
+    folhas = [span for span in spans if span.span_id not in pais]
+    return max(folhas, key=lambda span: span.duracao_s, default=None)
+
+
+def arvore(spans: Sequence[Span], trace_id: Optional[str] = None) -> str:
+    """
+    Árvore de texto dos traces, com a duração de cada span e a fração do
+    span raiz, terminando pelo passo mais lento de cada trace.
+    """
+    por_trace: Dict[str, List[Span]] = {}
+    for span in spans:
+        if trace_id is None or span.trace_id == trace_id:
+            por_trace.setdefault(span.trace_id, []).append(span)
+
+    linhas: List[str] = []
+    for spans_trace in por_trace.values():
+        ids = {span.span_id for span in spans_trace}
+        filhos: Dict[Optional[str], List[Span]] = {}
+        for span in sorted(spans_trace, key=lambda s: s.inicio_ns):
+            pai = span.pai_id if span.pai_id in ids else None
+            filhos.setdefault(pai, []).append(span)
+
+        for raiz in filhos.get(None, []):
+            total = raiz.duracao_s or 1e-9
+            linhas.append(f"{_rotulo(raiz)}  {raiz.duracao_s:.2f}s")
+
+            def descer(span: Span, prefixo: str) -> None:
+                lista = filhos.get(span.span_id, [])
+                for i, filho in enumerate(lista):
+                    ultimo = i == len(lista) - 1
+                    linhas.append(
+                        f"{prefixo}{'└─ ' if ultimo else '├─ '}{_rotulo(filho)}  "
+                        f"{filho.duracao_s:.2f}s ({filho.duracao_s / total:.0%})"
+                    )
+                    descer(filho, prefixo + ("   " if ultimo else "│  "))
+
+            descer(raiz, "")
+
+        lento = passo_mais_lento(spans_trace)
+        if lento is not None:
+            raiz = filhos.get(None, [lento])[0]
+            linhas.append(
+                f"🐢 Passo mais lento: {_rotulo(lento)} — {lento.duracao_s:.2f}s "
+                f"({lento.duracao_s / (raiz.duracao_s or 1e-9):.0%} do total)"
+            )
+        linhas.append("")
+    return "\n".join(linhas)
+
+
+_rastreador_padrao: Optional[Rastreador] = None
+_lock_padrao = threading.Lock()
+
+
+def rastreador_padrao() -> Rastreador:
+    """Rastreador do processo, configurado pelas variáveis CURSO_TRACE_*."""
+    global _rastreador_padrao
+    with _lock_padrao:
+        if _rastreador_padrao is None:
+            exportadores: List[Any] = []
+            arquivo = os.getenv("CURSO_TRACE_ARQUIVO", ".cache/traces.jsonl")
+            if arquivo:
+                exportadores.append(ExportadorArquivo(arquivo))
+            url = os.getenv("CURSO_TRACE_OTLP")
+            if url:
+                exportadores.append(ExportadorOTLP(url))
+            _rastreador_padrao = Rastreador(
+                exportadores,
+                servico=os.getenv("CURSO_TRACE_SERVICO", "curso-crewai"),
+                amostragem=float(os.getenv("CURSO_TRACE_AMOSTRAGEM", "1.0")),
+            )
+            atexit.register(_rastreador_padrao.encerrar)
+        return _rastreador_padrao
+
+
+def _benchmark(spans: int = 100_000) -> None:
+    import tempfile
+
+    # Sobrecarga por span (criar, ativar, terminar e enfileirar)
+    rastreador = Rastreador()
+    inicio = time.perf_counter()
+    with rastreador.span("raiz"):
+        for _ in range(spans - 1):
+            with rastreador.span("filho", **{"gen_ai.usage.input_tokens": 10}):
+                pass
+    por_span = (time.perf_counter() - inicio) / spans
+    rastreador.encerrar()
+
+    # Crew simulada: 3 tarefas, passos com LLM e ferramentas, exportada para
+    # arquivo OTLP/JSON e relida de lá
+    class Acao:
+        def __init__(self, tool: str):
+            self.tool = tool
+
+    class Final:
+        output = "resposta final"
+
+    class Agente:
+        def __init__(self, role: str):
+            self.role = role
+
+    class Tarefa:
+        def __init__(self, description: str, role: str):
+            self.description = description
+            self.agent = Agente(role)
+
+    class CrewSimulada:
+        def __init__(self) -> None:
+            self.tasks = [
+                Tarefa("Pesquise informações sobre CrewAI", "Pesquisador Web"),
+                Tarefa("Escreva um artigo técnico", "Redator Técnico"),
+                Tarefa("Revise o artigo", "Revisor Crítico"),
+            ]
+            self.task_callback = None
+            self.step_callback = None
+
+        def kickoff(self) -> str:
+            duracoes = [(0.05, "busca_web", 0.01), (0.12, "scraping_web", 0.25)]
+            for tarefa, passos in zip(
+                self.tasks, (duracoes, [(0.2, "leitura_arquivo", 0.01)], [])
+            ):
+                for llm, ferramenta, tempo_ferramenta in passos + [(0.03, None, 0)]:
+                    with rastreador.span(
+                        "llm.chamada",
+                        tipo="CLIENT",
+                        **{
+                            "gen_ai.request.model": "gpt-4o-mini",
+                            "gen_ai.usage.input_tokens": 800,
+                            "gen_ai.usage.output_tokens": 120,
+                        },
+                    ):
+                        time.sleep(llm)
+                    if ferramenta:
+                        with rastreador.span(f"tool.{ferramenta}"):
+                            time.sleep(tempo_ferramenta)
+                    self.step_callback(Acao(ferramenta) if ferramenta else Final())
+                self.task_callback(f"saída de {tarefa.description}")
+            return "artigo revisado"
+
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, "traces.jsonl")
+        rastreador = Rastreador([ExportadorArquivo(caminho)])
+        kickoff_rastreado(CrewSimulada(), rastreador, "crew_sequencial")
+        rastreador.encerrar()
+        lidos = ler_arquivo(caminho)
+
+    print(f"🧵 {spans} spans: {por_span * 1e6:.2f}µs por span (criar + exportar)")
+    print(f"📁 Crew simulada: {len(lidos)} spans relidos do arquivo OTLP/JSON\n")
+    print(arvore(lidos))
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) > 1:
+        # python -m curso_crewai.rastreamento .cache/traces.jsonl
+        print(arvore(ler_arquivo(sys.argv[1])))
+    else:
+        _benchmark()
@@ -0,0 +1,485 @@
+"""
+Retentativas com backoff exponencial, jitter e disjuntor (circuit breaker).
+
+Repetir na hora, a qualquer erro, piora uma tempestade de rate limit: todo
+mundo volta ao mesmo tempo e estoura de novo. Aqui cada erro é classificado
+antes de decidir:
+
+- "rate_limit" (429), "servidor" (5xx), "timeout" e "conexao": transitórios,
+  repete com backoff exponencial e jitter decorrelacionado, respeitando o
+  `Retry-After` quando a API informa
+- "conteudo" (política de conteúdo, contexto grande demais) e "cliente"
+  (4xx como chave inválida): repetir não adianta, falha na hora
+
+Cada requisição tem um prazo total; nenhuma espera passa dele. Cada modelo
+tem um disjuntor: depois de N falhas transitórias seguidas ele abre, as
+chamadas vão direto para o próximo modelo da lista e, passado o tempo de
+resfriamento, uma chamada de teste decide se fecha de novo.
+
+Uso:
+    executor = ExecutorRetentativas(PoliticaRetentativa(prazo_s=60))
+    resultado = executor.executar_com_fallback([
+        ("gpt-4o", lambda: crew_premium.kickoff()),
+        ("gpt-4o-mini", lambda: crew_economica.kickoff()),
+    ])
+    print(executor.estatisticas())
+"""
+
+import email.utils
+import math
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import timezone
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Sequence, Tuple
+
+RETENTAVEIS = frozenset({"rate_limit", "servidor", "timeout", "conexao"})
+
+FECHADO = "fechado"
+ABERTO = "aberto"
+MEIO_ABERTO = "meio_aberto"
+
+
+class CircuitoAberto(Exception):
+    """
+    O disjuntor do modelo está aberto: a chamada nem foi feita, ou a que
+    acabou de falhar abriu o circuito (o erro original fica em `__cause__`).
+    """
+
+    def __init__(self, modelo: str, reabre_em: float):
+        super().__init__(f"Circuito de '{modelo}' aberto por mais {reabre_em:.1f}s")
+        self.modelo = modelo
+        self.reabre_em = reabre_em
+
+
+class ErroHTTP(Exception):
+    """Erro com status e cabeçalhos, para simular respostas da API."""
+
+    def __init__(
+        self,
+        status_code: int,
+        mensagem: str = "",
+        retry_after: Optional[float] = None,
+    ):
+        super().__init__(mensagem or f"HTTP {status_code}")
+        self.status_code = status_code
+        self.headers = {} if retry_after is None else {"retry-after": str(retry_after)}
+
+
+# =============================================================================
+# CLASSIFICAÇÃO DE ERROS
+# =============================================================================
+
+# Nomes das exceções do SDK da OpenAI e do LiteLLM
+_CLASSES = {
+    "RateLimitError": "rate_limit",
+    "APITimeoutError": "timeout",
+    "Timeout": "timeout",
+    "ReadTimeout": "timeout",
+    "ConnectTimeout": "timeout",
+    "APIConnectionError": "conexao",
+    "ConnectError": "conexao",
+    "ServiceUnavailableError": "servidor",
+    "InternalServerError": "servidor",
+    "ContentPolicyViolationError": "conteudo",
+    "ContextWindowExceededError": "conteudo",
+    "AuthenticationError": "cliente",
+    "PermissionDeniedError": "cliente",
+    "BadRequestError": "cliente",
+    "NotFoundError": "cliente",
+}
+
+
+def _status(erro: BaseException) -> Optional[int]:
+    status = getattr(erro, "status_code", None)
+    if status is None:
+        status = getattr(getattr(erro, "response", None), "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def classificar_erro(erro: BaseException) -> str:
+    """
+    "rate_limit", "servidor", "timeout", "conexao", "conteudo", "cliente" ou
+    "desconhecido". A classe da exceção vem antes do status HTTP (o LiteLLM
+    usa 400 para violação de conteúdo).
+    """
+    for classe in type(erro).__mro__:
+        if classe.__name__ in _CLASSES:
+            return _CLASSES[classe.__name__]
+    status = _status(erro)
+    if status is not None:
+        if status == 429:
+            return "rate_limit"
+        if status in (408, 504):
+            return "timeout"
+        if status >= 500:
+            return "servidor"
+        if 400 <= status < 500:
+            return "cliente"
+    if isinstance(erro, TimeoutError):
+        return "timeout"
+    if isinstance(erro, ConnectionError):
+        return "conexao"
+    mensagem = str(erro).lower()
+    if "rate limit" in mensagem or "429" in mensagem:
+        return "rate_limit"
+    if "timed out" in mensagem or "timeout" in mensagem:
+        return "timeout"
+    return "desconhecido"
+
+
+def _cabecalhos(erro: BaseException) -> Dict[str, str]:
+    cabecalhos = getattr(erro, "headers", None)
+    if cabecalhos is None:
+        cabecalhos = getattr(getattr(erro, "response", None), "headers", None)
+    if not cabecalhos:
+        return {}
+    return {str(k).lower(): str(v) for k, v in dict(cabecalhos).items()}
+
+
+def ler_retry_after(erro: BaseException) -> Optional[float]:
+    """
+    Segundos pedidos pela API (`retry-after-ms` ou `retry-after`). Valor
+    ilegível conta como "sem pedido": nunca esconde o erro original.
+    """
+    cabecalhos = _cabecalhos(erro)
+    if "retry-after-ms" in cabecalhos:
+        try:
+            segundos = float(cabecalhos["retry-after-ms"]) / 1000
+        except (TypeError, ValueError):
+            segundos = math.nan
+        if math.isfinite(segundos):
+            return max(segundos, 0.0)
+    valor = cabecalhos.get("retry-after")
+    if valor is None:
+        return None
+    try:
+        segundos = float(valor)
+    except (TypeError, ValueError):
+        # Formato de data HTTP
+        try:
+            data = email.utils.parsedate_to_datetime(valor)
+        except (TypeError, ValueError, IndexError):
+            return None
+        if data.tzinfo is None:
+            data = data.replace(tzinfo=timezone.utc)
+        return max(data.timestamp() - time.time(), 0.0)
+    if not math.isfinite(segundos):
+        return None
+    return max(segundos, 0.0)
+
+
+# =============================================================================
+# POLÍTICA E DISJUNTOR
+# =============================================================================
+
+
+@dataclass
+class PoliticaRetentativa:
+    """
+    Args:
+        max_tentativas: Tentativas por modelo (1 = sem retentativa)
+        base_s: Menor espera entre tentativas
+        teto_s: Maior espera entre tentativas
+        prazo_s: Tempo total da requisição, incluindo fallbacks
+        retentaveis: Classes de erro que valem outra tentativa
+    """
+
+    max_tentativas: int = 4
+    base_s: float = 0.5
+    teto_s: float = 20.0
+    prazo_s: float = 60.0
+    retentaveis: FrozenSet[str] = RETENTAVEIS
+
+    def proxima_espera(self, anterior: float, aleatorio: random.Random) -> float:
+        """Jitter decorrelacionado: sorteio entre a base e 3x a espera anterior."""
+        limite_superior = max(anterior, self.base_s) * 3
+        return min(self.teto_s, aleatorio.uniform(self.base_s, limite_superior))
+
+
+@dataclass
+class DisjuntorCircuito:
+    """Abre após `limiar_falhas` falhas transitórias seguidas do mesmo modelo."""
+
+    limiar_falhas: int = 5
+    resfriamento_s: float = 30.0
+    estado: str = FECHADO
+    falhas_seguidas: int = 0
+    aberturas: int = 0
+    aberto_em: float = 0.0
+    _teste_em_andamento: bool = field(default=False, repr=False)
+
+    def permitir(self, agora: float) -> Optional[float]:
+        """None se a chamada pode seguir; senão, segundos até reabrir."""
+        if self.estado == ABERTO:
+            restante = self.aberto_em + self.resfriamento_s - agora
+            if restante > 0:
+                return restante
+            self.estado = MEIO_ABERTO
+        if self.estado == MEIO_ABERTO:
+            # Só uma chamada de teste por vez
+            if self._teste_em_andamento:
+                return self.resfriamento_s
+            self._teste_em_andamento = True
+        return None
+
+    def registrar_sucesso(self) -> None:
+        self.estado = FECHADO
+        self.falhas_seguidas = 0
+        self._teste_em_andamento = False
+
+    def registrar_falha(self, agora: float) -> None:
+        self.falhas_seguidas += 1
+        self._teste_em_andamento = False
+        if self.estado == MEIO_ABERTO or self.falhas_seguidas >= self.limiar_falhas:
+            if self.estado != ABERTO:
+                self.aberturas += 1
+            self.estado = ABERTO
+            self.aberto_em = agora
+
+    def liberar_teste(self) -> None:
+        self._teste_em_andamento = False
+
+
+# =============================================================================
+# EXECUTOR
+# =============================================================================
+
+
+class ExecutorRetentativas:
+    """
+    Executa chamadas com a política de retentativa e um disjuntor por modelo.
+    Seguro entre threads; as métricas são do executor inteiro.
+    """
+
+    def __init__(
+        self,
+        politica: Optional[PoliticaRetentativa] = None,
+        limiar_falhas: int = 5,
+        resfriamento_s: float = 30.0,
+        dormir: Callable[[float], None] = time.sleep,
+        relogio: Callable[[], float] = time.monotonic,
+        semente: Optional[int] = None,
+    ):
+        self.politica = politica or PoliticaRetentativa()
+        self.limiar_falhas = limiar_falhas
+        self.resfriamento_s = resfriamento_s
+        self._dormir = dormir
+        self._relogio = relogio
+        self._aleatorio = random.Random(semente)
+        self._lock = threading.Lock()
+        self.disjuntores: Dict[str, DisjuntorCircuito] = {}
+        self._metricas: Dict[str, Any] = {
+            "chamadas": 0,
+            "sucessos": 0,
+            "falhas": 0,
+            "tentativas": 0,
+            "retentativas": 0,
+            "retentativas_por_classe": {},
+            "erros_por_classe": {},
+            "retry_after_respeitados": 0,
+            "fallbacks": 0,
+            "circuito_aberto": 0,
+            "prazo_esgotado": 0,
+            "latencia_adicionada_s": 0.0,
+        }
+
+    def disjuntor(self, modelo: str) -> DisjuntorCircuito:
+        with self._lock:
+            if modelo not in self.disjuntores:
+                self.disjuntores[modelo] = DisjuntorCircuito(
+                    self.limiar_falhas, self.resfriamento_s
+                )
+            return self.disjuntores[modelo]
+
+    def _contar(self, chave: str, valor: float = 1, classe: Optional[str] = None):
+        with self._lock:
+            if classe is None:
+                self._metricas[chave] += valor
+            else:
+                grupo = self._metricas[chave]
+                grupo[classe] = grupo.get(classe, 0) + valor
+
+    def _tentar_modelo(
+        self, modelo: str, funcao: Callable[[], Any], limite: float
+    ) -> Any:
+        """Tentativas de um modelo até dar certo, esgotar ou passar do prazo."""
+        disjuntor = self.disjuntor(modelo)
+        espera = 0.0
+        for tentativa in range(1, self.politica.max_tentativas + 1):
+            with self._lock:
+                reabre_em = disjuntor.permitir(self._relogio())
+            if reabre_em is not None:
+                self._contar("circuito_aberto")
+                raise CircuitoAberto(modelo, reabre_em)
+
+            self._contar("tentativas")
+            inicio = self._relogio()
+            try:
+                resultado = funcao()
+            except Exception as erro:
+                duracao = self._relogio() - inicio
+                classe = classificar_erro(erro)
+                self._contar("erros_por_classe", classe=classe)
+                transitorio = classe in self.politica.retentaveis
+                with self._lock:
+                    if transitorio:
+                        disjuntor.registrar_falha(self._relogio())
+                    else:
+                        # Erro do pedido, não do modelo: não pesa no disjuntor
+                        disjuntor.liberar_teste()
+                    aberto = disjuntor.estado == ABERTO
+                if not transitorio or tentativa == self.politica.max_tentativas:
+                    self._contar("latencia_adicionada_s", duracao)
+                    raise
+                if aberto:
+                    # Teste do meio-aberto falhou (ou o limiar foi atingido):
+                    # esperar só para ouvir "circuito aberto" não adianta
+                    self._contar("circuito_aberto")
+                    self._contar("latencia_adicionada_s", duracao)
+                    raise CircuitoAberto(modelo, disjuntor.resfriamento_s) from erro
+
+                pedido = ler_retry_after(erro)
+                espera = self.politica.proxima_espera(espera, self._aleatorio)
+                if pedido is not None:
+                    self._contar("retry_after_respeitados")
+                    espera = max(espera, pedido)
+                restante = limite - self._relogio()
+                if espera >= restante:
+                    self._contar("prazo_esgotado")
+                    self._contar("latencia_adicionada_s", duracao)
+                    raise
+                self._contar("retentativas")
+                self._contar("retentativas_por_classe", classe=classe)
+                self._contar("latencia_adicionada_s", duracao + espera)
+                self._dormir(espera)
+            else:
+                with self._lock:
+                    disjuntor.registrar_sucesso()
+                return resultado
+
+    def executar(self, funcao: Callable[[], Any], modelo: str = "padrao") -> Any:
+        """Executa `funcao()` com retentativas e o disjuntor de `modelo`."""
+        return self.executar_com_fallback([(modelo, funcao)])
+
+    def executar_com_fallback(
+        self, chamadas: Sequence[Tuple[str, Callable[[], Any]]]
+    ) -> Any:
+        """
+        Tenta cada (modelo, funcao) em ordem, passando ao próximo quando as
+        tentativas acabam ou o circuito está aberto. Erros de conteúdo ou do
+        pedido são relançados na hora. O prazo da política vale para tudo.
+        """
+        self._contar("chamadas")
+        limite = self._relogio() + self.politica.prazo_s
+        ultimo_erro: Optional[BaseException] = None
+        for indice, (modelo, funcao) in enumerate(chamadas):
+            if indice:
+                if self._relogio() >= limite:
+                    self._contar("prazo_esgotado")
+                    break
+                self._contar("fallbacks")
+            try:
+                resultado = self._tentar_modelo(modelo, funcao, limite)
+            except CircuitoAberto as erro:
+                # Prefere o erro real da API ao aviso de circuito aberto
+                ultimo_erro = erro.__cause__ or ultimo_erro or erro
+                continue
+            except Exception as erro:
+                ultimo_erro = erro
+                if classificar_erro(erro) not in self.politica.retentaveis:
+                    break
+                continue
+            self._contar("sucessos")
+            return resultado
+        self._contar("falhas")
+        assert ultimo_erro is not None
+        raise ultimo_erro
+
+    def estatisticas(self) -> Dict[str, Any]:
+        with self._lock:
+            metricas = {
+                chave: dict(valor) if isinstance(valor, dict) else valor
+                for chave, valor in self._metricas.items()
+            }
+            metricas["disjuntores"] = {
+                modelo: {
+                    "estado": d.estado,
+                    "falhas_seguidas": d.falhas_seguidas,
+                    "aberturas": d.aberturas,
+                }
+                for modelo, d in self.disjuntores.items()
+            }
+        return metricas
+
+
+def _benchmark(requisicoes: int = 200) -> None:
+    # O primário responde 429 (Retry-After: 1) em 90% das chamadas nos
+    # primeiros 40s; o fallback sempre responde. Tempo simulado: o relógio
+    # avança com as chamadas e as esperas.
+    def cenario() -> Tuple[List[float], List[int], Callable[[], str], Callable]:
+        agora = [0.0]
+        sorteio = random.Random(7)
+        chamadas_primario = [0]
+
+        def primario() -> str:
+            chamadas_primario[0] += 1
+            agora[0] += 0.2
+            if agora[0] < 40 and sorteio.random() < 0.9:
+                raise ErroHTTP(429, "Rate limit exceeded", retry_after=1)
+            return "primário"
+
+        def fallback() -> str:
+            agora[0] += 0.4
+            return "fallback"
+
+        return agora, chamadas_primario, primario, fallback
+
+    # Antes: repete na hora (3x) e cai no fallback
+    agora, chamadas, primario, fallback = cenario()
+    for _ in range(requisicoes):
+        for _ in range(3):
+            try:
+                primario()
+                break
+            except ErroHTTP:
+                continue
+        else:
+            fallback()
+    print(
+        f"Repetição imediata: {chamadas[0]} chamadas ao primário, "
+        f"{agora[0]:.0f}s simulados"
+    )
+
+    agora, chamadas, primario, fallback = cenario()
+
+    def dormir(segundos: float) -> None:
+        agora[0] += segundos
+
+    executor = ExecutorRetentativas(
+        PoliticaRetentativa(prazo_s=15),
+        resfriamento_s=10,
+        dormir=dormir,
+        relogio=lambda: agora[0],
+        semente=1,
+    )
+    for _ in range(requisicoes):
+        executor.executar_com_fallback(
+            [("gpt-4o", primario), ("gpt-4o-mini", fallback)]
+        )
+    stats = executor.estatisticas()
+    print(
+        f"Backoff + disjuntor: {chamadas[0]} chamadas ao primário, "
+        f"{agora[0]:.0f}s simulados"
+    )
+    print(
+        f"  retentativas {stats['retentativas']}, fallbacks {stats['fallbacks']}, "
+        f"circuito aberto {stats['circuito_aberto']}x, "
+        f"latência adicionada {stats['latencia_adicionada_s']:.1f}s"
+    )
+    print(f"  disjuntores: {stats['disjuntores']}")
+
+
+if __name__ == "__main__":
+    _benchmark()
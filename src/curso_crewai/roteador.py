@@ -0,0 +1,707 @@
+"""
+Roteamento de modelos por custo, qualidade esperada e latência.
+
+Em vez de escolher o modelo por uma string passada à mão ("low", "high") ou
+por tipo de agente fixo, cada requisição é pontuada:
+
+- tamanho do prompt (tokens)
+- tipo de tarefa, por um classificador Naive Bayes local (sem chamada à API)
+- complexidade: tamanho, marcadores de raciocínio, número de perguntas
+
+e vai para o modelo mais barato cuja taxa de sucesso esperada, naquele tipo
+de tarefa e faixa de complexidade, atinge o limiar. A expectativa começa em
+uma estimativa por modelo e é corrigida pelos resultados registrados
+(sucesso e latência), então o roteador aprende onde o modelo barato basta.
+Se uma resposta falhar, `escalar` devolve o próximo modelo, até o premium.
+
+Cada decisão (características, candidatos, escolha) e cada resultado vão
+para um log JSONL, que `reproduzir` usa para testar outra configuração
+offline com o mesmo tráfego. Uma consulta que pode nem ser executada (ex.:
+montar a configuração de um agente) usa `rotear(..., registrar=False)`: a
+decisão só entra no log e nas contagens quando recebe um resultado.
+
+Uso:
+    roteador = Roteador(["gpt-4o-mini", "gpt-4o"], caminho_log="rotas.jsonl")
+    decisao = roteador.rotear(prompt)
+    resposta = chamar(decisao.modelo)
+    roteador.registrar_resultado(decisao, sucesso=True, latencia_s=1.2)
+"""
+
+import json
+import math
+import os
+import re
+import threading
+import time
+import unicodedata
+import uuid
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from curso_crewai.tokens import estimar_tokens
+from curso_crewai.uso import custo_tokens, normalizar_modelo
+
+# Taxa de sucesso estimada em tarefas simples, antes de qualquer resultado
+QUALIDADE_BASE = {
+    "gpt-4.1-nano": 0.70,
+    "gpt-3.5-turbo": 0.72,
+    "gpt-4o-mini": 0.82,
+    "gpt-4.1-mini": 0.85,
+    "o3-mini": 0.88,
+    "gpt-4-turbo": 0.89,
+    "gpt-4": 0.90,
+    "gpt-4o": 0.92,
+    "gpt-4.1": 0.93,
+}
+
+# Tokens de resposta esperados por tipo (para o custo estimado)
+SAIDA_POR_TIPO = {
+    "extracao": 150,
+    "conversacional": 250,
+    "analitica": 500,
+    "raciocinio": 600,
+    "codigo": 600,
+    "criativa": 700,
+}
+
+# Quanto cada tipo pesa na complexidade
+PESO_TIPO = {
+    "extracao": -0.1,
+    "conversacional": 0.0,
+    "analitica": 0.1,
+    "criativa": 0.1,
+    "raciocinio": 0.2,
+    "codigo": 0.2,
+}
+
+_MARCADORES = re.compile(
+    r"\b(por que|porque|explique|justifique|compare|comparar|estrategi\w*|"
+    r"analis\w*|avali\w*|trade-?offs?|planej\w*|passo a passo|prove|otimiz\w*|"
+    r"arquitetura|diagnostic\w*|why|explain|compare|strategy|analy[sz]e|"
+    r"evaluate|step by step)\b"
+)
+_ITENS = re.compile(r"^\s*(?:[-*•]|\d+[.)])\s", re.MULTILINE)
+_PALAVRA = re.compile(r"[a-z0-9]+")
+
+# Exemplos iniciais do classificador; `treinar` acrescenta mais
+_EXEMPLOS = {
+    "extracao": [
+        "extraia o nome email e telefone do texto",
+        "liste os produtos e precos mencionados",
+        "classifique o sentimento do comentario",
+        "retorne apenas o valor total do pedido em json",
+        "extract the fields from this document",
+    ],
+    "conversacional": [
+        "responda ao cliente de forma educada sobre o prazo de entrega",
+        "ola tudo bem preciso de ajuda com meu pedido",
+        "qual o horario de atendimento da loja",
+        "agradeca o cliente e ofereca ajuda",
+        "answer the customer question politely",
+    ],
+    "analitica": [
+        "analise as vendas do trimestre e identifique tendencias",
+        "avalie os dados de trafego e conversao do site",
+        "resuma os principais indicadores do relatorio financeiro",
+        "identifique padroes no feedback dos clientes",
+        "analyze the sales data and report insights",
+    ],
+    "raciocinio": [
+        "compare as duas estrategias e justifique qual escolher",
+        "explique por que a conversao caiu e proponha um plano passo a passo",
+        "avalie os trade offs entre custo e qualidade de cada opcao",
+        "planeje a estrategia de expansao considerando riscos e restricoes",
+        "explain step by step why this approach fails",
+    ],
+    "codigo": [
+        "escreva uma funcao python que valide cpf",
+        "corrija o erro neste codigo javascript",
+        "crie uma consulta sql que agrupe vendas por mes",
+        "refatore esta classe e adicione testes",
+        "write a python function to parse the csv",
+    ],
+    "criativa": [
+        "crie um slogan criativo para a campanha de verao",
+        "escreva um post divertido para o instagram da marca",
+        "sugira nomes originais para o novo produto",
+        "invente uma historia curta para o lancamento",
+        "brainstorm creative ideas for the launch",
+    ],
+}
+
+
+def _sem_acento(texto: str) -> str:
+    """Minúsculas sem acentos: "Análise" -> "analise"."""
+    texto = unicodedata.normalize("NFKD", texto.lower())
+    return "".join(c for c in texto if not unicodedata.combining(c))
+
+
+def _normalizar(texto: str) -> List[str]:
+    # Radical grosseiro: "analisar", "analise" e "analista" viram "anali"
+    return [palavra[:5] for palavra in _PALAVRA.findall(_sem_acento(texto))]
+
+
+class ClassificadorLocal:
+    """Naive Bayes multinomial sobre palavras; treina e prevê em microssegundos."""
+
+    def __init__(self, exemplos: Optional[Dict[str, List[str]]] = None):
+        self._palavras: Dict[str, Counter] = {}
+        self._documentos: Counter = Counter()
+        self._vocabulario: set = set()
+        for rotulo, textos in (exemplos or _EXEMPLOS).items():
+            for texto in textos:
+                self.treinar(texto, rotulo)
+
+    def treinar(self, texto: str, rotulo: str) -> None:
+        palavras = _normalizar(texto)
+        self._palavras.setdefault(rotulo, Counter()).update(palavras)
+        self._documentos[rotulo] += 1
+        self._vocabulario.update(palavras)
+
+    def probabilidades(self, texto: str) -> Dict[str, float]:
+        palavras = _normalizar(texto)
+        total_docs = sum(self._documentos.values())
+        vocabulario = len(self._vocabulario) + 1
+        logs = {}
+        for rotulo, contagem in self._palavras.items():
+            total = sum(contagem.values())
+            log = math.log(self._documentos[rotulo] / total_docs)
+            for palavra in palavras:
+                log += math.log((contagem[palavra] + 1) / (total + vocabulario))
+            logs[rotulo] = log
+        maximo = max(logs.values())
+        exps = {rotulo: math.exp(log - maximo) for rotulo, log in logs.items()}
+        soma = sum(exps.values())
+        return {rotulo: valor / soma for rotulo, valor in exps.items()}
+
+    def classificar(self, texto: str) -> Tuple[str, float]:
+        """Tipo mais provável e a probabilidade dele."""
+        probabilidades = self.probabilidades(texto)
+        rotulo = max(probabilidades, key=probabilidades.__getitem__)
+        return rotulo, probabilidades[rotulo]
+
+
+# =============================================================================
+# CARACTERÍSTICAS E DECISÃO
+# =============================================================================
+
+
+@dataclass
+class Caracteristicas:
+    """O que o roteador sabe da requisição (também vai para o log)."""
+
+    tokens: int
+    tipo_tarefa: str
+    confianca_tipo: float
+    complexidade: float
+    marcadores: int = 0
+    perguntas: int = 0
+
+    @property
+    def faixa(self) -> str:
+        if self.complexidade < 0.35:
+            return "baixa"
+        return "media" if self.complexidade < 0.65 else "alta"
+
+
+@dataclass
+class Candidato:
+    modelo: str
+    custo_estimado: float
+    qualidade_esperada: float
+    latencia_s: Optional[float] = None
+    atende: bool = False
+
+
+@dataclass
+class Decisao:
+    id: str
+    modelo: str
+    caracteristicas: Caracteristicas
+    candidatos: List[Candidato]
+    motivo: str
+    nivel: int = 0  # quantas vezes já foi escalada
+    criada_em: float = field(default_factory=time.time)
+    registrada: bool = True  # False: consulta, ainda fora do log
+
+    @property
+    def custo_estimado(self) -> float:
+        for candidato in self.candidatos:
+            if candidato.modelo == self.modelo:
+                return candidato.custo_estimado
+        return 0.0
+
+
+@dataclass
+class _Historico:
+    sucessos: float = 0.0
+    falhas: float = 0.0
+
+
+class Roteador:
+    """
+    Escolhe o modelo mais barato que deve atingir `limiar` de sucesso.
+
+    Args:
+        modelos: Candidatos; a ordem não importa (ordena pelo custo)
+        limiar: Taxa de sucesso esperada mínima
+        latencia_max_s: Ignora modelos com latência média acima disso
+        peso_prior: Quantos resultados a estimativa inicial "vale"
+        caminho_log: JSONL com decisões e resultados (None = sem log)
+        classificador: Classificador de tipo de tarefa
+    """
+
+    def __init__(
+        self,
+        modelos: Sequence[str] = ("gpt-4o-mini", "gpt-4o"),
+        limiar: float = 0.75,
+        latencia_max_s: Optional[float] = None,
+        peso_prior: float = 10.0,
+        caminho_log: Optional[str] = None,
+        classificador: Optional[ClassificadorLocal] = None,
+    ):
+        self.modelos = list(modelos)
+        self.limiar = limiar
+        self.latencia_max_s = latencia_max_s
+        self.peso_prior = peso_prior
+        self.caminho_log = caminho_log
+        self.classificador = classificador or ClassificadorLocal()
+        self._lock = threading.Lock()
+        self._historico: Dict[Tuple[str, str, str], _Historico] = {}
+        self._latencia: Dict[str, float] = {}
+        self._metricas: Dict[str, Any] = {
+            "decisoes": 0,
+            "escaladas": 0,
+            "sem_candidato": 0,
+            "por_modelo": Counter(),
+            "custo_estimado": 0.0,
+        }
+
+    # -- pontuação ----------------------------------------------------------
+
+    def caracterizar(
+        self,
+        prompt: str,
+        tipo_tarefa: Optional[str] = None,
+        dica: Optional[str] = None,
+    ) -> Caracteristicas:
+        """
+        Pontua o prompt. `tipo_tarefa` pula o classificador; `dica`
+        ("low"/"high", "baixa"/"alta") limita a complexidade calculada.
+        """
+        tokens = estimar_tokens(prompt)
+        if tipo_tarefa is None:
+            tipo_tarefa, confianca = self.classificador.classificar(prompt)
+        else:
+            confianca = 1.0
+        # Marcadores sem acento: "análise" e "diagnóstico" também contam
+        marcadores = len(_MARCADORES.findall(_sem_acento(prompt)))
+        perguntas = prompt.count("?") + len(_ITENS.findall(prompt))
+
+        complexidade = 0.35 * min(1.0, math.log1p(tokens) / math.log1p(4000))
+        complexidade += min(0.4, 0.1 * marcadores)
+        complexidade += min(0.15, 0.05 * max(0, perguntas - 1))
+        complexidade += PESO_TIPO.get(tipo_tarefa, 0.0) * confianca
+        if dica in ("high", "complex", "advanced", "alta"):
+            complexidade = max(complexidade, 0.7)
+        elif dica in ("low", "simple", "baixa"):
+            complexidade = min(complexidade, 0.3)
+        return Caracteristicas(
+            tokens=tokens,
+            tipo_tarefa=tipo_tarefa,
+            confianca_tipo=round(confianca, 3),
+            complexidade=round(max(0.0, min(1.0, complexidade)), 3),
+            marcadores=marcadores,
+            perguntas=perguntas,
+        )
+
+    def qualidade_esperada(self, modelo: str, c: Caracteristicas) -> float:
+        """Média a posteriori (Beta) da taxa de sucesso do modelo nesse perfil."""
+        base = QUALIDADE_BASE.get(normalizar_modelo(modelo), 0.8)
+        prior = max(0.05, base - c.complexidade * (1 - base))
+        with self._lock:
+            h = self._historico.get((modelo, c.tipo_tarefa, c.faixa), _Historico())
+            return (prior * self.peso_prior + h.sucessos) / (
+                self.peso_prior + h.sucessos + h.falhas
+            )
+
+    def _candidatos(self, c: Caracteristicas) -> List[Candidato]:
+        saida = SAIDA_POR_TIPO.get(c.tipo_tarefa, 400)
+        candidatos = []
+        for modelo in self.modelos:
+            qualidade = self.qualidade_esperada(modelo, c)
+            latencia = self._latencia.get(modelo)
+            rapido = (
+                self.latencia_max_s is None
+                or latencia is None
+                or latencia <= self.latencia_max_s
+            )
+            candidatos.append(
+                Candidato(
+                    modelo=modelo,
+                    custo_estimado=custo_tokens(modelo, c.tokens, saida),
+                    qualidade_esperada=round(qualidade, 4),
+                    latencia_s=None if latencia is None else round(latencia, 3),
+                    atende=qualidade >= self.limiar and rapido,
+                )
+            )
+        # Mais barato primeiro; empate (modelo sem preço) pela qualidade
+        candidatos.sort(key=lambda x: (x.custo_estimado, -x.qualidade_esperada))
+        return candidatos
+
+    def _escolher(
+        self, candidatos: List[Candidato], acima_de: int = -1
+    ) -> Tuple[Optional[Candidato], str]:
+        for posicao, candidato in enumerate(candidatos):
+            if posicao > acima_de and candidato.atende:
+                return candidato, "mais_barato_no_limiar"
+        restantes = candidatos[acima_de + 1 :]
+        if not restantes:
+            return None, "sem_candidato"
+        melhor = max(restantes, key=lambda x: x.qualidade_esperada)
+        return melhor, "maior_qualidade"
+
+    # -- decisão ------------------------------------------------------------
+
+    def rotear(
+        self,
+        prompt: str,
+        tipo_tarefa: Optional[str] = None,
+        dica: Optional[str] = None,
+        registrar: bool = True,
+    ) -> Decisao:
+        """
+        Escolhe o modelo para o prompt. Com `registrar=False` a decisão só é
+        registrada junto com o primeiro resultado.
+        """
+        return self.rotear_caracteristicas(
+            self.caracterizar(prompt, tipo_tarefa, dica), registrar
+        )
+
+    def rotear_caracteristicas(
+        self, c: Caracteristicas, registrar: bool = True
+    ) -> Decisao:
+        candidatos = self._candidatos(c)
+        escolhido, motivo = self._escolher(candidatos)
+        assert escolhido is not None, "Roteador sem modelos"
+        decisao = Decisao(
+            id=uuid.uuid4().hex[:12],
+            modelo=escolhido.modelo,
+            caracteristicas=c,
+            candidatos=candidatos,
+            motivo=motivo,
+            registrada=registrar,
+        )
+        if registrar:
+            self._contabilizar(decisao)
+        return decisao
+
+    def escalar(self, decisao: Decisao) -> Optional[Decisao]:
+        """
+        Próximo modelo mais caro que atende ao limiar (ou o de maior
+        qualidade acima do atual). None se já está no topo.
+        """
+        posicao = [c.modelo for c in decisao.candidatos].index(decisao.modelo)
+        escolhido, motivo = self._escolher(decisao.candidatos, acima_de=posicao)
+        if escolhido is None:
+            with self._lock:
+                self._metricas["sem_candidato"] += 1
+            return None
+        nova = Decisao(
+            id=decisao.id,
+            modelo=escolhido.modelo,
+            caracteristicas=decisao.caracteristicas,
+            candidatos=decisao.candidatos,
+            motivo=f"escalada:{motivo}",
+            nivel=decisao.nivel + 1,
+        )
+        self._contabilizar(nova)
+        return nova
+
+    def _contabilizar(self, decisao: Decisao) -> None:
+        with self._lock:
+            self._metricas["escaladas" if decisao.nivel else "decisoes"] += 1
+            self._metricas["por_modelo"][decisao.modelo] += 1
+            self._metricas["custo_estimado"] += decisao.custo_estimado
+        self._log(
+            {
+                "evento": "decisao",
+                "id": decisao.id,
+                "ts": decisao.criada_em,
+                "modelo": decisao.modelo,
+                "motivo": decisao.motivo,
+                "nivel": decisao.nivel,
+                "limiar": self.limiar,
+                "caracteristicas": asdict(decisao.caracteristicas),
+                "candidatos": [asdict(c) for c in decisao.candidatos],
+            }
+        )
+
+    # -- aprendizado --------------------------------------------------------
+
+    def registrar_resultado(
+        self,
+        decisao: Decisao,
+        sucesso: bool,
+        latencia_s: Optional[float] = None,
+        custo: Optional[float] = None,
+    ) -> None:
+        """Sucesso (ou não) e latência do modelo escolhido."""
+        if not decisao.registrada:
+            decisao.registrada = True
+            self._contabilizar(decisao)
+        self._aprender(decisao.modelo, decisao.caracteristicas, sucesso, latencia_s)
+        self._log(
+            {
+                "evento": "resultado",
+                "id": decisao.id,
+                "ts": time.time(),
+                "modelo": decisao.modelo,
+                "sucesso": sucesso,
+                "latencia_s": latencia_s,
+                "custo": custo,
+            }
+        )
+
+    def _aprender(
+        self,
+        modelo: str,
+        c: Caracteristicas,
+        sucesso: bool,
+        latencia_s: Optional[float],
+    ) -> None:
+        with self._lock:
+            chave = (modelo, c.tipo_tarefa, c.faixa)
+            h = self._historico.setdefault(chave, _Historico())
+            if sucesso:
+                h.sucessos += 1
+            else:
+                h.falhas += 1
+            if latencia_s is not None:
+                anterior = self._latencia.get(modelo)
+                self._latencia[modelo] = (
+                    latencia_s
+                    if anterior is None
+                    else 0.8 * anterior + 0.2 * latencia_s
+                )
+
+    def executar(
+        self,
+        prompt: str,
+        chamar: Callable[[str], Any],
+        validar: Optional[Callable[[Any], bool]] = None,
+        tipo_tarefa: Optional[str] = None,
+    ) -> Tuple[Any, Decisao]:
+        """
+        Roteia, chama `chamar(modelo)` e escala enquanto a chamada falhar ou
+        `validar(resposta)` recusar. Registra cada resultado.
+        """
+        decisao: Optional[Decisao] = self.rotear(prompt, tipo_tarefa)
+        ultimo_erro: Optional[BaseException] = None
+        resposta: Any = None
+        while decisao is not None:
+            inicio = time.perf_counter()
+            try:
+                resposta = chamar(decisao.modelo)
+                aprovada = validar is None or validar(resposta)
+            except Exception as erro:
+                ultimo_erro, aprovada = erro, False
+            self.registrar_resultado(decisao, aprovada, time.perf_counter() - inicio)
+            if aprovada:
+                return resposta, decisao
+            anterior, decisao = decisao, self.escalar(decisao)
+        if ultimo_erro is not None:
+            raise ultimo_erro
+        return resposta, anterior
+
+    # -- log e replay -------------------------------------------------------
+
+    def _log(self, registro: Dict[str, Any]) -> None:
+        if not self.caminho_log:
+            return
+        linha = json.dumps(registro, ensure_ascii=False)
+        with self._lock:
+            with open(self.caminho_log, "a", encoding="utf-8") as arquivo:
+                arquivo.write(linha + "\n")
+
+    def aprender_do_log(self, caminho: str) -> int:
+        """Reaplica os resultados de um log (ex.: ao reiniciar). Retorna quantos."""
+        caracteristicas: Dict[str, Caracteristicas] = {}
+        aplicados = 0
+        for registro in ler_log(caminho):
+            if registro["evento"] == "decisao":
+                caracteristicas[registro["id"]] = Caracteristicas(
+                    **registro["caracteristicas"]
+                )
+            elif registro["id"] in caracteristicas:
+                self._aprender(
+                    registro["modelo"],
+                    caracteristicas[registro["id"]],
+                    registro["sucesso"],
+                    registro.get("latencia_s"),
+                )
+                aplicados += 1
+        return aplicados
+
+    def estatisticas(self) -> Dict[str, Any]:
+        with self._lock:
+            metricas = dict(self._metricas)
+            metricas["por_modelo"] = dict(self._metricas["por_modelo"])
+            metricas["latencia_media_s"] = dict(self._latencia)
+            metricas["historico"] = {
+                "/".join(chave): {"sucessos": h.sucessos, "falhas": h.falhas}
+                for chave, h in self._historico.items()
+            }
+        return metricas
+
+
+def ler_log(caminho: str) -> Iterable[Dict[str, Any]]:
+    with open(caminho, encoding="utf-8") as arquivo:
+        for linha in arquivo:
+            if linha.strip():
+                yield json.loads(linha)
+
+
+def reproduzir(caminho: str, roteador: Roteador) -> Dict[str, Any]:
+    """
+    Passa o tráfego do log por outro roteador (outro limiar, outros
+    modelos). O aprendizado só usa resultados de decisões em que o novo
+    roteador escolheu o mesmo modelo do log: dos outros não há resultado.
+    """
+    roteador.caminho_log = None
+    escolhas: Dict[str, str] = {}
+    caracteristicas: Dict[str, Caracteristicas] = {}
+    iguais = decisoes = 0
+    custo_original = custo_novo = 0.0
+    for registro in ler_log(caminho):
+        if registro["evento"] == "decisao":
+            if registro["nivel"]:
+                continue
+            c = Caracteristicas(**registro["caracteristicas"])
+            nova = roteador.rotear_caracteristicas(c)
+            caracteristicas[registro["id"]] = c
+            escolhas[registro["id"]] = nova.modelo
+            decisoes += 1
+            iguais += nova.modelo == registro["modelo"]
+            custo_novo += nova.custo_estimado
+            custo_original += next(
+                (
+                    x["custo_estimado"]
+                    for x in registro["candidatos"]
+                    if x["modelo"] == registro["modelo"]
+                ),
+                0.0,
+            )
+        elif escolhas.get(registro["id"]) == registro["modelo"]:
+            roteador._aprender(
+                registro["modelo"],
+                caracteristicas[registro["id"]],
+                registro["sucesso"],
+                registro.get("latencia_s"),
+            )
+    return {
+        "decisoes": decisoes,
+        "concordancia": iguais / decisoes if decisoes else 0.0,
+        "custo_original": custo_original,
+        "custo_reproduzido": custo_novo,
+        "por_modelo": roteador.estatisticas()["por_modelo"],
+    }
+
+
+_roteador_padrao: Optional[Roteador] = None
+_lock_padrao = threading.Lock()
+
+
+def roteador_padrao() -> Roteador:
+    """
+    Roteador do processo. Configuração: CURSO_ROTEADOR_MODELOS (lista
+    separada por vírgula), CURSO_ROTEADOR_LIMIAR e CURSO_ROTEADOR_LOG.
+    """
+    global _roteador_padrao
+    with _lock_padrao:
+        if _roteador_padrao is None:
+            modelos = os.getenv("CURSO_ROTEADOR_MODELOS", "gpt-4o-mini,gpt-4o")
+            _roteador_padrao = Roteador(
+                [m.strip() for m in modelos.split(",") if m.strip()],
+                limiar=float(os.getenv("CURSO_ROTEADOR_LIMIAR", "0.75")),
+                caminho_log=os.getenv("CURSO_ROTEADOR_LOG") or None,
+            )
+        return _roteador_padrao
+
+
+def _benchmark(requisicoes: int = 2000) -> None:
+    import random
+    import tempfile
+
+    aleatorio = random.Random(3)
+    prompts = [
+        ("Qual o horário de atendimento da loja?", 0.1),
+        ("Extraia o nome e o email do texto: João, joao@x.com", 0.1),
+        ("Resuma os principais indicadores do relatório de vendas", 0.4),
+        ("Analise as vendas: Q1 100k, Q2 120k, Q3 95k, Q4 140k", 0.5),
+        (
+            "Compare as estratégias A e B, explique por que uma é melhor e "
+            "planeje a migração passo a passo considerando riscos e custos",
+            0.85,
+        ),
+        ("Crie um slogan criativo para a campanha de verão", 0.3),
+    ]
+    # Modelo "verdadeiro": o barato falha nas difíceis, o premium quase nunca
+    acerto = {
+        "gpt-4o-mini": lambda d: 0.97 - 0.6 * d,
+        "gpt-4o": lambda d: 0.97 - 0.1 * d,
+    }
+
+    def simular(
+        politica: Callable[[str, Callable[[str], bool]], bool],
+    ) -> Tuple[float, float]:
+        custo = 0.0
+        sucessos = 0
+        for _ in range(requisicoes):
+            prompt, dificuldade = aleatorio.choice(prompts)
+            tentados: List[str] = []
+
+            def chamar(modelo: str) -> bool:
+                tentados.append(modelo)
+                return aleatorio.random() < acerto[modelo](dificuldade)
+
+            sucessos += politica(prompt, chamar)
+            tokens = estimar_tokens(prompt)
+            custo += sum(custo_tokens(m, tokens, 400) for m in tentados)
+        return custo, sucessos / requisicoes
+
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, "rotas.jsonl")
+        roteador = Roteador(caminho_log=caminho)
+
+        def roteado(prompt: str, chamar: Callable[[str], bool]) -> bool:
+            ok, _ = roteador.executar(prompt, chamar, validar=bool)
+            return ok
+
+        custo_premium, ok_premium = simular(lambda p, chamar: chamar("gpt-4o"))
+        custo_barato, ok_barato = simular(lambda p, chamar: chamar("gpt-4o-mini"))
+        inicio = time.perf_counter()
+        custo_roteado, ok_roteado = simular(roteado)
+        duracao = time.perf_counter() - inicio
+        stats = roteador.estatisticas()
+
+        print(f"{requisicoes} requisições simuladas:")
+        print(f"  sempre gpt-4o:      ${custo_premium:.3f}  sucesso {ok_premium:.1%}")
+        print(f"  sempre gpt-4o-mini: ${custo_barato:.3f}  sucesso {ok_barato:.1%}")
+        print(
+            f"  roteador:           ${custo_roteado:.3f}  sucesso {ok_roteado:.1%}  "
+            f"{stats['por_modelo']}, {stats['escaladas']} escaladas"
+        )
+        print(f"  {duracao / requisicoes * 1e6:.0f}µs por requisição (com log)")
+
+        replay = reproduzir(caminho, Roteador(limiar=0.9))
+        print(
+            f"  replay com limiar 0.9: concordância {replay['concordancia']:.0%}, "
+            f"custo ${replay['custo_original']:.3f} -> "
+            f"${replay['custo_reproduzido']:.3f}"
+        )
+
+
+if __name__ == "__main__":
+    _benchmark()
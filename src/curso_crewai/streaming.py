@@ -0,0 +1,178 @@
+"""
+Streaming de respostas com eventos de progresso.
+
+Numa cadeia sequencial o cliente só vê algo quando o último agente termina.
+Com streaming, as etapas anteriores emitem eventos de progresso e a etapa
+final entrega a resposta em trechos à medida que o modelo gera, então o
+tempo percebido passa a ser o tempo até o primeiro token (TTFT), não a
+latência total.
+
+`transmitir` roda o produtor numa thread e repassa os eventos por uma fila,
+assim a crew (que bloqueia) continua rodando enquanto quem consome já
+recebe o progresso. O último evento é sempre `fim`, com as métricas.
+
+Uso:
+    def produtor(emitir):
+        emitir(EventoStream("inicio_etapa", "pesquisa"))
+        for trecho in llm.stream(mensagens):
+            emitir(EventoStream("token", "resposta", texto_do_trecho(trecho)))
+
+    for evento in transmitir(produtor):
+        if evento.tipo == "token":
+            print(evento.texto, end="", flush=True)
+"""
+
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, Optional
+
+INICIO_ETAPA = "inicio_etapa"
+FIM_ETAPA = "fim_etapa"
+TOKEN = "token"
+FIM = "fim"
+
+_FIM_DA_FILA = object()
+
+
+@dataclass
+class EventoStream:
+    """Evento entregue a quem consome o stream."""
+
+    tipo: str
+    etapa: Optional[str] = None
+    texto: str = ""
+    # Segundos desde o início da requisição
+    instante: float = 0.0
+    dados: Dict[str, Any] = field(default_factory=dict)
+
+
+class MetricasStream:
+    """Tempo até o primeiro token, latência total e duração de cada etapa."""
+
+    def __init__(self) -> None:
+        self.inicio = time.perf_counter()
+        self.primeiro_token: Optional[float] = None
+        self.fim: Optional[float] = None
+        self.trechos = 0
+        self.caracteres = 0
+        self._inicio_etapas: Dict[str, float] = {}
+        self.etapas: Dict[str, float] = {}
+
+    def registrar(self, evento: EventoStream) -> None:
+        agora = time.perf_counter()
+        evento.instante = agora - self.inicio
+        if evento.tipo == INICIO_ETAPA and evento.etapa:
+            self._inicio_etapas[evento.etapa] = agora
+        elif evento.tipo == FIM_ETAPA and evento.etapa in self._inicio_etapas:
+            self.etapas[evento.etapa] = agora - self._inicio_etapas[evento.etapa]
+        elif evento.tipo == TOKEN and evento.texto:
+            if self.primeiro_token is None:
+                self.primeiro_token = agora
+            self.trechos += 1
+            self.caracteres += len(evento.texto)
+
+    def finalizar(self) -> None:
+        self.fim = time.perf_counter()
+
+    @property
+    def ttft(self) -> Optional[float]:
+        """Segundos entre a pergunta e o primeiro trecho da resposta."""
+        if self.primeiro_token is None:
+            return None
+        return self.primeiro_token - self.inicio
+
+    @property
+    def latencia_total(self) -> float:
+        return (self.fim or time.perf_counter()) - self.inicio
+
+    def resumo(self) -> Dict[str, Any]:
+        geracao = None
+        if self.primeiro_token is not None:
+            geracao = (self.fim or time.perf_counter()) - self.primeiro_token
+        return {
+            "ttft_s": self.ttft,
+            "latencia_total_s": self.latencia_total,
+            "geracao_s": geracao,
+            "trechos": self.trechos,
+            "caracteres": self.caracteres,
+            "etapas_s": dict(self.etapas),
+        }
+
+
+def texto_do_trecho(trecho: Any) -> str:
+    """Extrai o texto de um chunk (LangChain, OpenAI/LiteLLM ou str)."""
+    if trecho is None:
+        return ""
+    if isinstance(trecho, str):
+        return trecho
+    conteudo = getattr(trecho, "content", None)
+    if isinstance(conteudo, str):
+        return conteudo
+    escolhas = getattr(trecho, "choices", None)
+    if escolhas is None and isinstance(trecho, dict):
+        escolhas = trecho.get("choices")
+    if escolhas:
+        delta = escolhas[0]
+        delta = delta.get("delta") if isinstance(delta, dict) else delta.delta
+        conteudo = delta.get("content") if isinstance(delta, dict) else delta.content
+        return conteudo or ""
+    return ""
+
+
+def transmitir(
+    produtor: Callable[[Callable[[EventoStream], None]], Any],
+    tamanho_fila: int = 0,
+) -> Iterator[EventoStream]:
+    """
+    Executa `produtor(emitir)` numa thread e devolve os eventos emitidos.
+
+    O valor retornado pelo produtor vai em `dados["resultado"]` do evento
+    `fim`, junto com o resumo das métricas. Exceções do produtor são
+    relançadas para quem consome.
+    """
+    metricas = MetricasStream()
+    fila: "queue.Queue[Any]" = queue.Queue(tamanho_fila)
+    saida: Dict[str, Any] = {}
+
+    def emitir(evento: EventoStream) -> None:
+        metricas.registrar(evento)
+        fila.put(evento)
+
+    def executar() -> None:
+        try:
+            saida["resultado"] = produtor(emitir)
+        except BaseException as e:
+            saida["erro"] = e
+        finally:
+            fila.put(_FIM_DA_FILA)
+
+    thread = threading.Thread(target=executar, name="stream", daemon=True)
+    thread.start()
+    while True:
+        evento = fila.get()
+        if evento is _FIM_DA_FILA:
+            break
+        yield evento
+    thread.join()
+    metricas.finalizar()
+    if "erro" in saida:
+        raise saida["erro"]
+    resumo = metricas.resumo()
+    resumo["resultado"] = saida.get("resultado")
+    fim = EventoStream(FIM, dados=resumo)
+    fim.instante = metricas.latencia_total
+    yield fim
+
+
+async def para_async(eventos: Iterator[EventoStream]) -> AsyncIterator[EventoStream]:
+    """Consome um iterador bloqueante sem travar o event loop."""
+    import asyncio  # Só quem usa async paga o import
+
+    loop = asyncio.get_running_loop()
+    while True:
+        evento = await loop.run_in_executor(None, next, eventos, _FIM_DA_FILA)
+        if evento is _FIM_DA_FILA:
+            return
+        yield evento
@@ -0,0 +1,388 @@
+"""
+Contagem de tokens offline e estimativa de custo antes da chamada.
+
+`len(texto) * 0.25` erra bastante em português: acentos e palavras longas
+viram mais tokens. Aqui a contagem usa o tokenizador BPE do modelo
+(tiktoken), sem acesso à rede:
+
+1. tiktoken com o cache local de encodings; se não houver, os arquivos
+   que o LiteLLM (dependência do CrewAI) já traz embutidos
+2. Sem tiktoken: aproximação pelo mesmo pré-tokenizador (palavras,
+   números, pontuação, espaços), calibrada contra o BPE real
+
+Prompts de sistema e backstories se repetem a cada chamada; as contagens
+ficam em um cache LRU, então só o texto novo de cada requisição é
+tokenizado.
+
+Uso:
+    estimador = EstimadorCusto("gpt-4o-mini")
+    estimativa = estimador.estimar(pergunta, sistema=backstory)
+    print(estimativa.tokens_entrada, estimativa.custo)
+
+Benchmark:
+    python -m curso_crewai.tokens
+"""
+
+import importlib.util
+import os
+import re
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+from curso_crewai.uso import custo_tokens, normalizar_modelo
+
+# Tokens extras por mensagem de chat (papel e delimitadores)
+TOKENS_POR_MENSAGEM = 3
+TOKENS_RESPOSTA_PRIMING = 3
+
+# Pré-tokenizador no estilo dos encodings da OpenAI
+_PADRAO_PECAS = re.compile(r" ?[^\W\d_]+| ?\d{1,3}| ?[^\s\w]+|\s+|_+")
+
+# Média de tokens de uma palavra por tamanho (índice = nº de letras, até
+# 15) e acréscimo quando ela tem acentos. A escala desconta as fusões do
+# BPE entre peças vizinhas (".\n", "**"). Calibrado com textos do curso.
+_PERFIS_APROXIMADOS = {
+    "o200k_base": {
+        "palavra": (
+            1.0,
+            1.0,
+            1.0,
+            1.09,
+            1.08,
+            1.17,
+            1.4,
+            1.44,
+            1.61,
+            1.69,
+            2.0,
+            1.86,
+            2.03,
+            2.07,
+            2.17,
+            2.18,
+        ),
+        "acento": 0.2,
+        "pontuacao": (1.0, 1.04, 1.07, 1.32, 1.64, 2.07),
+        "escala": 0.91,
+    },
+    "cl100k_base": {
+        "palavra": (
+            1.0,
+            1.0,
+            1.0,
+            1.13,
+            1.14,
+            1.29,
+            1.57,
+            1.67,
+            1.88,
+            1.94,
+            2.29,
+            2.31,
+            2.66,
+            2.52,
+            2.74,
+            2.84,
+        ),
+        "acento": 0.6,
+        "pontuacao": (1.0, 1.07, 1.09, 1.27, 1.72, 2.34),
+        "escala": 0.91,
+    },
+}
+
+
+class OrcamentoPromptExcedido(ValueError):
+    """O prompt não cabe no orçamento de tokens nem após o corte."""
+
+
+def codificacao_do_modelo(modelo: Optional[str]) -> str:
+    """Encoding BPE usado pelo modelo."""
+    nome = normalizar_modelo(modelo)
+    if nome.startswith(("gpt-4o", "gpt-4.1", "gpt-5", "o1", "o3", "o4")):
+        return "o200k_base"
+    return "cl100k_base"
+
+
+def _pasta_cache_offline() -> Optional[str]:
+    """Pasta dos encodings embutidos no LiteLLM, se houver."""
+    spec = importlib.util.find_spec("litellm")
+    if spec is None or not spec.submodule_search_locations:
+        return None
+    pasta = os.path.join(
+        spec.submodule_search_locations[0], "litellm_core_utils", "tokenizers"
+    )
+    return pasta if os.path.isdir(pasta) else None
+
+
+@contextmanager
+def _cache_offline() -> Iterator[None]:
+    """
+    Aponta o tiktoken para os encodings do LiteLLM só durante o carregamento.
+    O tiktoken lê o TIKTOKEN_CACHE_DIR ao montar o encoding; depois o
+    ambiente volta ao que era e quem roda no mesmo processo não o vê mudar.
+    """
+    pasta = None if os.getenv("TIKTOKEN_CACHE_DIR") else _pasta_cache_offline()
+    if pasta is None:
+        yield
+        return
+    with _lock_ambiente:
+        os.environ["TIKTOKEN_CACHE_DIR"] = pasta
+        try:
+            yield
+        finally:
+            os.environ.pop("TIKTOKEN_CACHE_DIR", None)
+
+
+_lock_ambiente = threading.Lock()
+
+
+@lru_cache(maxsize=None)
+def _carregar_tiktoken(codificacao: str):
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        with _cache_offline():
+            return tiktoken.get_encoding(codificacao)
+    except Exception:  # Sem cache local e sem rede
+        return None
+
+
+def contar_aproximado(texto: str, codificacao: str = "o200k_base") -> int:
+    """Estimativa sem tokenizador, peça a peça do pré-tokenizador."""
+    perfil = _PERFIS_APROXIMADOS.get(codificacao, _PERFIS_APROXIMADOS["o200k_base"])
+    palavras, pontuacao = perfil["palavra"], perfil["pontuacao"]
+    total = 0.0
+    for peca in _PADRAO_PECAS.findall(texto):
+        primeiro = peca[-1]
+        if primeiro.isalpha():
+            tamanho = len(peca) - (peca[0] == " ")
+            if tamanho < len(palavras):
+                total += palavras[tamanho]
+            else:
+                total += palavras[-1] + (tamanho - len(palavras) + 1) / 6
+            if not peca.isascii():
+                total += perfil["acento"]
+        elif primeiro.isdigit():
+            total += 1.4
+        elif peca.isspace():
+            total += 1.0 if len(peca) <= 2 else 2.0
+        else:
+            tamanho = len(peca.strip()) or 1
+            if tamanho < len(pontuacao):
+                total += pontuacao[tamanho]
+            else:
+                total += tamanho * 0.6
+    return round(total * perfil["escala"])
+
+
+class ContadorTokens:
+    """
+    Conta tokens com o BPE do modelo, com cache LRU por texto.
+
+    Args:
+        modelo: Nome do modelo (define o encoding)
+        max_cache: Textos distintos mantidos no cache
+        usar_tiktoken: False força a aproximação
+    """
+
+    def __init__(
+        self,
+        modelo: str = "gpt-4o-mini",
+        max_cache: int = 4096,
+        usar_tiktoken: bool = True,
+    ):
+        self.modelo = modelo
+        self.codificacao = codificacao_do_modelo(modelo)
+        self._bpe = _carregar_tiktoken(self.codificacao) if usar_tiktoken else None
+        self.contar = lru_cache(maxsize=max_cache)(self._contar)
+
+    @property
+    def exato(self) -> bool:
+        """True se a contagem vem do tokenizador real."""
+        return self._bpe is not None
+
+    def _contar(self, texto: str) -> int:
+        if self._bpe is not None:
+            return len(self._bpe.encode_ordinary(texto))
+        return contar_aproximado(texto, self.codificacao)
+
+    def contar_mensagens(self, mensagens: Sequence[Dict[str, str]]) -> int:
+        """Tokens de uma lista de mensagens de chat ({"role", "content"})."""
+        total = TOKENS_RESPOSTA_PRIMING
+        for mensagem in mensagens:
+            total += TOKENS_POR_MENSAGEM + self.contar(mensagem.get("content") or "")
+        return total
+
+    def estatisticas_cache(self) -> Dict[str, int]:
+        info = self.contar.cache_info()
+        return {"hits": info.hits, "misses": info.misses, "itens": info.currsize}
+
+
+@lru_cache(maxsize=None)
+def contador_padrao(modelo: str = "gpt-4o-mini") -> ContadorTokens:
+    """Contador compartilhado por modelo."""
+    return ContadorTokens(modelo)
+
+
+def estimar_tokens(texto: str, modelo: str = "gpt-4o-mini") -> int:
+    """Número de tokens do texto para o modelo."""
+    return contador_padrao(modelo).contar(texto)
+
+
+@dataclass
+class EstimativaCusto:
+    """Resultado de uma estimativa antes da chamada."""
+
+    tokens_entrada: int
+    tokens_saida: int
+    custo: float
+    exato: bool
+
+
+class EstimadorCusto:
+    """
+    Estima tokens e custo de uma chamada antes de enviá-la.
+
+    Args:
+        modelo: Modelo (define encoding e tabela de preços)
+        tokens_saida: Tokens de resposta esperados, se não informados
+    """
+
+    def __init__(self, modelo: str = "gpt-4o-mini", tokens_saida: int = 600):
+        self.modelo = modelo
+        self.tokens_saida = tokens_saida
+        self.contador = contador_padrao(modelo)
+
+    def estimar(
+        self,
+        entrada: str,
+        sistema: str = "",
+        tokens_saida: Optional[int] = None,
+    ) -> EstimativaCusto:
+        """
+        Estima uma chamada com prompt de sistema (backstory) e mensagem.
+
+        O `sistema` quase sempre se repete e sai do cache; só a entrada
+        nova é tokenizada.
+        """
+        tokens_entrada = TOKENS_RESPOSTA_PRIMING + TOKENS_POR_MENSAGEM
+        tokens_entrada += self.contador.contar(entrada)
+        if sistema:
+            tokens_entrada += TOKENS_POR_MENSAGEM + self.contador.contar(sistema)
+        saida = self.tokens_saida if tokens_saida is None else tokens_saida
+        return EstimativaCusto(
+            tokens_entrada,
+            saida,
+            custo_tokens(self.modelo, tokens_entrada, saida),
+            self.contador.exato,
+        )
+
+    def estimar_varios(
+        self,
+        entradas: Iterable[str],
+        sistema: str = "",
+        tokens_saida: Optional[int] = None,
+    ) -> List[EstimativaCusto]:
+        """Estima um lote de chamadas que compartilham o mesmo `sistema`."""
+        return [self.estimar(e, sistema, tokens_saida) for e in entradas]
+
+
+def ajustar_ao_orcamento(
+    base: str,
+    itens: Iterable[str],
+    max_tokens: int,
+    separador: str = "\n",
+    modelo: str = "gpt-4o-mini",
+) -> List[str]:
+    """
+    Seleciona, na ordem dada, os itens que cabem no orçamento junto com `base`.
+
+    Args:
+        base: Parte fixa do prompt (instruções)
+        itens: Trechos opcionais, do mais para o menos relevante
+        max_tokens: Limite de tokens do prompt montado
+        modelo: Modelo cujo tokenizador é usado na contagem
+
+    Returns:
+        List[str]: Itens aceitos (pode ser vazia)
+
+    Raises:
+        OrcamentoPromptExcedido: Se só a parte fixa já passa do limite
+    """
+    usados = estimar_tokens(base, modelo)
+    if usados > max_tokens:
+        raise OrcamentoPromptExcedido(
+            f"Prompt base com ~{usados} tokens excede o limite de {max_tokens}"
+        )
+    aceitos = []
+    for item in itens:
+        custo = estimar_tokens(item + separador, modelo)
+        if usados + custo > max_tokens:
+            break
+        aceitos.append(item)
+        usados += custo
+    return aceitos
+
+
+def _benchmark() -> None:
+    import random
+    import time
+
+    gerador = random.Random(0)
+    frases = [
+        "Olá, gostaria de saber se vocês têm o notebook gamer em estoque.",
+        "Analista de dados com 5 anos de experiência em Python, SQL e Power BI.",
+        "Responsável pela gestão de uma equipe de 12 pessoas na área comercial.",
+        "Formação em Administração pela Universidade de São Paulo (2018).",
+        "Quanto custa o frete para Belo Horizonte? Preciso da entrega até sexta.",
+        "Experiência com negociação, prospecção de clientes e pós-venda.",
+        "Certificações: AWS Cloud Practitioner, Scrum Master e inglês avançado.",
+        "O produto chegou com defeito e ninguém respondeu minha reclamação!",
+    ]
+    sistema = (
+        "Você é um recrutador experiente com 10 anos de mercado. Avalie "
+        "currículos com critérios objetivos: experiência, formação, "
+        "habilidades técnicas e comportamentais. Responda em português, "
+        "de forma clara e construtiva, em no máximo 200 palavras. "
+    ) * 4
+    entradas = [
+        " ".join(gerador.choice(frases) for _ in range(gerador.randint(1, 8)))
+        + f" (protocolo {i})"
+        for i in range(1000)
+    ]
+
+    print("🔢 BENCHMARK: ESTIMATIVA DE TOKENS ANTES DA CHAMADA")
+    print("=" * 64)
+    for modelo in ("gpt-4o-mini", "gpt-3.5-turbo"):
+        estimador = EstimadorCusto(modelo)
+        inicio = time.perf_counter()
+        estimativas = estimador.estimar_varios(entradas, sistema=sistema)
+        duracao = time.perf_counter() - inicio
+        fonte = "tiktoken" if estimador.contador.exato else "aproximação"
+        media = sum(e.tokens_entrada for e in estimativas) / len(entradas)
+        print(
+            f"{modelo:<14} ({fonte}): {len(entradas) / duracao:,.0f} req/s | "
+            f"média {media:.0f} tokens de entrada"
+        )
+
+        if estimador.contador.exato:
+            # Erro das heurísticas em relação ao BPE real
+            codificacao = estimador.contador.codificacao
+            reais = [estimador.contador.contar(e) for e in entradas]
+            heuristicas = {
+                "len * 0.25": lambda t: len(t) * 0.25,
+                "aproximação": lambda t: contar_aproximado(t, codificacao),
+            }
+            for nome, funcao in heuristicas.items():
+                erros = [abs(funcao(t) - r) / r for t, r in zip(entradas, reais)]
+                print(f"   erro médio {nome:<12}: {sum(erros) / len(erros):6.1%}")
+    print("\n💡 O prompt de sistema sai do cache LRU; só a entrada é tokenizada.")
+
+
+if __name__ == "__main__":
+    _benchmark()
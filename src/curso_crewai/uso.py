@@ -0,0 +1,436 @@
+"""
+Contabilidade real de tokens a partir das respostas da API.
+
+Em vez de estimar tokens pelo tamanho do texto, o coletor lê o campo
+`usage` de cada resposta do modelo (prompt, completion e tokens em cache)
+e atribui o consumo ao agente e à tarefa que estavam em execução.
+
+Fontes, da mais para a menos detalhada:
+- LiteLLM (usado internamente pelo CrewAI): callback registrado com
+  `instalar_litellm()`
+- LangChain: `coletor.handler_langchain()` em `callbacks=[...]` do modelo
+- CrewOutput.token_usage: total da crew, usado quando nenhum hook viu a
+  execução
+
+Uso:
+    coletor = ColetorUso()
+    coletor.instalar_litellm()
+    with coletor.rastrear(agente="pesquisador", tarefa="pesquisa") as escopo:
+        resultado = crew.kickoff()
+        escopo.finalizar(resultado)
+    print(escopo.custo, coletor.resumo("agente"))
+"""
+
+import contextvars
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+# Preços em US$ por 1M de tokens (input, output, input em cache)
+PRECOS_POR_MILHAO = {
+    "gpt-4o-mini": (0.15, 0.60, 0.075),
+    "gpt-4o": (2.50, 10.00, 1.25),
+    "gpt-4.1-mini": (0.40, 1.60, 0.10),
+    "gpt-4.1-nano": (0.10, 0.40, 0.025),
+    "gpt-4.1": (2.00, 8.00, 0.50),
+    "gpt-4-turbo": (10.00, 30.00, 10.00),
+    "gpt-4": (30.00, 60.00, 30.00),
+    "gpt-3.5-turbo": (0.50, 1.50, 0.50),
+    "o3-mini": (1.10, 4.40, 0.55),
+    "o1-mini": (1.10, 4.40, 0.55),
+}
+
+
+def normalizar_modelo(modelo: Optional[str]) -> str:
+    """
+    Reduz o nome ao modelo base da tabela de preços.
+
+    "openai/gpt-4o-mini-2024-07-18" -> "gpt-4o-mini"
+    """
+    nome = (modelo or "").lower().rsplit("/", 1)[-1]
+    # Prefixo mais longo primeiro: "gpt-4o-mini" antes de "gpt-4o"
+    for base in sorted(PRECOS_POR_MILHAO, key=len, reverse=True):
+        if nome.startswith(base):
+            return base
+    return nome
+
+
+def custo_tokens(
+    modelo: Optional[str],
+    prompt_tokens: int,
+    completion_tokens: int,
+    cached_tokens: int = 0,
+) -> float:
+    """Custo em US$; `cached_tokens` é a parte do prompt servida do cache."""
+    precos = PRECOS_POR_MILHAO.get(normalizar_modelo(modelo))
+    if precos is None:
+        return 0.0
+    entrada, saida, cache = precos
+    cached_tokens = min(cached_tokens, prompt_tokens)
+    return (
+        (prompt_tokens - cached_tokens) * entrada
+        + cached_tokens * cache
+        + completion_tokens * saida
+    ) / 1_000_000
+
+
+@dataclass
+class RegistroUso:
+    """Consumo de uma chamada ao modelo (ou de uma crew inteira)."""
+
+    modelo: str
+    prompt_tokens: int
+    completion_tokens: int
+    cached_tokens: int = 0
+    agente: Optional[str] = None
+    tarefa: Optional[str] = None
+    origem: str = "api"
+    chamadas: int = 1
+    timestamp: float = field(default_factory=time.time)
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    @property
+    def custo(self) -> float:
+        return custo_tokens(
+            self.modelo, self.prompt_tokens, self.completion_tokens, self.cached_tokens
+        )
+
+
+def _ler(objeto: Any, nome: str, padrao: Any = None) -> Any:
+    """Lê atributo ou chave (as respostas vêm como dict ou objeto)."""
+    if objeto is None:
+        return padrao
+    if isinstance(objeto, dict):
+        return objeto.get(nome, padrao)
+    return getattr(objeto, nome, padrao)
+
+
+def extrair_usage(usage: Any) -> Optional[Dict[str, int]]:
+    """Normaliza o campo `usage` de OpenAI/LiteLLM/LangChain."""
+    if usage is None:
+        return None
+    prompt = _ler(usage, "prompt_tokens", _ler(usage, "input_tokens"))
+    completion = _ler(usage, "completion_tokens", _ler(usage, "output_tokens"))
+    if prompt is None and completion is None:
+        return None
+    detalhes = _ler(usage, "prompt_tokens_details") or _ler(
+        usage, "input_token_details"
+    )
+    cached = _ler(detalhes, "cached_tokens", _ler(detalhes, "cache_read")) or 0
+    return {
+        "prompt_tokens": int(prompt or 0),
+        "completion_tokens": int(completion or 0),
+        "cached_tokens": int(cached or _ler(usage, "cached_prompt_tokens", 0) or 0),
+    }
+
+
+class Escopo:
+    """Janela de execução (agente/tarefa) à qual o consumo é atribuído."""
+
+    def __init__(
+        self, coletor: "ColetorUso", agente: Optional[str], tarefa: Optional[str]
+    ):
+        self.coletor = coletor
+        self.agente = agente
+        self.tarefa = tarefa
+        self.registros: List[RegistroUso] = []
+        self._pendentes = 0  # Registros ainda sem tarefa definida
+
+    def _adicionar(self, registro: RegistroUso) -> None:
+        self.registros.append(registro)
+
+    def fechar_tarefa(self, agente: Optional[str], tarefa: Optional[str]) -> None:
+        """
+        Atribui a (agente, tarefa) as chamadas feitas desde o último
+        fechamento. Útil como `task_callback` de uma crew sequencial.
+        """
+        for registro in self.registros[self._pendentes :]:
+            self.coletor._reatribuir(registro, agente, tarefa)
+        self._pendentes = len(self.registros)
+
+    def finalizar(self, resultado: Any = None, modelo: Optional[str] = None) -> None:
+        """
+        Se nenhum hook registrou chamadas, usa `resultado.token_usage`
+        (CrewOutput) como fonte do consumo total.
+        """
+        if self.registros or resultado is None:
+            return
+        usage = extrair_usage(_ler(resultado, "token_usage"))
+        if not usage or not (usage["prompt_tokens"] or usage["completion_tokens"]):
+            return
+        self.coletor.registrar(
+            RegistroUso(
+                modelo=modelo or "desconhecido",
+                agente=self.agente,
+                tarefa=self.tarefa,
+                origem="crew_output",
+                chamadas=int(
+                    _ler(_ler(resultado, "token_usage"), "successful_requests", 1) or 1
+                ),
+                **usage,
+            ),
+            escopo=self,
+        )
+
+    @property
+    def prompt_tokens(self) -> int:
+        return sum(r.prompt_tokens for r in self.registros)
+
+    @property
+    def completion_tokens(self) -> int:
+        return sum(r.completion_tokens for r in self.registros)
+
+    @property
+    def cached_tokens(self) -> int:
+        return sum(r.cached_tokens for r in self.registros)
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    @property
+    def custo(self) -> float:
+        return sum(r.custo for r in self.registros)
+
+
+_escopo_atual: contextvars.ContextVar[Optional[Escopo]] = contextvars.ContextVar(
+    "escopo_uso", default=None
+)
+
+
+class ColetorUso:
+    """
+    Acumula o consumo real de tokens por agente, tarefa e modelo.
+
+    Assinantes (`assinar`) recebem cada RegistroUso assim que ele chega,
+    para alimentar monitores e controles de orçamento.
+
+    Em processos longos só os últimos `max_registros` registros ficam em
+    `registros`; os totais de `resumo`, `custo_total` e `total_tokens` são
+    acumulados na chegada e continuam exatos depois do descarte.
+    """
+
+    AGRUPAMENTOS = ("agente", "tarefa", "modelo", "origem")
+
+    def __init__(self, max_registros: int = 10_000):
+        self.registros: Deque[RegistroUso] = deque(maxlen=max_registros)
+        self._totais: Dict[str, Dict[str, Dict[str, Any]]] = {
+            agrupamento: {} for agrupamento in self.AGRUPAMENTOS
+        }
+        self._custo_total = 0.0
+        self._total_tokens = 0
+        self._assinantes: List[Callable[[RegistroUso], None]] = []
+        self._lock = threading.Lock()
+
+    def assinar(self, funcao: Callable[[RegistroUso], None]) -> None:
+        self._assinantes.append(funcao)
+
+    def registrar(self, registro: RegistroUso, escopo: Optional[Escopo] = None) -> None:
+        with self._lock:
+            self.registros.append(registro)
+            self._acumular(registro)
+            if escopo is not None:
+                escopo._adicionar(registro)
+        for funcao in self._assinantes:
+            funcao(registro)
+
+    def _acumular(self, registro: RegistroUso, sinal: int = 1) -> None:
+        custo = sinal * registro.custo
+        self._custo_total += custo
+        self._total_tokens += sinal * registro.total_tokens
+        for agrupamento, grupos in self._totais.items():
+            nome = getattr(registro, agrupamento) or "sem_atribuicao"
+            grupo = grupos.setdefault(
+                nome,
+                {
+                    "chamadas": 0,
+                    "prompt_tokens": 0,
+                    "completion_tokens": 0,
+                    "cached_tokens": 0,
+                    "custo": 0.0,
+                },
+            )
+            grupo["chamadas"] += sinal * registro.chamadas
+            grupo["prompt_tokens"] += sinal * registro.prompt_tokens
+            grupo["completion_tokens"] += sinal * registro.completion_tokens
+            grupo["cached_tokens"] += sinal * registro.cached_tokens
+            grupo["custo"] += custo
+            if not grupo["chamadas"]:
+                del grupos[nome]
+
+    def _reatribuir(
+        self, registro: RegistroUso, agente: Optional[str], tarefa: Optional[str]
+    ) -> None:
+        """Move um registro já contabilizado para outro agente/tarefa."""
+        with self._lock:
+            self._acumular(registro, -1)
+            registro.agente = agente or registro.agente
+            registro.tarefa = tarefa or registro.tarefa
+            self._acumular(registro)
+
+    def rastrear(
+        self, agente: Optional[str] = None, tarefa: Optional[str] = None
+    ) -> "_Rastreamento":
+        """Context manager: chamadas ao modelo dentro do bloco são atribuídas."""
+        return _Rastreamento(Escopo(self, agente, tarefa))
+
+    # ------------------------------------------------------------------
+    # Hooks
+    # ------------------------------------------------------------------
+
+    def instalar_litellm(self) -> bool:
+        """Registra o callback no LiteLLM. Retorna False se não instalado."""
+        return _instalar_litellm(self)
+
+    def handler_langchain(self):
+        """Callback handler para `ChatOpenAI(callbacks=[...])`."""
+        from langchain_core.callbacks import BaseCallbackHandler
+
+        coletor = self
+
+        class HandlerUso(BaseCallbackHandler):
+            def on_llm_end(self, response, **kwargs):
+                saida = getattr(response, "llm_output", None) or {}
+                usage = extrair_usage(saida.get("token_usage"))
+                if usage is None:
+                    # Versões novas trazem usage_metadata na mensagem
+                    for geracoes in getattr(response, "generations", []):
+                        for geracao in geracoes:
+                            mensagem = getattr(geracao, "message", None)
+                            usage = extrair_usage(
+                                getattr(mensagem, "usage_metadata", None)
+                            )
+                            if usage:
+                                break
+                if usage:
+                    coletor.registrar_chamada(
+                        saida.get("model_name"), usage, origem="langchain"
+                    )
+
+        return HandlerUso()
+
+    def registrar_chamada(
+        self,
+        modelo: Optional[str],
+        usage: Dict[str, int],
+        origem: str = "api",
+        escopo: Optional[Escopo] = None,
+    ) -> None:
+        """Registra uma chamada, atribuída ao escopo ativo (ou ao informado)."""
+        escopo = escopo or _escopo_atual.get()
+        if escopo is not None and escopo.coletor is not self:
+            escopo.coletor.registrar_chamada(modelo, usage, origem, escopo)
+            return
+        self.registrar(
+            RegistroUso(
+                modelo=modelo or "desconhecido",
+                agente=escopo.agente if escopo else None,
+                tarefa=escopo.tarefa if escopo else None,
+                origem=origem,
+                **usage,
+            ),
+            escopo=escopo,
+        )
+
+    # ------------------------------------------------------------------
+    # Relatórios
+    # ------------------------------------------------------------------
+
+    def resumo(self, agrupar_por: str = "agente") -> Dict[str, Dict[str, Any]]:
+        """Totais agrupados por "agente", "tarefa", "modelo" ou "origem"."""
+        if agrupar_por not in self._totais:
+            raise ValueError(f"agrupamento desconhecido: {agrupar_por}")
+        with self._lock:
+            return {
+                nome: dict(grupo) for nome, grupo in self._totais[agrupar_por].items()
+            }
+
+    @property
+    def custo_total(self) -> float:
+        with self._lock:
+            return self._custo_total
+
+    @property
+    def total_tokens(self) -> int:
+        with self._lock:
+            return self._total_tokens
+
+
+class _Rastreamento:
+    def __init__(self, escopo: Escopo):
+        self.escopo = escopo
+        self._token: Optional[contextvars.Token] = None
+
+    def __enter__(self) -> Escopo:
+        self._token = _escopo_atual.set(self.escopo)
+        return self.escopo
+
+    def __exit__(self, *exc) -> None:
+        _escopo_atual.reset(self._token)
+
+
+# ----------------------------------------------------------------------
+# LiteLLM
+# ----------------------------------------------------------------------
+
+# Coletor que recebe chamadas feitas fora de qualquer `rastrear`
+_coletor_global: Optional[ColetorUso] = None
+_litellm_instalado = False
+# O callback de sucesso do LiteLLM pode rodar em outra thread (sem o
+# contexto do chamador); o escopo é guardado no pre-call pelo id da chamada
+_escopos_por_chamada: Dict[str, Escopo] = {}
+_lock_chamadas = threading.Lock()
+
+
+def _instalar_litellm(coletor: ColetorUso) -> bool:
+    global _coletor_global, _litellm_instalado
+    try:
+        import litellm
+        from litellm.integrations.custom_logger import CustomLogger
+    except ImportError:
+        return False
+
+    if _coletor_global is None:
+        _coletor_global = coletor
+    if _litellm_instalado:
+        return True
+
+    class LoggerUso(CustomLogger):
+        def log_pre_api_call(self, model, messages, kwargs):
+            escopo = _escopo_atual.get()
+            id_chamada = kwargs.get("litellm_call_id")
+            if escopo is not None and id_chamada:
+                with _lock_chamadas:
+                    _escopos_por_chamada[id_chamada] = escopo
+
+        def _registrar(self, kwargs, resposta):
+            with _lock_chamadas:
+                escopo = _escopos_por_chamada.pop(kwargs.get("litellm_call_id"), None)
+            usage = extrair_usage(_ler(resposta, "usage"))
+            if usage is None:
+                return
+            modelo = _ler(resposta, "model") or kwargs.get("model")
+            destino = escopo.coletor if escopo else _coletor_global
+            if destino is not None:
+                destino.registrar_chamada(modelo, usage, "litellm", escopo)
+
+        def log_success_event(self, kwargs, response_obj, start_time, end_time):
+            self._registrar(kwargs, response_obj)
+
+        async def async_log_success_event(
+            self, kwargs, response_obj, start_time, end_time
+        ):
+            self._registrar(kwargs, response_obj)
+
+        def log_failure_event(self, kwargs, response_obj, start_time, end_time):
+            with _lock_chamadas:
+                _escopos_por_chamada.pop(kwargs.get("litellm_call_id"), None)
+
+    litellm.callbacks = [*(litellm.callbacks or []), LoggerUso()]
+    _litellm_instalado = True
+    return True
@@ -0,0 +1,1134 @@
+"""
+Busca e extração de páginas web para as ferramentas dos agentes.
+
+As ferramentas de busca e scraping da aula 3 precisam buscar várias páginas
+por chamada sem abrir uma conexão nova para cada uma e sem derrubar o site
+de destino. Aqui:
+
+- As requisições usam o pool HTTP compartilhado (`conexoes`): o mesmo
+  keep-alive e os mesmos limites dos clientes de LLM, com um cliente
+  síncrono (`buscar`) e um assíncrono (`abuscar`).
+- `buscar_varias` / `abuscar_varias` buscam URLs em paralelo, com no máximo
+  `por_host` requisições simultâneas para o mesmo host.
+- O HTML é processado enquanto chega (lxml em modo alvo, `feed` a cada
+  pedaço; `html.parser` quando o lxml não está instalado): nenhuma árvore é
+  montada e a leitura para assim que o texto atinge `max_caracteres`.
+- As páginas extraídas ficam num `BackendCache` e são revalidadas com
+  ETag/Last-Modified: uma resposta 304 reaproveita a extração sem baixar o
+  corpo. `Cache-Control` (max-age, no-cache, no-store) é respeitado e, se o
+  site falhar, a cópia antiga é devolvida.
+- Com `bloquear_internos=True` (URLs escolhidas pelo agente), hosts que
+  resolvem para a rede local (privada, loopback, link-local) são recusados,
+  inclusive como destino de um redirecionamento.
+
+Uso:
+    from curso_crewai.web import coletor_padrao
+
+    coletor = coletor_padrao()
+    pagina = coletor.buscar("https://docs.crewai.com")
+    print(pagina.resumo())
+    paginas = coletor.buscar_varias(urls)              # threads
+    paginas = await coletor.abuscar_varias(urls)       # asyncio
+    resultados = coletor.buscar_web("crewai agentes")  # busca + links
+
+Configuração: CURSO_WEB_POR_HOST (padrão 4) e CURSO_BUSCA_URL (modelo da
+URL de busca com `{consulta}`; padrão: HTML do DuckDuckGo).
+
+Teste contra um servidor local de páginas:
+    python -m curso_crewai.web
+"""
+
+import asyncio
+import codecs
+import hashlib
+import ipaddress
+import json
+import os
+import re
+import socket
+import threading
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import asdict, dataclass, field
+from email.utils import formatdate
+from html.parser import HTMLParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import (
+    Any,
+    AsyncIterator,
+    Dict,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from curso_crewai import conexoes
+from curso_crewai.cache import BackendCache, BackendMemoria
+
+URL_BUSCA_PADRAO = "https://html.duckduckgo.com/html/?q={consulta}"
+AGENTE_USUARIO = "curso-crewai/0.1 (+https://github.com/exemplo/curso-crewai)"
+MAX_REDIRECIONAMENTOS = 5
+
+# Conteúdo que não é texto da página (menus, scripts, formulários)
+IGNORADAS = {
+    "script",
+    "style",
+    "noscript",
+    "template",
+    "svg",
+    "nav",
+    "footer",
+    "form",
+    "iframe",
+}
+CABECALHOS = {"h1", "h2", "h3"}
+BLOCOS = {
+    "p",
+    "div",
+    "li",
+    "br",
+    "tr",
+    "td",
+    "th",
+    "pre",
+    "blockquote",
+    "section",
+    "article",
+    "dt",
+    "dd",
+    "h1",
+    "h2",
+    "h3",
+    "h4",
+    "h5",
+    "h6",
+}
+
+
+def _lxml_disponivel() -> bool:
+    try:
+        import lxml.etree  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+# =============================================================================
+# EXTRAÇÃO INCREMENTAL
+# =============================================================================
+
+
+class Link(NamedTuple):
+    url: str
+    texto: str
+    classe: str = ""
+
+
+class _Conteudo:
+    """
+    Alvo dos eventos do parser (a interface `start/end/data/close` do lxml):
+    guarda título, descrição, cabeçalhos, links e o texto visível.
+    """
+
+    def __init__(self, url: str, max_caracteres: int, max_links: int):
+        self.url = url
+        self.max_caracteres = max_caracteres
+        self.max_links = max_links
+        self.titulo = ""
+        self.descricao = ""
+        self.cabecalhos: List[str] = []
+        self.links: List[Link] = []
+        self.caracteres = 0
+        self._linhas: List[str] = []
+        self._linha: List[str] = []
+        self._ignorar = 0
+        self._no_titulo = False
+        self._link: Optional[Tuple[str, List[str], str]] = None
+        self._cabecalho: Optional[List[str]] = None
+
+    @property
+    def cheio(self) -> bool:
+        return self.caracteres >= self.max_caracteres
+
+    def start(self, tag: str, atributos: Any) -> None:
+        tag = tag.lower()
+        if tag in IGNORADAS:
+            self._ignorar += 1
+            return
+        if self._ignorar:
+            return
+        if tag in BLOCOS:
+            self._quebrar()
+        if tag == "title":
+            self._no_titulo = True
+        elif tag == "meta" and not self.descricao:
+            nome = (atributos.get("name") or atributos.get("property") or "").lower()
+            if nome in ("description", "og:description"):
+                self.descricao = " ".join((atributos.get("content") or "").split())
+        elif tag == "a":
+            href = (atributos.get("href") or "").strip()
+            if href and not href.startswith(("#", "javascript:", "mailto:")):
+                destino = urllib.parse.urljoin(self.url, href)
+                self._link = (destino, [], atributos.get("class") or "")
+        if tag in CABECALHOS:
+            self._cabecalho = []
+
+    def end(self, tag: str) -> None:
+        tag = tag.lower()
+        if tag in IGNORADAS:
+            self._ignorar = max(0, self._ignorar - 1)
+            return
+        if self._ignorar:
+            return
+        if tag == "title":
+            self._no_titulo = False
+        elif tag == "a" and self._link is not None:
+            destino, partes, classe = self._link
+            self._link = None
+            if len(self.links) < self.max_links:
+                self.links.append(
+                    Link(destino, " ".join("".join(partes).split()), classe)
+                )
+        if tag in CABECALHOS and self._cabecalho is not None:
+            texto = " ".join("".join(self._cabecalho).split())
+            if texto:
+                self.cabecalhos.append(texto)
+            self._cabecalho = None
+        if tag in BLOCOS:
+            self._quebrar()
+
+    def data(self, texto: str) -> None:
+        if self._ignorar:
+            return
+        if self._no_titulo:
+            self.titulo = " ".join((self.titulo + texto).split())
+            return
+        if self._link is not None:
+            self._link[1].append(texto)
+        if self._cabecalho is not None:
+            self._cabecalho.append(texto)
+        if self.cheio:
+            return
+        # O texto de um nó pode chegar em vários pedaços (um por `feed`): só
+        # normaliza os espaços ao fechar a linha, sem separar as partes
+        self._linha.append(texto)
+        self.caracteres += len(" ".join(texto.split()))
+
+    def _quebrar(self) -> None:
+        linha = " ".join("".join(self._linha).split())
+        self._linha = []
+        if linha:
+            self._linhas.append(linha)
+            self.caracteres += 1
+
+    def close(self) -> "_Conteudo":
+        self._quebrar()
+        return self
+
+    @property
+    def texto(self) -> str:
+        return "\n".join(self._linhas)[: self.max_caracteres]
+
+
+class _ParserPadrao(HTMLParser):
+    """`html.parser` repassando os eventos para o mesmo alvo do lxml."""
+
+    def __init__(self, alvo: _Conteudo):
+        super().__init__(convert_charrefs=True)
+        self.alvo = alvo
+
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        self.alvo.start(tag, {nome: valor or "" for nome, valor in attrs})
+
+    def handle_endtag(self, tag: str) -> None:
+        self.alvo.end(tag)
+
+    def handle_data(self, data: str) -> None:
+        self.alvo.data(data)
+
+
+class ExtratorHTML:
+    """
+    Recebe o corpo em pedaços (`alimentar`) e devolve o conteúdo extraído
+    em `fechar`. `alimentar` retorna True quando o texto já atingiu o
+    limite e o resto do corpo pode ser descartado.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        charset: Optional[str] = None,
+        max_caracteres: int = 20_000,
+        max_links: int = 300,
+        usar_lxml: Optional[bool] = None,
+    ):
+        self.conteudo = _Conteudo(url, max_caracteres, max_links)
+        if charset:
+            try:
+                charset = codecs.lookup(charset).name
+            except LookupError:
+                charset = None
+        self.usar_lxml = _lxml_disponivel() if usar_lxml is None else usar_lxml
+        if self.usar_lxml:
+            from lxml import etree
+
+            self._parser: Any = etree.HTMLParser(
+                target=self.conteudo, encoding=charset, remove_comments=True
+            )
+            self._decodificador = None
+        else:
+            self._parser = _ParserPadrao(self.conteudo)
+            self._decodificador = codecs.getincrementaldecoder(charset or "utf-8")(
+                errors="replace"
+            )
+
+    def alimentar(self, pedaco: bytes) -> bool:
+        if self._decodificador is not None:
+            self._parser.feed(self._decodificador.decode(pedaco))
+        else:
+            self._parser.feed(pedaco)
+        return self.conteudo.cheio
+
+    def fechar(self) -> _Conteudo:
+        try:
+            if self._decodificador is not None:
+                self._parser.feed(self._decodificador.decode(b"", final=True))
+            self._parser.close()
+        except Exception:
+            # HTML truncado ou vazio: fica o que já foi extraído
+            pass
+        return self.conteudo.close()
+
+
+# =============================================================================
+# PÁGINAS E CACHE
+# =============================================================================
+
+
+@dataclass
+class Pagina:
+    """Conteúdo extraído de uma URL (e o necessário para revalidá-lo)."""
+
+    url: str
+    status: int = 0
+    titulo: str = ""
+    descricao: str = ""
+    texto: str = ""
+    cabecalhos: List[str] = field(default_factory=list)
+    links: List[Link] = field(default_factory=list)
+    tipo: str = ""
+    etag: str = ""
+    modificada_em: str = ""
+    fresca_ate: float = 0.0
+    origem: str = "rede"  # "rede", "cache", "revalidada" ou "cache_antigo"
+    truncada: bool = False
+    bytes_lidos: int = 0
+    duracao_s: float = 0.0
+    erro: str = ""
+
+    @property
+    def ok(self) -> bool:
+        return not self.erro and 200 <= self.status < 300
+
+    def resumo(self, max_caracteres: int = 1500) -> str:
+        """Texto curto para o agente: título, seções e início do conteúdo."""
+        if not self.ok and not self.texto:
+            return f"❌ {self.url}: {self.erro or f'HTTP {self.status}'}"
+        linhas = [f"📄 {self.titulo or self.url}", f"🔗 {self.url}"]
+        if self.descricao:
+            linhas.append(f"📝 {self.descricao}")
+        if self.cabecalhos:
+            linhas.append("📑 Seções: " + " | ".join(self.cabecalhos[:8]))
+        texto = self.texto[:max_caracteres]
+        if len(self.texto) > max_caracteres or self.truncada:
+            texto = texto.rstrip() + " […]"
+        linhas.append(texto)
+        if self.erro:
+            linhas.append(f"⚠️ Cópia em cache ({self.erro})")
+        return "\n".join(linhas)
+
+    def para_json(self) -> bytes:
+        return json.dumps(asdict(self), ensure_ascii=False).encode("utf-8")
+
+    @classmethod
+    def de_json(cls, dados: bytes) -> "Pagina":
+        valores = json.loads(dados)
+        valores["links"] = [Link(*link) for link in valores.get("links", [])]
+        return cls(**valores)
+
+
+class ResultadoBusca(NamedTuple):
+    titulo: str
+    url: str
+    trecho: str
+
+
+def _validade(cabecalhos: Any, ttl_padrao: float) -> Optional[float]:
+    """Segundos de validade pelo Cache-Control; None para não guardar."""
+    controle = (cabecalhos.get("cache-control") or "").lower()
+    if "no-store" in controle:
+        return None
+    if "no-cache" in controle:
+        return 0.0
+    idade = re.search(r"max-age=(\d+)", controle)
+    if idade:
+        return float(idade.group(1))
+    return ttl_padrao
+
+
+def _host(url: str) -> str:
+    return urllib.parse.urlsplit(url).netloc.lower()
+
+
+class EnderecoInterno(ConnectionError):
+    """A URL aponta para a rede local e o coletor foi pedido para recusá-la."""
+
+
+def endereco_interno(url: str) -> bool:
+    """
+    True se o host da URL resolve para um endereço que não é da internet
+    pública (privado, loopback, link-local, reservado, multicast).
+    """
+    host = urllib.parse.urlsplit(url).hostname
+    if not host:
+        return True
+    try:
+        enderecos = {info[4][0] for info in socket.getaddrinfo(host, None)}
+    except (socket.gaierror, UnicodeError):
+        return False  # Não resolve: a própria requisição vai falhar
+    for endereco in enderecos:
+        ip = ipaddress.ip_address(endereco.split("%")[0])
+        if isinstance(ip, ipaddress.IPv6Address) and ip.ipv4_mapped:
+            ip = ip.ipv4_mapped
+        if (
+            ip.is_private
+            or ip.is_loopback
+            or ip.is_link_local
+            or ip.is_reserved
+            or ip.is_multicast
+            or ip.is_unspecified
+        ):
+            return True
+    return False
+
+
+# =============================================================================
+# COLETOR
+# =============================================================================
+
+
+class ColetorWeb:
+    """
+    Busca páginas pelo pool compartilhado, com limite por host, extração
+    incremental e cache revalidável. Pode ser usado por várias threads e
+    por várias tarefas asyncio (do mesmo event loop) ao mesmo tempo.
+    """
+
+    def __init__(
+        self,
+        cache: Optional[BackendCache] = None,
+        por_host: int = 4,
+        max_simultaneas: int = 16,
+        max_bytes: int = 2_000_000,
+        max_caracteres: int = 20_000,
+        ttl_padrao_s: float = 300.0,
+        guardar_s: float = 86_400.0,
+        timeout: float = 15.0,
+        url_busca: str = URL_BUSCA_PADRAO,
+        cliente: Any = None,
+        cliente_async: Any = None,
+        usar_lxml: Optional[bool] = None,
+    ):
+        self.cache = cache if cache is not None else BackendMemoria(max_itens=500)
+        self.por_host = por_host
+        self.max_simultaneas = max_simultaneas
+        self.max_bytes = max_bytes
+        self.max_caracteres = max_caracteres
+        self.ttl_padrao_s = ttl_padrao_s
+        self.guardar_s = guardar_s
+        self.timeout = timeout
+        self.url_busca = url_busca
+        self.usar_lxml = _lxml_disponivel() if usar_lxml is None else usar_lxml
+        self._cliente = cliente
+        self._cliente_async = cliente_async
+        self._lock = threading.Lock()
+        self._limites: Dict[str, threading.BoundedSemaphore] = {}
+        self._limites_async: Dict[str, Tuple[Any, asyncio.Semaphore]] = {}
+        self._simultaneas: Dict[str, int] = {}
+        self.requisicoes = 0
+        self.acertos = 0
+        self.revalidadas = 0
+        self.antigas = 0
+        self.erros = 0
+        self.bytes_lidos = 0
+        self.max_por_host = 0
+
+    @property
+    def cliente(self) -> Any:
+        return self._cliente or conexoes.cliente_http()
+
+    @property
+    def cliente_async(self) -> Any:
+        return self._cliente_async or conexoes.cliente_http_async()
+
+    # -- limite por host ------------------------------------------------------
+
+    def _entrar(self, host: str) -> None:
+        with self._lock:
+            atual = self._simultaneas.get(host, 0) + 1
+            self._simultaneas[host] = atual
+            self.max_por_host = max(self.max_por_host, atual)
+            self.requisicoes += 1
+
+    def _sair(self, host: str) -> None:
+        with self._lock:
+            self._simultaneas[host] -= 1
+
+    @contextmanager
+    def _limite_host(self, host: str) -> Iterator[None]:
+        with self._lock:
+            semaforo = self._limites.get(host)
+            if semaforo is None:
+                semaforo = self._limites[host] = threading.BoundedSemaphore(
+                    self.por_host
+                )
+        with semaforo:
+            self._entrar(host)
+            try:
+                yield
+            finally:
+                self._sair(host)
+
+    @asynccontextmanager
+    async def _limite_host_async(self, host: str) -> AsyncIterator[None]:
+        # asyncio.Semaphore fica preso ao loop em que foi usado
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            par = self._limites_async.get(host)
+            if par is None or par[0] is not loop:
+                par = self._limites_async[host] = (
+                    loop,
+                    asyncio.Semaphore(self.por_host),
+                )
+        async with par[1]:
+            self._entrar(host)
+            try:
+                yield
+            finally:
+                self._sair(host)
+
+    # -- cache ----------------------------------------------------------------
+
+    def _preparar(self, url: str) -> Tuple[Optional[Pagina], Dict[str, str]]:
+        """Cópia em cache (se houver) e os cabeçalhos da requisição."""
+        cabecalhos = {
+            "User-Agent": AGENTE_USUARIO,
+            "Accept": "text/html,application/xhtml+xml;q=0.9,text/*;q=0.8,*/*;q=0.5",
+        }
+        dados = self.cache.ler(url)
+        if dados is None:
+            return None, cabecalhos
+        guardada = Pagina.de_json(dados)
+        if guardada.etag:
+            cabecalhos["If-None-Match"] = guardada.etag
+        if guardada.modificada_em:
+            cabecalhos["If-Modified-Since"] = guardada.modificada_em
+        return guardada, cabecalhos
+
+    def _fresca(self, guardada: Optional[Pagina]) -> Optional[Pagina]:
+        if guardada is not None and guardada.fresca_ate > time.time():
+            with self._lock:
+                self.acertos += 1
+            guardada.origem = "cache"
+            guardada.duracao_s = 0.0
+            return guardada
+        return None
+
+    def _guardar(self, pagina: Pagina, validade: Optional[float]) -> None:
+        if validade is None or not pagina.ok:
+            return
+        pagina.fresca_ate = time.time() + validade
+        self.cache.gravar(pagina.url, pagina.para_json(), ttl=self.guardar_s)
+
+    def _revalidada(
+        self, guardada: Pagina, resposta: Any, url: str, inicio: float
+    ) -> Pagina:
+        with self._lock:
+            self.revalidadas += 1
+        guardada.etag = resposta.headers.get("etag", guardada.etag)
+        guardada.modificada_em = resposta.headers.get(
+            "last-modified", guardada.modificada_em
+        )
+        self._guardar(guardada, _validade(resposta.headers, self.ttl_padrao_s))
+        guardada.origem = "revalidada"
+        guardada.duracao_s = time.perf_counter() - inicio
+        return guardada
+
+    def _falha(
+        self, url: str, erro: str, guardada: Optional[Pagina], inicio: float
+    ) -> Pagina:
+        with self._lock:
+            self.erros += 1
+            if guardada is not None:
+                self.antigas += 1
+        if guardada is not None:
+            # Melhor a cópia antiga do que nada
+            guardada.origem = "cache_antigo"
+            guardada.erro = erro
+            return guardada
+        return Pagina(url, erro=erro, duracao_s=time.perf_counter() - inicio)
+
+    # -- leitura do corpo ------------------------------------------------------
+
+    def _iniciar(self, url: str, resposta: Any) -> Tuple[Pagina, Optional[Any]]:
+        tipo = resposta.headers.get("content-type", "").split(";")[0].strip().lower()
+        pagina = Pagina(
+            str(resposta.url),
+            status=resposta.status_code,
+            tipo=tipo,
+            etag=resposta.headers.get("etag", ""),
+            modificada_em=resposta.headers.get("last-modified", ""),
+        )
+        if resposta.status_code >= 400:
+            pagina.erro = f"HTTP {resposta.status_code}"
+            return pagina, None
+        if "html" in tipo or "xml" in tipo:
+            return pagina, ExtratorHTML(
+                pagina.url,
+                resposta.charset_encoding,
+                self.max_caracteres,
+                usar_lxml=self.usar_lxml,
+            )
+        if tipo.startswith("text/") or tipo.endswith("json"):
+            decodificador = codecs.getincrementaldecoder(
+                resposta.charset_encoding or "utf-8"
+            )(errors="replace")
+            return pagina, decodificador
+        pagina.erro = f"conteúdo não é texto ({tipo or 'sem tipo'})"
+        return pagina, None
+
+    def _pedaco(self, pagina: Pagina, leitor: Any, pedaco: bytes) -> bool:
+        """Processa um pedaço do corpo; True para parar de ler."""
+        pagina.bytes_lidos += len(pedaco)
+        if isinstance(leitor, ExtratorHTML):
+            cheio = leitor.alimentar(pedaco)
+        else:
+            pagina.texto += leitor.decode(pedaco)
+            cheio = len(pagina.texto) >= self.max_caracteres
+        if cheio or pagina.bytes_lidos >= self.max_bytes:
+            pagina.truncada = True
+            return True
+        return False
+
+    def _concluir(
+        self, pagina: Pagina, leitor: Any, resposta: Any, url: str, inicio: float
+    ) -> Pagina:
+        if isinstance(leitor, ExtratorHTML):
+            conteudo = leitor.fechar()
+            pagina.titulo = conteudo.titulo
+            pagina.descricao = conteudo.descricao
+            pagina.cabecalhos = conteudo.cabecalhos
+            pagina.links = conteudo.links
+            pagina.texto = conteudo.texto
+        elif leitor is not None:
+            pagina.texto = pagina.texto[: self.max_caracteres]
+        pagina.duracao_s = time.perf_counter() - inicio
+        with self._lock:
+            self.bytes_lidos += pagina.bytes_lidos
+            if pagina.erro:
+                self.erros += 1
+        if pagina.url != url:
+            # Redirecionada: guarda também pela URL pedida
+            pagina_pedida = Pagina.de_json(pagina.para_json())
+            pagina_pedida.url = url
+            self._guardar(pagina_pedida, _validade(resposta.headers, self.ttl_padrao_s))
+        self._guardar(pagina, _validade(resposta.headers, self.ttl_padrao_s))
+        return pagina
+
+    # -- API ------------------------------------------------------------------
+
+    def buscar(self, url: str, bloquear_internos: bool = False) -> Pagina:
+        """
+        Busca uma URL (ou devolve a cópia em cache ainda válida). Com
+        `bloquear_internos`, cada destino (inclusive de redirecionamento) é
+        conferido antes da requisição.
+        """
+        guardada, cabecalhos = self._preparar(url)
+        fresca = self._fresca(guardada)
+        if fresca is not None:
+            return fresca
+        inicio = time.perf_counter()
+        try:
+            with self._limite_host(_host(url)):
+                destino = url
+                for _ in range(MAX_REDIRECIONAMENTOS + 1):
+                    if bloquear_internos and endereco_interno(destino):
+                        raise EnderecoInterno(f"{_host(destino)} é da rede local")
+                    with self.cliente.stream(
+                        "GET",
+                        destino,
+                        headers=cabecalhos,
+                        timeout=self.timeout,
+                        follow_redirects=not bloquear_internos,
+                    ) as resposta:
+                        if resposta.next_request is not None:
+                            destino = str(resposta.next_request.url)
+                            continue
+                        if resposta.status_code == 304 and guardada is not None:
+                            return self._revalidada(guardada, resposta, url, inicio)
+                        pagina, leitor = self._iniciar(url, resposta)
+                        if leitor is not None:
+                            for pedaco in resposta.iter_bytes():
+                                if self._pedaco(pagina, leitor, pedaco):
+                                    break
+                        break
+                else:
+                    raise ConnectionError("redirecionamentos demais")
+        except Exception as erro:
+            return self._falha(url, f"{type(erro).__name__}: {erro}", guardada, inicio)
+        return self._concluir(pagina, leitor, resposta, url, inicio)
+
+    async def abuscar(self, url: str, bloquear_internos: bool = False) -> Pagina:
+        """Versão assíncrona de `buscar` (cliente httpx assíncrono do pool)."""
+        guardada, cabecalhos = self._preparar(url)
+        fresca = self._fresca(guardada)
+        if fresca is not None:
+            return fresca
+        inicio = time.perf_counter()
+        try:
+            async with self._limite_host_async(_host(url)):
+                destino = url
+                for _ in range(MAX_REDIRECIONAMENTOS + 1):
+                    if bloquear_internos and await asyncio.to_thread(
+                        endereco_interno, destino
+                    ):
+                        raise EnderecoInterno(f"{_host(destino)} é da rede local")
+                    async with self.cliente_async.stream(
+                        "GET",
+                        destino,
+                        headers=cabecalhos,
+                        timeout=self.timeout,
+                        follow_redirects=not bloquear_internos,
+                    ) as resposta:
+                        if resposta.next_request is not None:
+                            destino = str(resposta.next_request.url)
+                            continue
+                        if resposta.status_code == 304 and guardada is not None:
+                            return self._revalidada(guardada, resposta, url, inicio)
+                        pagina, leitor = self._iniciar(url, resposta)
+                        if leitor is not None:
+                            async for pedaco in resposta.aiter_bytes():
+                                if self._pedaco(pagina, leitor, pedaco):
+                                    break
+                        break
+                else:
+                    raise ConnectionError("redirecionamentos demais")
+        except Exception as erro:
+            return self._falha(url, f"{type(erro).__name__}: {erro}", guardada, inicio)
+        return self._concluir(pagina, leitor, resposta, url, inicio)
+
+    def buscar_varias(
+        self, urls: Sequence[str], bloquear_internos: bool = False
+    ) -> List[Pagina]:
+        """Busca em paralelo (threads), na ordem pedida; URLs repetidas uma vez."""
+        unicas = list(dict.fromkeys(urls))
+
+        def buscar(url: str) -> Pagina:
+            return self.buscar(url, bloquear_internos)
+
+        if len(unicas) <= 1:
+            paginas = {url: buscar(url) for url in unicas}
+        else:
+            trabalhadores = min(len(unicas), self.max_simultaneas)
+            with ThreadPoolExecutor(trabalhadores) as executor:
+                paginas = dict(zip(unicas, executor.map(buscar, unicas)))
+        return [paginas[url] for url in urls]
+
+    async def abuscar_varias(
+        self, urls: Sequence[str], bloquear_internos: bool = False
+    ) -> List[Pagina]:
+        """Busca em paralelo (asyncio), na ordem pedida."""
+        unicas = list(dict.fromkeys(urls))
+        limite = asyncio.Semaphore(self.max_simultaneas)
+
+        async def buscar(url: str) -> Pagina:
+            async with limite:
+                return await self.abuscar(url, bloquear_internos)
+
+        resultados = await asyncio.gather(*(buscar(url) for url in unicas))
+        paginas = dict(zip(unicas, resultados))
+        return [paginas[url] for url in urls]
+
+    # -- busca ----------------------------------------------------------------
+
+    def _url_busca(self, consulta: str) -> str:
+        return self.url_busca.format(consulta=urllib.parse.quote_plus(consulta))
+
+    def _resultados(self, pagina: Pagina, maximo: int) -> List[ResultadoBusca]:
+        """
+        Resultados da página de busca: links `result__a` (e o
+        `result__snippet` seguinte) no HTML do DuckDuckGo; em outras páginas,
+        os links externos com texto.
+        """
+        resultados: List[List[str]] = []
+        marcados = any("result__a" in link.classe for link in pagina.links)
+        host_busca = _host(pagina.url)
+        for link in pagina.links:
+            destino = link.url
+            redirecionado = urllib.parse.parse_qs(
+                urllib.parse.urlsplit(destino).query
+            ).get("uddg")
+            if redirecionado:
+                destino = redirecionado[0]
+            if marcados:
+                if "result__a" in link.classe:
+                    resultados.append([link.texto, destino, ""])
+                elif "result__snippet" in link.classe and resultados:
+                    resultados[-1][2] = link.texto
+            elif _host(destino) != host_busca and len(link.texto) > 3:
+                resultados.append([link.texto, destino, ""])
+        unicos = {r[1]: ResultadoBusca(*r) for r in reversed(resultados)}
+        ordem = list(dict.fromkeys(r[1] for r in resultados))
+        return [unicos[url] for url in ordem][:maximo]
+
+    def buscar_web(self, consulta: str, maximo: int = 5) -> List[ResultadoBusca]:
+        pagina = self.buscar(self._url_busca(consulta))
+        if not pagina.ok:
+            raise ConnectionError(f"Busca falhou: {pagina.erro or pagina.status}")
+        return self._resultados(pagina, maximo)
+
+    async def abuscar_web(self, consulta: str, maximo: int = 5) -> List[ResultadoBusca]:
+        pagina = await self.abuscar(self._url_busca(consulta))
+        if not pagina.ok:
+            raise ConnectionError(f"Busca falhou: {pagina.erro or pagina.status}")
+        return self._resultados(pagina, maximo)
+
+    def estatisticas(self) -> Dict[str, Any]:
+        return {
+            "requisicoes": self.requisicoes,
+            "acertos_cache": self.acertos,
+            "revalidadas_304": self.revalidadas,
+            "copias_antigas": self.antigas,
+            "erros": self.erros,
+            "bytes_lidos": self.bytes_lidos,
+            "max_simultaneas_por_host": self.max_por_host,
+            "paginas_em_cache": len(self.cache),
+            "parser": "lxml" if self.usar_lxml else "html.parser",
+        }
+
+
+def formatar_busca(
+    consulta: str, resultados: Sequence[ResultadoBusca], paginas: Sequence[Pagina]
+) -> str:
+    """Texto para o agente: lista de resultados e o início das páginas."""
+    linhas = [f"🔍 BUSCA: {consulta}", ""]
+    if not resultados:
+        linhas.append("Nenhum resultado encontrado.")
+        return "\n".join(linhas)
+    linhas.append("📄 PRINCIPAIS RESULTADOS:")
+    for i, resultado in enumerate(resultados, 1):
+        linhas.append(f"{i}. {resultado.titulo}\n   {resultado.url}")
+        if resultado.trecho:
+            linhas.append(f"   {resultado.trecho}")
+    if paginas:
+        linhas += ["", "📖 CONTEÚDO DAS PRIMEIRAS PÁGINAS:"]
+        for pagina in paginas:
+            linhas += ["", pagina.resumo(max_caracteres=800)]
+    return "\n".join(linhas)
+
+
+_coletor_padrao: Optional[ColetorWeb] = None
+_lock_padrao = threading.Lock()
+
+
+def coletor_padrao() -> ColetorWeb:
+    """Coletor do processo, configurado por CURSO_WEB_POR_HOST/CURSO_BUSCA_URL."""
+    global _coletor_padrao
+    with _lock_padrao:
+        if _coletor_padrao is None:
+            _coletor_padrao = ColetorWeb(
+                por_host=int(os.getenv("CURSO_WEB_POR_HOST", "4")),
+                url_busca=os.getenv("CURSO_BUSCA_URL", URL_BUSCA_PADRAO),
+            )
+        return _coletor_padrao
+
+
+# =============================================================================
+# SERVIDOR LOCAL DE PÁGINAS (para testes)
+# =============================================================================
+
+
+class _ManipuladorPaginas(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, formato: str, *args: Any) -> None:
+        pass
+
+    def _enviar(self, status: int, corpo: bytes, cabecalhos: Dict[str, str]) -> None:
+        self.send_response(status)
+        for nome, valor in cabecalhos.items():
+            self.send_header(nome, valor)
+        self.send_header("Content-Length", str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def do_GET(self) -> None:
+        servidor: "ServidorPaginasLocal" = self.server  # type: ignore[assignment]
+        servidor.entrar()
+        try:
+            if servidor.latencia:
+                time.sleep(servidor.latencia)
+            caminho, _, consulta = self.path.partition("?")
+            if caminho == "/busca":
+                termos = urllib.parse.parse_qs(consulta).get("q", [""])[0]
+                corpo = servidor.pagina_busca(termos).encode("utf-8")
+                self._enviar(200, corpo, {"Content-Type": "text/html; charset=utf-8"})
+                return
+            if caminho in servidor.redirecionamentos:
+                destino = servidor.redirecionamentos[caminho]
+                self._enviar(302, b"", {"Location": destino})
+                return
+            pagina = servidor.paginas.get(caminho)
+            if pagina is None:
+                self._enviar(404, b"nao encontrada", {"Content-Type": "text/plain"})
+                return
+            corpo, cabecalhos = pagina
+            if self.headers.get("If-None-Match") == cabecalhos["ETag"]:
+                servidor.contar_304()
+                self._enviar(304, b"", {"ETag": cabecalhos["ETag"]})
+                return
+            self._enviar(200, corpo, cabecalhos)
+        finally:
+            servidor.sair()
+
+
+class ServidorPaginasLocal(ThreadingHTTPServer):
+    """
+    Servidor de páginas para testes: responde com ETag/Last-Modified, 304
+    para `If-None-Match`, redirecionamentos, uma busca em `/busca?q=` no
+    formato do DuckDuckGo e conta quantas requisições estiveram abertas ao mesmo tempo.
+
+    Uso:
+        with ServidorPaginasLocal(latencia=0.05) as servidor:
+            servidor.iniciar_em_thread()
+            coletor = ColetorWeb(url_busca=servidor.url_busca)
+            coletor.buscar(servidor.url + "/crewai")
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        porta: int = 0,
+        latencia: float = 0.0,
+        exemplos: bool = True,
+    ):
+        super().__init__((host, porta), _ManipuladorPaginas)
+        self.latencia = latencia
+        self.paginas: Dict[str, Tuple[bytes, Dict[str, str]]] = {}
+        self.redirecionamentos: Dict[str, str] = {}
+        self.requisicoes = 0
+        self.respostas_304 = 0
+        self.max_simultaneas = 0
+        self._simultaneas = 0
+        self._lock = threading.Lock()
+        if exemplos:
+            self._adicionar_exemplos()
+
+    @property
+    def url(self) -> str:
+        host, porta = self.server_address[:2]
+        return f"http://{host}:{porta}"
+
+    @property
+    def url_busca(self) -> str:
+        return self.url + "/busca?q={consulta}"
+
+    def adicionar(
+        self,
+        caminho: str,
+        html: str,
+        tipo: str = "text/html; charset=utf-8",
+        max_age: Optional[int] = None,
+    ) -> str:
+        corpo = html.encode("utf-8")
+        cabecalhos = {
+            "Content-Type": tipo,
+            "ETag": '"' + hashlib.sha1(corpo).hexdigest()[:16] + '"',
+            "Last-Modified": formatdate(usegmt=True),
+        }
+        if max_age is not None:
+            cabecalhos["Cache-Control"] = f"max-age={max_age}"
+        self.paginas[caminho] = (corpo, cabecalhos)
+        return self.url + caminho
+
+    def redirecionar(self, caminho: str, destino: str) -> str:
+        """`caminho` responde 302 para `destino` (URL absoluta ou caminho)."""
+        self.redirecionamentos[caminho] = destino
+        return self.url + caminho
+
+    def _adicionar_exemplos(self) -> None:
+        temas = [
+            ("crewai", "CrewAI", "Framework Python para equipes de agentes de IA."),
+            ("agentes", "Agentes", "Cada agente tem role, goal e backstory."),
+            ("tarefas", "Tarefas", "Tarefas ligam agentes e resultados esperados."),
+            ("processos", "Processos", "Sequencial ou hierárquico, com um gerente."),
+            ("ferramentas", "Ferramentas", "Tools dão acesso à web e a arquivos."),
+        ]
+        for i, (caminho, titulo, descricao) in enumerate(temas):
+            proximo = temas[(i + 1) % len(temas)][0]
+            paragrafos = "".join(
+                f"<p>{descricao} Parágrafo {i} sobre {titulo.lower()}.</p>"
+                for i in range(20)
+            )
+            self.adicionar(
+                f"/{caminho}",
+                f"<!DOCTYPE html><html><head><title>{titulo} | Curso</title>"
+                f'<meta name="description" content="{descricao}">'
+                "<script>var rastreio = 1;</script></head><body>"
+                '<nav><a href="/">Início</a></nav>'
+                f"<h1>{titulo}</h1>{paragrafos}<h2>Veja também</h2>"
+                f'<a href="/{proximo}">{proximo}</a>'
+                "<footer>© Curso</footer></body></html>",
+            )
+        # Página grande: só o começo interessa ao agente
+        self.adicionar(
+            "/grande",
+            "<html><head><title>Documento grande</title></head><body>"
+            + "<p>Conteúdo extenso de referência sobre agentes.</p>" * 50_000
+            + "</body></html>",
+        )
+
+    def pagina_busca(self, consulta: str) -> str:
+        termos = consulta.lower().split()
+        itens = []
+        for caminho, (corpo, _) in self.paginas.items():
+            texto = corpo.decode("utf-8", "replace").lower()
+            if (
+                "?" in caminho
+                or caminho == "/grande"
+                or not all(t in texto for t in termos)
+            ):
+                continue
+            destino = urllib.parse.quote(self.url + caminho, safe="")
+            itens.append(
+                '<div class="result">'
+                f'<a class="result__a" href="/l/?uddg={destino}">'
+                f"{caminho.strip('/').title()}</a>"
+                f'<a class="result__snippet" href="/l/?uddg={destino}">'
+                f"Resultado sobre {caminho.strip('/')}</a></div>"
+            )
+        return (
+            "<html><head><title>Busca</title></head><body>"
+            + "".join(itens)
+            + "</body></html>"
+        )
+
+    def handle_error(self, request: Any, client_address: Any) -> None:
+        # Clientes que param de ler no meio (página grande) fecham a conexão
+        pass
+
+    def entrar(self) -> None:
+        with self._lock:
+            self.requisicoes += 1
+            self._simultaneas += 1
+            self.max_simultaneas = max(self.max_simultaneas, self._simultaneas)
+
+    def sair(self) -> None:
+        with self._lock:
+            self._simultaneas -= 1
+
+    def contar_304(self) -> None:
+        with self._lock:
+            self.respostas_304 += 1
+
+    def iniciar_em_thread(self) -> threading.Thread:
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return thread
+
+
+def _benchmark() -> None:
+    import httpx
+
+    with ServidorPaginasLocal(latencia=0.05) as servidor:
+        servidor.iniciar_em_thread()
+        temas = ["crewai", "agentes", "tarefas", "processos", "ferramentas"]
+        urls = [f"{servidor.url}/{tema}?v={i}" for i in range(3) for tema in temas]
+        for caminho in list(servidor.paginas):
+            for i in range(3):
+                servidor.paginas[f"{caminho}?v={i}"] = servidor.paginas[caminho]
+
+        def coletor(**kwargs: Any) -> ColetorWeb:
+            return ColetorWeb(
+                cliente=httpx.Client(), url_busca=servidor.url_busca, **kwargs
+            )
+
+        print(f"🌐 {len(urls)} páginas, 50ms de latência, 4 por host")
+        sequencial = coletor()
+        inicio = time.perf_counter()
+        for url in urls:
+            sequencial.buscar(url)
+        print(f"   Uma por vez:      {time.perf_counter() - inicio:.2f}s")
+
+        paralelo = coletor()
+        servidor.max_simultaneas = 0
+        inicio = time.perf_counter()
+        paginas = paralelo.buscar_varias(urls)
+        print(
+            f"   buscar_varias:    {time.perf_counter() - inicio:.2f}s "
+            f"(máx. {servidor.max_simultaneas} simultâneas no servidor)"
+        )
+
+        async def assincrono() -> Tuple[float, ColetorWeb]:
+            async with httpx.AsyncClient() as cliente_async:
+                coletor_async = ColetorWeb(cliente_async=cliente_async)
+                inicio = time.perf_counter()
+                await coletor_async.abuscar_varias(urls)
+                return time.perf_counter() - inicio, coletor_async
+
+        servidor.max_simultaneas = 0
+        duracao, coletor_async = asyncio.run(assincrono())
+        print(
+            f"   abuscar_varias:   {duracao:.2f}s "
+            f"(máx. {servidor.max_simultaneas} simultâneas no servidor)"
+        )
+
+        inicio = time.perf_counter()
+        paralelo.buscar_varias(urls)
+        print(f"   Cache válido:     {(time.perf_counter() - inicio) * 1000:.1f}ms")
+
+        revalidar = coletor(ttl_padrao_s=0)
+        revalidar.buscar_varias(urls)
+        antes = servidor.respostas_304
+        revalidar.buscar_varias(urls)
+        print(
+            f"   Revalidação:      {servidor.respostas_304 - antes} respostas 304, "
+            f"extração reaproveitada"
+        )
+
+        grande = paralelo.buscar(servidor.url + "/grande")
+        tamanho = len(servidor.paginas["/grande"][0])
+        print(
+            f"   Página grande:    {grande.bytes_lidos / 1024:.0f} de "
+            f"{tamanho / 1024:.0f} KiB lidos até {len(grande.texto)} caracteres"
+        )
+
+        resultados = paralelo.buscar_web("processos")
+        encontrados = [r.url.rsplit("/", 1)[-1] for r in resultados]
+        print(f"   Busca 'processos': {encontrados}")
+        print(f"   {paralelo.estatisticas()}")
+        print()
+        print(paginas[0].resumo(max_caracteres=200))
+        servidor.shutdown()
+
+
+if __name__ == "__main__":
+    _benchmark()
@@ -45,8 +45,8 @@ def validar_api_key(api_key):
 def verificar_conteudo_seguro(texto):
     """Verificação básica de conteúdo seguro usando API de Moderação"""
     try:
-        from openai import OpenAI
-        client = OpenAI()
+        from curso_crewai.conexoes import cliente_openai
+        client = cliente_openai()
         response = client.moderations.create(input=texto)
         return not response.results[0].flagged
     except Exception:
@@ -95,9 +95,10 @@ def teste_rapido_openai():
         print("💡 Execute: uv add openai")
         return False
 
-    # 3. Inicializar cliente
+    # 3. Inicializar cliente (mesmo pool de conexões da moderação)
     try:
-        client = OpenAI(api_key=api_key)
+        from curso_crewai.conexoes import cliente_openai
+        client = cliente_openai(api_key=api_key)
         print("✅ Cliente OpenAI inicializado")
     except Exception as e:
         print(f"❌ Erro ao inicializar: {e}")
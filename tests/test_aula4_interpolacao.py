@@ -0,0 +1,71 @@
+"""Textos da cadeia da aula 4 sobrevivem à interpolação do kickoff(inputs=...)."""
+
+import importlib.util
+import string
+import sys
+from pathlib import Path
+
+import pytest
+
+AULA4 = Path(__file__).resolve().parents[1] / "aula4"
+sys.path.insert(0, str(AULA4))
+
+_spec = importlib.util.spec_from_file_location("aula4_main", AULA4 / "main.py")
+aula4 = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(aula4)
+
+# Textos que as crews do pool recebem ainda com os marcadores
+TEXTOS_INTERPOLADOS = {
+    "BACKSTORY_ANALISE": aula4.BACKSTORY_ANALISE,
+    "DESCRICAO_RECEPCAO": aula4.DESCRICAO_RECEPCAO,
+    "DESCRICAO_ANALISE": aula4.DESCRICAO_ANALISE,
+    "PROMPT_PESQUISA": aula4.PROMPT_PESQUISA,
+    "DESCRICAO_RESPOSTA": aula4.DESCRICAO_RESPOSTA,
+}
+
+
+@pytest.fixture
+def entradas():
+    return aula4.entradas_atendimento("quanto custa o {notebook} gamer?")
+
+
+@pytest.mark.parametrize("nome", sorted(TEXTOS_INTERPOLADOS))
+def test_interpolacao_com_str_format(nome, entradas):
+    texto = TEXTOS_INTERPOLADOS[nome]
+    marcadores = {campo for _, campo, _, _ in string.Formatter().parse(texto) if campo}
+
+    assert marcadores <= set(entradas)
+    texto.format(**entradas)
+
+
+def test_formato_json_continua_no_prompt_de_analise():
+    for texto in (aula4.BACKSTORY_ANALISE, aula4.DESCRICAO_ANALISE):
+        assert '"intencao"' in texto and '"produto"' in texto
+
+
+def test_tarefas_com_pergunta_mantem_chaves_do_cliente():
+    pytest.importorskip("crewai")
+    agentes = aula4.criar_agentes(verbose=False, llm="gpt-4o-mini")
+
+    tarefas = aula4.criar_tarefas("tem {smartphone}?", agentes)
+
+    assert "tem {smartphone}?" in tarefas[0].description
+
+
+def test_interpolate_inputs_do_crewai(entradas, monkeypatch):
+    pytest.importorskip("crewai")
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-teste")
+    agentes = aula4.criar_agentes(verbose=False, llm="gpt-4o-mini")
+    tarefas = aula4.criar_tarefas(agentes=agentes)
+
+    for agente in agentes:
+        agente.interpolate_inputs(entradas)
+    for tarefa in tarefas:
+        interpolar = getattr(tarefa, "interpolate_inputs", None) or getattr(
+            tarefa, "interpolate_inputs_and_add_conversation_history"
+        )
+        interpolar(entradas)
+
+    assert "quanto custa o {notebook} gamer?" in tarefas[0].description
+    assert "Notebook Gamer Ultra X1" in tarefas[2].description
+    assert '"intencao"' in tarefas[1].description
@@ -0,0 +1,177 @@
+"""Testes dos backends do cache de respostas e do servidor Redis local."""
+
+import socket
+import threading
+import time
+
+import pytest
+
+from curso_crewai.cache import (
+    BackendCamadas,
+    BackendMemoria,
+    BackendRedis,
+    BackendSQLite,
+    CacheLLM,
+    ServidorRedisLocal,
+    criar_backend,
+)
+
+
+@pytest.fixture
+def servidor_redis():
+    servidor = ServidorRedisLocal(porta=0)
+    servidor.iniciar_em_thread()
+    yield servidor
+    servidor.shutdown()
+    servidor.server_close()
+
+
+@pytest.fixture
+def redis(servidor_redis):
+    backend = BackendRedis(porta=servidor_redis.porta, prefixo="teste:")
+    yield backend
+    backend.fechar()
+
+
+@pytest.fixture(params=["memoria", "sqlite", "redis"])
+def backend(request, tmp_path):
+    if request.param == "memoria":
+        return BackendMemoria()
+    if request.param == "sqlite":
+        return BackendSQLite(str(tmp_path / "cache.sqlite3"))
+    return request.getfixturevalue("redis")
+
+
+def test_grava_le_e_remove(backend):
+    backend.gravar("a", b"1")
+    backend.gravar("b", b"2", ttl=60)
+
+    assert backend.ler("a") == b"1"
+    assert backend.ler_com_ttl("b")[1] == pytest.approx(60, abs=1)
+    assert len(backend) == 2
+    backend.remover("a")
+    assert backend.ler("a") is None
+    backend.limpar()
+    assert len(backend) == 0
+
+
+def test_ttl_vencido_nao_e_lido(backend):
+    backend.gravar("a", b"1", ttl=0.05)
+    time.sleep(0.1)
+
+    assert backend.ler("a") is None
+
+
+def test_memoria_descarta_o_menos_usado():
+    memoria = BackendMemoria(max_itens=2)
+    memoria.gravar("a", b"1")
+    memoria.gravar("b", b"2")
+    memoria.ler("a")
+
+    memoria.gravar("c", b"3")
+
+    assert memoria.ler("b") is None
+    assert memoria.ler("a") == b"1"
+    assert memoria.evictions == 1
+
+
+def test_memoria_respeita_limite_de_bytes():
+    memoria = BackendMemoria(max_itens=100, max_bytes=1000)
+    for i in range(20):
+        memoria.gravar(f"chave{i}", b"x" * 100)
+
+    assert memoria.tamanho_bytes() <= 1000
+    assert memoria.ler("chave19") == b"x" * 100
+
+
+def test_memoria_chaves_com_padrao():
+    memoria = BackendMemoria()
+    memoria.gravar("llm:a", b"1")
+    memoria.gravar("llm:b", b"2")
+    memoria.gravar("web:c", b"3")
+
+    assert sorted(memoria.chaves("llm:*")) == ["llm:a", "llm:b"]
+
+
+def test_camadas_promove_l2_com_ttl_restante():
+    l1, l2 = BackendMemoria(), BackendMemoria()
+    camadas = BackendCamadas(l1, l2, ttl_promocao=300)
+    l2.gravar("a", b"1", ttl=30)
+
+    assert camadas.ler("a") == b"1"
+    assert camadas.ler("a") == b"1"
+    assert (camadas.hits_l1, camadas.hits_l2) == (1, 1)
+    assert l1.ler_com_ttl("a")[1] <= 30
+
+
+def test_sqlite_compartilhado_entre_instancias(tmp_path):
+    caminho = str(tmp_path / "cache.sqlite3")
+    BackendSQLite(caminho).gravar("a", b"1")
+
+    assert BackendSQLite(caminho).ler("a") == b"1"
+
+
+def test_cache_llm_conta_hits_e_misses():
+    cache = CacheLLM(BackendMemoria())
+    chamadas = []
+
+    def calcular():
+        chamadas.append(1)
+        return "resposta"
+
+    cache.obter_ou_calcular("prompt", calcular, "gpt-4o-mini", temperature=0.1)
+    resposta = cache.obter_ou_calcular(
+        "prompt", calcular, "gpt-4o-mini", temperature=0.1
+    )
+
+    assert resposta == "resposta"
+    assert len(chamadas) == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert cache.get("prompt", "gpt-4o-mini", temperature=0.7) is None
+
+
+@pytest.mark.parametrize(
+    "url, tipo",
+    [
+        ("memoria://?max_itens=10", BackendMemoria),
+        ("sqlite:///{pasta}/cache.sqlite3", BackendSQLite),
+        ("redis://127.0.0.1:6399/llm:", BackendRedis),
+    ],
+)
+def test_criar_backend(url, tipo, tmp_path):
+    assert isinstance(criar_backend(url.format(pasta=tmp_path)), tipo)
+
+
+def test_servidor_redis_keys_com_sets_concorrentes(servidor_redis, redis):
+    parar = threading.Event()
+
+    def gravar():
+        cliente = BackendRedis(porta=servidor_redis.porta, prefixo="teste:")
+        i = 0
+        while not parar.is_set():
+            cliente.gravar(f"k{i}", b"x")
+            i += 1
+        cliente.fechar()
+
+    escritores = [threading.Thread(target=gravar) for _ in range(4)]
+    for escritor in escritores:
+        escritor.start()
+    try:
+        for _ in range(50):
+            assert len(redis) >= 0
+    finally:
+        parar.set()
+        for escritor in escritores:
+            escritor.join()
+
+
+def _enviar(porta, dados):
+    with socket.create_connection(("127.0.0.1", porta), timeout=5) as conexao:
+        conexao.sendall(dados)
+        return conexao.makefile("rb").readline()
+
+
+def test_servidor_redis_responde_erro_a_comando_vazio(servidor_redis):
+    assert _enviar(servidor_redis.porta, b"\r\n").startswith(b"-ERR")
+    assert _enviar(servidor_redis.porta, b"GET\r\n").startswith(b"-ERR")
+    assert _enviar(servidor_redis.porta, b"PING\r\n") == b"+PONG\r\n"
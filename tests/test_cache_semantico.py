@@ -0,0 +1,84 @@
+"""Testes do cache semântico de perguntas."""
+
+import pytest
+
+from curso_crewai.cache_semantico import CacheSemantico, negacoes, numeros
+
+
+@pytest.fixture
+def cache():
+    return CacheSemantico(limiar=0.8, taxa_auditoria=0.0)
+
+
+def test_quase_duplicata_reaproveita_resposta(cache):
+    cache.armazenar("tem smartphone em estoque?", "Temos 8 unidades.")
+
+    resultado = cache.buscar("ainda tem smartphone em estoque?")
+
+    assert resultado is not None
+    assert resultado.resposta == "Temos 8 unidades."
+    assert cache.hits_semanticos == 1
+
+
+def test_mesma_forma_canonica_e_hit_exato(cache):
+    cache.armazenar("Quanto custa o notebook gamer?", "R$ 2.999,90")
+
+    resultado = cache.buscar("quanto custa notebook gamer")
+
+    assert resultado.similaridade == 1.0
+    assert cache.hits_exatos == 1
+
+
+def test_negacao_diferente_nao_reaproveita(cache):
+    cache.armazenar("o fone bluetooth tem garantia?", "Sim, 12 meses.")
+
+    assert cache.buscar("o fone bluetooth não tem garantia?") is None
+    assert cache.rejeitados_negacao == 1
+
+
+def test_quantidade_diferente_nao_reaproveita(cache):
+    cache.armazenar("quero comprar 2 notebooks", "Separamos 2 unidades.")
+
+    assert cache.buscar("quero comprar 20 notebooks") is None
+    assert cache.rejeitados_numero == 1
+    assert cache.buscar("quero comprar 2 notebooks!").resposta == (
+        "Separamos 2 unidades."
+    )
+
+
+def test_obter_ou_executar_so_executa_no_miss(cache):
+    chamadas = []
+
+    def executar():
+        chamadas.append(1)
+        return "resposta"
+
+    cache.obter_ou_executar("tem smartphone em estoque?", executar)
+    cache.obter_ou_executar("ainda tem smartphone em estoque?", executar)
+
+    assert len(chamadas) == 1
+
+
+def test_ttl_expira_entrada():
+    cache = CacheSemantico(ttl=0)
+    cache.armazenar("tem smartphone em estoque?", "Temos 8 unidades.")
+
+    assert cache.buscar("tem smartphone em estoque?") is None
+
+
+@pytest.mark.parametrize(
+    "texto, esperado",
+    [
+        ("quero 2 notebooks", {"2"}),
+        ("smartphone 256GB", {"256gb"}),
+        ("quero dois fones", {"dois"}),
+        ("quero um notebook", set()),
+    ],
+)
+def test_numeros(texto, esperado):
+    assert numeros(texto) == esperado
+
+
+def test_negacoes():
+    assert negacoes("Não tem nenhum?") == {"nao", "nenhum"}
+    assert negacoes("tem algum?") == set()
@@ -0,0 +1,93 @@
+"""Testes do índice invertido do catálogo de produtos."""
+
+import pytest
+
+from curso_crewai.catalogo import IndiceProdutos
+
+PRODUTOS = {
+    "notebook gamer": {
+        "nome": "Notebook Gamer Ultra X1",
+        "preco": 2999.90,
+        "estoque": 15,
+        "categoria": "informatica",
+    },
+    "smartphone": {
+        "nome": "Smartphone Pro Max 256GB",
+        "preco": 1599.90,
+        "estoque": 8,
+        "categoria": "celulares",
+    },
+    "fone bluetooth": {
+        "nome": "Fone Bluetooth Premium",
+        "preco": 299.90,
+        "estoque": 25,
+        "categoria": "acessorios",
+    },
+}
+
+
+@pytest.fixture
+def indice():
+    return IndiceProdutos.de_dict(PRODUTOS)
+
+
+@pytest.mark.parametrize(
+    "consulta, nome",
+    [
+        ("quanto custa o notebook gamer?", "Notebook Gamer Ultra X1"),
+        ("smartphone 256gb", "Smartphone Pro Max 256GB"),
+        ("fone blutooth", "Fone Bluetooth Premium"),  # uma letra a menos
+        ("smartph", "Smartphone Pro Max 256GB"),  # prefixo
+    ],
+)
+def test_buscar_primeiro(indice, consulta, nome):
+    assert indice.buscar_primeiro(consulta)["nome"] == nome
+
+
+def test_sem_correspondencia(indice):
+    assert indice.buscar("geladeira") == []
+    assert indice.buscar_primeiro("geladeira") is None
+
+
+def test_remover_produto(indice):
+    indice.remover("smartphone")
+
+    assert "smartphone" not in indice
+    assert indice.buscar_primeiro("smartphone") is None
+
+
+def test_salvar_e_abrir(indice, tmp_path):
+    caminho = tmp_path / "indice.json"
+    indice.salvar(caminho)
+
+    reaberto = IndiceProdutos.carregar(caminho)
+
+    assert len(reaberto) == 3
+    assert reaberto.buscar_primeiro("notebook")["preco"] == 2999.90
+
+
+def test_carregar_csv_com_precos_brasileiros(tmp_path):
+    caminho = tmp_path / "catalogo.csv"
+    caminho.write_text(
+        "sku,nome,preco,estoque\n"
+        'nb1,Notebook Gamer,"1.299,90",15\n'
+        'tv1,Smart TV 50,"R$ 2999,90",3\n'
+        'mo1,Monitor 4K,"1,299.90",2\n'
+        "cb1,Cabo HDMI,29.9,100\n"
+        "sv1,Servidor Rack,1.299.900,1\n",
+        encoding="utf-8",
+    )
+
+    indice = IndiceProdutos.carregar(caminho)
+
+    precos = {
+        r.chave: r.produto["preco"]
+        for r in indice.buscar("notebook tv monitor cabo servidor", k=10)
+    }
+    assert precos == {
+        "nb1": 1299.90,
+        "tv1": 2999.90,
+        "mo1": 1299.90,
+        "cb1": 29.9,
+        "sv1": 1299900.0,
+    }
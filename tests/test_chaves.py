@@ -0,0 +1,91 @@
+"""Testes das chaves de cache canônicas."""
+
+import dataclasses
+import enum
+import subprocess
+import sys
+
+import pytest
+
+from curso_crewai.chaves import gerar_chave, serializar_config
+
+
+@dataclasses.dataclass
+class Config:
+    model: str
+    temperature: float
+
+
+class Modo(enum.Enum):
+    RAPIDO = "rapido"
+    PRECISO = "preciso"
+
+
+class Persona:
+    def __init__(self, nome):
+        self.nome = nome
+
+    def __chave_cache__(self):
+        return {"nome": self.nome}
+
+
+class Opaco:
+    def __init__(self, valor):
+        self.valor = valor
+
+
+def test_chave_igual_em_outro_processo():
+    codigo = (
+        "from curso_crewai.chaves import gerar_chave;"
+        "print(gerar_chave('Olá  mundo', {'model': 'gpt-4o-mini', 'temperature': 0.1}))"
+    )
+    saida = subprocess.run(
+        [sys.executable, "-c", codigo], capture_output=True, text=True, check=True
+    )
+
+    esperado = gerar_chave("Olá mundo", {"temperature": 0.1, "model": "gpt-4o-mini"})
+    assert saida.stdout.strip() == esperado
+
+
+def test_prompt_normalizado():
+    assert gerar_chave("olá\n  mundo ") == gerar_chave("olá mundo")
+    assert gerar_chave("Olá", minusculas=True) == gerar_chave("olá", minusculas=True)
+    assert gerar_chave("Olá") != gerar_chave("olá")
+
+
+@pytest.mark.parametrize(
+    "a, b",
+    [
+        ({"temperature": 1}, {"temperature": 1.0}),
+        ({1: "x"}, {"1": "x"}),
+        ({True: "x"}, {1: "x"}),
+        ({"__float__": "0.1"}, {"temperature": 0.1}),
+        ({"modo": Modo.RAPIDO}, {"modo": Modo.PRECISO}),
+        ({"persona": Persona("ana")}, {"persona": Persona("bia")}),
+        ({"c": Config("gpt-4o", 0.1)}, {"c": Config("gpt-4o", 0.2)}),
+    ],
+)
+def test_configs_diferentes_geram_chaves_diferentes(a, b):
+    assert gerar_chave("p", a) != gerar_chave("p", b)
+
+
+def test_conjunto_independe_da_ordem():
+    assert serializar_config({"stop": {"b", "a"}}) == serializar_config(
+        {"stop": {"a", "b"}}
+    )
+
+
+def test_objeto_sem_forma_canonica_levanta_type_error():
+    with pytest.raises(TypeError, match="Opaco"):
+        gerar_chave("p", {"ferramenta": Opaco(1)})
+
+
+def test_objeto_llm_reduzido_aos_parametros():
+    class LLM:
+        def __init__(self, temperature):
+            self.model_name = "gpt-4o-mini"
+            self.temperature = temperature
+            self.cliente = object()
+
+    assert gerar_chave("p", {"llm": LLM(0.1)}) == gerar_chave("p", {"llm": LLM(0.1)})
+    assert gerar_chave("p", {"llm": LLM(0.1)}) != gerar_chave("p", {"llm": LLM(0.7)})
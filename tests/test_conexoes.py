@@ -0,0 +1,69 @@
+"""Testes do pool de conexões contra o servidor local compatível com a OpenAI."""
+
+import asyncio
+
+import pytest
+
+from curso_crewai.conexoes import (
+    ConfigConexoes,
+    MetricasConexoes,
+    ServidorOpenAILocal,
+    criar_cliente,
+)
+
+CHAT = {"model": "gpt-4o-mini", "messages": [{"role": "user", "content": "oi"}]}
+
+
+@pytest.fixture
+def servidor():
+    servidor = ServidorOpenAILocal()
+    servidor.iniciar_em_thread()
+    yield servidor
+    servidor.shutdown()
+    servidor.server_close()
+
+
+def test_servidor_local_responde_como_a_api(servidor):
+    with criar_cliente(ConfigConexoes(http2=False), MetricasConexoes()) as cliente:
+        chat = cliente.post(servidor.url + "/chat/completions", json=CHAT).json()
+        modelos = cliente.get(servidor.url + "/models").json()
+        moderacao = cliente.post(servidor.url + "/moderations", json={"input": "x"})
+        inexistente = cliente.post(servidor.url + "/embeddings", json={})
+
+    assert chat["choices"][0]["message"]["content"] == "OK"
+    assert chat["usage"]["total_tokens"] == 11
+    assert {m["id"] for m in modelos["data"]} == {"gpt-4o-mini", "gpt-4o"}
+    assert moderacao.json()["results"][0]["flagged"] is False
+    assert inexistente.status_code == 404
+
+
+def test_cliente_reaproveita_a_conexao(servidor):
+    metricas = MetricasConexoes()
+    with criar_cliente(ConfigConexoes(http2=False), metricas) as cliente:
+        for _ in range(20):
+            cliente.post(servidor.url + "/chat/completions", json=CHAT)
+
+    assert servidor.conexoes_recebidas == 1
+    resumo = metricas.resumo()
+    assert resumo["requisicoes"] == 20
+    assert resumo["conexoes_novas"] == 1
+
+
+def test_cliente_async_reaproveita_as_conexoes(servidor):
+    metricas = MetricasConexoes()
+    config = ConfigConexoes(http2=False, max_conexoes=4)
+
+    async def chamar():
+        async with criar_cliente(config, metricas, assincrono=True) as cliente:
+            for _ in range(5):
+                await asyncio.gather(
+                    *(
+                        cliente.post(servidor.url + "/chat/completions", json=CHAT)
+                        for _ in range(4)
+                    )
+                )
+
+    asyncio.run(chamar())
+
+    assert servidor.conexoes_recebidas <= 4
+    assert metricas.resumo()["requisicoes"] == 20
@@ -0,0 +1,129 @@
+"""Testes do livro-caixa de orçamento com reservas."""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from curso_crewai.orcamento import LivroOrcamento, OrcamentoExcedido
+
+
+def test_reserva_recusa_o_que_nao_cabe():
+    livro = LivroOrcamento(limite_tenant=1.0)
+    livro.reservar(0.8, tenant="acme")
+
+    with pytest.raises(OrcamentoExcedido) as erro:
+        livro.reservar(0.3, tenant="acme")
+
+    assert erro.value.conta == "acme"
+    assert livro.estatisticas()["acme"]["rejeicoes"] == 1
+
+
+def test_confirmar_troca_reserva_pelo_custo_real():
+    livro = LivroOrcamento(limite_tenant=1.0)
+    reserva = livro.reservar(0.5, tenant="acme", agente="pesquisador")
+
+    livro.confirmar(reserva, 0.2)
+
+    assert livro.saldo("acme") == {
+        "conta": "acme",
+        "limite": 1.0,
+        "gasto": 0.2,
+        "reservado": 0.0,
+        "disponivel": 0.8,
+    }
+    assert livro.saldo("acme", "pesquisador")["gasto"] == 0.2
+    with pytest.raises(ValueError):
+        livro.confirmar(reserva, 0.2)
+
+
+def test_reservas_concorrentes_nao_estouram_o_limite():
+    livro = LivroOrcamento(limite_tenant=1.0)
+
+    def executar(_):
+        try:
+            with livro.reserva(0.01, tenant="demo"):
+                time.sleep(0.001)
+        except OrcamentoExcedido:
+            pass
+
+    with ThreadPoolExecutor(16) as pool:
+        list(pool.map(executar, range(200)))
+
+    assert livro.saldo("demo")["gasto"] == pytest.approx(1.0)
+
+
+def test_excecao_libera_a_reserva():
+    livro = LivroOrcamento(limite_tenant=1.0)
+
+    with pytest.raises(RuntimeError):
+        with livro.reserva(0.5, tenant="acme"):
+            raise RuntimeError("falhou")
+
+    assert livro.saldo("acme")["reservado"] == 0.0
+    assert livro.saldo("acme")["gasto"] == 0.0
+
+
+def test_confirmacao_depois_de_expirar_ainda_lanca_o_custo():
+    livro = LivroOrcamento(limite_tenant=1.0, ttl_reserva=0.01)
+    lenta = livro.reservar(0.5, tenant="acme")
+    time.sleep(0.02)
+    # Outra execução não cabe, devolve a reserva vencida e consegue reservar
+    livro.confirmar(livro.reservar(0.6, tenant="acme"))
+
+    livro.confirmar(lenta, 0.7)
+
+    saldo = livro.saldo("acme")
+    assert saldo["gasto"] == pytest.approx(1.3)
+    assert saldo["reservado"] == 0.0
+    assert livro.estatisticas()["acme"]["tardias"] == 1
+    with pytest.raises(ValueError):
+        livro.confirmar(lenta, 0.7)
+
+
+def test_context_manager_confirma_reserva_expirada():
+    livro = LivroOrcamento(limite_tenant=1.0, ttl_reserva=0.01)
+
+    with livro.reserva(0.2, tenant="acme") as reserva:
+        time.sleep(0.02)
+        livro.expirar_reservas()
+        reserva.custo_real = 0.3
+
+    assert livro.saldo("acme")["gasto"] == pytest.approx(0.3)
+
+
+def test_lancar_registra_gasto_com_conta_estourada():
+    livro = LivroOrcamento(limite_tenant=1.0)
+    livro.confirmar(livro.reservar(0.5, tenant="acme"), 1.2)
+
+    livro.lancar(0.3, tenant="acme", agente="comunicador")
+
+    assert livro.saldo("acme")["gasto"] == pytest.approx(1.5)
+    assert livro.saldo("acme", "comunicador")["gasto"] == pytest.approx(0.3)
+    with pytest.raises(OrcamentoExcedido):
+        livro.reservar(0.01, tenant="acme")
+
+
+def test_limite_global_soma_os_clientes():
+    livro = LivroOrcamento(limite_global=1.0)
+    livro.confirmar(livro.reservar(0.6, tenant="a"))
+
+    with pytest.raises(OrcamentoExcedido) as erro:
+        livro.reservar(0.6, tenant="b")
+
+    assert erro.value.conta == "*"
+
+
+def test_gastos_sobrevivem_a_reinicio(tmp_path):
+    caminho = str(tmp_path / "orcamento.sqlite3")
+    livro = LivroOrcamento(limite_tenant=1.0, caminho=caminho)
+    livro.definir_limite(2.0, tenant="acme")
+    livro.confirmar(livro.reservar(0.4, tenant="acme"))
+    livro.lancar(0.1, tenant="acme")
+    livro.fechar()
+
+    reaberto = LivroOrcamento(caminho=caminho)
+
+    assert reaberto.saldo("acme")["gasto"] == pytest.approx(0.5)
+    assert reaberto.saldo("acme")["limite"] == 2.0
+    reaberto.fechar()
@@ -0,0 +1,88 @@
+"""Testes do pool de crews reutilizáveis."""
+
+import threading
+
+import pytest
+
+from curso_crewai.pool import PoolCrews, PoolEsgotado
+
+
+class Crew:
+    def __init__(self, chave):
+        self.chave = chave
+        self.task_callback = "sujo"
+
+
+@pytest.fixture
+def pool():
+    return PoolCrews(Crew, max_por_chave=2)
+
+
+def test_reutiliza_instancia_devolvida(pool):
+    with pool.usar("atendimento") as primeira:
+        pass
+    with pool.usar("atendimento") as segunda:
+        pass
+
+    assert segunda is primeira
+    assert segunda.task_callback is None
+    stats = pool.estatisticas()["chaves"]["atendimento"]
+    assert (stats["construcoes"], stats["reutilizacoes"]) == (1, 1)
+
+
+def test_excecao_descarta_instancia(pool):
+    with pytest.raises(RuntimeError):
+        with pool.usar("atendimento"):
+            raise RuntimeError("falhou")
+
+    stats = pool.estatisticas()["chaves"]["atendimento"]
+    assert stats["instancias"] == 0
+    assert stats["descartes"] == 1
+
+
+def test_esgotado_com_timeout(pool):
+    pool.retirar("atendimento")
+    pool.retirar("atendimento")
+
+    with pytest.raises(PoolEsgotado):
+        pool.retirar("atendimento", timeout=0.05)
+
+
+def test_redimensionar_descarta_sobras(pool):
+    pool.redimensionar(4)
+    em_uso = [pool.retirar("atendimento") for _ in range(4)]
+    pool.devolver("atendimento", em_uso.pop())
+    pool.devolver("atendimento", em_uso.pop())
+
+    pool.redimensionar(2)
+    stats = pool.estatisticas()["chaves"]["atendimento"]
+    assert (stats["instancias"], stats["livres"]) == (2, 0)
+
+    for crew in em_uso:
+        pool.devolver("atendimento", crew)
+    stats = pool.estatisticas()["chaves"]["atendimento"]
+    assert (stats["instancias"], stats["livres"]) == (2, 2)
+
+
+def test_instancias_nao_sao_compartilhadas_entre_threads(pool):
+    em_uso, repetidas = [], []
+    trava = threading.Lock()
+
+    def usar():
+        with pool.usar("atendimento") as crew:
+            with trava:
+                if crew in em_uso:
+                    repetidas.append(crew)
+                em_uso.append(crew)
+            threading.Event().wait(0.01)
+            with trava:
+                em_uso.remove(crew)
+
+    threads = [threading.Thread(target=usar) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert repetidas == []
+    assert pool.estatisticas()["chaves"]["atendimento"]["instancias"] <= 2
@@ -0,0 +1,95 @@
+"""Testes do roteador de modelos."""
+
+import pytest
+
+from curso_crewai.roteador import Roteador, ler_log, reproduzir
+
+
+@pytest.fixture
+def roteador():
+    return Roteador(["gpt-4o", "gpt-4o-mini"], limiar=0.75)
+
+
+def test_prompt_com_acentos_pontua_como_sem_acentos(roteador):
+    com_acento = roteador.caracterizar(
+        "Faça uma análise da estratégia e um diagnóstico"
+    )
+    sem_acento = roteador.caracterizar(
+        "Faca uma analise da estrategia e um diagnostico"
+    )
+
+    assert com_acento.marcadores == 3
+    assert com_acento.complexidade == sem_acento.complexidade
+
+
+def test_prompt_simples_vai_para_o_modelo_barato(roteador):
+    decisao = roteador.rotear("Qual o horário de atendimento da loja?")
+
+    assert decisao.modelo == "gpt-4o-mini"
+    assert decisao.motivo == "mais_barato_no_limiar"
+    assert [c.modelo for c in decisao.candidatos] == ["gpt-4o-mini", "gpt-4o"]
+
+
+def test_prompt_dificil_em_portugues_vai_para_o_modelo_forte(roteador):
+    decisao = roteador.rotear("Faça uma análise da estratégia e um diagnóstico")
+
+    assert decisao.modelo == "gpt-4o"
+
+
+def test_dica_limita_a_complexidade(roteador):
+    prompt = "Faça uma análise da estratégia e um diagnóstico"
+
+    assert roteador.caracterizar(prompt, dica="low").complexidade <= 0.3
+    assert roteador.caracterizar("oi", dica="high").complexidade >= 0.7
+
+
+def test_falhas_registradas_tiram_o_modelo_barato_do_limiar(roteador):
+    prompt = "Qual o horário de atendimento da loja?"
+    for _ in range(20):
+        roteador.registrar_resultado(roteador.rotear(prompt), sucesso=False)
+
+    assert roteador.rotear(prompt).modelo == "gpt-4o"
+
+
+def test_executar_escala_ate_validar(roteador):
+    chamados = []
+
+    def chamar(modelo):
+        chamados.append(modelo)
+        return modelo
+
+    resposta, decisao = roteador.executar(
+        "Qual o horário de atendimento da loja?",
+        chamar,
+        validar=lambda resposta: resposta == "gpt-4o",
+    )
+
+    assert chamados == ["gpt-4o-mini", "gpt-4o"]
+    assert resposta == "gpt-4o"
+    assert decisao.nivel == 1
+    assert roteador.escalar(decisao) is None
+
+
+def test_decisao_nao_registrada_so_entra_no_log_com_o_resultado(tmp_path):
+    caminho = tmp_path / "roteador.jsonl"
+    roteador = Roteador(caminho_log=str(caminho))
+
+    decisao = roteador.rotear("oi", registrar=False)
+    assert not caminho.exists()
+    roteador.registrar_resultado(decisao, sucesso=True, latencia_s=0.5)
+
+    eventos = [registro["evento"] for registro in ler_log(str(caminho))]
+    assert eventos == ["decisao", "resultado"]
+    assert roteador.estatisticas()["decisoes"] == 1
+
+
+def test_log_reaplicado_e_reproduzido(tmp_path):
+    caminho = str(tmp_path / "roteador.jsonl")
+    original = Roteador(caminho_log=caminho)
+    for _ in range(5):
+        original.registrar_resultado(original.rotear("oi"), sucesso=True)
+
+    assert Roteador().aprender_do_log(caminho) == 5
+    resumo = reproduzir(caminho, Roteador(["gpt-4o"]))
+    assert resumo["decisoes"] == 5
+    assert resumo["concordancia"] == 0.0
@@ -0,0 +1,110 @@
+"""Testes do atalho de perguntas de catálogo da aula 4."""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "aula4"))
+
+from roteador import RoteadorAtendimento  # noqa: E402
+
+PRODUTOS = {
+    "notebook gamer": {
+        "nome": "Notebook Gamer Ultra X1",
+        "preco": 2999.90,
+        "estoque": 15,
+        "categoria": "informatica",
+    },
+    "smartphone": {
+        "nome": "Smartphone Pro Max 256GB",
+        "preco": 1599.90,
+        "estoque": 8,
+        "categoria": "celulares",
+    },
+    "fone bluetooth": {
+        "nome": "Fone Bluetooth Premium",
+        "preco": 299.90,
+        "estoque": 25,
+        "categoria": "acessorios",
+    },
+}
+
+
+@pytest.fixture
+def roteador():
+    return RoteadorAtendimento(PRODUTOS, limiar=0.8)
+
+
+@pytest.mark.parametrize(
+    "pergunta, intencao, produto",
+    [
+        ("quanto custa o notebook gamer?", "consultar_preco", "notebook gamer"),
+        ("tem smartphone em estoque?", "verificar_estoque", "smartphone"),
+        (
+            "preciso de info sobre o fone bluetooth",
+            "obter_informacoes",
+            "fone bluetooth",
+        ),
+        (
+            "e aí, queria saber o preço daquele notebook gamer",
+            "consultar_preco",
+            "notebook gamer",
+        ),
+    ],
+)
+def test_responde_perguntas_simples(roteador, pergunta, intencao, produto):
+    resposta = roteador.responder(pergunta)
+
+    assert resposta is not None
+    assert resposta.classificacao.intencao == intencao
+    assert resposta.classificacao.produto == produto
+
+
+def test_resposta_usa_preco_do_catalogo(roteador):
+    resposta = roteador.responder("quanto custa o notebook gamer?")
+
+    assert "R$ 2.999,90" in resposta.texto
+    assert "15 unidades" in resposta.texto
+
+
+@pytest.mark.parametrize(
+    "pergunta",
+    [
+        "quanto custa a capinha do smartphone?",
+        "quanto custa o conserto do smartphone?",
+        "quanto custa o carregador do notebook gamer?",
+        "quanto custa o notebook gamer e quanto tempo dura a bateria?",
+    ],
+)
+def test_escalona_outro_assunto_ou_segunda_pergunta(roteador, pergunta):
+    assert roteador.responder(pergunta) is None
+    assert roteador.classificar(pergunta).confianca == 0.0
+
+
+@pytest.mark.parametrize(
+    "pergunta",
+    [
+        "qual o frete do notebook gamer?",
+        "quanto custa o notebook gamer e o smartphone?",
+        "quanto custa o fone com fio?",
+        "quanto custa aquele celular novo?",
+        "quanto custa o fone bluetooth? e o prazo de entrega?",
+    ],
+)
+def test_escalona_perguntas_ambiguas(roteador, pergunta):
+    assert roteador.responder(pergunta) is None
+
+
+def test_estatisticas_contam_roteadas_e_escalonadas(roteador):
+    roteador.responder("quanto custa o notebook gamer?")
+    roteador.responder("quanto custa a capinha do smartphone?")
+    roteador.registrar_execucao_crew(2.0)
+
+    stats = roteador.estatisticas()
+
+    assert stats["total"] == 2
+    assert stats["roteadas"] == 1
+    assert stats["escalonadas"] == 1
+    assert stats["por_intencao"] == {"consultar_preco": 1}
+    assert stats["latencia_media_crew_s"] == 2.0
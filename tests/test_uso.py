@@ -0,0 +1,79 @@
+"""Testes da contabilidade de tokens por agente, tarefa e modelo."""
+
+import pytest
+
+from curso_crewai.uso import ColetorUso, RegistroUso, extrair_usage
+
+
+def _registro(agente="pesquisador", modelo="gpt-4o-mini", prompt=1000):
+    return RegistroUso(
+        modelo=modelo, prompt_tokens=prompt, completion_tokens=500, agente=agente
+    )
+
+
+@pytest.mark.parametrize(
+    "usage, esperado",
+    [
+        (
+            {
+                "prompt_tokens": 100,
+                "completion_tokens": 20,
+                "prompt_tokens_details": {"cached_tokens": 40},
+            },
+            {"prompt_tokens": 100, "completion_tokens": 20, "cached_tokens": 40},
+        ),
+        (
+            {
+                "input_tokens": 7,
+                "output_tokens": 3,
+                "input_token_details": {"cache_read": 2},
+            },
+            {"prompt_tokens": 7, "completion_tokens": 3, "cached_tokens": 2},
+        ),
+        ({"total_tokens": 10}, None),
+        (None, None),
+    ],
+)
+def test_extrair_usage(usage, esperado):
+    assert extrair_usage(usage) == esperado
+
+
+def test_registros_limitados_e_totais_exatos():
+    coletor = ColetorUso(max_registros=3)
+    for i in range(10):
+        coletor.registrar(_registro(agente="a" if i % 2 else "b"))
+
+    assert len(coletor.registros) == 3
+    assert coletor.total_tokens == 10 * 1500
+    assert coletor.custo_total == pytest.approx(10 * _registro().custo)
+    resumo = coletor.resumo("agente")
+    assert (resumo["a"]["chamadas"], resumo["b"]["chamadas"]) == (5, 5)
+    assert coletor.resumo("modelo")["gpt-4o-mini"]["prompt_tokens"] == 10_000
+
+
+def test_resumo_sem_atribuicao_e_agrupamento_invalido():
+    coletor = ColetorUso()
+    coletor.registrar(_registro(agente=None))
+
+    assert coletor.resumo("agente")["sem_atribuicao"]["chamadas"] == 1
+    with pytest.raises(ValueError):
+        coletor.resumo("cliente")
+
+
+def test_fechar_tarefa_move_os_totais():
+    coletor = ColetorUso(max_registros=1)
+    with coletor.rastrear() as escopo:
+        coletor.registrar_chamada(
+            "gpt-4o-mini", {"prompt_tokens": 10, "completion_tokens": 5}
+        )
+        escopo.fechar_tarefa("pesquisador", "pesquisa")
+        coletor.registrar_chamada(
+            "gpt-4o-mini", {"prompt_tokens": 20, "completion_tokens": 5}
+        )
+        escopo.fechar_tarefa("redator", "texto")
+
+    assert escopo.total_tokens == 40
+    resumo = coletor.resumo("tarefa")
+    assert set(resumo) == {"pesquisa", "texto"}
+    assert resumo["pesquisa"]["prompt_tokens"] == 10
+    assert resumo["texto"]["prompt_tokens"] == 20
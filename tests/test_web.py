@@ -0,0 +1,177 @@
+"""Testes do coletor web contra o servidor local de páginas."""
+
+import asyncio
+
+import httpx
+import pytest
+
+from curso_crewai.cache import BackendMemoria
+from curso_crewai.web import (
+    ColetorWeb,
+    ExtratorHTML,
+    ServidorPaginasLocal,
+    endereco_interno,
+)
+
+HTML = (
+    "<html><head><title>Agentes | Curso</title>"
+    '<meta name="description" content="Role, goal e backstory."></head>'
+    "<body><nav>menu</nav><h1>Agentes</h1><p>Cada agente tem um papel.</p>"
+    '<script>var x = 1;</script><a href="/tarefas">Tarefas</a></body></html>'
+)
+
+
+@pytest.fixture
+def servidor():
+    servidor = ServidorPaginasLocal(latencia=0.05)
+    servidor.iniciar_em_thread()
+    yield servidor
+    servidor.shutdown()
+    servidor.server_close()
+
+
+@pytest.fixture
+def coletor():
+    cliente = httpx.Client()
+    yield ColetorWeb(cache=BackendMemoria(), por_host=2, cliente=cliente)
+    cliente.close()
+
+
+def test_limite_por_host(servidor, coletor):
+    urls = [f"{servidor.url}/crewai?pagina={i}" for i in range(8)]
+
+    paginas = coletor.buscar_varias(urls)
+
+    assert all(pagina.ok for pagina in paginas)
+    assert servidor.max_simultaneas == 2
+    assert coletor.max_por_host == 2
+
+
+def test_limite_por_host_async(servidor):
+    async def buscar():
+        async with httpx.AsyncClient() as cliente:
+            coletor = ColetorWeb(por_host=3, cliente_async=cliente)
+            return await coletor.abuscar_varias(
+                [f"{servidor.url}/agentes?pagina={i}" for i in range(9)]
+            )
+
+    paginas = asyncio.run(buscar())
+
+    assert [pagina.titulo for pagina in paginas] == ["Agentes | Curso"] * 9
+    assert servidor.max_simultaneas == 3
+
+
+def test_revalidacao_com_etag_reaproveita_extracao(servidor, coletor):
+    coletor.ttl_padrao_s = 0  # sem Cache-Control: revalida sempre
+    url = servidor.adicionar("/etag", HTML)
+
+    primeira = coletor.buscar(url)
+    segunda = coletor.buscar(url)
+
+    assert primeira.origem == "rede"
+    assert segunda.origem == "revalidada"
+    assert servidor.respostas_304 == 1
+    assert segunda.texto == primeira.texto
+    assert segunda.titulo == "Agentes | Curso"
+
+
+def test_cache_control_max_age_dispensa_a_rede(servidor, coletor):
+    url = servidor.adicionar("/max-age", HTML, max_age=60)
+
+    coletor.buscar(url)
+    requisicoes = servidor.requisicoes
+    pagina = coletor.buscar(url)
+
+    assert pagina.origem == "cache"
+    assert servidor.requisicoes == requisicoes
+
+
+def test_cache_control_no_store_nao_guarda(servidor, coletor):
+    url = servidor.adicionar("/no-store", HTML)
+    servidor.paginas["/no-store"][1]["Cache-Control"] = "no-store"
+
+    coletor.buscar(url)
+    pagina = coletor.buscar(url)
+
+    assert pagina.origem == "rede"
+    assert servidor.respostas_304 == 0
+
+
+def test_copia_antiga_quando_o_site_falha():
+    servidor = ServidorPaginasLocal(exemplos=False)
+    servidor.iniciar_em_thread()
+    # Sem keep-alive: a conexão aberta continuaria atendendo após o shutdown
+    cliente = httpx.Client(limits=httpx.Limits(max_keepalive_connections=0))
+    coletor = ColetorWeb(ttl_padrao_s=0, cliente=cliente)
+    url = servidor.adicionar("/instavel", HTML)
+    original = coletor.buscar(url)
+    servidor.shutdown()
+    servidor.server_close()
+
+    pagina = coletor.buscar(url)
+
+    assert pagina.origem == "cache_antigo"
+    assert pagina.erro
+    assert pagina.texto == original.texto
+    assert coletor.antigas == 1
+    cliente.close()
+
+
+def test_bloqueia_rede_local(servidor, coletor):
+    url = servidor.adicionar("/interna", HTML)
+
+    pagina = coletor.buscar(url, bloquear_internos=True)
+
+    assert not pagina.ok
+    assert "EnderecoInterno" in pagina.erro
+    assert servidor.requisicoes == 0
+    assert coletor.buscar(url).ok
+
+
+@pytest.mark.parametrize(
+    "url, interno",
+    [
+        ("http://127.0.0.1:8000/", True),
+        ("http://10.1.2.3/", True),
+        ("http://192.168.0.10/admin", True),
+        ("http://169.254.169.254/latest/meta-data/", True),
+        ("http://[::1]/", True),
+        ("http://[::ffff:127.0.0.1]/", True),
+        ("http://0.0.0.0/", True),
+        ("http://93.184.216.34/", False),
+    ],
+)
+def test_endereco_interno(url, interno):
+    assert endereco_interno(url) is interno
+
+
+def _extrair(usar_lxml, tamanho_pedaco=7):
+    extrator = ExtratorHTML("http://exemplo.com/agentes", usar_lxml=usar_lxml)
+    dados = HTML.encode("utf-8")
+    for i in range(0, len(dados), tamanho_pedaco):
+        extrator.alimentar(dados[i : i + tamanho_pedaco])
+    return extrator.fechar()
+
+
+def test_extracao_em_pedacos_html_parser():
+    conteudo = _extrair(usar_lxml=False)
+
+    assert conteudo.titulo == "Agentes | Curso"
+    assert conteudo.descricao == "Role, goal e backstory."
+    assert conteudo.cabecalhos == ["Agentes"]
+    assert "Cada agente tem um papel." in conteudo.texto
+    assert "menu" not in conteudo.texto and "var x" not in conteudo.texto
+    assert [link.url for link in conteudo.links] == ["http://exemplo.com/tarefas"]
+
+
+def test_extracao_em_pedacos_lxml_igual_ao_html_parser():
+    pytest.importorskip("lxml")
+
+    lxml = _extrair(usar_lxml=True)
+    padrao = _extrair(usar_lxml=False)
+
+    assert lxml.titulo == padrao.titulo
+    assert lxml.descricao == padrao.descricao
+    assert lxml.cabecalhos == padrao.cabecalhos
+    assert lxml.texto == padrao.texto
+    assert lxml.links == padrao.links
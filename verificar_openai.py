@@ -16,7 +16,7 @@ from datetime import datetime
 from dotenv import load_dotenv
 
 try:
-    from openai import OpenAI
+    from openai import OpenAI  # noqa: F401
 
     print("✅ Biblioteca OpenAI importada com sucesso")
 except ImportError:
@@ -24,6 +24,8 @@ except ImportError:
     print("Execute: pip install openai")
     sys.exit(1)
 
+from curso_crewai.conexoes import cliente_openai, metricas
+
 # Carrega variáveis de ambiente
 load_dotenv()
 
@@ -53,7 +55,9 @@ class VerificadorOpenAI:
 
         # Inicializar cliente OpenAI
         try:
-            self.client = OpenAI(api_key=self.api_key)
+            # Cliente do pool compartilhado: as verificações seguintes
+            # reaproveitam a mesma conexão (um único handshake TLS)
+            self.client = cliente_openai(api_key=self.api_key)
             print("✅ Cliente OpenAI inicializado")
             return True
         except Exception as e:
@@ -185,6 +189,13 @@ class VerificadorOpenAI:
 
         self.informacoes_conta()
 
+        conexoes = metricas.resumo()
+        print(
+            f"\n🔌 Conexões: {conexoes['requisicoes']} requisições em "
+            f"{conexoes['conexoes_novas']} conexão(ões) "
+            f"({conexoes['handshakes_tls']} handshake(s) TLS)"
+        )
+
         print("\n" + "=" * 60)
         print("🎉 VERIFICAÇÃO CONCLUÍDA COM SUCESSO!")
         print("✅ Sua configuração está pronta para usar CrewAI")